@@ -70,6 +70,15 @@ def create_app() -> Flask:
     return app
 
 
+def crear_formateador_json() -> logging.Formatter:
+    """Formato JSON de los logs de producción (lo lee también app/utils/log_analyzer.py)."""
+    from pythonjsonlogger import jsonlogger
+    return jsonlogger.JsonFormatter(
+        '%(asctime)s %(levelname)s %(name)s %(message)s',
+        rename_fields={'asctime': 'timestamp', 'levelname': 'level'}
+    )
+
+
 def configure_logging(app):
     """Configura logging estructurado con rotación. Usa JSON en producción."""
     from app.constants import MAX_LOG_SIZE_BYTES, MAX_LOG_BACKUP_COUNT
@@ -79,7 +88,7 @@ def configure_logging(app):
     carpeta_base = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
     
     # Mover logs a carpeta dedicada fuera del web root (Auditoría: seguridad)
-    log_dir = os.path.join(carpeta_base, 'logs')
+    log_dir = app.config.get('LOGS_DIR') or os.path.join(carpeta_base, 'logs')
     os.makedirs(log_dir, exist_ok=True)
     log_file = os.path.join(log_dir, 'app.log')
     
@@ -103,11 +112,7 @@ def configure_logging(app):
     # Use JSON formatter in production for log analytics
     if not app.debug:
         try:
-            from pythonjsonlogger import jsonlogger
-            json_formatter = jsonlogger.JsonFormatter(
-                '%(asctime)s %(levelname)s %(name)s %(message)s',
-                rename_fields={'asctime': 'timestamp', 'levelname': 'level'}
-            )
+            json_formatter = crear_formateador_json()
             file_handler.setFormatter(json_formatter)
             stream_handler.setFormatter(json_formatter)
         except ImportError:
@@ -120,10 +125,21 @@ def configure_logging(app):
         file_handler.setFormatter(text_formatter)
         stream_handler.setFormatter(text_formatter)
     
+    handlers = [file_handler, stream_handler]
+    
+    # Logging asíncrono opcional: la petición solo encola, un hilo escribe
+    if app.config.get('LOG_ASYNC') and not logging.getLogger().handlers:
+        from app.utils.async_logging import crear_cola
+        handlers = [crear_cola(handlers, app.config.get('LOG_QUEUE_MAX_RECORDS', 10000))]
+    
     logging.basicConfig(
         level=log_level,
-        handlers=[file_handler, stream_handler]
+        handlers=handlers
     )
+    
+    # Muestreo de líneas de acceso correctas (logger 'request') a alta QPS
+    from app.utils.async_logging import instalar_muestreo
+    instalar_muestreo(app.config.get('LOG_REQUEST_SAMPLE_EVERY', 1), app.config.get('LOG_REQUEST_SAMPLE_SLOW_MS', 1000))
 
 
 
@@ -134,6 +150,34 @@ def register_extensions(app):
     csrf.init_app(app)
     cache.init_app(app)
     
+    # Caché de contenido de artículos/casos (por worker)
+    from app.utils.content_cache import content_cache
+    content_cache.init_app(app)
+    
+    # Buffer write-behind de eventos de lectura (por worker)
+    from app.utils.analytics_buffer import read_events
+    read_events.init_app(app)
+    
+    # Registro de categorías inmutable y versionado (por worker)
+    from app.utils.category_registry import category_registry
+    category_registry.init_app(app)
+    
+    # Métricas en proceso (peticiones, SQL y caché; por worker)
+    from app.utils.metrics import metricas
+    metricas.init_app(app)
+    
+    # Instrumentación SQL por petición (N+1, consultas lentas; por worker)
+    from app.utils.query_stats import instrumentacion_sql
+    instrumentacion_sql.init_app(app)
+    
+    # Perfilado por muestreo bajo demanda (sesiones compartidas por los workers)
+    from app.utils.profiler import perfilador
+    perfilador.init_app(app)
+    
+    # Vigilante de peticiones lentas (pila de los workers atascados)
+    from app.utils.watchdog import vigilante
+    vigilante.init_app(app)
+    
     # Rate limiter con protección DoS global
     # REMEDIACIÓN CRÍTICO-002: Límites globales para prevenir ataques DoS
     limiter.init_app(app)
@@ -279,6 +323,10 @@ def register_blueprints(app):
     from app.routes.diagnostics import diagnostics_bp
     app.register_blueprint(diagnostics_bp)
     
+    # Métricas Prometheus (/metrics, restringido por IP o admin)
+    from app.routes.metrics import metrics_bp
+    app.register_blueprint(metrics_bp)
+    
     # Debug blueprint: SOLO en desarrollo
     # Esto previene exposición de endpoints de debug en producción
     if app.debug:
@@ -318,40 +366,24 @@ def register_context_processors(app):
     @app.context_processor
     def inject_global_vars():
         """Inyecta variables globales en templates"""
-        from flask import session
-        from app.constants import LISTA_CATEGORIAS, get_category_slug
-        
-        # Check si es admin
-        es_admin = False
-        admin_email = app.config.get('ADMIN_EMAIL', '')
-        
-        if 'user_email' in session and admin_email:
-            es_admin = session['user_email'].strip().lower() == admin_email.strip().lower()
+        from app.utils.tags import parsear_tags
+        from app.utils.category_registry import category_registry
         
-        # REMEDIACIÓN: Usar método centralizado en lugar de lógica duplicada
-        from app.models.categoria import Categoria
-        todas_las_categorias = Categoria.get_nombres_con_fallback()
+        # OPTIMIZACIÓN: Usuario resuelto una vez por petición (caché por email)
+        from app.utils.current_user import get_current_user
+        usuario = get_current_user()
         
-        # Verificar acceso educativo (.edu)
-        tiene_acceso_edu = False
-        if es_admin:
-            tiene_acceso_edu = True  # Admin siempre tiene acceso
-        elif 'user_email' in session:
-            from app.models.usuario import Usuario
-            user = Usuario.query.filter_by(email=session['user_email']).first()
-            tiene_acceso_edu = user.acceso_edu if user else False
-        
-        # Verificar si es correo @ieproes.edu.sv (acceso a Recursos)
-        es_ieproes = es_admin  # Admin siempre tiene acceso
-        if not es_ieproes and 'user_email' in session:
-            es_ieproes = session['user_email'].strip().lower().endswith('@ieproes.edu.sv')
+        # OPTIMIZACIÓN: Registro en memoria (sin consulta por render)
+        registro = category_registry.actual()
         
         return dict(
-            todas_las_categorias=todas_las_categorias,
-            es_admin=es_admin,
-            get_category_slug=get_category_slug,  # Nueva función para URLs jerárquicas
-            tiene_acceso_edu=tiene_acceso_edu,  # Acceso educativo verificado
-            es_ieproes=es_ieproes  # Acceso a recursos institucionales
+            todas_las_categorias=registro.nombres,
+            es_admin=usuario.es_admin,
+            get_category_slug=registro.slug,  # Slugs precalculados para URLs jerárquicas
+            parsear_tags=parsear_tags,  # Enlaces /tag/<slug> con la misma normalización que la BD
+            tiene_acceso_edu=usuario.acceso_edu,  # Acceso educativo verificado
+            es_ieproes=usuario.es_ieproes,  # Acceso a recursos institucionales
+            current_user=usuario
         )
 
 
@@ -361,6 +393,10 @@ def register_request_hooks(app):
     import uuid
     from flask import request, g
     from app.utils.helpers import check_session_timeout
+    from app.utils.metrics import metricas
+    from app.utils.query_stats import instrumentacion_sql
+    from app.utils.profiler import perfilador
+    from app.utils.watchdog import vigilante
     
     @app.before_request
     def before_request_logging():
@@ -370,6 +406,10 @@ def register_request_hooks(app):
         g.request_id = str(uuid.uuid4())[:8]
         # Remediación AUTH-001: Verificar inactividad de sesión
         check_session_timeout()
+        # Peticiones que superen WATCHDOG_THRESHOLD_SECONDS dejan su pila en el log
+        vigilante.iniciar_peticion(g.request_id, request.endpoint, request.method, request.path)
+        # Perfilado bajo demanda (sin sesión armada solo mira el reloj)
+        perfilador.antes_de_peticion(request.endpoint, request.headers)
     
     @app.after_request
     def after_request_logging(response):
@@ -385,17 +425,36 @@ def register_request_hooks(app):
         if hasattr(g, 'request_id'):
             response.headers['X-Request-ID'] = g.request_id
         
+        metricas.observar_peticion(request.endpoint, request.method, response.status_code, elapsed_ms / 1000)
+        
+        req_id = getattr(g, 'request_id', 'unknown')
+        consultas = instrumentacion_sql.de_peticion()
+        
         # Solo loguear en producción o para rutas significativas
         if not app.debug:
             request_logger = logging.getLogger('request')
-            req_id = getattr(g, 'request_id', 'unknown')
+            sql = f" - SQL: {consultas.total} ({consultas.milisegundos}ms)" if consultas else ''
             request_logger.info(
                 f"[{req_id}] {request.method} {request.path} - "
                 f"Status: {response.status_code} - "
-                f"Tiempo: {elapsed_ms}ms"
+                f"Tiempo: {elapsed_ms}ms{sql}",
+                extra={
+                    'status': response.status_code, 'elapsed_ms': elapsed_ms,  # Para el muestreo
+                    'sql_consultas': consultas.total if consultas else 0,
+                }
             )
         
+        # Posibles N+1 y presupuesto de consultas (también en desarrollo)
+        if consultas:
+            instrumentacion_sql.revisar_peticion(consultas, req_id, request.endpoint)
+        
         return response
+    
+    @app.teardown_request
+    def teardown_request_tracking(exc):
+        """Cierra perfilado y vigilancia también si la vista lanzó una excepción."""
+        vigilante.terminar_peticion()
+        perfilador.despues_de_peticion(g.get('request_id'), request.path)
 
 
 def configure_production_features(app):
@@ -12,6 +12,10 @@ from flask.cli import with_appcontext
 def init_app(app):
     """Registra los comandos CLI con la aplicación Flask."""
     app.cli.add_command(logs_cli)
+    app.cli.add_command(content_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(metrics_cli)
 
 
 @click.group('logs')
@@ -20,12 +24,16 @@ def logs_cli():
     pass
 
 
+def _ruta_logs(*partes) -> str:
+    """Ruta dentro de la carpeta de logs (LOGS_DIR, donde escribe configure_logging)."""
+    return os.path.join(current_app.config['LOGS_DIR'], *partes)
+
+
 @logs_cli.command('clear')
 @with_appcontext
 def clear_logs():
     """Limpia el archivo app.log principal"""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    log_file = os.path.join(base_dir, 'app.log')
+    log_file = _ruta_logs('app.log')
     
     if os.path.exists(log_file):
         try:
@@ -46,12 +54,10 @@ def clear_logs():
 @with_appcontext
 def rotate_logs():
     """Fuerza rotación de logs (elimina backups antiguos)"""
-    import glob
-    
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    backup_pattern = os.path.join(base_dir, 'app.log.*')
+    from app.utils.log_analyzer import archivos_de_log
     
-    backups = glob.glob(backup_pattern)
+    log_file = _ruta_logs('app.log')
+    backups = [ruta for ruta in archivos_de_log(_ruta_logs()) if ruta != log_file]
     
     if backups:
         removed = 0
@@ -70,23 +76,351 @@ def rotate_logs():
 @with_appcontext
 def log_stats():
     """Muestra estadísticas del archivo de log"""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    log_file = os.path.join(base_dir, 'app.log')
+    from app.utils.log_analyzer import archivos_de_log, iterar_lineas
+    
+    log_file = _ruta_logs('app.log')
     
     if os.path.exists(log_file):
         size = os.path.getsize(log_file)
         size_kb = size / 1024
         size_mb = size_kb / 1024
         
-        # Contar líneas
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = sum(1 for _ in f)
+        # Contar líneas (mmap, sin decodificar)
+        lines = sum(1 for _ in iterar_lineas(log_file))
         
-        click.echo(f'📊 Estadísticas de app.log:')
+        click.echo(f'📊 Estadísticas de {log_file}:')
         click.echo(f'   Tamaño: {size_mb:.2f} MB ({size_kb:.0f} KB)')
         click.echo(f'   Líneas: {lines:,}')
         
+        backups = [ruta for ruta in archivos_de_log(_ruta_logs()) if ruta != log_file]
+        if backups:
+            total_backups = sum(os.path.getsize(ruta) for ruta in backups) / (1024 * 1024)
+            click.echo(f'   Backups: {len(backups)} ({total_backups:.2f} MB)')
+        
         if size_mb > 5:
             click.echo(click.style('   ⚠️ El log es grande, considera ejecutar: flask logs clear', fg='yellow'))
     else:
         click.echo(click.style('ℹ️ app.log no existe', fg='blue'))
+
+
+@logs_cli.command('analyze')
+@click.option('--dir', 'log_dir', default=None, help='Carpeta de logs (default: LOGS_DIR)')
+@click.option('--desde', default=None, help="Desde 'YYYY-MM-DD[ HH:MM]' (inclusive)")
+@click.option('--hasta', default=None, help="Hasta 'YYYY-MM-DD[ HH:MM]' (inclusive)")
+@click.option('--sin-rotados', is_flag=True, help='Analizar solo app.log (sin app.log.N[.gz])')
+@click.option('--json', 'como_json', is_flag=True, help='Emitir el resultado completo en JSON')
+@click.option('--salida', default=None, type=click.Path(dir_okay=False), help='Escribir el JSON en un archivo')
+@click.option('--top', default=None, type=int, help='Rutas mostradas en modo texto (default: LOGS_ANALYZE_TOP)')
+@with_appcontext
+def analyze_logs(log_dir, desde, hasta, sin_rotados, como_json, salida, top):
+    """Latencias p50/p95/p99, estados y throughput por ruta desde los logs de peticiones"""
+    import json
+    from app.utils.log_analyzer import analizar_logs, archivos_de_log, normalizador_flask
+    
+    rutas = archivos_de_log(log_dir or _ruta_logs(), incluir_rotados=not sin_rotados)
+    if not rutas:
+        raise click.UsageError(f'No hay logs en {log_dir or _ruta_logs()}')
+    
+    resultado = analizar_logs(rutas, normalizar=normalizador_flask(current_app), desde=desde, hasta=hasta)
+    
+    if salida:
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        click.echo(click.style(f'✅ Análisis escrito en {salida}', fg='green'))
+    if como_json:
+        click.echo(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return
+    if salida:
+        return
+    
+    glob_ = resultado['global']
+    click.echo(f"📊 {resultado['peticiones']:,} peticiones en {len(rutas)} archivos "
+               f"({resultado['desde'] or '-'} → {resultado['hasta'] or '-'})")
+    click.echo(f"   Global: p50 {glob_['p50_ms']}ms · p95 {glob_['p95_ms']}ms · p99 {glob_['p99_ms']}ms · "
+               f"máx {glob_['max_ms']}ms")
+    click.echo(f"   Estados: {resultado['estados_por_clase']}")
+    throughput = resultado['throughput']
+    click.echo(f"   Throughput: {throughput['media_por_minuto']}/min de media, "
+               f"pico {throughput['pico_por_minuto']}/min")
+    
+    top = top or current_app.config.get('LOGS_ANALYZE_TOP', 20)
+    click.echo(f"\n   {'Ruta':<48} {'n':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'5xx':>6}")
+    for clave, datos in list(resultado['rutas'].items())[:top]:
+        errores = sum(n for estado, n in datos['estados'].items() if estado.startswith('5'))
+        click.echo(f"   {clave[:48]:<48} {datos['peticiones']:>8,} {datos['p50_ms']:>9} "
+                   f"{datos['p95_ms']:>9} {datos['p99_ms']:>9} {errores:>6}")
+
+
+@logs_cli.command('archive')
+@click.option('--dias', default=None, type=int, help='Días conservados en la tabla (default: LOGS_RETENTION_DAYS)')
+@click.option('--batch-size', default=None, type=int, help='Filas por lote/transacción (default: LOGS_ARCHIVE_BATCH)')
+@click.option('--destino', default=None, help='Directorio de archivo (default: LOGS_ARCHIVE_DIR)')
+@with_appcontext
+def archive_logs(dias, batch_size, destino):
+    """Mueve log_actividad antiguo a NDJSON comprimido (por lotes)"""
+    from app.utils.log_archive import archivar_logs
+    
+    def reportar(archivadas):
+        click.echo(f'   {archivadas:,} eventos archivados...')
+    
+    resultado = archivar_logs(dias=dias, batch_size=batch_size, destino=destino, reportar=reportar)
+    click.echo(click.style(
+        f"✅ {resultado['archivadas']:,} eventos anteriores a {resultado['corte']} archivados "
+        f"en {resultado['lotes']} lotes ({len(resultado['archivos'])} archivos nuevos)",
+        fg='green'
+    ))
+
+
+@logs_cli.command('partition')
+@click.option('--meses', default=3, show_default=True, help='Particiones mensuales creadas por adelantado')
+@click.option('--aplicar', is_flag=True, help='Ejecutar las sentencias (solo MySQL); sin esto solo se muestran')
+@with_appcontext
+def partition_logs(meses, aplicar):
+    """Particiona log_actividad por mes en MySQL (o muestra el SQL)"""
+    from sqlalchemy import text
+    from app.extensions import db
+    from app.utils.log_archive import plan_particiones
+    
+    sentencias = plan_particiones(meses)
+    if not sentencias:
+        click.echo(click.style('ℹ️ Las particiones ya están al día', fg='blue'))
+        return
+    for sentencia in sentencias:
+        click.echo(sentencia + ';')
+    
+    if aplicar:
+        if db.engine.dialect.name != 'mysql':
+            raise click.UsageError('--aplicar solo está soportado en MySQL')
+        for sentencia in sentencias:
+            db.session.execute(text(sentencia))
+        db.session.commit()
+        click.echo(click.style(f'✅ {len(sentencias)} sentencias aplicadas', fg='green'))
+
+
+@click.group('content')
+def content_cli():
+    """Comandos para gestión de contenido (artículos y casos)"""
+    pass
+
+
+def _backfill_metricas_modelo(modelo, carpeta: str, batch_size: int, todos: bool) -> tuple:
+    """
+    Recalcula métricas de ingesta para un modelo en lotes por id (keyset).
+    
+    Returns:
+        Tuple (actualizados, archivos_faltantes)
+    """
+    from sqlalchemy import update
+    from app.config import BASE_DIR
+    from app.extensions import db
+    from app.utils.ingest import analizar_html, valores_metricas
+    
+    actualizados = 0
+    faltantes = 0
+    ultimo_id = 0
+    
+    while True:
+        query = db.session.query(modelo.id, modelo.nombre_archivo, modelo.updated_at).filter(
+            modelo.id > ultimo_id
+        )
+        if not todos:
+            query = query.filter(modelo.tiempo_lectura.is_(None))
+        filas = query.order_by(modelo.id).limit(batch_size).all()
+        if not filas:
+            break
+        
+        cambios = []
+        for id_, nombre_archivo, updated_at in filas:
+            ruta = os.path.join(BASE_DIR, 'templates', carpeta, nombre_archivo)
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    html = f.read()
+            except OSError:
+                faltantes += 1
+                continue
+            # updated_at explícito: el backfill no es una edición de contenido
+            cambios.append({'id': id_, 'updated_at': updated_at, **valores_metricas(analizar_html(html))})
+        
+        if cambios:
+            db.session.execute(update(modelo), cambios)
+            db.session.commit()
+        
+        actualizados += len(cambios)
+        ultimo_id = filas[-1][0]
+        click.echo(f'   {modelo.__tablename__}: {actualizados} actualizados (id <= {ultimo_id})')
+    
+    return actualizados, faltantes
+
+
+@content_cli.command('backfill-metrics')
+@click.option('--batch-size', default=500, show_default=True, help='Filas por lote/transacción')
+@click.option('--todos', is_flag=True, help='Recalcular también filas que ya tienen métricas')
+@with_appcontext
+def backfill_metrics(batch_size, todos):
+    """Precalcula palabras, tiempo de lectura, índice y extracto"""
+    from app.models.articulo import Articulo
+    from app.models.caso import CasoClinico
+    
+    for modelo, carpeta in ((Articulo, 'articulos'), (CasoClinico, 'casos_clinicos')):
+        actualizados, faltantes = _backfill_metricas_modelo(modelo, carpeta, batch_size, todos)
+        click.echo(click.style(
+            f'✅ {modelo.__tablename__}: {actualizados} con métricas, {faltantes} sin archivo HTML',
+            fg='green'
+        ))
+
+
+@content_cli.command('reindex-search')
+@click.option('--batch-size', default=500, show_default=True, help='Artículos por lote/transacción')
+@with_appcontext
+def reindex_search(batch_size):
+    """Reconstruye el índice de búsqueda de texto completo de artículos"""
+    from app.config import BASE_DIR
+    from app.utils.search import reindexar_articulos
+    
+    def reportar(indexados, total, ultimo_id):
+        click.echo(f'   articulo_busqueda: {indexados} indexados (id <= {ultimo_id})')
+    
+    indexados, faltantes = reindexar_articulos(BASE_DIR, batch_size, reportar)
+    
+    click.echo(click.style(
+        f'✅ Índice de búsqueda: {indexados} artículos, {faltantes} sin archivo HTML',
+        fg='green'
+    ))
+
+
+@content_cli.command('import')
+@click.argument('fuente', type=click.Path(exists=True))
+@click.option('--manifiesto', default=None, help='Manifiesto CSV/JSON (default: manifest.csv/json en la fuente)')
+@click.option('--batch-size', default=1000, show_default=True, help='Filas por lote/transacción')
+@click.option('--workers', default=None, type=int, help='Procesos de sanitización (default: CPUs)')
+@click.option('--io-workers', default=8, show_default=True, help='Hilos de escritura de archivos')
+@click.option('--checkpoint', default=None, help='Archivo de progreso (default: <fuente>.import-checkpoint.json)')
+@click.option('--no-reanudar', is_flag=True, help='Ignorar el checkpoint y empezar desde el principio')
+@with_appcontext
+def import_content(fuente, manifiesto, batch_size, workers, io_workers, checkpoint, no_reanudar):
+    """Importa artículos en lote desde un directorio o .zip con manifiesto"""
+    from app.config import BASE_DIR
+    from app.utils.bulk_import import importar_articulos, ImportacionError
+    
+    def reportar(lote):
+        click.echo(
+            f'   Lote {lote.numero}: {lote.importados} importados, {lote.omitidos} existentes, '
+            f'{lote.errores} errores en {lote.segundos:.2f}s ({lote.por_segundo:.0f} art/s) '
+            f'- {lote.procesadas}/{lote.total}'
+        )
+    
+    try:
+        resultado = importar_articulos(
+            fuente, BASE_DIR, manifiesto=manifiesto, checkpoint=checkpoint, batch_size=batch_size,
+            workers=workers, io_workers=io_workers, reanudar=not no_reanudar, reportar=reportar
+        )
+    except ImportacionError as e:
+        raise click.ClickException(str(e))
+    
+    for slug, mensaje in resultado['errores'][:20]:
+        click.echo(click.style(f'   ⚠️ {slug or "(sin slug)"}: {mensaje}', fg='yellow'))
+    if len(resultado['errores']) > 20:
+        click.echo(f'   ... y {len(resultado["errores"]) - 20} errores más (ver log)')
+    
+    click.echo(click.style(
+        f'✅ Importación: {resultado["importados"]} artículos, {resultado["omitidos"]} ya existentes, '
+        f'{resultado["total_errores"]} errores en {resultado["segundos"]:.1f}s',
+        fg='green'
+    ))
+
+
+@click.group('jobs')
+def jobs_cli():
+    """Trabajos en segundo plano (app/utils/jobs.py)"""
+    pass
+
+
+@jobs_cli.command('worker')
+@click.option('--hilos', default=2, show_default=True, help='Trabajos ejecutados en paralelo')
+@click.option('--intervalo', default=None, type=float,
+              help='Segundos entre sondeos de la cola (default: JOBS_POLL_SECONDS)')
+@click.option('--una-vez', is_flag=True, help='Vaciar la cola y terminar (útil desde cron)')
+@with_appcontext
+def jobs_worker(hilos, intervalo, una_vez):
+    """Ejecuta los trabajos encolados desde el panel de administración"""
+    from app.utils.jobs import ejecutar_worker, procesar_pendientes, nombre_worker
+    
+    if una_vez:
+        ejecutados = procesar_pendientes(nombre_worker())
+        click.echo(click.style(f'✅ {ejecutados} trabajos ejecutados', fg='green'))
+        return
+    
+    intervalo = intervalo or current_app.config.get('JOBS_POLL_SECONDS', 2)
+    click.echo(f'👷 Worker de trabajos: {hilos} hilos, sondeo cada {intervalo}s (Ctrl+C para detener)')
+    ejecutar_worker(current_app._get_current_object(), hilos=hilos, intervalo=intervalo)
+
+
+@jobs_cli.command('enqueue')
+@click.argument('tipo')
+@click.option('--param', 'parametros', multiple=True, help='Parámetro clave=valor (repetible)')
+@with_appcontext
+def jobs_enqueue(tipo, parametros):
+    """Encola un trabajo (p. ej. regenerar_sitemap desde cron)"""
+    from app.utils.jobs import encolar, TAREAS
+    
+    if tipo not in TAREAS:
+        raise click.BadParameter(f"tipos disponibles: {', '.join(sorted(TAREAS))}", param_hint='TIPO')
+    
+    valores = {}
+    for par in parametros:
+        clave, separador, valor = par.partition('=')
+        if not separador:
+            raise click.BadParameter(f'se esperaba clave=valor: {par}', param_hint='--param')
+        valores[clave] = int(valor) if valor.isdigit() else valor
+    
+    try:
+        trabajo = encolar(tipo, valores, clave=tipo if not valores else None)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(click.style(f'✅ Trabajo #{trabajo.id} ({tipo}) {trabajo.estado}', fg='green'))
+
+
+@click.group('stats')
+def stats_cli():
+    """Estadísticas materializadas (app/utils/stats_rollup.py)"""
+    pass
+
+
+@stats_cli.command('rollup')
+@click.option('--batch-size', default=None, type=int,
+              help='Eventos por lote/transacción (default: STATS_ROLLUP_BATCH)')
+@with_appcontext
+def stats_rollup(batch_size):
+    """Acumula los eventos nuevos de log_actividad en los rollups diarios"""
+    from app.utils.stats_rollup import acumular_estadisticas, RollupConcurrente
+    
+    def reportar(eventos, marca):
+        click.echo(f'   {eventos:,} eventos acumulados (marca {marca})...')
+    
+    try:
+        resultado = acumular_estadisticas(batch_size=batch_size, reportar=reportar)
+    except RollupConcurrente:
+        raise click.ClickException('Otro rollup avanzó la marca a la vez; vuelve a ejecutar')
+    click.echo(click.style(
+        f"✅ {resultado['eventos']:,} eventos acumulados en {resultado['lotes']} lotes (marca {resultado['marca']})",
+        fg='green'
+    ))
+
+
+@click.group('metrics')
+def metrics_cli():
+    """Métricas Prometheus (app/utils/metrics.py)"""
+    pass
+
+
+@metrics_cli.command('reset')
+@with_appcontext
+def metrics_reset():
+    """Borra los volcados de METRICS_DIR (ejecutar al desplegar, antes de arrancar Gunicorn)"""
+    from app.utils.metrics import metricas
+    
+    if not metricas.directorio:
+        click.echo(click.style('ℹ️ METRICS_DIR no configurado (métricas solo en memoria)', fg='blue'))
+        return
+    borrados = metricas.limpiar_directorio()
+    click.echo(click.style(f'✅ {borrados} volcados de métricas eliminados de {metricas.directorio}', fg='green'))
@@ -135,6 +135,111 @@ class Config:
     TOAST_DURATION_MS = 5000
     MAX_FILE_SIZE_MB = 16 * 1024 * 1024
     ASSET_VERSION = os.getenv('ASSET_VERSION', 'v3.1.0')  # Versión actualizada
+    
+    # Caché de contenido HTML por worker (app/utils/content_cache.py)
+    CONTENT_CACHE_ENABLED = True
+    CONTENT_CACHE_MAX_BYTES = int(os.getenv('CONTENT_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 64MB
+    CONTENT_CACHE_REVALIDATE_SECONDS = 5  # Intervalo mínimo entre stat() de un mismo archivo
+    
+    # Analytics de lectura write-behind (app/utils/analytics_buffer.py)
+    ANALYTICS_WRITE_BEHIND = True
+    ANALYTICS_BUFFER_MAX_EVENTS = 10000  # Eventos en cola antes de descartar
+    ANALYTICS_FLUSH_EVERY = 200  # Eventos por INSERT
+    ANALYTICS_FLUSH_INTERVAL_MS = 1000  # Latencia máxima antes de escribir
+    
+    # Búsqueda de texto completo (app/utils/search.py)
+    SEARCH_MAX_RESULTS = 500  # Candidatos máximos por consulta (acota tiempo y memoria)
+    
+    # Paginación keyset de listados (app/utils/pagination.py)
+    PAGINATION_MAX_OFFSET_PAGE = int(os.getenv('PAGINATION_MAX_OFFSET_PAGE', 20))  # ?page= más allá → 404
+    # TTL de los totales por listado. Con CACHE_TYPE 'simple' es también el retraso
+    # máximo con el que los demás workers ven altas y bajas del panel
+    PAGINATION_TOTAL_CACHE_SECONDS = 300
+    
+    # Visor del log de actividad (app/utils/log_viewer.py)
+    LOGS_COUNT_LIMIT = 10000  # Filas máximas contadas para el total (por encima se muestra "más de N")
+    LOGS_TOTAL_CACHE_SECONDS = 60  # TTL del total estimado por combinación de filtros
+    
+    # Logs de la aplicación y su análisis (app/__init__.py, app/utils/log_analyzer.py)
+    LOGS_DIR = os.getenv('LOGS_DIR', os.path.join(BASE_DIR, 'logs'))  # app.log y rotados (app.log.N[.gz])
+    LOGS_ANALYZE_TOP = 20  # Rutas mostradas por `flask logs analyze` en modo texto
+    
+    # Logging asíncrono y muestreo de accesos (app/utils/async_logging.py)
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'False') == 'True'  # QueueHandler + hilo listener por worker
+    LOG_QUEUE_MAX_RECORDS = 10000  # Registros en cola antes de descartar
+    LOG_REQUEST_SAMPLE_EVERY = int(os.getenv('LOG_REQUEST_SAMPLE_EVERY', 1))  # 1 de cada N accesos < 400 (1 = todos)
+    LOG_REQUEST_SAMPLE_SLOW_MS = 1000  # Accesos más lentos se registran siempre
+    
+    # Métricas Prometheus (app/utils/metrics.py, app/routes/metrics.py)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+    METRICS_DIR = os.getenv('METRICS_DIR')  # Carpeta compartida por los workers de Gunicorn (None: solo este proceso)
+    METRICS_FLUSH_SECONDS = 5  # Volcado máximo de cada worker a METRICS_DIR
+    # IPs del scraper (sin la del proxy: tras nginx todas las peticiones llegan con su IP)
+    METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+    
+    # Instrumentación SQL por petición (app/utils/query_stats.py)
+    SQL_SLOW_QUERY_MS = 200  # Consultas más lentas se guardan para el panel de diagnóstico
+    SQL_SLOW_BUFFER = 50  # Consultas lentas / sospechas de N+1 conservadas por worker
+    SQL_N1_THRESHOLD = 5  # Misma sentencia repetida en una petición → posible N+1
+    SQL_QUERY_BUDGET = 50  # Consultas por petición antes de avisar en el log
+    
+    # Perfilado por muestreo bajo demanda (app/utils/profiler.py)
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'True') == 'True'
+    PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join(BASE_DIR, 'logs', 'profiles'))  # Sesión armada y capturas
+    PROFILER_INTERVAL_MS = 5  # Periodo de muestreo de la pila
+    PROFILER_MAX_REQUESTS = 50  # Peticiones máximas por sesión
+    PROFILER_TTL_SECONDS = 900  # Una sesión sin completar caduca
+    PROFILER_CHECK_SECONDS = 1  # Cada cuánto mira cada worker si hay sesión armada
+    
+    # Vigilante de peticiones lentas (app/utils/watchdog.py)
+    WATCHDOG_ENABLED = os.getenv('WATCHDOG_ENABLED', 'True') == 'True'
+    # Captura la pila; por debajo del --timeout 120 de Gunicorn
+    WATCHDOG_THRESHOLD_SECONDS = int(os.getenv('WATCHDOG_THRESHOLD_SECONDS', 30))
+    WATCHDOG_CHECK_SECONDS = 1  # Periodo del hilo de revisión de cada worker
+    WATCHDOG_BUFFER = 20  # Capturas conservadas por worker para el panel
+    
+    # Diagnósticos del panel (app/routes/diagnostics.py)
+    DIAGNOSTICS_MAX_WORKERS = 8  # Hilos por worker para ejecutar los checks en paralelo
+    DIAGNOSTICS_CHECK_TIMEOUT_SECONDS = 10  # Por check; muy por debajo del --timeout de Gunicorn
+    DIAGNOSTICS_CACHE_SECONDS = 60  # TTL de los resultados (las recargas del panel no re-ejecutan)
+    
+    # Retención y archivo de log_actividad (app/utils/log_archive.py)
+    LOGS_RETENTION_DAYS = int(os.getenv('LOGS_RETENTION_DAYS', 90))  # Días conservados en la tabla
+    LOGS_ARCHIVE_DIR = os.getenv('LOGS_ARCHIVE_DIR', os.path.join(BASE_DIR, 'logs', 'archive'))  # NDJSON.gz por día
+    LOGS_ARCHIVE_BATCH = 1000  # Filas por lote (SELECT + gzip + DELETE + commit)
+    LOGS_ARCHIVE_PAUSE_SECONDS = 0.05  # Pausa entre lotes para ceder la tabla a las escrituras
+    
+    # Estadísticas materializadas (app/utils/stats_rollup.py)
+    STATS_ROLLUP_BATCH = 5000  # Eventos por lote/transacción del rollup
+    STATS_ROLLUP_LAG_SECONDS = 60  # Eventos más recientes se acumulan en la siguiente pasada
+    
+    # Usuario actual por petición (app/utils/current_user.py)
+    # TTL entre peticiones. La invalidación al cambiar acceso .edu solo llega al worker
+    # que la hizo si CACHE_TYPE es 'simple': el resto espera al TTL
+    CURRENT_USER_CACHE_SECONDS = 60
+    CURRENT_USER_EDU_CACHE_SECONDS = 5  # Instantáneas con acceso .edu: cota de una revocación entre workers
+    
+    # Registro de categorías (app/utils/category_registry.py)
+    CATEGORY_REGISTRY_MAX_AGE = 300  # Reconstrucción forzada aunque no cambie la versión
+    
+    # Sitemaps (app/utils/sitemap.py)
+    SITEMAP_MAX_URLS = 50000  # Límite del protocolo por archivo; por encima se usa índice
+    SITEMAP_YIELD_PER = 1000  # Filas por lote al recorrer artículos
+    SITEMAP_CACHE_SECONDS = 86400  # Una entrada por parte (se sobrescribe al cambiar la huella)
+    SITEMAP_MAX_AGE = 3600  # Cache-Control para crawlers y CDN
+    
+    # Panel de administración (app/utils/dashboard.py)
+    ADMIN_PAGE_SIZE = 25  # Filas por página en las tablas cargadas por JSON
+    ADMIN_PAGE_MAX = 100  # Máximo aceptado en ?per_page=
+    ADMIN_COUNTERS_CACHE_SECONDS = 120  # TTL de contadores (altas/bajas del panel invalidan antes)
+    ADMIN_BATCH_MAX = 1000  # Ids por acción en lote (app/utils/batch_actions.py)
+    
+    # Trabajos en segundo plano (app/utils/jobs.py)
+    JOBS_LEASE_SECONDS = 300  # Plazo del bloqueo; se renueva con cada progreso/log
+    JOBS_MAX_INTENTOS = 3  # Reintentos si el worker muere con el trabajo tomado
+    JOBS_LOG_LINEAS = 200  # Líneas de log conservadas por trabajo
+    JOBS_POLL_SECONDS = 2  # Intervalo de sondeo de la cola en `flask jobs worker`
+    IMPORT_DIR = os.getenv('IMPORT_DIR', os.path.join(BASE_DIR, 'imports'))  # Fuentes del trabajo 'importar'
 
 
 class DevelopmentConfig(Config):
@@ -231,6 +336,9 @@ class TestingConfig(Config):
     # Deshabilitar rate limiting en tests
     RATELIMIT_ENABLED = False
     
+    # Analytics síncrono en tests (resultados deterministas)
+    ANALYTICS_WRITE_BEHIND = False
+    
     # Session cookies en testing
     SESSION_COOKIE_SECURE = False
 
@@ -7,6 +7,8 @@ para evitar duplicación y garantizar consistencia.
 Nota: Para configuración que varía por ambiente, ver app/config.py
 """
 
+from functools import lru_cache
+
 # =============================================================================
 # CATEGORÍAS DE ARTÍCULOS
 # =============================================================================
@@ -182,6 +184,7 @@ def get_category_emoji(categoria: str) -> str:
     return categoria.split(' ', 1)[0]
 
 
+@lru_cache(maxsize=256)
 def get_category_slug(categoria: str) -> str:
     """
     Genera un slug SEO-friendly a partir del nombre de una categoría.
@@ -236,10 +239,7 @@ def get_category_by_slug(slug: str) -> str | None:
     Returns:
         Nombre completo de la categoría o None si no existe
     """
-    for cat in LISTA_CATEGORIAS:
-        if get_category_slug(cat) == slug:
-            return cat
-    return None
+    return CATEGORIAS_SLUGS.get(slug)
 
 
 # Diccionario precalculado de slugs para mejor performance
@@ -37,3 +37,14 @@ class ArticleStatus(str, Enum):
     
     def __str__(self) -> str:
         return self.value
+
+
+class JobStatus(str, Enum):
+    """Estados de un trabajo en segundo plano (app/utils/jobs.py)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    def __str__(self) -> str:
+        return self.value
@@ -10,6 +10,10 @@ from .categoria import Categoria
 from .biblioteca import biblioteca
 from .fuente import FuenteAcademica
 from .caso import CasoClinico
+from .busqueda import ArticuloBusqueda
+from .tag import Tag, articulo_tag
+from .trabajo import Trabajo
+from .estadistica import EstadisticaArticuloDia, EstadisticaDia, MarcaRollup
 
 __all__ = [
     'Articulo',
@@ -19,5 +23,12 @@ __all__ = [
     'Categoria',
     'biblioteca',
     'FuenteAcademica',
-    'CasoClinico'
+    'CasoClinico',
+    'ArticuloBusqueda',
+    'Tag',
+    'articulo_tag',
+    'Trabajo',
+    'EstadisticaArticuloDia',
+    'EstadisticaDia',
+    'MarcaRollup'
 ]
@@ -2,10 +2,12 @@
 Modelo de Artículo con soporte para soft delete
 """
 
+import json
 from datetime import datetime, timezone
 import logging
 from app.extensions import db
 from app.enums import LogEventType
+from app.models.tag import articulo_tag
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +21,7 @@ class Articulo(db.Model):
     titulo = db.Column(db.String(200), nullable=False)
     slug = db.Column(db.String(200), unique=True, nullable=False, index=True)
     categoria = db.Column(db.String(100), index=True)  # Índice para búsquedas
-    tags = db.Column(db.String(200), index=True)  # Índice para búsquedas
+    tags = db.Column(db.String(200), index=True)  # Texto visible; consultas usan `etiquetas`
     nombre_archivo = db.Column(db.String(200), nullable=False)  # Referencia al HTML estático
     url_pdf = db.Column(db.String(500))
     url_audio = db.Column(db.String(500))
@@ -30,6 +32,15 @@ class Articulo(db.Model):
     # SEO Optimization: fecha de última actualización para schema.org dateModified
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), 
                           onupdate=lambda: datetime.now(timezone.utc), index=True)
+    # Métricas precalculadas en la ingesta (app/utils/ingest.py)
+    num_palabras = db.Column(db.Integer, nullable=True)
+    tiempo_lectura = db.Column(db.Integer, nullable=True)  # Minutos
+    indice_json = db.Column(db.Text, nullable=True)  # TOC: [{"nivel": 2, "texto": "..."}]
+    extracto = db.Column(db.String(300), nullable=True)  # Texto plano inicial
+    
+    # Tags normalizados (app/utils/tags.py mantiene sincronizado `tags`)
+    etiquetas = db.relationship('Tag', secondary=articulo_tag, lazy='select',
+                                backref=db.backref('articulos', lazy='dynamic'))
     
     def __repr__(self):
         return f'<Articulo {self.titulo}>'
@@ -60,6 +71,15 @@ class Articulo(db.Model):
         db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Restaurado: {self.titulo}"))
         logger.info(f"Artículo restaurado: {self.slug}")
     
+    def get_indice(self) -> list:
+        """Retorna el índice de encabezados precalculado."""
+        if not self.indice_json:
+            return []
+        try:
+            return json.loads(self.indice_json)
+        except ValueError:
+            return []
+    
     @staticmethod
     def get_active():
         """Retorna query solo con artículos no eliminados."""
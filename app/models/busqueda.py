@@ -0,0 +1,75 @@
+"""
+Documento de búsqueda de texto completo por artículo.
+
+Cada fila guarda el texto ya normalizado (minúsculas, sin acentos) de un
+artículo. El índice de texto completo depende del motor:
+
+    - MySQL: índices FULLTEXT sobre esta misma tabla
+    - SQLite: tabla virtual FTS5 ``articulo_busqueda_fts`` (external content)
+      sincronizada por triggers
+
+Ambos se crean con eventos DDL condicionados al dialecto, de modo que
+``db.create_all()`` en desarrollo/tests y la migración en producción
+producen el mismo esquema.
+"""
+
+from sqlalchemy import DDL, event
+from app.extensions import db
+
+
+class ArticuloBusqueda(db.Model):
+    """Texto normalizado e indexable de un artículo"""
+
+    __tablename__ = 'articulo_busqueda'
+
+    articulo_id = db.Column(db.Integer, db.ForeignKey('articulo.id'), primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False, default='')
+    tags = db.Column(db.String(400), nullable=False, default='')  # Tags + nombre de categoría
+    descripcion = db.Column(db.String(300), nullable=False, default='')
+    cuerpo = db.Column(db.Text, nullable=False, default='')
+
+    def __repr__(self):
+        return f'<ArticuloBusqueda {self.articulo_id}>'
+
+
+# =============================================================================
+# DDL ESPECÍFICO POR MOTOR
+# =============================================================================
+
+_tabla = ArticuloBusqueda.__table__
+
+# MySQL: FULLTEXT (título+tags para boost de relevancia, y documento completo)
+event.listen(_tabla, 'after_create', DDL(
+    "ALTER TABLE articulo_busqueda "
+    "ADD FULLTEXT INDEX ft_articulo_busqueda_titulo (titulo, tags), "
+    "ADD FULLTEXT INDEX ft_articulo_busqueda_todo (titulo, tags, descripcion, cuerpo)"
+).execute_if(dialect='mysql'))
+
+# SQLite: FTS5 con contenido externo + triggers de sincronización
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articulo_busqueda_fts USING fts5("
+    "titulo, tags, descripcion, cuerpo, "
+    "content='articulo_busqueda', content_rowid='articulo_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER IF NOT EXISTS articulo_busqueda_ai AFTER INSERT ON articulo_busqueda BEGIN "
+    "INSERT INTO articulo_busqueda_fts(rowid, titulo, tags, descripcion, cuerpo) "
+    "VALUES (new.articulo_id, new.titulo, new.tags, new.descripcion, new.cuerpo); END",
+
+    "CREATE TRIGGER IF NOT EXISTS articulo_busqueda_ad AFTER DELETE ON articulo_busqueda BEGIN "
+    "INSERT INTO articulo_busqueda_fts(articulo_busqueda_fts, rowid, titulo, tags, descripcion, cuerpo) "
+    "VALUES ('delete', old.articulo_id, old.titulo, old.tags, old.descripcion, old.cuerpo); END",
+
+    "CREATE TRIGGER IF NOT EXISTS articulo_busqueda_au AFTER UPDATE ON articulo_busqueda BEGIN "
+    "INSERT INTO articulo_busqueda_fts(articulo_busqueda_fts, rowid, titulo, tags, descripcion, cuerpo) "
+    "VALUES ('delete', old.articulo_id, old.titulo, old.tags, old.descripcion, old.cuerpo); "
+    "INSERT INTO articulo_busqueda_fts(rowid, titulo, tags, descripcion, cuerpo) "
+    "VALUES (new.articulo_id, new.titulo, new.tags, new.descripcion, new.cuerpo); END",
+]
+
+for _sentencia in SQLITE_FTS_DDL:
+    event.listen(_tabla, 'after_create', DDL(_sentencia).execute_if(dialect='sqlite'))
+
+event.listen(_tabla, 'before_drop', DDL(
+    "DROP TABLE IF EXISTS articulo_busqueda_fts"
+).execute_if(dialect='sqlite'))
@@ -2,6 +2,7 @@
 Modelo de Caso Clínico con soporte para soft delete y archivos HTML
 """
 
+import json
 from datetime import datetime, timezone
 import logging
 from app.extensions import db
@@ -30,6 +31,11 @@ class CasoClinico(db.Model):
     deleted_at = db.Column(db.DateTime, nullable=True)  # Soft delete
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
                           onupdate=lambda: datetime.now(timezone.utc), index=True)
+    # Métricas precalculadas en la ingesta (app/utils/ingest.py)
+    num_palabras = db.Column(db.Integer, nullable=True)
+    tiempo_lectura = db.Column(db.Integer, nullable=True)  # Minutos
+    indice_json = db.Column(db.Text, nullable=True)  # TOC: [{"nivel": 2, "texto": "..."}]
+    extracto = db.Column(db.String(300), nullable=True)  # Texto plano inicial
     
     def __repr__(self):
         return f'<CasoClinico {self.titulo}>'
@@ -60,6 +66,15 @@ class CasoClinico(db.Model):
         db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Caso restaurado: {self.titulo}"))
         logger.info(f"Caso restaurado: {self.slug}")
     
+    def get_indice(self) -> list:
+        """Retorna el índice de encabezados precalculado."""
+        if not self.indice_json:
+            return []
+        try:
+            return json.loads(self.indice_json)
+        except ValueError:
+            return []
+    
     @staticmethod
     def get_active():
         """Retorna query solo con casos no eliminados."""
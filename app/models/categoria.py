@@ -42,6 +42,9 @@ class Categoria(db.Model):
         REMEDIACIÓN: Centraliza lógica que estaba duplicada en form_validators.py
         y __init__.py context processor.
         
+        Nota: consulta la BD en cada llamada; en rutas y templates usar
+        ``category_registry.actual().nombres`` (app/utils/category_registry.py).
+        
         Returns:
             Lista de nombres de categorías válidas
         """
@@ -0,0 +1,51 @@
+"""
+Modelos de estadísticas materializadas (rollups diarios de log_actividad).
+
+Los mantiene ``flask stats rollup`` de forma incremental (ver
+app/utils/stats_rollup.py); las consultas del panel leen estas tablas en
+lugar de contar eventos crudos.
+"""
+
+from app.extensions import db
+
+
+class EstadisticaArticuloDia(db.Model):
+    """Lecturas de un artículo en un día (UTC)"""
+
+    __tablename__ = 'article_daily_stats'
+    __table_args__ = (
+        db.Index('ix_article_daily_stats_dia', 'dia'),  # "Más leídos" de un rango de días
+    )
+
+    articulo_id = db.Column(db.Integer, db.ForeignKey('articulo.id'), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    lecturas = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<EstadisticaArticuloDia {self.articulo_id} {self.dia}: {self.lecturas}>'
+
+
+class EstadisticaDia(db.Model):
+    """Eventos de un tipo (lectura, login...) en un día (UTC)"""
+
+    __tablename__ = 'daily_stats'
+
+    dia = db.Column(db.Date, primary_key=True)
+    tipo_evento = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<EstadisticaDia {self.dia} {self.tipo_evento}: {self.total}>'
+
+
+class MarcaRollup(db.Model):
+    """Último id de log_actividad ya acumulado (high-water mark) por rollup"""
+
+    __tablename__ = 'rollup_marca'
+
+    nombre = db.Column(db.String(50), primary_key=True)
+    ultimo_id = db.Column(db.Integer, nullable=False, default=0)
+    actualizado_en = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<MarcaRollup {self.nombre}: {self.ultimo_id}>'
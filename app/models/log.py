@@ -21,6 +21,10 @@ class LogActividad(db.Model):
     """
     
     __tablename__ = 'log_actividad'
+    __table_args__ = (
+        # Visor: filtro por tipo + rango/orden por fecha
+        db.Index('ix_log_actividad_tipo_evento_fecha', 'tipo_evento', 'fecha'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     tipo_evento = db.Column(db.String(50), nullable=False, index=True)
@@ -0,0 +1,26 @@
+"""
+Modelo de Etiqueta normalizada y tabla de asociación con Artículo
+"""
+
+from app.extensions import db
+
+# Tabla intermedia Muchos-a-Muchos (Artículo <-> Tag)
+# El índice (tag_id, articulo_id) cubre la búsqueda /tag/<slug> sin tocar la PK
+articulo_tag = db.Table('articulo_tag',
+    db.Column('articulo_id', db.Integer, db.ForeignKey('articulo.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True),
+    db.Index('ix_articulo_tag_tag_articulo', 'tag_id', 'articulo_id')
+)
+
+
+class Tag(db.Model):
+    """Etiqueta con slug normalizado único (ver app/utils/tags.py)"""
+    
+    __tablename__ = 'tag'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(60), nullable=False)  # Forma visible ("Memoria de trabajo")
+    slug = db.Column(db.String(80), unique=True, nullable=False, index=True)  # "memoria-de-trabajo"
+    
+    def __repr__(self):
+        return f'<Tag {self.slug}>'
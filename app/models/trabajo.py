@@ -0,0 +1,86 @@
+"""
+Modelo de Trabajo en segundo plano (cola local respaldada por la BD).
+
+Los trabajos los encola el panel de administración y los ejecuta
+``flask jobs worker`` (ver app/utils/jobs.py).
+"""
+
+import json
+from datetime import datetime, timezone
+from app.extensions import db
+from app.enums import JobStatus
+
+
+class Trabajo(db.Model):
+    """
+    Trabajo pesado de administración (sincronizar, importar, reindexar...).
+
+    Bloqueo: un worker lo reclama con un UPDATE condicional que fija
+    ``worker`` y ``bloqueado_hasta``; mientras el plazo no venza ningún otro
+    worker puede tomarlo. Idempotencia: ``clave`` evita encolar dos veces el
+    mismo trabajo mientras esté pendiente o en curso.
+    """
+
+    __tablename__ = 'trabajo'
+    __table_args__ = (
+        db.Index('ix_trabajo_estado_id', 'estado', 'id'),  # Búsqueda de pendientes por orden de llegada
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default=JobStatus.PENDING.value)
+    clave = db.Column(db.String(255), nullable=True, index=True)  # Idempotencia
+    parametros_json = db.Column(db.Text, nullable=True)
+    progreso = db.Column(db.Integer, nullable=False, default=0)  # 0-100
+    mensaje = db.Column(db.String(255), nullable=True)
+    log = db.Column(db.Text, nullable=True)  # Últimas líneas, separadas por \n
+    resultado_json = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(100), nullable=True)
+    bloqueado_hasta = db.Column(db.DateTime, nullable=True)
+    creado_en = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    iniciado_en = db.Column(db.DateTime, nullable=True)
+    finalizado_en = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Trabajo {self.id} {self.tipo} {self.estado}>'
+
+    def get_parametros(self) -> dict:
+        """Retorna los parámetros del trabajo."""
+        if not self.parametros_json:
+            return {}
+        try:
+            return json.loads(self.parametros_json)
+        except ValueError:
+            return {}
+
+    def get_resultado(self):
+        """Retorna el resultado (JSON) o None si aún no terminó."""
+        if not self.resultado_json:
+            return None
+        try:
+            return json.loads(self.resultado_json)
+        except ValueError:
+            return None
+
+    def to_dict(self) -> dict:
+        """Representación para /admin/jobs/<id>."""
+        def iso(fecha):
+            return fecha.isoformat() if fecha else None
+
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'progreso': self.progreso,
+            'mensaje': self.mensaje,
+            'log': self.log.splitlines() if self.log else [],
+            'resultado': self.get_resultado(),
+            'error': self.error,
+            'intentos': self.intentos,
+            'creado_en': iso(self.creado_en),
+            'iniciado_en': iso(self.iniciado_en),
+            'finalizado_en': iso(self.finalizado_en),
+            'terminado': self.estado in (JobStatus.DONE.value, JobStatus.FAILED.value),
+        }
@@ -7,7 +7,7 @@ incluyendo la creación, edición y eliminación de artículos.
 
 import os
 import logging
-from flask import Blueprint, render_template, request, redirect, url_for, session, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, session, current_app, jsonify
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from app.extensions import db
@@ -16,9 +16,14 @@ from app.models.articulo import Articulo
 from app.models.usuario import Usuario
 from app.models.log import LogActividad
 from app.models.categoria import Categoria
-from app.constants import LISTA_CATEGORIAS, ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES
+from app.models.trabajo import Trabajo
+from app.constants import ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES
+from app.utils.category_registry import category_registry
 from app.enums import LogEventType
 from app.utils.sanitizers import limpiar_html_google, validar_css_seguro
+from app.utils.ingest import analizar_html, aplicar_metricas
+from app.utils.search import indexar_articulo, invalidar_busqueda
+from app.utils.tags import sincronizar_tags, slugify_tag, contar_tags, invalidar_conteos_tags
 from app.utils.validators import (
     validar_url_segura, 
     validar_longitud, 
@@ -27,6 +32,16 @@ from app.utils.validators import (
     validar_slug
 )
 from app.utils.decorators import admin_required
+from app.utils.content_cache import content_cache, CARPETA_ARTICULOS, CARPETA_CASOS
+from app.utils.pagination import invalidar_totales
+from app.utils.current_user import invalidar_usuario
+from app.utils.file_sync import reconciliar, archivar_huerfanos
+from app.utils.jobs import encolar, cache_compartida, TAREAS_CACHE_COMPARTIDA
+from app.utils.log_viewer import TIPOS_EVENTO, parsear_filtros, paginar_logs
+from app.utils.log_archive import resumen_archivo
+from app.utils.stats_rollup import serie_diaria, mas_leidos, marca_actual
+from app.utils.batch_actions import ACCIONES, AccionLoteError, parsear_ids, ejecutar_accion_lote
+from app.utils.dashboard import contadores_dashboard, listar_seccion, SECCIONES, ORDEN_DEFECTO
 from app.utils.form_validators import (
     validar_formulario_articulo,
     validar_archivo_upload,
@@ -119,6 +134,7 @@ def admin():
                 
                 contenido_sucio = archivo_html.read().decode('utf-8', errors='ignore')
                 contenido_limpio = limpiar_html_google(contenido_sucio)
+                metricas = analizar_html(contenido_limpio)  # Ingesta: una sola vez por upload
                 
                 with open(ruta_guardado_html, 'w', encoding='utf-8') as f:
                     f.write(contenido_limpio)
@@ -146,9 +162,15 @@ def admin():
                     url_pdf=form_data['url_pdf'], 
                     url_audio=form_data['url_audio']
                 )
+                aplicar_metricas(nuevo_art, metricas)
+                sincronizar_tags(nuevo_art, form_data['tags'])
                 db.session.add(nuevo_art)
+                db.session.flush()  # Asigna id para el documento de búsqueda
+                indexar_articulo(nuevo_art, metricas['texto'])
                 db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Publicado: {form_data['titulo']}"))
                 db.session.commit()
+                content_cache.invalidar(CARPETA_ARTICULOS, form_data['slug'])
+                invalidar_totales()
                 mensaje = "¡Artículo publicado correctamente!"
             else:
                 mensaje = "Error: Falta archivo HTML."
@@ -183,44 +205,165 @@ def admin():
             logger.error(f"Error inesperado al procesar artículo: {e}", exc_info=True)
             db.session.rollback()
     
-    # Cargar datos para el dashboard
-    per_page = current_app.config.get('LOGS_PER_PAGE', 50)
-    pagina_logs = request.args.get('log_page', 1, type=int)
+    # OPTIMIZACIÓN: El render inicial solo usa contadores cacheados; las tablas
+    # se cargan por JSON bajo demanda (admin_api_listado)
+    contadores = contadores_dashboard()
     
-    lista_articulos = Articulo.get_active().order_by(Articulo.fecha.desc()).all()
-    total_usuarios = Usuario.query.count()
-    total_visitas = LogActividad.query.filter_by(tipo_evento=LogEventType.LECTURA).count()
+    # OPTIMIZACIÓN: Solo los últimos eventos (sin OFFSET ni COUNT); el
+    # historial completo está en el visor /admin/logs
+    ultimos_eventos = LogActividad.query.order_by(
+        LogActividad.fecha.desc(), LogActividad.id.desc()
+    ).limit(current_app.config.get('LOGS_PER_PAGE', 50)).all()
     
-    # Paginación de logs
-    logs_pag = LogActividad.query.order_by(LogActividad.fecha.desc()).paginate(
-        page=pagina_logs, per_page=per_page, error_out=False
+    return render_template('admin.html',
+                           mensaje=mensaje,
+                           usuario=session['user_name'],
+                           contadores=contadores,
+                           total_usuarios=contadores['usuarios'],
+                           total_visitas=contadores['visitas'],
+                           ultimos_eventos=ultimos_eventos,
+                           total_articulos=contadores['articulos'],
+                           total_categorias=len(category_registry.actual()),
+                           cache_compartida=cache_compartida())
+
+
+@admin_bp.route('/api/listado/<seccion>')
+@admin_required
+def admin_api_listado(seccion):
+    """
+    Tabla del panel (articulos, fuentes, casos, usuarios) paginada en JSON.
+    
+    Query params: q (filtro), sort (date-desc, date-asc, alpha-asc, alpha-desc),
+    page, per_page.
+    """
+    if seccion not in SECCIONES:
+        return jsonify({'error': 'Sección desconocida'}), 404
+    
+    datos = listar_seccion(
+        seccion,
+        busqueda=request.args.get('q', ''),
+        orden=request.args.get('sort', ORDEN_DEFECTO),
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', current_app.config.get('ADMIN_PAGE_SIZE', 25), type=int),
     )
-    ultimos_eventos = logs_pag.items
+    return jsonify(datos)
+
+
+@admin_bp.route('/api/estadisticas')
+@admin_required
+def admin_api_estadisticas():
+    """
+    Lecturas por día y artículos más leídos desde los rollups diarios.
     
-    usuarios_recientes = Usuario.query.order_by(Usuario.fecha_ultimo_login.desc()).limit(5).all()
+    Query params: dias (1-365, default 30).
+    """
+    dias = max(1, min(request.args.get('dias', 30, type=int), 365))
+    return jsonify({
+        'dias': dias,
+        'serie': serie_diaria(dias),
+        'mas_leidos': mas_leidos(dias),
+        'marca': marca_actual(),
+    })
+
+
+@admin_bp.route('/lote/<seccion>/<accion>', methods=['POST'])
+@admin_required
+def admin_accion_lote(seccion, accion):
+    """
+    Aplica una acción a varias filas del panel con un UPDATE por conjunto.
     
-    # Datos para secciones nuevas
-    from app.models.fuente import FuenteAcademica
-    from app.models.caso import CasoClinico
+    Recibe `ids` (lista JSON, campos repetidos o "1,2,3") y, para
+    articulos/categoria, `valor`. Responde con solicitados y afectados.
+    """
+    if accion not in ACCIONES.get(seccion, {}):
+        return jsonify({'error': 'Acción desconocida'}), 404
     
-    lista_fuentes = FuenteAcademica.get_active().order_by(FuenteAcademica.fecha.desc()).all()
-    lista_casos = CasoClinico.get_active().order_by(CasoClinico.fecha.desc()).all()
-    todos_usuarios = Usuario.query.order_by(Usuario.fecha_registro.desc()).all()
+    if request.is_json:
+        datos = request.get_json(silent=True) or {}
+        ids, valor = datos.get('ids'), datos.get('valor')
+    else:
+        ids, valor = request.form.getlist('ids'), request.form.get('valor')
     
-    return render_template('admin.html',
-                           mensaje=mensaje,
-                           usuario=session['user_name'],
-                           articulos=lista_articulos,
-                           total_usuarios=total_usuarios,
-                           total_visitas=total_visitas,
-                           ultimos_eventos=ultimos_eventos,
+    try:
+        resultado = ejecutar_accion_lote(seccion, accion, parsear_ids(ids), valor)
+    except AccionLoteError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(resultado)
+
+
+@admin_bp.route('/logs')
+@admin_required
+def admin_logs():
+    """
+    Visor del log de actividad con filtros y paginación keyset.
+    
+    Query params: tipo, desde, hasta (YYYY-MM-DD), page o cursor.
+    """
+    filtros = parsear_filtros(request.args)
+    logs_pag = paginar_logs(
+        filtros,
+        page=request.args.get('page', 1, type=int),
+        cursor=request.args.get('cursor'),
+        per_page=current_app.config.get('LOGS_PER_PAGE', 50),
+    )
+    return render_template('admin_logs.html',
                            logs_pag=logs_pag,
-                           usuarios_recientes=usuarios_recientes,
-                           total_articulos=len(lista_articulos),
-                           total_categorias=len(LISTA_CATEGORIAS),
-                           fuentes=lista_fuentes,
-                           casos=lista_casos,
-                           todos_usuarios=todos_usuarios)
+                           filtros=filtros,
+                           tipos_evento=TIPOS_EVENTO,
+                           archivo=resumen_archivo())
+
+
+# =============================================================================
+# TRABAJOS EN SEGUNDO PLANO
+# =============================================================================
+
+# Trabajos que el panel puede encolar (app/utils/jobs.py)
+TRABAJOS_ADMIN = ('sincronizar', 'diagnostico_integridad', 'reindexar_busqueda', 'regenerar_sitemap', 'importar',
+                  'archivar_logs')
+
+
+@admin_bp.route('/jobs/<tipo>', methods=['POST'])
+@admin_required
+def admin_encolar_trabajo(tipo):
+    """
+    Encola una operación pesada y responde con el id del trabajo (202).
+    
+    El progreso se consulta en /admin/jobs/<id>; lo ejecuta `flask jobs worker`.
+    'importar' recibe `fuente`: nombre de un directorio o .zip dentro de IMPORT_DIR.
+    """
+    if tipo not in TRABAJOS_ADMIN:
+        return jsonify({'error': 'Tipo de trabajo desconocido'}), 404
+    if tipo in TAREAS_CACHE_COMPARTIDA and not cache_compartida():
+        return jsonify({'error': 'Requiere una caché compartida (CACHE_TYPE redis)'}), 409
+    
+    parametros = {}
+    clave = tipo  # Un solo trabajo pendiente/en curso por tipo
+    if tipo == 'importar':
+        nombre = os.path.basename(request.form.get('fuente', '').strip())
+        ruta = os.path.join(current_app.config['IMPORT_DIR'], nombre)
+        if not nombre or not os.path.exists(ruta):
+            return jsonify({'error': f'Fuente no encontrada en {current_app.config["IMPORT_DIR"]}'}), 400
+        parametros = {'fuente': ruta}
+        clave = f'importar:{ruta}'
+    
+    trabajo = encolar(tipo, parametros, clave=clave)
+    db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Trabajo #{trabajo.id} encolado: {tipo}"))
+    db.session.commit()
+    return jsonify({
+        'id': trabajo.id,
+        'estado': trabajo.estado,
+        'url': url_for('admin.admin_estado_trabajo', id=trabajo.id),
+    }), 202
+
+
+@admin_bp.route('/jobs/<int:id>')
+@admin_required
+def admin_estado_trabajo(id):
+    """Progreso, log y resultado de un trabajo en JSON."""
+    trabajo = db.session.get(Trabajo, id)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(trabajo.to_dict())
 
 
 @admin_bp.route('/editar/<int:id>', methods=['GET', 'POST'])
@@ -230,6 +373,7 @@ def admin_editar(id):
     art = Articulo.query.get_or_404(id)
     
     if request.method == 'POST':
+        slug_anterior = art.slug
         try:
             # VALIDACIÓN DE ENTRADAS COMPLETA
             titulo = request.form.get('titulo', '').strip()
@@ -268,7 +412,7 @@ def admin_editar(id):
             art.url_pdf = url_pdf
             art.url_audio = url_audio
             art.categoria = categoria
-            art.tags = tags
+            sincronizar_tags(art, tags)
             
             # Handle slug change with proper error handling
             if nuevo_slug != art.slug:
@@ -302,6 +446,7 @@ def admin_editar(id):
             archivo_css = request.files.get('css_file')
             
             try:
+                texto_cuerpo = None  # None conserva el cuerpo ya indexado
                 if archivo_html and archivo_html.filename != '':
                     nombre_final_html = f"{art.slug}.html"
                     ruta_guardado_html = os.path.join(carpeta_base, 'templates', 'articulos', nombre_final_html)
@@ -310,6 +455,9 @@ def admin_editar(id):
                     with open(ruta_guardado_html, 'w', encoding='utf-8') as f:
                         f.write(contenido_limpio)
                     art.nombre_archivo = nombre_final_html
+                    metricas = analizar_html(contenido_limpio)
+                    aplicar_metricas(art, metricas)
+                    texto_cuerpo = metricas['texto']
                 
                 if archivo_css and archivo_css.filename != '':
                     contenido_css = archivo_css.read().decode('utf-8', errors='ignore')
@@ -321,9 +469,13 @@ def admin_editar(id):
                     with open(ruta_guardado_css, 'w', encoding='utf-8') as f:
                         f.write(resultado_css)
                 
+                indexar_articulo(art, texto_cuerpo)
+                
                 # Single commit at the end for transaction integrity
                 db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Editado: {art.titulo}"))
                 db.session.commit()
+                content_cache.invalidar(CARPETA_ARTICULOS, slug_anterior, art.slug)
+                invalidar_totales()  # La categoría o los tags pudieron cambiar
                 
             except (IOError, OSError) as e:
                 db.session.rollback()
@@ -342,6 +494,8 @@ def admin_editar(id):
         
         except Exception as e:
             db.session.rollback()
+            # Los archivos pudieron renombrarse antes del fallo
+            content_cache.invalidar(CARPETA_ARTICULOS, slug_anterior, art.slug)
             logger.error(f"Error en admin_editar: {e}", exc_info=True)
             return redirect(url_for('admin.admin', mensaje="Error inesperado al editar artículo."))
     
@@ -357,6 +511,10 @@ def admin_eliminar(id):
     # Soft delete (marcar como eliminado)
     art.soft_delete()
     db.session.commit()  # Commit explícito (Auditoría: separación de responsabilidades)
+    content_cache.invalidar(CARPETA_ARTICULOS, art.slug)
+    invalidar_conteos_tags()
+    invalidar_totales()
+    invalidar_busqueda()
     
     return redirect(url_for('admin.admin', mensaje="Artículo movido a papelera (puede restaurarse)."))
 
@@ -372,6 +530,9 @@ def admin_restaurar(id):
     
     art.restore()
     db.session.commit()  # Commit explícito (Auditoría: separación de responsabilidades)
+    invalidar_conteos_tags()
+    invalidar_totales()
+    invalidar_busqueda()
     
     return redirect(url_for('admin.admin', mensaje="Artículo restaurado correctamente."))
 
@@ -381,34 +542,45 @@ def admin_restaurar(id):
 def admin_sincronizar():
     """
     Sincroniza BD con el sistema de archivos usando soft delete.
-    GET: Muestra preview de artículos huérfanos
-    POST: Confirma y archiva artículos huérfanos
+    GET: Muestra preview de artículos/casos huérfanos y archivos sin registro
+    POST: Confirma y archiva los huérfanos
+    
+    OPTIMIZACIÓN: Un scandir por carpeta y un UPDATE en bloque
+    (app/utils/file_sync.py) en lugar de os.path.exists + soft_delete() por fila.
     """
+    resultados = reconciliar(carpeta_base)
+    
     if request.method == 'GET':
-        # Mostrar preview de artículos huérfanos
-        articulos = Articulo.get_active().all()
-        huerfanos = []
-        for art in articulos:
-            ruta_full = os.path.join(carpeta_base, 'templates', 'articulos', art.nombre_archivo)
-            if not os.path.exists(ruta_full):
-                huerfanos.append(art)
-        
-        return render_template('admin_sincronizar_preview.html', huerfanos=huerfanos)
+        return render_template('admin_sincronizar_preview.html', resultados=resultados)
     
     # POST: Confirmar sincronización
-    articulos = Articulo.get_active().all()
-    eliminados = 0
-    for art in articulos:
-        ruta_full = os.path.join(carpeta_base, 'templates', 'articulos', art.nombre_archivo)
-        if not os.path.exists(ruta_full):
-            art.soft_delete()  # Soft delete instead of physical deletion
-            eliminados += 1
+    archivados = archivar_huerfanos(resultados)
+    db.session.commit()
     
-    if eliminados > 0:
-        db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Sincronización: {eliminados} archivados"))
+    eliminados = archivados.get(CARPETA_ARTICULOS, 0)
+    casos = archivados.get(CARPETA_CASOS, 0)
+    if eliminados or casos:
+        invalidar_conteos_tags()
+        invalidar_totales()
+        invalidar_busqueda()
+    mensaje = f"Sincronización: {eliminados} artículos archivados (pueden restaurarse)"
+    if casos:
+        mensaje += f" y {casos} casos clínicos"
+    return redirect(url_for('admin.admin', mensaje=mensaje))
+
+
+@admin_bp.route('/api/tags')
+@admin_required
+def admin_tags_autocompletar():
+    """
+    Autocompletado de tags para los formularios de artículo.
     
-    db.session.commit()
-    return redirect(url_for('admin.admin', mensaje=f"Sincronización: {eliminados} artículos archivados (pueden restaurarse)"))
+    Sirve desde el índice de conteos cacheado (sin consulta por tecla).
+    Query param: q (prefijo, opcional).
+    """
+    prefijo = slugify_tag(request.args.get('q', ''))
+    sugerencias = [t for t in contar_tags() if t['slug'].startswith(prefijo)]
+    return jsonify(sugerencias[:20])
 
 
 # =============================================================================
@@ -459,6 +631,7 @@ def admin_crear_fuente():
         db.session.add(nueva_fuente)
         db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Fuente creada: {titulo}"))
         db.session.commit()
+        invalidar_totales()
         
         return redirect(url_for('admin.admin', mensaje="¡Fuente académica publicada correctamente!"))
     
@@ -477,6 +650,7 @@ def admin_eliminar_fuente(id):
     fuente = FuenteAcademica.query.get_or_404(id)
     fuente.soft_delete()
     db.session.commit()
+    invalidar_totales()
     
     return redirect(url_for('admin.admin', mensaje="Fuente movida a papelera."))
 
@@ -538,6 +712,7 @@ def admin_crear_caso():
         
         contenido_sucio = archivo_html.read().decode('utf-8', errors='ignore')
         contenido_limpio = limpiar_html_google(contenido_sucio)
+        metricas = analizar_html(contenido_limpio)
         
         with open(ruta_guardado_html, 'w', encoding='utf-8') as f:
             f.write(contenido_limpio)
@@ -555,9 +730,12 @@ def admin_crear_caso():
             nombre_archivo=nombre_final_html,
             descripcion=descripcion
         )
+        aplicar_metricas(nuevo_caso, metricas)
         db.session.add(nuevo_caso)
         db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=f"Caso creado: {titulo}"))
         db.session.commit()
+        content_cache.invalidar(CARPETA_CASOS, slug)
+        invalidar_totales()
         
         return redirect(url_for('admin.admin', mensaje="¡Caso clínico publicado correctamente!"))
     
@@ -586,6 +764,8 @@ def admin_eliminar_caso(id):
     caso = CasoClinico.query.get_or_404(id)
     caso.soft_delete()
     db.session.commit()
+    content_cache.invalidar(CARPETA_CASOS, caso.slug)
+    invalidar_totales()
     
     return redirect(url_for('admin.admin', mensaje="Caso clínico movido a papelera."))
 
@@ -605,6 +785,7 @@ def admin_aprobar_edu(user_id):
         detalle=f"Acceso .edu aprobado manualmente: {usuario.email}"
     ))
     db.session.commit()
+    invalidar_usuario(usuario.email)
     logger.info(f"Acceso .edu aprobado manualmente para: {usuario.email}")
     
     return redirect(url_for('admin.admin', mensaje=f"Acceso educativo aprobado para {usuario.nombre or usuario.email}."))
@@ -621,6 +802,7 @@ def admin_revocar_edu(user_id):
         detalle=f"Acceso .edu revocado: {usuario.email}"
     ))
     db.session.commit()
+    invalidar_usuario(usuario.email)
     
     return redirect(url_for('admin.admin', mensaje=f"Acceso educativo revocado para {usuario.nombre or usuario.email}."))
 
@@ -11,9 +11,10 @@ from datetime import datetime, timezone
 
 from app.extensions import db, limiter
 from app.models.articulo import Articulo
-from app.models.usuario import Usuario
+from app.models.biblioteca import biblioteca
 from app.models.log import LogActividad
 from app.utils.helpers import get_rate_limit_key
+from app.utils.current_user import get_current_user
 
 # Blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -45,22 +46,26 @@ def toggle_biblioteca(articulo_id: int) -> Tuple[Response, int]:
     if 'user_email' not in session:
         return jsonify({'status': 'error', 'message': 'No autorizado'}), 403
     
-    usuario = Usuario.query.filter_by(email=session['user_email']).first()
+    # OPTIMIZACIÓN: id del usuario desde g.current_user (cacheado), sin cargar
+    # el Usuario ni su relación completa articulos_guardados
+    usuario_id = get_current_user().id
     articulo = Articulo.query.get_or_404(articulo_id)
     
-    if not usuario:
+    if usuario_id is None:
         return jsonify({'status': 'error', 'message': 'Usuario no encontrado'}), 404
     
+    fila = (biblioteca.c.usuario_id == usuario_id) & (biblioteca.c.articulo_id == articulo.id)
+    
     # REMEDIACIÓN FUNCIONAL-002: Transacción atómica para prevenir race conditions
     try:
         with db.session.begin_nested():
             action = ''
-            if articulo in usuario.articulos_guardados:
-                usuario.articulos_guardados.remove(articulo)
+            if db.session.query(biblioteca).filter(fila).first() is not None:
+                db.session.execute(biblioteca.delete().where(fila))
                 action = 'removed'
                 logger.info(f"Biblioteca: artículo {articulo_id} removido por usuario hash")
             else:
-                usuario.articulos_guardados.append(articulo)
+                db.session.execute(biblioteca.insert().values(usuario_id=usuario_id, articulo_id=articulo.id))
                 action = 'added'
                 logger.info(f"Biblioteca: artículo {articulo_id} guardado por usuario hash")
         
@@ -91,13 +96,13 @@ def vaciar_biblioteca() -> Tuple[Response, int]:
     if 'user_email' not in session:
         return jsonify({'status': 'error', 'message': 'No autorizado'}), 403
     
-    usuario = Usuario.query.filter_by(email=session['user_email']).first()
-    if not usuario:
+    usuario_id = get_current_user().id
+    if usuario_id is None:
         return jsonify({'status': 'error', 'message': 'Usuario no encontrado'}), 404
     
-    # Limpiar la lista de artículos guardados (Disociación)
+    # Limpiar la lista de artículos guardados (Disociación, un solo DELETE)
     try:
-        usuario.articulos_guardados = []
+        db.session.execute(biblioteca.delete().where(biblioteca.c.usuario_id == usuario_id))
         db.session.commit()
         return jsonify({'status': 'ok', 'message': 'Biblioteca vaciada'})
     except Exception:
@@ -141,11 +146,7 @@ def health_check() -> Tuple[Response, int]:
     }
     
     # REMEDIACIÓN MED-002: Detalles extendidos solo para admins autenticados
-    admin_email = current_app.config.get('ADMIN_EMAIL', '')
-    user_email = session.get('user_email', '')
-    is_admin = user_email and admin_email and user_email.strip().lower() == admin_email.strip().lower()
-    
-    if is_admin:
+    if get_current_user().es_admin:
         # Admin obtiene información completa para debugging
         basic_response.update({
             'environment': 'production' if not current_app.debug else 'development',
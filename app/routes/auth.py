@@ -14,6 +14,7 @@ from app.models.log import LogActividad
 from app.enums import LogEventType
 from app.utils.decorators import es_email_educativo
 from app.utils.helpers import get_rate_limit_key
+from app.utils.current_user import invalidar_usuario
 from app.constants import DEFAULT_AVATAR_PATH
 
 # Logger configurado al inicio del módulo (Auditoría: evitar definición tardía)
@@ -174,6 +175,7 @@ def google_callback() -> Response:
     # Log con información de seguridad
     db.session.add(LogActividad(tipo_evento=LogEventType.LOGIN, detalle=log_detalle))
     db.session.commit()
+    invalidar_usuario(email)  # acceso_edu pudo cambiar o el usuario es nuevo
     
     # Log adicional para monitoreo (REMEDIACIÓN CRT-002: Solo hash de email)
     logger.info(
@@ -5,8 +5,10 @@ Provee endpoints para verificar el estado del sistema desde la UI de admin.
 
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify, current_app, request
 from sqlalchemy import text, inspect
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 
@@ -19,11 +21,20 @@ from app.utils.decorators import admin_required
 # Rate limit para endpoints de diagnóstico (REMEDIACIÓN CRT-001)
 DIAGNOSTICS_RATE_LIMIT = "5 per minute"
 
+# Checks baratos o con estado por worker: siempre se ejecutan (sin caché)
+CHECKS_SIN_CACHE = {'Configuración', 'Seguridad', 'Archivo de Log', 'Consultas SQL', 'Peticiones Lentas'}
+CACHE_PREFIX = 'diagnostics:'
+
 # Blueprint
 diagnostics_bp = Blueprint('diagnostics', __name__, url_prefix='/api/diagnostics')
 
 logger = logging.getLogger(__name__)
 
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_en_curso = {}  # nombre -> future aún sin terminar (un check colgado no se reenvía)
+
 
 def run_check(name: str, check_func) -> dict:
     """Ejecuta una verificación y captura errores."""
@@ -50,6 +61,99 @@ def run_check(name: str, check_func) -> dict:
         }
 
 
+# ============================================================================
+# EJECUCIÓN CONCURRENTE Y CACHÉ
+# ============================================================================
+
+def _obtener_pool() -> ThreadPoolExecutor:
+    """Pool de hilos del worker (se recrea tras un fork de Gunicorn)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _en_curso.clear()
+            _pool = ThreadPoolExecutor(
+                max_workers=current_app.config.get('DIAGNOSTICS_MAX_WORKERS', 8),
+                thread_name_prefix='diagnostics'
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _ejecutar_y_cachear(app, name: str, check_func) -> dict:
+    """Ejecuta el check en su propio app context y cachea el resultado completo."""
+    with app.app_context():
+        result = run_check(name, check_func)
+        result['checked_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        # Los errores no se cachean; un check que terminó tras el timeout sí
+        if result['status'] != 'error' and name not in CHECKS_SIN_CACHE:
+            cache.set(CACHE_PREFIX + name, result, timeout=app.config.get('DIAGNOSTICS_CACHE_SECONDS', 60))
+        return result
+
+
+def _enviar(pool: ThreadPoolExecutor, app, name: str, check_func):
+    """Future del check: el que sigue en curso si lo hay, o uno nuevo."""
+    with _pool_lock:
+        future = _en_curso.get(name)
+        if future is None or future.done():
+            future = _en_curso[name] = pool.submit(_ejecutar_y_cachear, app, name, check_func)
+            future.add_done_callback(lambda f: _en_curso.pop(name, None) if _en_curso.get(name) is f else None)
+        return future
+
+
+def ejecutar_checks(checks: list, forzar: bool = False) -> list:
+    """
+    Ejecuta los checks en paralelo con timeout y caché TTL.
+
+    Los resultados cacheados (``DIAGNOSTICS_CACHE_SECONDS``) se devuelven sin
+    ejecutar nada salvo con ``forzar``. Un check que supera
+    ``DIAGNOSTICS_CHECK_TIMEOUT_SECONDS`` se reporta como error parcial; sigue
+    ejecutándose en segundo plano y su resultado queda en caché para la
+    siguiente consulta; mientras tanto las nuevas consultas esperan a ese
+    mismo future en lugar de ocupar otro hilo del pool.
+
+    Args:
+        checks: Lista de (nombre, función)
+        forzar: Ignorar la caché
+
+    Returns:
+        Resultados en el mismo orden que ``checks``
+    """
+    results = {}
+    pendientes = {}
+    app = current_app._get_current_object()
+    pool = _obtener_pool()
+
+    for name, check_func in checks:
+        cached = None if forzar or name in CHECKS_SIN_CACHE else cache.get(CACHE_PREFIX + name)
+        if cached is not None:
+            results[name] = {**cached, 'cached': True}
+        else:
+            pendientes[_enviar(pool, app, name, check_func)] = name
+
+    timeout = current_app.config.get('DIAGNOSTICS_CHECK_TIMEOUT_SECONDS', 10)
+    terminados, sin_terminar = wait(pendientes, timeout=timeout)
+    for future in terminados:
+        results[pendientes[future]] = {**future.result(), 'cached': False}
+    for future in sin_terminar:
+        name = pendientes[future]
+        logger.warning(f"Diagnostic check '{name}' superó {timeout}s; continúa en segundo plano")
+        results[name] = {
+            'name': name,
+            'status': 'error',
+            'message': f'Tiempo agotado (> {timeout}s); el resultado estará disponible en la próxima ejecución',
+            'details': {'timeout': True},
+            'duration_ms': round(timeout * 1000, 2),
+            'cached': False
+        }
+
+    return [results[name] for name, _ in checks]
+
+
+def ejecutar_check(name: str, check_func) -> dict:
+    """Un solo check con caché y timeout (``?refresh=1`` fuerza la ejecución)."""
+    return ejecutar_checks([(name, check_func)], forzar=request.args.get('refresh') == '1')[0]
+
+
 # ============================================================================
 # CHECKS INDIVIDUALES
 # ============================================================================
@@ -139,28 +243,48 @@ def check_static_files():
 
 
 def check_articles_integrity():
-    """Verifica integridad de artículos (archivos HTML existen)."""
-    from app.config import BASE_DIR
-    
-    articulos = Articulo.get_active().all()
-    orphaned = []
+    """
+    Verifica integridad de artículos y casos (archivos HTML existen).
     
-    for art in articulos:
-        html_path = os.path.join(BASE_DIR, 'templates', 'articulos', art.nombre_archivo)
-        if not os.path.exists(html_path):
-            orphaned.append({'id': art.id, 'titulo': art.titulo, 'archivo': art.nombre_archivo})
+    OPTIMIZACIÓN: Un scandir por carpeta comparado contra una consulta de
+    solo columnas, en lugar de os.path.exists por fila (app/utils/file_sync.py).
+    """
+    from app.config import BASE_DIR
+    from app.utils.file_sync import reconciliar
+    from app.utils.content_cache import CARPETA_ARTICULOS
+    
+    # Incremental: solo se re-verifican las carpetas/tablas que cambiaron
+    resultados = reconciliar(BASE_DIR, incremental=True)
+    articulos = resultados[CARPETA_ARTICULOS]
+    verificacion = {r.carpeta: r.verificacion for r in resultados.values()}
+    orphaned = [
+        {'carpeta': r.carpeta, 'id': h.id, 'titulo': h.titulo, 'archivo': h.nombre_archivo}
+        for r in resultados.values() for h in r.huerfanos
+    ]
+    sin_registro = {r.carpeta: len(r.sin_registro) for r in resultados.values()}
+    muestra_sin_registro = [n for r in resultados.values() for n in r.sin_registro][:5]
     
     if orphaned:
         return {
             'success': False,
-            'message': f'{len(orphaned)} artículos sin archivo HTML',
-            'details': {'orphaned': orphaned[:5]}  # Limitar a 5
+            'message': f'{len(orphaned)} registros sin archivo HTML',
+            'details': {
+                'orphaned': orphaned[:5],  # Limitar a 5
+                'sin_registro': sin_registro,
+                'sin_registro_muestra': muestra_sin_registro,
+                'verificacion': verificacion
+            }
         }
     
     return {
         'success': True,
-        'message': f'{len(articulos)} artículos con archivos verificados',
-        'details': {'total': len(articulos)}
+        'message': f'{articulos.activos} artículos con archivos verificados',
+        'details': {
+            'total': {r.carpeta: r.activos for r in resultados.values()},
+            'sin_registro': sin_registro,
+            'sin_registro_muestra': muestra_sin_registro,
+            'verificacion': verificacion
+        }
     }
 
 
@@ -277,32 +401,71 @@ def check_disk_space():
 
 
 def check_log_file():
-    """Verifica estado del archivo de log."""
-    from app.config import BASE_DIR
+    """Verifica estado del archivo de log y de la cola de logging asíncrono."""
+    from app.utils.async_logging import estado_logging
     
-    # Corregido: logs están en la carpeta 'logs/' según configure_logging()
-    log_path = os.path.join(BASE_DIR, 'logs', 'app.log')
+    # Corregido: logs están en LOGS_DIR ('logs/') según configure_logging()
+    log_path = os.path.join(current_app.config['LOGS_DIR'], 'app.log')
+    logging_estado = estado_logging()
     
     if not os.path.exists(log_path):
         return {
             'success': True,
             'message': 'Archivo de log no existe aún',
-            'details': {'exists': False}
+            'details': {'exists': False, 'logging': logging_estado}
         }
     
     size_mb = os.path.getsize(log_path) / (1024 * 1024)
+    message = f'Log: {size_mb:.2f} MB ({logging_estado["modo"]})'
+    if logging_estado['cola'] and logging_estado['cola']['descartados']:
+        message += f' · {logging_estado["cola"]["descartados"]} registros descartados (cola llena)'
     
     return {
         'success': True,
-        'message': f'Log: {size_mb:.2f} MB',
+        'message': message,
         'details': {
             'exists': True,
             'size_mb': round(size_mb, 2),
-            'path': log_path
+            'path': log_path,
+            'logging': logging_estado
         }
     }
 
 
+def check_sql_queries():
+    """Consultas lentas y posibles N+1 recientes de este worker."""
+    from app.utils.query_stats import instrumentacion_sql
+    
+    estado = instrumentacion_sql.estado()
+    lentas = len(estado['lentas'])
+    sospechas = len(estado['sospechas_n1'])
+    
+    return {
+        'success': True,
+        'message': (f"{lentas} consultas lentas (≥ {estado['umbral_lenta_ms']}ms) "
+                    f"y {sospechas} posibles N+1 recientes"),
+        'details': estado
+    }
+
+
+def check_slow_requests():
+    """Peticiones en curso y pilas capturadas por el vigilante de este worker."""
+    from app.utils.watchdog import vigilante
+    
+    estado = vigilante.estado()
+    atascadas = [p for p in estado['en_curso'] if p['segundos'] >= estado['umbral_segundos']]
+    
+    return {
+        'success': not atascadas,
+        'message': (
+            f"{len(atascadas)} peticiones en curso superan {estado['umbral_segundos']:g}s"
+            if atascadas else
+            f"{len(estado['capturas'])} capturas recientes de peticiones > {estado['umbral_segundos']:g}s"
+        ),
+        'details': estado
+    }
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -321,11 +484,12 @@ def run_all_checks():
         ('Integridad Artículos', check_articles_integrity),
         ('Espacio en Disco', check_disk_space),
         ('Archivo de Log', check_log_file),
+        ('Consultas SQL', check_sql_queries),
+        ('Peticiones Lentas', check_slow_requests),
     ]
     
-    results = []
-    for name, func in checks:
-        results.append(run_check(name, func))
+    # En paralelo, con timeout por check y resultados cacheados (?refresh=1 los ignora)
+    results = ejecutar_checks(checks, forzar=request.args.get('refresh') == '1')
     
     # Resumen
     passed = sum(1 for r in results if r['status'] == 'pass')
@@ -339,7 +503,9 @@ def run_all_checks():
             'passed': passed,
             'failed': failed,
             'errors': errors,
-            'health_score': round((passed / len(results)) * 100, 1)
+            'health_score': round((passed / len(results)) * 100, 1),
+            'cached': sum(1 for r in results if r.get('cached')),
+            'partial': any(r['details'].get('timeout') for r in results)
         },
         'checks': results
     })
@@ -350,8 +516,7 @@ def run_all_checks():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_db():
     """Verifica conexión a base de datos."""
-    result = run_check('Base de Datos', check_database)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Base de Datos', check_database))
 
 
 @diagnostics_bp.route('/config', methods=['POST'])
@@ -359,8 +524,7 @@ def check_db():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_cfg():
     """Verifica configuración."""
-    result = run_check('Configuración', check_config)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Configuración', check_config))
 
 
 @diagnostics_bp.route('/security', methods=['POST'])
@@ -368,8 +532,7 @@ def check_cfg():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_sec():
     """Verifica seguridad."""
-    result = run_check('Seguridad', check_security)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Seguridad', check_security))
 
 
 @diagnostics_bp.route('/templates', methods=['POST'])
@@ -377,8 +540,7 @@ def check_sec():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_tpl():
     """Verifica templates."""
-    result = run_check('Templates', check_templates)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Templates', check_templates))
 
 
 @diagnostics_bp.route('/static', methods=['POST'])
@@ -386,8 +548,7 @@ def check_tpl():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_stc():
     """Verifica archivos estáticos."""
-    result = run_check('Archivos Estáticos', check_static_files)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Archivos Estáticos', check_static_files))
 
 
 @diagnostics_bp.route('/articles', methods=['POST'])
@@ -395,8 +556,7 @@ def check_stc():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_art():
     """Verifica integridad de artículos."""
-    result = run_check('Integridad Artículos', check_articles_integrity)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Integridad Artículos', check_articles_integrity))
 
 
 @diagnostics_bp.route('/disk', methods=['POST'])
@@ -404,8 +564,7 @@ def check_art():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_dsk():
     """Verifica espacio en disco."""
-    result = run_check('Espacio en Disco', check_disk_space)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Espacio en Disco', check_disk_space))
 
 
 @diagnostics_bp.route('/logs', methods=['POST'])
@@ -413,5 +572,94 @@ def check_dsk():
 @limiter.limit(DIAGNOSTICS_RATE_LIMIT)
 def check_logs():
     """Verifica archivo de log."""
-    result = run_check('Archivo de Log', check_log_file)
-    return jsonify(result)
+    return jsonify(ejecutar_check('Archivo de Log', check_log_file))
+
+
+@diagnostics_bp.route('/queries', methods=['POST'])
+@admin_required
+@limiter.limit(DIAGNOSTICS_RATE_LIMIT)
+def check_queries():
+    """Consultas SQL lentas y posibles N+1."""
+    return jsonify(ejecutar_check('Consultas SQL', check_sql_queries))
+
+
+@diagnostics_bp.route('/watchdog', methods=['POST'])
+@admin_required
+@limiter.limit(DIAGNOSTICS_RATE_LIMIT)
+def check_watchdog():
+    """Pilas de peticiones lentas capturadas por el vigilante."""
+    return jsonify(ejecutar_check('Peticiones Lentas', check_slow_requests))
+
+
+# ============================================================================
+# PERFILADO BAJO DEMANDA (app/utils/profiler.py)
+# ============================================================================
+
+@diagnostics_bp.route('/profiler', methods=['GET'])
+@admin_required
+def profiler_estado():
+    """Sesión armada (si la hay) y capturas guardadas."""
+    from app.utils.profiler import perfilador
+    
+    return jsonify({
+        'enabled': perfilador.enabled,
+        'sesion': perfilador.sesion_activa(),
+        'sesiones': perfilador.capturas(),
+    })
+
+
+@diagnostics_bp.route('/profiler', methods=['POST'])
+@admin_required
+@limiter.limit(DIAGNOSTICS_RATE_LIMIT)
+def profiler_armar():
+    """
+    Arma el perfilado de las próximas N peticiones a un endpoint.
+    
+    JSON: {"endpoint": "main.inicio", "peticiones": 10, "requiere_token": false}.
+    Con ``requiere_token`` solo se perfilan las peticiones con la cabecera
+    X-Profile-Token (el endpoint es entonces opcional).
+    """
+    from app.utils.profiler import CABECERA_TOKEN, perfilador
+    
+    datos = request.get_json(silent=True) or {}
+    endpoint = (datos.get('endpoint') or '').strip() or None
+    if endpoint and endpoint not in current_app.view_functions:
+        return jsonify({'error': f'Endpoint desconocido: {endpoint}'}), 400
+    try:
+        sesion = perfilador.armar(endpoint, int(datos.get('peticiones', 10)), bool(datos.get('requiere_token')))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    sesion['cabecera'] = CABECERA_TOKEN
+    sesion['descarga'] = f"{diagnostics_bp.url_prefix}/profiler/{sesion['token']}.collapsed"
+    return jsonify(sesion), 201
+
+
+@diagnostics_bp.route('/profiler', methods=['DELETE'])
+@admin_required
+def profiler_desarmar():
+    """Cancela la sesión armada; las capturas hechas se conservan."""
+    from app.utils.profiler import perfilador
+    
+    return jsonify({'desarmado': perfilador.desarmar()})
+
+
+@diagnostics_bp.route('/profiler/<token>.collapsed', methods=['GET'])
+@admin_required
+def profiler_descargar(token):
+    """Pilas colapsadas de la sesión (todas sus capturas sumadas, o ``?captura=n``)."""
+    from flask import Response, abort
+    from app.utils.profiler import EXTENSION, formatear_pilas, leer_pilas, perfilador
+    
+    rutas = perfilador.rutas_sesion(token)
+    captura = request.args.get('captura')
+    if captura is not None:
+        rutas = [r for r in rutas if os.path.basename(r) == f'{token}-{captura}{EXTENSION}']
+    if not rutas:
+        abort(404)
+    
+    return Response(
+        formatear_pilas(leer_pilas(rutas)),
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'attachment; filename=perfil-{token}{EXTENSION}'},
+    )
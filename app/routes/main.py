@@ -4,19 +4,20 @@ Blueprint de rutas principales: inicio, artículos, páginas estáticas
 
 import os
 import logging
-from flask import Blueprint, render_template, request, session, abort, Response, redirect, url_for, current_app
-from bs4 import BeautifulSoup
-from sqlalchemy.orm import selectinload
-from sqlalchemy.exc import SQLAlchemyError
+from flask import Blueprint, render_template, request, abort, Response, redirect, url_for
 
 from app.extensions import db, limiter
 from app.config import BASE_DIR, Config
 from app.models.articulo import Articulo
-from app.models.usuario import Usuario
-from app.models.log import LogActividad
+from app.models.biblioteca import biblioteca
 from app.enums import LogEventType
 from app.utils.helpers import get_rate_limit_key
-from app.constants import LISTA_CATEGORIAS, READING_SPEED_WPM
+from app.utils.analytics_buffer import read_events
+from app.utils.content_cache import content_cache, CARPETA_ARTICULOS, CARPETA_CASOS
+from app.utils.search import buscar_articulos
+from app.utils.pagination import paginar_por_fecha
+from app.utils.current_user import get_current_user
+from app.utils.category_registry import category_registry
 
 # Blueprint
 main_bp = Blueprint('main', __name__)
@@ -27,6 +28,15 @@ carpeta_base = BASE_DIR
 logger = logging.getLogger(__name__)
 
 
+def _ids_guardados() -> list:
+    """IDs de artículos guardados por el usuario actual (sin cargar el Usuario)."""
+    usuario_id = get_current_user().id
+    if usuario_id is None:
+        return []
+    filas = db.session.query(biblioteca.c.articulo_id).filter(biblioteca.c.usuario_id == usuario_id)
+    return [fila[0] for fila in filas]
+
+
 @main_bp.route('/')
 @limiter.limit("30 per minute", key_func=get_rate_limit_key)
 def inicio() -> str:
@@ -78,7 +88,7 @@ def inicio() -> str:
     ]
     
     # Estadísticas para hero section
-    total_categorias = len(LISTA_CATEGORIAS)
+    total_categorias = len(category_registry.actual())
     total_articulos = Articulo.get_active().count()
     
     # Últimos 6 artículos publicados (para grid de 3 columnas)
@@ -100,80 +110,51 @@ def ver_articulo(cat_slug: str, slug: str) -> str:
     
     Nueva estructura SEO: /categoria/{cat_slug}/{art_slug}
     """
-    from app.constants import CATEGORIAS_SLUGS, get_category_slug
+    registro = category_registry.actual()
     
     # Validar que la categoría existe
-    categoria_completa = CATEGORIAS_SLUGS.get(cat_slug)
-    if not categoria_completa:
+    if registro.por_slug(cat_slug) is None:
         abort(404)
     
     articulo = Articulo.get_active().filter_by(slug=slug).first_or_404()
     
     # Verificar que el artículo pertenece a esta categoría
     # Si no coincide, redirigir a la URL correcta
-    articulo_cat_slug = get_category_slug(articulo.categoria)
+    articulo_cat_slug = registro.slug(articulo.categoria)
     if articulo_cat_slug != cat_slug:
         from flask import redirect, url_for
         return redirect(url_for('main.ver_articulo', cat_slug=articulo_cat_slug, slug=slug), code=301)
     
-    # Cargar contenido HTML desde archivo físico
+    # OPTIMIZACIÓN: Contenido preparado desde caché por worker (sin I/O ni parseo por petición)
     ruta_html = os.path.join(carpeta_base, 'templates', 'articulos', articulo.nombre_archivo)
-    contenido_html = ""
-    tiempo_lectura = Config.DEFAULT_READING_TIME
+    ruta_css = os.path.join(carpeta_base, 'static', 'articulos_css', f"{slug}.css")
+    contenido = content_cache.obtener(CARPETA_ARTICULOS, slug, ruta_html, ruta_css)
     
-    if os.path.exists(ruta_html):
-        with open(ruta_html, 'r', encoding='utf-8') as f:
-            contenido_html = f.read()
-        
-        # Calcular tiempo de lectura estimado
-        try:
-            # REMEDIACIÓN: READING_SPEED_WPM importado al inicio del archivo
-            soup = BeautifulSoup(contenido_html, 'html.parser')
-            texto_plano = soup.get_text(separator=' ')
-            palabras = len(texto_plano.split())
-            tiempo_lectura = max(1, round(palabras / READING_SPEED_WPM))
-        except (AttributeError, TypeError, ZeroDivisionError) as e:
-            # REMEDIACIÓN DT-003: Excepciones específicas en lugar de genérica
-            logger.debug(f"Error calculando tiempo de lectura: {e.__class__.__name__}")
-            tiempo_lectura = Config.DEFAULT_READING_TIME
+    if contenido is not None:
+        contenido_html = contenido['html']
+        tiene_css = contenido['tiene_css']
+        css_version = contenido['css_version']  # REMEDIACIÓN LOW-002: Cache-busting
     else:
         contenido_html = "<p><em>Error: El archivo de contenido no se encuentra en el servidor.</em></p>"
+        tiene_css = os.path.exists(ruta_css)
+        css_version = None
     
-    # Registrar visita (Analytics interno)
-    try:
-        nuevo_log = LogActividad(tipo_evento=LogEventType.LECTURA, detalle=f"Leído: {slug}")
-        db.session.add(nuevo_log)
-        db.session.commit()
-    except SQLAlchemyError as e:
-        logger.error(f"Error de BD en analytics: {e.__class__.__name__}")
-        db.session.rollback()
-    
-    # Verificar si existe CSS específico para este artículo
-    # REMEDIACIÓN LOW-002: Cache-busting con timestamp de modificación
-    ruta_css = os.path.join(carpeta_base, 'static', 'articulos_css', f"{slug}.css")
-    tiene_css = os.path.exists(ruta_css)
-    css_version = None
-    if tiene_css:
-        try:
-            css_version = int(os.path.getmtime(ruta_css))
-        except OSError:
-            css_version = 0
+    # Tiempo de lectura precalculado en la ingesta (flask content backfill-metrics)
+    tiempo_lectura = articulo.tiempo_lectura or Config.DEFAULT_READING_TIME
+    
+    # Registrar visita (Analytics interno, write-behind: no bloquea la lectura)
+    read_events.registrar(LogEventType.LECTURA, f"Leído: {slug}")
     
     # Estado de guardado para el botón
     esta_guardado = False
-    if 'user_email' in session:
-        from app.models.biblioteca import biblioteca
-        usuario = Usuario.query.filter_by(email=session['user_email']).first()
-        if usuario:
-            # Consulta directa a tabla intermedia en lugar de cargar lazy la relación
-            from sqlalchemy import and_
-            existe = db.session.query(biblioteca).filter(
-                and_(
-                    biblioteca.c.usuario_id == usuario.id,
-                    biblioteca.c.articulo_id == articulo.id
-                )
-            ).first()
-            esta_guardado = existe is not None
+    usuario_id = get_current_user().id
+    if usuario_id is not None:
+        # Consulta directa a tabla intermedia con el id cacheado del usuario
+        existe = db.session.query(biblioteca).filter(
+            biblioteca.c.usuario_id == usuario_id,
+            biblioteca.c.articulo_id == articulo.id
+        ).first()
+        esta_guardado = existe is not None
     
     return render_template('articulo_detalle.html',
                            articulo=articulo,
@@ -193,42 +174,31 @@ def categorias() -> str:
     Página principal que muestra las 50 categorías, estadísticas,
     búsqueda y últimas publicaciones con estructura SEO.
     """
-    from app.constants import get_category_slug, get_category_display_name, get_category_emoji, CATEGORIAS_SLUGS
+    registro = category_registry.actual()
     
     busqueda = request.args.get('q')
     pagina = request.args.get('page', 1, type=int)
     per_page = Config.ARTICLES_PER_PAGE
     
     # IDs de artículos guardados por el usuario
-    ids_guardados = []
-    if 'user_email' in session:
-        usuario = Usuario.query.options(
-            selectinload(Usuario.articulos_guardados)
-        ).filter_by(email=session['user_email']).first()
-        if usuario:
-            ids_guardados = [art.id for art in usuario.articulos_guardados]
+    ids_guardados = _ids_guardados()
     
     # Lógica de búsqueda y paginación
     if busqueda:
-        search_pattern = f'%{busqueda}%'
-        articulos_pag = Articulo.get_active().filter(
-            (Articulo.titulo.ilike(search_pattern)) |
-            (Articulo.categoria.ilike(search_pattern)) |
-            (Articulo.tags.ilike(search_pattern))
-        ).order_by(Articulo.fecha.desc()).paginate(
-            page=pagina, per_page=per_page, error_out=False
-        )
+        # Búsqueda de texto completo (FULLTEXT/FTS5), ordenada por relevancia
+        articulos_pag = buscar_articulos(busqueda, page=pagina, per_page=per_page)
     else:
-        articulos_pag = Articulo.get_active().order_by(
-            Articulo.fecha.desc()
-        ).paginate(page=pagina, per_page=per_page, error_out=False)
+        articulos_pag = paginar_por_fecha(
+            Articulo.get_active(), Articulo, page=pagina, cursor=request.args.get('cursor'),
+            per_page=per_page, clave_total='articulos'
+        )
     
     articulos_recientes = articulos_pag.items
     total_articulos = articulos_pag.total
-    total_categorias = len(LISTA_CATEGORIAS)
+    total_categorias = len(registro)
     
-    # Diccionario de slugs para el template
-    categorias_slugs = {cat: get_category_slug(cat) for cat in LISTA_CATEGORIAS}
+    # Diccionario de slugs para el template (precalculado en el registro)
+    categorias_slugs = registro.slugs
     
     return render_template('categorias.html',
                            articulos_recientes=articulos_recientes,
@@ -247,30 +217,23 @@ def ver_categoria(slug: str) -> str:
     Muestra los artículos de una categoría específica con estructura SEO
     incluyendo JSON-LD CollectionPage, ItemList y breadcrumbs.
     """
-    from app.constants import CATEGORIAS_SLUGS, get_category_display_name, get_category_emoji, get_category_slug
-    
     # Buscar categoría por slug
-    categoria = CATEGORIAS_SLUGS.get(slug)
-    if not categoria:
+    info = category_registry.actual().por_slug(slug)
+    if info is None:
         abort(404)
+    categoria = info.nombre
     
     pagina = request.args.get('page', 1, type=int)
     per_page = Config.ARTICLES_PER_PAGE
     
     # IDs de artículos guardados por el usuario
-    ids_guardados = []
-    if 'user_email' in session:
-        usuario = Usuario.query.options(
-            selectinload(Usuario.articulos_guardados)
-        ).filter_by(email=session['user_email']).first()
-        if usuario:
-            ids_guardados = [art.id for art in usuario.articulos_guardados]
+    ids_guardados = _ids_guardados()
     
     # Obtener artículos de esta categoría con paginación
-    articulos_pag = Articulo.get_active().filter(
-        Articulo.categoria == categoria
-    ).order_by(Articulo.fecha.desc()).paginate(
-        page=pagina, per_page=per_page, error_out=False
+    articulos_pag = paginar_por_fecha(
+        Articulo.get_active().filter(Articulo.categoria == categoria), Articulo,
+        page=pagina, cursor=request.args.get('cursor'), per_page=per_page,
+        clave_total=f'categoria:{slug}'
     )
     
     # Preparar datos para JSON-LD
@@ -283,8 +246,8 @@ def ver_categoria(slug: str) -> str:
     
     return render_template('categoria.html',
                            categoria=categoria,
-                           categoria_nombre=get_category_display_name(categoria),
-                           categoria_emoji=get_category_emoji(categoria),
+                           categoria_nombre=info.display,
+                           categoria_emoji=info.emoji,
                            categoria_slug=slug,
                            articulos=articulos_pag.items,
                            articulos_pag=articulos_pag,
@@ -302,45 +265,46 @@ def ver_tag(slug: str) -> str:
     Muestra todos los artículos que contienen una etiqueta específica,
     con estructura SEO incluyendo JSON-LD CollectionPage.
     """
-    import unicodedata
-    import re
+    from app.models.tag import Tag, articulo_tag
+    from app.utils.tags import slugify_tag
     
-    # Convertir slug de vuelta a tag legible para buscar
-    # El slug viene como 'neurociencia' y buscamos en tags 'neurociencia'
-    tag_normalizado = slug.lower()
+    # Normalizar con la misma función que la ingesta (URLs antiguas con acentos/mayúsculas)
+    tag_slug = slugify_tag(slug)
+    if tag_slug != slug and tag_slug:
+        return redirect(url_for('main.ver_tag', slug=tag_slug), code=301)
+    
+    tag = Tag.query.filter_by(slug=tag_slug).first()
+    if tag is None:
+        abort(404)
     
     pagina = request.args.get('page', 1, type=int)
     per_page = Config.ARTICLES_PER_PAGE
     
     # IDs de artículos guardados por el usuario
-    ids_guardados = []
-    if 'user_email' in session:
-        usuario = Usuario.query.options(
-            selectinload(Usuario.articulos_guardados)
-        ).filter_by(email=session['user_email']).first()
-        if usuario:
-            ids_guardados = [art.id for art in usuario.articulos_guardados]
-    
-    # Buscar artículos que contengan este tag (case-insensitive)
-    # Los tags están almacenados como "tag1, tag2, tag3"
-    articulos_pag = Articulo.get_active().filter(
-        Articulo.tags.ilike(f'%{tag_normalizado}%')
-    ).order_by(Articulo.fecha.desc()).paginate(
-        page=pagina, per_page=per_page, error_out=False
+    ids_guardados = _ids_guardados()
+    
+    # OPTIMIZACIÓN: JOIN indexado por (tag_id, articulo_id) con coincidencia exacta,
+    # en lugar de ILIKE '%slug%' (full scan y falsos positivos: "ira" ⊂ "inspiracion")
+    articulos_pag = paginar_por_fecha(
+        Articulo.get_active().join(
+            articulo_tag, articulo_tag.c.articulo_id == Articulo.id
+        ).filter(articulo_tag.c.tag_id == tag.id), Articulo,
+        page=pagina, cursor=request.args.get('cursor'), per_page=per_page,
+        clave_total=f'tag:{tag.id}'
     )
     
     # Si no hay artículos con este tag, 404
     if articulos_pag.total == 0:
         abort(404)
     
-    # Nombre legible del tag (capitalizado)
-    tag_display = slug.replace('-', ' ').title()
+    # Nombre legible del tag
+    tag_display = tag.nombre
     
     # Preparar datos para JSON-LD
     articulos_json = []
-    from app.constants import get_category_slug
+    registro = category_registry.actual()
     for art in articulos_pag.items:
-        cat_slug = get_category_slug(art.categoria) if art.categoria else ''
+        cat_slug = registro.slug(art.categoria) if art.categoria else ''
         articulos_json.append({
             'nombre': art.titulo,
             'url': f"/categoria/{cat_slug}/{art.slug}"
@@ -375,34 +339,8 @@ def _determinar_tipo_usuario() -> int:
         3 = Sesión con correo .edu
         4 = Sesión con correo @ieproes.edu.sv o admin
     """
-    if 'user_email' not in session:
-        return 1
-    
-    email = session.get('user_email', '').strip().lower()
-    
-    # Admin siempre es tipo 4
-    admin_email = current_app.config.get('ADMIN_EMAIL', '')
-    if admin_email and email == admin_email.strip().lower():
-        return 4
-    
-    # Correo @ieproes.edu.sv → tipo 4
-    if email.endswith('@ieproes.edu.sv'):
-        return 4
-    
-    # Correo .edu → tipo 3 (verificar acceso_edu en BD también)
-    from app.models.usuario import Usuario as _User
-    usuario = _User.query.filter_by(email=email).first()
-    
-    if usuario and usuario.acceso_edu:
-        return 3
-    
-    # Verificar dominio .edu directamente
-    from app.utils.decorators import es_email_educativo
-    if es_email_educativo(email):
-        return 3
-    
-    # Correo personal → tipo 2
-    return 2
+    # OPTIMIZACIÓN: Calculado una sola vez por petición (app/utils/current_user.py)
+    return get_current_user().tipo
 
 
 @main_bp.route('/fuentes')
@@ -422,9 +360,10 @@ def repositorio_fuentes() -> str:
     pagina = request.args.get('page', 1, type=int)
     per_page = 12
     
-    fuentes_pag = FuenteAcademica.get_active().order_by(
-        FuenteAcademica.fecha.desc()
-    ).paginate(page=pagina, per_page=per_page, error_out=False)
+    fuentes_pag = paginar_por_fecha(
+        FuenteAcademica.get_active(), FuenteAcademica, page=pagina,
+        cursor=request.args.get('cursor'), per_page=per_page, clave_total='fuentes'
+    )
     
     return render_template('fuentes.html',
                            fuentes=fuentes_pag.items,
@@ -451,9 +390,10 @@ def casos_clinicos() -> str:
     pagina = request.args.get('page', 1, type=int)
     per_page = 12
     
-    casos_pag = CasoClinico.get_active().order_by(
-        CasoClinico.fecha.desc()
-    ).paginate(page=pagina, per_page=per_page, error_out=False)
+    casos_pag = paginar_por_fecha(
+        CasoClinico.get_active(), CasoClinico, page=pagina,
+        cursor=request.args.get('cursor'), per_page=per_page, clave_total='casos'
+    )
     
     return render_template('casos.html',
                            casos=casos_pag.items,
@@ -483,21 +423,15 @@ def ver_caso(slug: str) -> str:
     contenido_html = ""
     if not acceso_bloqueado:
         ruta_html = os.path.join(carpeta_base, 'templates', 'casos_clinicos', caso.nombre_archivo)
+        contenido = content_cache.obtener(CARPETA_CASOS, slug, ruta_html)
         
-        if os.path.exists(ruta_html):
-            with open(ruta_html, 'r', encoding='utf-8') as f:
-                contenido_html = f.read()
+        if contenido is not None:
+            contenido_html = contenido['html']
         else:
             contenido_html = "<p><em>Error: El archivo de contenido no se encuentra en el servidor.</em></p>"
         
         # Registrar visita solo si tiene acceso
-        try:
-            nuevo_log = LogActividad(tipo_evento=LogEventType.LECTURA, detalle=f"Caso leído: {slug}")
-            db.session.add(nuevo_log)
-            db.session.commit()
-        except SQLAlchemyError as e:
-            logger.error(f"Error de BD en analytics caso: {e.__class__.__name__}")
-            db.session.rollback()
+        read_events.registrar(LogEventType.LECTURA, f"Caso leído: {slug}")
     
     return render_template('caso_detalle.html',
                            caso=caso,
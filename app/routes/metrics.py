@@ -0,0 +1,33 @@
+"""
+Blueprint de métricas: exposición Prometheus en /metrics.
+
+Acceso restringido a las IPs de METRICS_ALLOWED_IPS (el scraper de
+Prometheus contra Gunicorn) o a una sesión de administrador.
+"""
+
+from flask import Blueprint, Response, abort, current_app, request, session
+
+from app.extensions import limiter
+from app.utils.metrics import CONTENT_TYPE, metricas
+
+# Blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _es_admin() -> bool:
+    admin_email = current_app.config.get('ADMIN_EMAIL', '').strip().lower()
+    return bool(admin_email) and session.get('user_email', '').strip().lower() == admin_email
+
+
+@metrics_bp.route('/metrics')
+@limiter.exempt
+def exposicion():
+    """Métricas agregadas de todos los workers en formato de texto de Prometheus."""
+    if not metricas.enabled:
+        abort(404)
+    if request.remote_addr not in current_app.config.get('METRICS_ALLOWED_IPS', ()) and not _es_admin():
+        abort(403)
+
+    respuesta = Response(metricas.exposicion(), content_type=CONTENT_TYPE)
+    respuesta.headers['Cache-Control'] = 'no-store'
+    return respuesta
@@ -5,13 +5,14 @@ Este módulo maneja la vista del perfil personal del usuario,
 incluyendo su biblioteca de artículos guardados y notificaciones.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, session, current_app
+from flask import Blueprint, render_template, redirect, url_for, session
 from sqlalchemy.orm import selectinload
 from app.extensions import db
 from app.models.usuario import Usuario
 from app.models.articulo import Articulo
 from app.utils.decorators import login_required
-from app.constants import LISTA_CATEGORIAS
+from app.utils.current_user import get_current_user
+from app.utils.category_registry import category_registry
 
 # Blueprint
 perfil_bp = Blueprint('perfil', __name__)
@@ -23,8 +24,7 @@ def perfil():
     """Vista del perfil de usuario."""
     
     # Redirigir admin a su panel propio
-    admin_email = current_app.config.get('ADMIN_EMAIL', '')
-    if admin_email and session['user_email'].strip().lower() == admin_email.strip().lower():
+    if get_current_user().es_admin:
         return redirect(url_for('admin.admin'))
     
     # OPTIMIZACIÓN: Usar selectinload para evitar consultas N+1
@@ -42,7 +42,7 @@ def perfil():
     
     # Stats para el componente de estadísticas
     total_articulos = Articulo.get_active().count()
-    total_categorias = len(LISTA_CATEGORIAS)
+    total_categorias = len(category_registry.actual())
     
     return render_template('perfil.html',
                            articulos_guardados=articulos_guardados,
@@ -3,99 +3,89 @@ Blueprint SEO: Sitemap, robots.txt y archivos de rastreo
 Auditoría 1.2: Generación dinámica de sitemap.xml
 """
 
-from flask import Blueprint, Response, url_for, current_app
-from datetime import datetime, timezone
+import gzip
 
-from app.models.articulo import Articulo
-from app.constants import LISTA_CATEGORIAS, get_category_slug
+from flask import Blueprint, Response, current_app, request, abort
+from werkzeug.http import is_resource_modified
+
+from app.utils.sitemap import estado_sitemap, numero_de_partes, sitemap_gz
 
 # Blueprint
 seo_bp = Blueprint('seo', __name__)
 
 
+def _servir_sitemap(numero=None, forzar_gzip=False):
+    """
+    Respuesta condicional (ETag/Last-Modified) con el sitemap precomprimido.
+    
+    Los clientes que aceptan gzip reciben los bytes cacheados tal cual;
+    el resto recibe la versión descomprimida.
+    """
+    estado = estado_sitemap()
+    # Antes del 304: la ETag es la huella global, común a todas las partes
+    if numero is not None and not 1 <= numero <= numero_de_partes(estado):
+        abort(404)
+    
+    usar_gzip = forzar_gzip or 'gzip' in request.accept_encodings
+    # ETag distinto por representación (RFC 9110: codificaciones distintas)
+    etag = estado.huella + ('-gz' if usar_gzip and not forzar_gzip else '')
+    
+    if not is_resource_modified(request.environ, etag=etag, last_modified=estado.ultima_modificacion):
+        respuesta = Response(status=304)
+    else:
+        contenido = sitemap_gz(estado, numero)
+        if contenido is None:
+            abort(404)
+        if forzar_gzip:
+            respuesta = Response(contenido, mimetype='application/gzip')
+        elif usar_gzip:
+            respuesta = Response(contenido, mimetype='application/xml')
+            respuesta.headers['Content-Encoding'] = 'gzip'
+        else:
+            respuesta = Response(gzip.decompress(contenido), mimetype='application/xml')
+    
+    respuesta.set_etag(etag)
+    if estado.ultima_modificacion:
+        respuesta.last_modified = estado.ultima_modificacion
+    respuesta.vary.add('Accept-Encoding')
+    respuesta.cache_control.public = True
+    respuesta.cache_control.max_age = current_app.config.get('SITEMAP_MAX_AGE', 3600)
+    return respuesta
+
+
 @seo_bp.route('/sitemap.xml')
 def sitemap():
     """
-    Genera sitemap XML dinámico para motores de búsqueda.
+    Sitemap XML para motores de búsqueda (app/utils/sitemap.py).
     
     Incluye:
     - Páginas estáticas (inicio, categorías, about, etc.)
     - Todas las categorías individuales
     - Todos los artículos activos
     
+    Por encima de SITEMAP_MAX_URLS responde con un índice de sitemaps.
+    
     SEO Impact: Mejora rastreabilidad e indexación de contenido.
     """
-    base_url = current_app.config.get('SITE_URL', 'https://www.nexusciencia.com')
-    
-    # Construir lista de URLs
-    urls = []
-    
-    # 1. Páginas estáticas principales
-    static_pages = [
-        {'loc': '/', 'priority': '1.0', 'changefreq': 'daily'},
-        {'loc': '/categorias', 'priority': '0.9', 'changefreq': 'daily'},
-        {'loc': '/info/nosotros', 'priority': '0.5', 'changefreq': 'monthly'},
-        {'loc': '/info/filosofia', 'priority': '0.4', 'changefreq': 'monthly'},
-        {'loc': '/info/editorial', 'priority': '0.5', 'changefreq': 'monthly'},  # E-E-A-T
-        {'loc': '/info/politica', 'priority': '0.3', 'changefreq': 'yearly'},
-        {'loc': '/info/contacto', 'priority': '0.5', 'changefreq': 'monthly'},
-        {'loc': '/info/legal', 'priority': '0.3', 'changefreq': 'yearly'},
-        {'loc': '/info/solicitar', 'priority': '0.6', 'changefreq': 'monthly'},
-    ]
-    
-    for page in static_pages:
-        urls.append({
-            'loc': base_url.rstrip('/') + page['loc'],
-            'lastmod': datetime.now(timezone.utc).strftime('%Y-%m-%d'),
-            'changefreq': page['changefreq'],
-            'priority': page['priority']
-        })
-    
-    # 2. Páginas de categorías
-    for cat in LISTA_CATEGORIAS:
-        slug = get_category_slug(cat)
-        urls.append({
-            'loc': f"{base_url.rstrip('/')}/categoria/{slug}",
-            'lastmod': datetime.now().strftime('%Y-%m-%d'),
-            'changefreq': 'weekly',
-            'priority': '0.8'
-        })
-    
-    # 3. Artículos individuales
-    articulos = Articulo.get_active().all()
-    for art in articulos:
-        cat_slug = get_category_slug(art.categoria)
-        urls.append({
-            'loc': f"{base_url.rstrip('/')}/categoria/{cat_slug}/{art.slug}",
-            'lastmod': art.fecha.strftime('%Y-%m-%d') if art.fecha else datetime.now().strftime('%Y-%m-%d'),
-            'changefreq': 'monthly',
-            'priority': '0.7'
-        })
-    
-    # Generar XML
-    xml_content = generate_sitemap_xml(urls)
-    
-    return Response(xml_content, mimetype='application/xml')
+    return _servir_sitemap()
 
 
-def generate_sitemap_xml(urls: list) -> str:
-    """Genera contenido XML del sitemap."""
-    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    for url in urls:
-        xml += '  <url>\n'
-        xml += f'    <loc>{url["loc"]}</loc>\n'
-        if url.get('lastmod'):
-            xml += f'    <lastmod>{url["lastmod"]}</lastmod>\n'
-        if url.get('changefreq'):
-            xml += f'    <changefreq>{url["changefreq"]}</changefreq>\n'
-        if url.get('priority'):
-            xml += f'    <priority>{url["priority"]}</priority>\n'
-        xml += '  </url>\n'
-    
-    xml += '</urlset>'
-    return xml
+@seo_bp.route('/sitemap.xml.gz')
+def sitemap_gz_archivo():
+    """Variante precomprimida de /sitemap.xml."""
+    return _servir_sitemap(forzar_gzip=True)
+
+
+@seo_bp.route('/sitemap-<int:numero>.xml')
+def sitemap_parte(numero: int):
+    """Sitemap hijo n del índice."""
+    return _servir_sitemap(numero)
+
+
+@seo_bp.route('/sitemap-<int:numero>.xml.gz')
+def sitemap_parte_gz(numero: int):
+    """Variante precomprimida del sitemap hijo n."""
+    return _servir_sitemap(numero, forzar_gzip=True)
 
 
 @seo_bp.route('/robots.txt')
@@ -0,0 +1,203 @@
+"""
+Buffer write-behind para eventos de lectura (LogActividad LECTURA).
+
+Las rutas de lectura solo encolan una tupla compacta ``(tipo, detalle, fecha)``
+y retornan; un hilo de fondo por worker agrupa los eventos y los escribe con
+un único INSERT multi-fila cada ``ANALYTICS_FLUSH_EVERY`` eventos o cada
+``ANALYTICS_FLUSH_INTERVAL_MS`` milisegundos.
+
+La cola está acotada: si se llena, el evento se descarta y se contabiliza
+en lugar de bloquear la petición. Al terminar el proceso se vacía la cola.
+"""
+
+import os
+import queue
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.enums import LogEventType
+
+logger = logging.getLogger(__name__)
+
+
+class ReadEventBuffer:
+    """
+    Cola acotada + hilo de escritura en lote para eventos de analytics.
+
+    Uso:
+        read_events.registrar(LogEventType.LECTURA, f"Leído: {slug}")
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.flush_every = 200
+        self.flush_interval = 1.0
+        self._cola = queue.Queue(maxsize=10000)
+        self._stop = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._atexit_registrado = False
+        self.encolados = 0
+        self.escritos = 0
+        self.descartados = 0
+        self.errores = 0
+
+    def init_app(self, app):
+        """Configura el buffer desde app.config y registra el flush de salida."""
+        self.app = app
+        self.enabled = app.config.get('ANALYTICS_WRITE_BEHIND', True)
+        self.flush_every = app.config.get('ANALYTICS_FLUSH_EVERY', self.flush_every)
+        self.flush_interval = app.config.get('ANALYTICS_FLUSH_INTERVAL_MS', 1000) / 1000.0
+        self._cola = queue.Queue(maxsize=app.config.get('ANALYTICS_BUFFER_MAX_EVENTS', 10000))
+        if not self._atexit_registrado:
+            atexit.register(self.detener)
+            self._atexit_registrado = True
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def registrar(self, tipo: LogEventType, detalle: str = None) -> None:
+        """
+        Encola un evento sin bloquear. En modo síncrono lo escribe de inmediato.
+
+        Args:
+            tipo: LogEventType del evento
+            detalle: Descripción (se trunca a 255 caracteres)
+        """
+        valor_tipo = tipo.value if isinstance(tipo, LogEventType) else str(tipo)
+        evento = (valor_tipo, detalle[:255] if detalle else None, datetime.now(timezone.utc))
+
+        if not self.enabled:
+            self._escribir_sincrono(evento)
+            return
+
+        self._asegurar_hilo()
+        try:
+            self._cola.put_nowait(evento)
+            self.encolados += 1
+        except queue.Full:
+            self.descartados += 1
+            if self.descartados % 1000 == 1:
+                logger.warning(f"Buffer de analytics lleno: {self.descartados} eventos descartados")
+
+    def flush(self) -> int:
+        """Escribe todo lo pendiente en el hilo actual. Retorna eventos escritos."""
+        total = 0
+        while True:
+            lote = self._drenar(self.flush_every)
+            if not lote:
+                return total
+            self._escribir(lote)
+            total += len(lote)
+
+    def detener(self) -> None:
+        """Detiene el hilo de fondo y vacía la cola (flush de apagado)."""
+        self._stop.set()
+        hilo = self._hilo
+        if hilo is not None and hilo.is_alive():
+            hilo.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self) -> dict:
+        """Contadores del buffer para diagnóstico."""
+        return {
+            'enabled': self.enabled,
+            'pendientes': self._cola.qsize(),
+            'encolados': self.encolados,
+            'escritos': self.escritos,
+            'descartados': self.descartados,
+            'errores': self.errores,
+        }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _asegurar_hilo(self) -> None:
+        """Arranca el hilo de escritura (de nuevo tras un fork de Gunicorn)."""
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._bucle, name='analytics-writer', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self) -> None:
+        """Agrupa eventos hasta flush_every o flush_interval y los escribe."""
+        while not self._stop.is_set():
+            try:
+                primero = self._cola.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            lote = [primero]
+            limite = time.monotonic() + self.flush_interval
+            while len(lote) < self.flush_every:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+            self._escribir(lote)
+
+    def _drenar(self, maximo: int) -> list:
+        """Extrae hasta `maximo` eventos sin bloquear."""
+        lote = []
+        while len(lote) < maximo:
+            try:
+                lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _escribir_sincrono(self, evento: tuple) -> None:
+        """Modo sin buffer: inserta en la sesión de la petición actual."""
+        from app.extensions import db
+        from app.models.log import LogActividad
+
+        tipo, detalle, fecha = evento
+        try:
+            log = LogActividad(tipo_evento=tipo, detalle=detalle)
+            log.fecha = fecha
+            db.session.add(log)
+            db.session.commit()
+            self.escritos += 1
+        except SQLAlchemyError as e:
+            self.errores += 1
+            logger.error(f"Error de BD en analytics: {e.__class__.__name__}")
+            db.session.rollback()
+
+    def _escribir(self, lote: list) -> None:
+        """Inserta el lote con un único INSERT multi-fila."""
+        if not lote or self.app is None:
+            return
+
+        from app.extensions import db
+        from app.models.log import LogActividad
+
+        filas = [{'tipo_evento': t, 'detalle': d, 'fecha': f} for t, d, f in lote]
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(LogActividad.__table__.insert(), filas)
+            self.escritos += len(filas)
+        except SQLAlchemyError as e:
+            self.errores += 1
+            logger.error(f"Error de BD escribiendo {len(filas)} eventos de analytics: {e.__class__.__name__}")
+
+
+# Instancia por worker (se configura en register_extensions)
+read_events = ReadEventBuffer()
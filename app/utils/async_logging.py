@@ -0,0 +1,164 @@
+"""
+Logging no bloqueante: QueueHandler acotado + QueueListener por worker.
+
+Con ``LOG_ASYNC`` activado, el logger raíz solo tiene un ``ColaLogs``: el
+hilo de la petición resuelve el mensaje y encola el registro; un hilo
+listener lo formatea (JSON/texto) y lo escribe en los handlers reales
+(archivo rotativo y stdout). Así una escritura lenta o una rotación de
+``app.log`` no se suman a la latencia de la respuesta.
+
+La cola está acotada: si se llena, el registro se descarta y se contabiliza
+en lugar de bloquear. Al terminar el proceso se detiene el listener tras
+vaciar la cola. Tras un fork (Gunicorn) el listener se vuelve a crear en el
+worker en el primer registro.
+
+``MuestreoPeticiones`` reduce el volumen de las líneas de acceso del logger
+``request`` a alta QPS: conserva 1 de cada N peticiones correctas y todas
+las de error (>= 400) o lentas.
+"""
+
+import os
+import queue
+import atexit
+import logging
+import itertools
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+_cola_activa = None
+
+
+class _Listener(QueueListener):
+    """QueueListener cuyo centinela de parada espera hueco en la cola acotada."""
+
+    def enqueue_sentinel(self):
+        try:
+            self.queue.put(self._sentinel, timeout=5)
+        except queue.Full:
+            pass
+
+
+class ColaLogs(QueueHandler):
+    """
+    QueueHandler con cola acotada, contador de descartes y listener por proceso.
+
+    Args:
+        handlers: Handlers reales (con su formatter y nivel)
+        max_registros: Capacidad de la cola
+    """
+
+    def __init__(self, handlers: list, max_registros: int = 10000):
+        super().__init__(queue.Queue(maxsize=max_registros))
+        self.destinos = list(handlers)
+        self.listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.encolados = 0
+        self.descartados = 0
+
+    def prepare(self, record):
+        # Sin format(): solo se fija el mensaje (los args pueden mutar después);
+        # el formateo queda para el hilo listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self._asegurar_listener()
+        try:
+            self.queue.put_nowait(record)
+            self.encolados += 1
+        except queue.Full:
+            self.descartados += 1
+
+    def detener(self) -> None:
+        """Vacía la cola en los handlers reales y detiene el listener."""
+        listener = self.listener
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+            self.listener = None
+        for handler in self.destinos:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        """Contadores de la cola para diagnóstico."""
+        return {
+            'pendientes': self.queue.qsize(),
+            'capacidad': self.queue.maxsize,
+            'encolados': self.encolados,
+            'descartados': self.descartados,
+        }
+
+    def _asegurar_listener(self) -> None:
+        if self.listener is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self.listener is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.listener = _Listener(self.queue, *self.destinos, respect_handler_level=True)
+            self.listener.start()
+
+
+class MuestreoPeticiones(logging.Filter):
+    """
+    Conserva 1 de cada ``cada`` líneas de acceso correctas.
+
+    Usa los campos ``status`` y ``elapsed_ms`` que ``after_request_logging``
+    pasa en ``extra``; los registros sin ellos pasan siempre.
+    """
+
+    def __init__(self, cada: int = 1, lento_ms: float = 1000):
+        super().__init__()
+        self.cada = max(int(cada), 1)
+        self.lento_ms = lento_ms
+        self._contador = itertools.count()
+        self.omitidos = 0
+
+    def filter(self, record) -> bool:
+        estado = getattr(record, 'status', None)
+        if self.cada == 1 or estado is None or estado >= 400 \
+                or getattr(record, 'elapsed_ms', 0) >= self.lento_ms:
+            return True
+        if next(self._contador) % self.cada:
+            self.omitidos += 1
+            return False
+        return True
+
+
+def instalar_muestreo(cada: int, lento_ms: float) -> None:
+    """Reemplaza el filtro de muestreo del logger 'request' (una vez por app)."""
+    request_logger = logging.getLogger('request')
+    for filtro in [f for f in request_logger.filters if isinstance(f, MuestreoPeticiones)]:
+        request_logger.removeFilter(filtro)
+    if cada > 1:
+        request_logger.addFilter(MuestreoPeticiones(cada, lento_ms))
+
+
+def crear_cola(handlers: list, max_registros: int) -> ColaLogs:
+    """Crea el handler de cola que sustituye a ``handlers`` en el logger raíz."""
+    global _cola_activa
+    if _cola_activa is None:
+        atexit.register(_detener_activa)
+    _cola_activa = ColaLogs(handlers, max_registros)
+    return _cola_activa
+
+
+def _detener_activa() -> None:
+    if _cola_activa is not None:
+        _cola_activa.detener()
+
+
+def estado_logging() -> dict:
+    """Modo de logging y contadores de cola y muestreo (para diagnóstico)."""
+    raiz = logging.getLogger()
+    cola = next((h for h in raiz.handlers if isinstance(h, ColaLogs)), None)
+    muestreo = next((f for f in logging.getLogger('request').filters if isinstance(f, MuestreoPeticiones)), None)
+    return {
+        'modo': 'async' if cola is not None else 'sync',
+        'cola': cola.stats() if cola is not None else None,
+        'muestreo': {'cada': muestreo.cada, 'omitidos': muestreo.omitidos} if muestreo else None,
+    }
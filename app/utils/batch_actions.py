@@ -0,0 +1,244 @@
+"""
+Acciones en lote del panel de administración.
+
+Cada acción (papelera, restaurar, reasignar categoría, acceso .edu) se
+ejecuta como ``UPDATE ... WHERE id IN (...)`` sobre la lista de ids, con una
+sola entrada de auditoría y una sola invalidación de cachés, en lugar de una
+petición, un ``get_or_404`` y un commit por fila.
+
+La condición de cada acción excluye las filas que ya están en el estado
+destino, por lo que ``afectados`` cuenta solo los cambios reales y repetir
+la acción es inocuo.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+
+from flask import current_app
+from sqlalchemy import update, or_
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.models.articulo import Articulo
+from app.models.caso import CasoClinico
+from app.models.fuente import FuenteAcademica
+from app.models.log import LogActividad
+from app.models.usuario import Usuario
+from app.utils.category_registry import category_registry
+from app.utils.content_cache import content_cache, CARPETA_ARTICULOS, CARPETA_CASOS
+
+logger = logging.getLogger(__name__)
+
+# Ids por sentencia UPDATE (límite de parámetros de SQLite)
+TAMANIO_LOTE_UPDATE = 500
+
+
+class AccionLoteError(ValueError):
+    """Sección, acción, ids o valor no válidos para una acción en lote."""
+    pass
+
+
+class AccionLote(NamedTuple):
+    """Cómo aplicar una acción a un conjunto de ids"""
+    modelo: type
+    valores: Callable  # valor -> dict para UPDATE ... SET
+    pendiente: Callable  # valor -> condición de filas que aún no están en el estado destino
+    invalidar: Callable  # ids afectados (solicitados) -> None
+    requiere_valor: bool = False
+    complementar: Optional[Callable] = None  # (ids, valor) -> None, en la misma transacción
+
+
+# =============================================================================
+# INVALIDACIONES (una por acción, no por fila)
+# =============================================================================
+
+def _invalidar_articulos(ids: list) -> None:
+    from app.utils.pagination import invalidar_totales
+    from app.utils.search import invalidar_busqueda
+    from app.utils.tags import invalidar_conteos_tags
+
+    slugs = [slug for (slug,) in db.session.query(Articulo.slug).filter(Articulo.id.in_(ids))]
+    content_cache.invalidar(CARPETA_ARTICULOS, *slugs)
+    invalidar_conteos_tags()
+    invalidar_busqueda()
+    invalidar_totales()
+
+
+def _invalidar_casos(ids: list) -> None:
+    from app.utils.pagination import invalidar_totales
+
+    slugs = [slug for (slug,) in db.session.query(CasoClinico.slug).filter(CasoClinico.id.in_(ids))]
+    content_cache.invalidar(CARPETA_CASOS, *slugs)
+    invalidar_totales()
+
+
+def _invalidar_totales(ids: list) -> None:
+    from app.utils.pagination import invalidar_totales
+
+    invalidar_totales()
+
+
+def _invalidar_usuarios(ids: list) -> None:
+    from app.utils.current_user import invalidar_usuarios
+
+    invalidar_usuarios(email for (email,) in db.session.query(Usuario.email).filter(Usuario.id.in_(ids)))
+
+
+def _reindexar_categoria(ids: list, valor: str) -> None:
+    """
+    Recalcula ``articulo_busqueda.tags`` (tags + nombre de la categoría).
+
+    La normalización es en Python, así que es un UPDATE por clave primaria
+    con executemany, sin cargar los documentos (ni sus cuerpos).
+    """
+    from app.models.busqueda import ArticuloBusqueda
+    from app.utils.search import valores_busqueda
+
+    for i in range(0, len(ids), TAMANIO_LOTE_UPDATE):
+        filas = db.session.query(Articulo.id, Articulo.tags).join(
+            ArticuloBusqueda, ArticuloBusqueda.articulo_id == Articulo.id
+        ).filter(Articulo.id.in_(ids[i:i + TAMANIO_LOTE_UPDATE]), Articulo.categoria == valor).all()
+        if filas:
+            db.session.execute(update(ArticuloBusqueda), [
+                {'articulo_id': id_, 'tags': valores_busqueda('', tags, valor, '')['tags']}
+                for id_, tags in filas
+            ])
+
+
+def _papelera(modelo, invalidar) -> AccionLote:
+    return AccionLote(
+        modelo=modelo,
+        valores=lambda valor: {'deleted_at': datetime.now(timezone.utc)},
+        pendiente=lambda valor: modelo.deleted_at.is_(None),
+        invalidar=invalidar,
+    )
+
+
+def _restaurar(modelo, invalidar) -> AccionLote:
+    return AccionLote(
+        modelo=modelo,
+        valores=lambda valor: {'deleted_at': None},
+        pendiente=lambda valor: modelo.deleted_at.isnot(None),
+        invalidar=invalidar,
+    )
+
+
+def _validar_categoria(valor: Optional[str]) -> str:
+    if not valor or not category_registry.actual().es_valida(valor):
+        raise AccionLoteError('Categoría no válida')
+    return valor
+
+
+# Sección -> acción -> AccionLote
+ACCIONES = {
+    'articulos': {
+        'eliminar': _papelera(Articulo, _invalidar_articulos),
+        'restaurar': _restaurar(Articulo, _invalidar_articulos),
+        'categoria': AccionLote(
+            modelo=Articulo,
+            valores=lambda valor: {'categoria': valor},
+            pendiente=lambda valor: or_(Articulo.categoria.is_(None), Articulo.categoria != valor),
+            invalidar=_invalidar_articulos,
+            requiere_valor=True,
+            complementar=_reindexar_categoria,
+        ),
+    },
+    'fuentes': {
+        'eliminar': _papelera(FuenteAcademica, _invalidar_totales),
+        'restaurar': _restaurar(FuenteAcademica, _invalidar_totales),
+    },
+    'casos': {
+        'eliminar': _papelera(CasoClinico, _invalidar_casos),
+        'restaurar': _restaurar(CasoClinico, _invalidar_casos),
+    },
+    'usuarios': {
+        'aprobar_edu': AccionLote(
+            modelo=Usuario,
+            valores=lambda valor: {'acceso_edu': True},
+            pendiente=lambda valor: or_(Usuario.acceso_edu.is_(None), Usuario.acceso_edu.is_(False)),
+            invalidar=_invalidar_usuarios,
+        ),
+        'revocar_edu': AccionLote(
+            modelo=Usuario,
+            valores=lambda valor: {'acceso_edu': False},
+            pendiente=lambda valor: Usuario.acceso_edu.is_(True),
+            invalidar=_invalidar_usuarios,
+        ),
+    },
+}
+
+
+def parsear_ids(valores) -> list:
+    """
+    Normaliza los ids recibidos (lista o "1,2,3") a enteros positivos únicos.
+
+    Raises:
+        AccionLoteError: Si no hay ids, alguno no es entero o superan ADMIN_BATCH_MAX
+    """
+    if isinstance(valores, (str, int)):
+        valores = [valores]
+    partes = []
+    for valor in valores or []:
+        partes.extend(str(valor).split(','))
+
+    ids = []
+    for parte in partes:
+        parte = parte.strip()
+        if not parte:
+            continue
+        if not parte.isdigit() or int(parte) <= 0:
+            raise AccionLoteError(f'Id no válido: {parte[:20]}')
+        ids.append(int(parte))
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise AccionLoteError('No se indicaron ids')
+    maximo = current_app.config.get('ADMIN_BATCH_MAX', 1000)
+    if len(ids) > maximo:
+        raise AccionLoteError(f'Máximo {maximo} ids por lote')
+    return ids
+
+
+def ejecutar_accion_lote(seccion: str, accion: str, ids: list, valor: Optional[str] = None) -> dict:
+    """
+    Aplica una acción a los ids con UPDATEs por conjunto (con commit).
+
+    Returns:
+        dict con 'seccion', 'accion', 'solicitados' y 'afectados'
+
+    Raises:
+        AccionLoteError: Si la sección/acción no existe o falta un valor válido
+    """
+    definicion = ACCIONES.get(seccion, {}).get(accion)
+    if definicion is None:
+        raise AccionLoteError(f'Acción desconocida: {seccion}/{accion}')
+    if definicion.requiere_valor:
+        valor = _validar_categoria(valor)
+
+    modelo = definicion.modelo
+    valores = definicion.valores(valor)
+    afectados = 0
+    for i in range(0, len(ids), TAMANIO_LOTE_UPDATE):
+        sentencia = (
+            update(modelo)
+            .where(modelo.id.in_(ids[i:i + TAMANIO_LOTE_UPDATE]), definicion.pendiente(valor))
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        afectados += db.session.execute(sentencia).rowcount
+
+    if afectados and definicion.complementar:
+        definicion.complementar(ids, valor)
+    if afectados:
+        detalle = f"Lote {seccion}/{accion}: {afectados} de {len(ids)}"
+        if valor:
+            detalle += f" → {valor}"
+        db.session.add(LogActividad(tipo_evento=LogEventType.ADMIN, detalle=detalle))
+    db.session.commit()
+
+    if afectados:
+        definicion.invalidar(ids)
+        logger.info(f"Acción en lote {seccion}/{accion}: {afectados} de {len(ids)} filas")
+
+    return {'seccion': seccion, 'accion': accion, 'solicitados': len(ids), 'afectados': afectados}
@@ -0,0 +1,466 @@
+"""
+Importación masiva de artículos (``flask content import``).
+
+Entrada: un directorio o un .zip con los HTML (y CSS opcionales) más un
+manifiesto CSV o JSON con una fila por artículo::
+
+    slug,titulo,categoria,tags,archivo,css,url_pdf,url_audio,descripcion,fecha
+
+Solo ``slug`` y ``titulo`` son obligatorios; ``archivo`` por defecto es
+``<slug>.html`` y ``css`` se usa si existe ``<slug>.css``.
+
+El manifiesto se procesa por lotes. En cada lote:
+
+    1. Validación de campos (mismas reglas que el formulario del panel) y
+       descarte de slugs ya existentes con una sola consulta IN
+    2. Sanitización (``limpiar_html_google``) y métricas de ingesta en un
+       pool de procesos
+    3. Escritura de archivos en paralelo (hilos)
+    4. INSERT multi-fila de artículos, tags, relaciones y documentos de
+       búsqueda en una única transacción
+
+Tras cada commit se guarda un checkpoint: una importación interrumpida se
+reanuda desde el siguiente lote sin repetir trabajo.
+"""
+
+import os
+import csv
+import io
+import json
+import time
+import hashlib
+import logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models.articulo import Articulo
+from app.models.busqueda import ArticuloBusqueda
+from app.models.tag import Tag, articulo_tag
+from app.utils.form_validators import validar_formulario_articulo
+from app.utils.ingest import analizar_html, valores_metricas
+from app.utils.sanitizers import limpiar_html_google, validar_css_seguro
+from app.utils.search import normalizar_texto, valores_busqueda
+from app.utils.tags import parsear_tags
+
+logger = logging.getLogger(__name__)
+
+MANIFIESTOS_POR_DEFECTO = ('manifest.csv', 'manifest.json', 'manifiesto.csv', 'manifiesto.json')
+
+
+class ImportacionError(Exception):
+    """Entrada de importación inválida (fuente o manifiesto)."""
+
+
+class ResumenLote(NamedTuple):
+    """Resultado de un lote para el informe de progreso"""
+    numero: int
+    filas: int
+    importados: int
+    omitidos: int
+    errores: int
+    segundos: float
+    procesadas: int  # Filas del manifiesto recorridas hasta este lote
+    total: int
+
+    @property
+    def por_segundo(self) -> float:
+        return self.importados / self.segundos if self.segundos > 0 else 0.0
+
+
+# =============================================================================
+# FUENTE Y MANIFIESTO
+# =============================================================================
+
+class FuenteImportacion:
+    """Acceso uniforme a los archivos de un directorio o de un .zip."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._zip = None
+        if os.path.isdir(ruta):
+            self._base = os.path.realpath(ruta)
+        elif zipfile.is_zipfile(ruta):
+            self._zip = zipfile.ZipFile(ruta)
+            self._nombres = set(self._zip.namelist())
+        else:
+            raise ImportacionError(f"La fuente no es un directorio ni un .zip: {ruta}")
+
+    def _ruta_segura(self, nombre: str) -> Optional[str]:
+        # Previene path traversal desde el manifiesto
+        ruta = os.path.realpath(os.path.join(self._base, nombre))
+        return ruta if ruta.startswith(self._base + os.sep) else None
+
+    def existe(self, nombre: str) -> bool:
+        if self._zip is not None:
+            return nombre in self._nombres
+        ruta = self._ruta_segura(nombre)
+        return ruta is not None and os.path.isfile(ruta)
+
+    def leer_bytes(self, nombre: str) -> Optional[bytes]:
+        """Contenido del archivo o None si no existe."""
+        if not self.existe(nombre):
+            return None
+        if self._zip is not None:
+            return self._zip.read(nombre)
+        with open(self._ruta_segura(nombre), 'rb') as f:
+            return f.read()
+
+    def leer_texto(self, nombre: str) -> Optional[str]:
+        datos = self.leer_bytes(nombre)
+        return None if datos is None else datos.decode('utf-8', errors='ignore')
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def cargar_manifiesto(fuente: FuenteImportacion, nombre: Optional[str] = None) -> tuple:
+    """
+    Lee el manifiesto CSV o JSON.
+
+    Args:
+        fuente: Directorio o zip de origen
+        nombre: Ruta del manifiesto dentro de la fuente (o ruta absoluta);
+                None busca manifest.csv/json en la raíz
+
+    Returns:
+        Tuple (filas, sha256 del manifiesto)
+    """
+    if nombre and os.path.isabs(nombre):
+        with open(nombre, 'rb') as f:
+            crudo = f.read()
+    else:
+        candidatos = [nombre] if nombre else MANIFIESTOS_POR_DEFECTO
+        crudo, nombre = next(
+            ((fuente.leer_bytes(c), c) for c in candidatos if fuente.existe(c)), (None, None)
+        )
+        if crudo is None:
+            raise ImportacionError("No se encontró el manifiesto (manifest.csv o manifest.json)")
+
+    texto = crudo.decode('utf-8-sig')
+    if nombre.lower().endswith('.json'):
+        filas = json.loads(texto)
+        if isinstance(filas, dict):
+            filas = filas.get('articulos', [])
+    else:
+        filas = list(csv.DictReader(io.StringIO(texto)))
+
+    if not isinstance(filas, list):
+        raise ImportacionError("El manifiesto debe ser una lista de artículos")
+
+    filas = [{k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in fila.items() if k}
+             for fila in filas]
+    return filas, hashlib.sha256(crudo).hexdigest()
+
+
+# =============================================================================
+# CHECKPOINT
+# =============================================================================
+
+def leer_checkpoint(ruta: str, sha_manifiesto: str) -> dict:
+    """Estado guardado si corresponde al mismo manifiesto; vacío en otro caso."""
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if estado.get('manifiesto_sha256') != sha_manifiesto:
+        logger.warning(f"Checkpoint {ruta} corresponde a otro manifiesto; se ignora")
+        return {}
+    return estado
+
+
+def guardar_checkpoint(ruta: str, estado: dict) -> None:
+    """Escritura atómica (archivo temporal + rename)."""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporal, ruta)
+
+
+# =============================================================================
+# ETAPAS DEL LOTE
+# =============================================================================
+
+def _procesar_documento(payload: tuple) -> dict:
+    """
+    Sanitiza y analiza un documento (se ejecuta en procesos del pool).
+
+    Args:
+        payload: (slug, html sin sanitizar, css o None)
+    """
+    slug, html_crudo, css_crudo = payload
+    try:
+        html = limpiar_html_google(html_crudo)
+        css = None
+        if css_crudo:
+            css_valido, resultado = validar_css_seguro(css_crudo)
+            if not css_valido:
+                return {'slug': slug, 'error': resultado}
+            css = resultado
+        return {'slug': slug, 'html': html, 'css': css, 'metricas': analizar_html(html), 'error': None}
+    except Exception as e:
+        return {'slug': slug, 'error': f"Error al sanitizar: {e.__class__.__name__}"}
+
+
+def _validar_fila(fila: dict, fuente: FuenteImportacion) -> Optional[str]:
+    errores = validar_formulario_articulo({
+        'titulo': fila.get('titulo') or '',
+        'slug': fila.get('slug') or '',
+        'categoria': fila.get('categoria') or '',
+        'tags': fila.get('tags') or '',
+        'url_pdf': fila.get('url_pdf') or '',
+        'url_audio': fila.get('url_audio') or '',
+    })
+    if errores:
+        return errores[0]
+    if not fuente.existe(fila.get('archivo') or f"{fila['slug']}.html"):
+        return "Error: Falta archivo HTML."
+    return None
+
+
+def _parsear_fecha(valor) -> Optional[datetime]:
+    if not valor:
+        return None
+    try:
+        fecha = datetime.fromisoformat(str(valor))
+    except ValueError:
+        return None
+    return fecha.replace(tzinfo=None) if fecha.tzinfo else fecha
+
+
+def _escribir(ruta: str, contenido: str) -> None:
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(contenido)
+
+
+def _insertar_lote(documentos: List[dict]) -> None:
+    """INSERT multi-fila de artículos, tags, relaciones y búsqueda (sin commit)."""
+    ahora = datetime.now(timezone.utc)
+    filas_articulo = []
+    pares_por_slug = {}
+    for doc in documentos:
+        fila = doc['fila']
+        pares = parsear_tags(fila.get('tags') or '')
+        pares_por_slug[doc['slug']] = pares
+        filas_articulo.append({
+            'titulo': fila['titulo'],
+            'slug': doc['slug'],
+            'categoria': fila.get('categoria') or None,
+            'tags': ', '.join(nombre for nombre, _ in pares),
+            'nombre_archivo': f"{doc['slug']}.html",
+            'url_pdf': fila.get('url_pdf') or None,
+            'url_audio': fila.get('url_audio') or None,
+            'descripcion': (fila.get('descripcion') or '')[:300] or None,
+            'fecha': _parsear_fecha(fila.get('fecha')) or ahora,
+            'updated_at': ahora,
+            **valores_metricas(doc['metricas']),
+        })
+    db.session.execute(insert(Articulo), filas_articulo)
+
+    slugs = [doc['slug'] for doc in documentos]
+    ids = dict(db.session.execute(select(Articulo.slug, Articulo.id).where(Articulo.slug.in_(slugs))).all())
+
+    # Tags: insertar solo los que faltan (deduplicados en el lote)
+    todos = {slug_tag: nombre for pares in pares_por_slug.values() for nombre, slug_tag in pares}
+    tag_ids = {}
+    if todos:
+        consulta = select(Tag.slug, Tag.id).where(Tag.slug.in_(list(todos)))
+        tag_ids = dict(db.session.execute(consulta).all())
+        nuevos = [{'nombre': nombre, 'slug': slug_tag} for slug_tag, nombre in todos.items() if slug_tag not in tag_ids]
+        if nuevos:
+            db.session.execute(insert(Tag), nuevos)
+            tag_ids = dict(db.session.execute(consulta).all())
+
+    relaciones = [
+        {'articulo_id': ids[slug], 'tag_id': tag_ids[slug_tag]}
+        for slug, pares in pares_por_slug.items() for _, slug_tag in pares
+    ]
+    if relaciones:
+        db.session.execute(articulo_tag.insert(), relaciones)
+
+    db.session.execute(insert(ArticuloBusqueda), [
+        {
+            'articulo_id': ids[fila['slug']],
+            'cuerpo': normalizar_texto(doc['metricas']['texto']),
+            **valores_busqueda(fila['titulo'], fila['tags'], fila['categoria'], fila['descripcion']),
+        }
+        for doc, fila in zip(documentos, filas_articulo)
+    ])
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def importar_articulos(ruta_fuente: str, destino_base: str, manifiesto: Optional[str] = None,
+                       checkpoint: Optional[str] = None, batch_size: int = 1000,
+                       workers: Optional[int] = None, io_workers: int = 8,
+                       reanudar: bool = True,
+                       reportar: Optional[Callable[[ResumenLote], None]] = None) -> dict:
+    """
+    Importa los artículos del manifiesto por lotes.
+
+    Args:
+        ruta_fuente: Directorio o .zip con HTML/CSS y manifiesto
+        destino_base: Raíz del proyecto (templates/articulos, static/articulos_css)
+        manifiesto: Ruta del manifiesto (None: manifest.csv/json en la fuente)
+        checkpoint: Archivo de progreso (None: junto a la fuente)
+        batch_size: Filas del manifiesto por lote/transacción
+        workers: Procesos de sanitización (None: CPUs; <= 1 sin pool)
+        io_workers: Hilos de escritura de archivos
+        reanudar: Continuar desde el checkpoint si existe
+        reportar: Callback con el ResumenLote de cada lote
+
+    Returns:
+        dict con 'importados', 'omitidos' y 'total_errores' (acumulados con el
+        checkpoint), 'errores' (lista (slug, mensaje) de esta ejecución) y 'segundos'
+    """
+    from app.utils.pagination import invalidar_totales
+    from app.utils.search import invalidar_busqueda
+    from app.utils.tags import invalidar_conteos_tags
+
+    carpeta_html = os.path.join(destino_base, 'templates', 'articulos')
+    carpeta_css = os.path.join(destino_base, 'static', 'articulos_css')
+    os.makedirs(carpeta_html, exist_ok=True)
+    os.makedirs(carpeta_css, exist_ok=True)
+
+    checkpoint = checkpoint or f"{ruta_fuente.rstrip(os.sep)}.import-checkpoint.json"
+    workers = os.cpu_count() if workers is None else workers
+    inicio_total = time.perf_counter()
+
+    with FuenteImportacion(ruta_fuente) as fuente:
+        filas, sha = cargar_manifiesto(fuente, manifiesto)
+        estado = leer_checkpoint(checkpoint, sha) if reanudar else {}
+        siguiente = estado.get('siguiente', 0)
+        totales = {k: estado.get(k, 0) for k in ('importados', 'omitidos', 'errores')}
+        errores = []
+        if siguiente:
+            logger.info(f"Reanudando importación en la fila {siguiente} de {len(filas)}")
+
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        hilos = ThreadPoolExecutor(max_workers=io_workers)
+        try:
+            inicios = range(siguiente, len(filas), batch_size)
+            for numero, inicio in enumerate(inicios, start=siguiente // batch_size + 1):
+                t0 = time.perf_counter()
+                lote = filas[inicio:inicio + batch_size]
+                errores_lote = []
+
+                # 1. Validación y descarte de slugs existentes / duplicados
+                candidatas = []
+                vistos = set()
+                for fila in lote:
+                    slug = (fila.get('slug') or '').strip()
+                    error = _validar_fila(fila, fuente)
+                    if error is None and slug in vistos:
+                        error = "Error: Slug duplicado en el manifiesto."
+                    if error:
+                        errores_lote.append((slug, error))
+                        continue
+                    vistos.add(slug)
+                    candidatas.append(fila)
+
+                existentes = set()
+                if candidatas:
+                    existentes = set(db.session.execute(
+                        select(Articulo.slug).where(Articulo.slug.in_([f['slug'] for f in candidatas]))
+                    ).scalars())
+                nuevas = [f for f in candidatas if f['slug'] not in existentes]
+
+                # 2. Sanitización en paralelo (CPU)
+                payloads = []
+                for fila in nuevas:
+                    nombre_css = fila.get('css') or f"{fila['slug']}.css"
+                    payloads.append((
+                        fila['slug'],
+                        fuente.leer_texto(fila.get('archivo') or f"{fila['slug']}.html"),
+                        fuente.leer_texto(nombre_css) if fuente.existe(nombre_css) else None,
+                    ))
+                if pool is not None:
+                    chunksize = max(1, len(payloads) // (workers * 4))
+                    resultados = list(pool.map(_procesar_documento, payloads, chunksize=chunksize))
+                else:
+                    resultados = [_procesar_documento(p) for p in payloads]
+
+                documentos = []
+                for fila, resultado in zip(nuevas, resultados):
+                    if resultado['error']:
+                        errores_lote.append((fila['slug'], resultado['error']))
+                    else:
+                        documentos.append({**resultado, 'fila': fila})
+
+                # 3. Escritura de archivos en paralelo (I/O)
+                escritos = []
+                tareas = []
+                for doc in documentos:
+                    ruta_html = os.path.join(carpeta_html, f"{doc['slug']}.html")
+                    tareas.append(hilos.submit(_escribir, ruta_html, doc['html']))
+                    escritos.append(ruta_html)
+                    if doc['css']:
+                        ruta_css = os.path.join(carpeta_css, f"{doc['slug']}.css")
+                        tareas.append(hilos.submit(_escribir, ruta_css, doc['css']))
+                        escritos.append(ruta_css)
+
+                # 4. Inserción del lote en una transacción
+                try:
+                    for tarea in tareas:
+                        tarea.result()
+                    if documentos:
+                        _insertar_lote(documentos)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    for ruta in escritos:
+                        if os.path.exists(ruta):
+                            os.remove(ruta)
+                    raise
+
+                for slug, mensaje in errores_lote:
+                    logger.warning(f"Importación: {slug or '(sin slug)'}: {mensaje}")
+                errores.extend(errores_lote)
+                totales['importados'] += len(documentos)
+                totales['omitidos'] += len(existentes)
+                totales['errores'] += len(errores_lote)
+
+                siguiente = inicio + len(lote)
+                guardar_checkpoint(checkpoint, {'manifiesto_sha256': sha, 'siguiente': siguiente, **totales})
+
+                if reportar:
+                    reportar(ResumenLote(
+                        numero=numero, filas=len(lote), importados=len(documentos),
+                        omitidos=len(existentes), errores=len(errores_lote),
+                        segundos=time.perf_counter() - t0, procesadas=siguiente, total=len(filas),
+                    ))
+        finally:
+            hilos.shutdown(wait=True)
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+    # Completado: el checkpoint ya no es necesario
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    if totales['importados']:
+        invalidar_totales()
+        invalidar_conteos_tags()
+        invalidar_busqueda()
+
+    return {
+        'importados': totales['importados'],
+        'omitidos': totales['omitidos'],
+        'total_errores': totales['errores'],
+        'errores': errores,
+        'segundos': time.perf_counter() - inicio_total,
+    }
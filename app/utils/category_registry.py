@@ -0,0 +1,180 @@
+"""
+Registro de categorías en memoria, inmutable y versionado.
+
+Sustituye a las consultas ``Categoria.get_nombres_con_fallback()`` por render
+y al recálculo de slugs (normalización Unicode + regex) en cada llamada. El
+registro se construye una vez desde la tabla ``categoria`` (con
+``LISTA_CATEGORIAS`` como fallback) y solo se reconstruye cuando cambia el
+sello de versión en la caché compartida o vence ``CATEGORY_REGISTRY_MAX_AGE``
+(red de seguridad para workers con caché local).
+
+Uso:
+    registro = category_registry.actual()
+    registro.nombres            # categorías activas, en orden
+    registro.slug(nombre)       # slug precalculado
+    registro.por_slug(slug)     # CategoriaInfo o None
+"""
+
+import time
+import logging
+import threading
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import cache
+from app.constants import (
+    LISTA_CATEGORIAS, get_category_slug, get_category_display_name, get_category_emoji
+)
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'categorias:registro:version'
+
+
+class CategoriaInfo(NamedTuple):
+    """Datos precalculados de una categoría"""
+    nombre: str
+    display: str
+    emoji: str
+    slug: str
+    orden: int
+    activa: bool
+
+
+class RegistroCategorias:
+    """Instantánea inmutable de categorías con índices por nombre y slug."""
+
+    __slots__ = ('version', 'origen', 'categorias', 'nombres', 'slugs', '_por_nombre', '_por_slug')
+
+    def __init__(self, categorias: tuple, version: int, origen: str):
+        self.version = version
+        self.origen = origen  # 'bd' o 'constantes'
+        self.categorias = categorias
+        self.nombres = tuple(c.nombre for c in categorias if c.activa)
+        self._por_nombre = MappingProxyType({c.nombre: c for c in categorias})
+        self._por_slug = MappingProxyType({c.slug: c for c in categorias})
+        self.slugs = MappingProxyType({c.nombre: c.slug for c in categorias})
+
+    def get(self, nombre: str) -> Optional[CategoriaInfo]:
+        return self._por_nombre.get(nombre)
+
+    def slug(self, nombre: str) -> str:
+        """Slug de una categoría (fallback calculado para nombres fuera del registro)."""
+        info = self._por_nombre.get(nombre)
+        return info.slug if info else get_category_slug(nombre)
+
+    def por_slug(self, slug: str) -> Optional[CategoriaInfo]:
+        return self._por_slug.get(slug)
+
+    def es_valida(self, nombre: str) -> bool:
+        """True si el nombre es una categoría activa."""
+        info = self._por_nombre.get(nombre)
+        return info is not None and info.activa
+
+    def __len__(self):
+        return len(self.nombres)
+
+
+def _info(nombre: str, orden: int, activa: bool, icono: Optional[str] = None) -> CategoriaInfo:
+    return CategoriaInfo(
+        nombre=nombre,
+        display=get_category_display_name(nombre),
+        emoji=get_category_emoji(nombre) or (icono or ''),
+        slug=get_category_slug(nombre),
+        orden=orden,
+        activa=activa,
+    )
+
+
+class ProveedorCategorias:
+    """Mantiene el registro vigente por worker y lo reconstruye al cambiar la versión."""
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._registro = None
+        self._construido_en = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_age = app.config.get('CATEGORY_REGISTRY_MAX_AGE', self.max_age)
+        self._registro = None
+
+    def actual(self) -> RegistroCategorias:
+        """Registro vigente (sin consultas salvo al cambiar la versión)."""
+        if not has_app_context():
+            return self._construir_constantes(0)
+
+        version = cache.get(VERSION_KEY) or 0
+        registro = self._registro
+        if registro is not None and registro.version == version and not self._vencido():
+            return registro
+
+        with self._lock:
+            registro = self._registro
+            if registro is None or registro.version != version or self._vencido():
+                registro = self._construir(version)
+                self._registro = registro
+                self._construido_en = time.monotonic()
+        return registro
+
+    def invalidar(self) -> None:
+        """Incrementa el sello de versión: todos los workers reconstruyen en su próxima lectura."""
+        if has_app_context():
+            cache.set(VERSION_KEY, (cache.get(VERSION_KEY) or 0) + 1, timeout=0)
+        self._registro = None
+
+    def _vencido(self) -> bool:
+        return time.monotonic() - self._construido_en >= self.max_age
+
+    def _construir(self, version: int) -> RegistroCategorias:
+        from app.models.categoria import Categoria
+
+        try:
+            filas = Categoria.query.order_by(Categoria.orden, Categoria.id).all()
+        except SQLAlchemyError as e:
+            logger.debug(f"Usando categorías estáticas: {e.__class__.__name__}")
+            filas = []
+
+        if any(c.activa for c in filas):
+            categorias = tuple(_info(c.nombre, c.orden or 0, bool(c.activa), c.icono) for c in filas)
+            return RegistroCategorias(categorias, version, 'bd')
+        return self._construir_constantes(version)
+
+    @staticmethod
+    def _construir_constantes(version: int) -> RegistroCategorias:
+        categorias = tuple(_info(nombre, i, True) for i, nombre in enumerate(LISTA_CATEGORIAS))
+        return RegistroCategorias(categorias, version, 'constantes')
+
+
+# Instancia por worker (se configura en register_extensions)
+category_registry = ProveedorCategorias()
+
+
+# =============================================================================
+# INVALIDACIÓN AUTOMÁTICA AL MODIFICAR CATEGORÍAS
+# =============================================================================
+
+def _marcar_cambio(mapper, connection, target):
+    sesion = object_session(target)
+    if sesion is not None:
+        sesion.info['categorias_modificadas'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_tras_commit(sesion):
+    if sesion.info.pop('categorias_modificadas', False):
+        category_registry.invalidar()
+
+
+def _registrar_eventos():
+    from app.models.categoria import Categoria
+    for evento in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(Categoria, evento, _marcar_cambio)
+
+
+_registrar_eventos()
@@ -0,0 +1,196 @@
+"""
+Caché en memoria del contenido HTML de artículos y casos clínicos.
+
+Cada worker mantiene un LRU acotado por bytes con el payload ya preparado
+(HTML y presencia/versión del CSS asociado). Las entradas se validan contra
+mtime/tamaño del archivo físico, pero el ``stat`` solo se repite cada
+``CONTENT_CACHE_REVALIDATE_SECONDS`` para que la ruta caliente no toque el
+disco en cada petición.
+
+Las rutas de administración invalidan explícitamente las entradas que
+modifican; los demás workers detectan el cambio en la siguiente revalidación.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Carpetas de contenido soportadas (subcarpetas de templates/)
+CARPETA_ARTICULOS = 'articulos'
+CARPETA_CASOS = 'casos_clinicos'
+
+
+def _firma_archivo(ruta: Optional[str]) -> Optional[tuple]:
+    """Retorna (mtime_ns, size) del archivo o None si no existe."""
+    if not ruta:
+        return None
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ContentCache:
+    """
+    LRU thread-safe de contenido preparado, acotado por bytes totales.
+
+    Uso:
+        payload = content_cache.obtener(CARPETA_ARTICULOS, slug, ruta_html, ruta_css)
+        if payload is None:
+            ...  # el archivo HTML no existe
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, revalidate_seconds: float = 5.0):
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.enabled = True
+        self._entradas = OrderedDict()
+        self._bytes_totales = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Lee límites desde la configuración de la app."""
+        self.max_bytes = app.config.get('CONTENT_CACHE_MAX_BYTES', self.max_bytes)
+        self.revalidate_seconds = app.config.get('CONTENT_CACHE_REVALIDATE_SECONDS', self.revalidate_seconds)
+        self.enabled = app.config.get('CONTENT_CACHE_ENABLED', True)
+        self.clear()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def obtener(self, carpeta: str, slug: str, ruta_html: str, ruta_css: str = None) -> Optional[dict]:
+        """
+        Retorna el payload preparado del contenido o None si el HTML no existe.
+
+        Args:
+            carpeta: CARPETA_ARTICULOS o CARPETA_CASOS
+            slug: Slug del contenido (clave de caché junto a la carpeta)
+            ruta_html: Ruta absoluta al archivo HTML
+            ruta_css: Ruta absoluta al CSS específico (opcional)
+
+        Returns:
+            dict con 'html', 'tiene_css' y 'css_version'
+        """
+        clave = (carpeta, slug)
+        ahora = time.monotonic()
+
+        if self.enabled:
+            with self._lock:
+                entrada = self._entradas.get(clave)
+                if entrada is not None and entrada['ruta_html'] == ruta_html:
+                    if ahora - entrada['verificado'] < self.revalidate_seconds:
+                        self._entradas.move_to_end(clave)
+                        self.hits += 1
+                        return entrada['payload']
+
+            # Revalidar fuera del lock (stat de disco)
+            if entrada is not None and entrada['ruta_html'] == ruta_html:
+                if (_firma_archivo(ruta_html) == entrada['firma_html']
+                        and _firma_archivo(ruta_css) == entrada['firma_css']):
+                    with self._lock:
+                        entrada['verificado'] = ahora
+                        if clave in self._entradas:
+                            self._entradas.move_to_end(clave)
+                        self.hits += 1
+                    return entrada['payload']
+
+        with self._lock:
+            self.misses += 1
+
+        entrada = self._cargar(ruta_html, ruta_css, ahora)
+        if entrada is None:
+            self.invalidar(carpeta, slug)
+            return None
+
+        if self.enabled:
+            self._guardar(clave, entrada)
+        return entrada['payload']
+
+    def invalidar(self, carpeta: str, *slugs: str) -> None:
+        """Elimina de la caché las entradas de los slugs indicados."""
+        with self._lock:
+            for slug in slugs:
+                entrada = self._entradas.pop((carpeta, slug), None)
+                if entrada is not None:
+                    self._bytes_totales -= entrada['bytes']
+
+    def clear(self) -> None:
+        """Vacía la caché completa."""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes_totales = 0
+
+    def stats(self) -> dict:
+        """Estadísticas de uso para diagnóstico."""
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes_totales,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _cargar(self, ruta_html: str, ruta_css: Optional[str], ahora: float) -> Optional[dict]:
+        """Lee y prepara el contenido desde disco."""
+        firma_html = _firma_archivo(ruta_html)
+        if firma_html is None:
+            return None
+
+        try:
+            with open(ruta_html, 'r', encoding='utf-8') as f:
+                contenido_html = f.read()
+        except OSError as e:
+            logger.warning(f"No se pudo leer contenido {ruta_html}: {e.__class__.__name__}")
+            return None
+
+        firma_css = _firma_archivo(ruta_css)
+        tiene_css = firma_css is not None
+
+        return {
+            'ruta_html': ruta_html,
+            'firma_html': firma_html,
+            'firma_css': firma_css,
+            'verificado': ahora,
+            'bytes': firma_html[1],
+            'payload': {
+                'html': contenido_html,
+                'tiene_css': tiene_css,
+                # Cache-busting con timestamp de modificación (segundos)
+                'css_version': firma_css[0] // 1_000_000_000 if tiene_css else None,
+            },
+        }
+
+    def _guardar(self, clave: tuple, entrada: dict) -> None:
+        """Inserta la entrada y expulsa las menos usadas hasta respetar max_bytes."""
+        if entrada['bytes'] > self.max_bytes:
+            return
+
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes_totales -= anterior['bytes']
+
+            self._entradas[clave] = entrada
+            self._bytes_totales += entrada['bytes']
+
+            while self._bytes_totales > self.max_bytes and self._entradas:
+                _, expulsada = self._entradas.popitem(last=False)
+                self._bytes_totales -= expulsada['bytes']
+
+
+# Instancia por worker (se configura en register_extensions)
+content_cache = ContentCache()
@@ -0,0 +1,150 @@
+"""
+Usuario actual por petición (g.current_user).
+
+Context processor, decoradores y rutas necesitaban el mismo ``Usuario`` y
+cada uno lo consultaba por email. Aquí se resuelve una sola vez por petición,
+de forma perezosa, y se respalda con una caché de TTL corto entre peticiones
+indexada por email: en un acierto de caché la petición no consulta ``usuario``.
+
+La caché se invalida al cambiar datos que afectan al acceso
+(aprobación/revocación .edu y login OAuth) con ``invalidar_usuario``.
+
+Con la caché por proceso (CACHE_TYPE ``simple``) la invalidación solo llega
+al worker que atendió al administrador; los demás conservan su instantánea
+hasta el TTL. Por eso las instantáneas que conceden acceso .edu usan un TTL
+más corto (``CURRENT_USER_EDU_CACHE_SECONDS``): una revocación tarda como
+mucho eso en aplicarse en todos los workers.
+"""
+
+import logging
+from typing import Optional
+
+from flask import g, session, current_app, has_request_context
+from werkzeug.local import LocalProxy
+
+from app.extensions import cache
+
+logger = logging.getLogger(__name__)
+
+# Niveles de acceso académico (ver routes/main.py)
+TIPO_VISITANTE = 1
+TIPO_PERSONAL = 2
+TIPO_EDUCATIVO = 3
+TIPO_INSTITUCIONAL = 4
+
+DOMINIO_INSTITUCIONAL = '@ieproes.edu.sv'
+
+
+def _clave_cache(email: str) -> str:
+    return f'usuario_actual:{email}'
+
+
+class UsuarioActual:
+    """
+    Instantánea inmutable del usuario de la sesión y sus permisos.
+
+    No es una instancia ORM: para modificar relaciones use ``id`` con
+    ``db.session.get(Usuario, usuario.id)``.
+    """
+
+    __slots__ = ('email', 'id', 'nombre', 'acceso_edu', 'es_admin', 'es_ieproes', 'tipo')
+
+    def __init__(self, email: Optional[str] = None, datos: Optional[dict] = None, admin_email: str = ''):
+        datos = datos or {}
+        email_normalizado = (email or '').strip().lower()
+
+        self.email = email
+        self.id = datos.get('id')
+        self.nombre = datos.get('nombre')
+        self.es_admin = bool(email and admin_email and email_normalizado == admin_email.strip().lower())
+        self.es_ieproes = self.es_admin or (bool(email) and email_normalizado.endswith(DOMINIO_INSTITUCIONAL))
+        # Admin siempre tiene acceso educativo
+        self.acceso_edu = self.es_admin or bool(datos.get('acceso_edu'))
+        self.tipo = self._calcular_tipo(email_normalizado)
+
+    def _calcular_tipo(self, email_normalizado: str) -> int:
+        from app.utils.decorators import es_email_educativo
+
+        if not self.email:
+            return TIPO_VISITANTE
+        if self.es_ieproes:
+            return TIPO_INSTITUCIONAL
+        if self.acceso_edu or es_email_educativo(email_normalizado):
+            return TIPO_EDUCATIVO
+        return TIPO_PERSONAL
+
+    @property
+    def autenticado(self) -> bool:
+        return bool(self.email)
+
+    def __repr__(self):
+        return f'<UsuarioActual tipo={self.tipo} id={self.id}>'
+
+
+def _cargar_datos(email: str) -> dict:
+    """Datos mínimos del usuario desde caché o BD (una consulta en fallo de caché)."""
+    from app.models.usuario import Usuario
+    from app.extensions import db
+
+    datos = cache.get(_clave_cache(email))
+    if datos is not None:
+        return datos
+
+    fila = db.session.query(Usuario.id, Usuario.nombre, Usuario.acceso_edu).filter(
+        Usuario.email == email
+    ).first()
+    # También se cachea la ausencia ({'id': None}) para sesiones sin fila en BD
+    datos = {'id': fila[0], 'nombre': fila[1], 'acceso_edu': bool(fila[2])} if fila else {'id': None}
+    if datos.get('acceso_edu'):
+        timeout = current_app.config.get('CURRENT_USER_EDU_CACHE_SECONDS', 5)
+    else:
+        timeout = current_app.config.get('CURRENT_USER_CACHE_SECONDS', 60)
+    cache.set(_clave_cache(email), datos, timeout=timeout)
+    return datos
+
+
+def get_current_user() -> UsuarioActual:
+    """
+    Retorna el usuario de la petición actual, resolviéndolo como mucho una vez.
+
+    El resultado queda en ``g.current_user`` para el resto de la petición.
+    """
+    if not has_request_context():
+        return UsuarioActual()
+
+    usuario = g.get('current_user')
+    if usuario is not None:
+        return usuario
+
+    email = session.get('user_email')
+    admin_email = current_app.config.get('ADMIN_EMAIL', '')
+    if not email:
+        usuario = UsuarioActual(admin_email=admin_email)
+    else:
+        usuario = UsuarioActual(email, _cargar_datos(email), admin_email)
+
+    g.current_user = usuario
+    return usuario
+
+
+def invalidar_usuario(email: Optional[str]) -> None:
+    """Descarta la instantánea cacheada de un usuario (y la de esta petición) en este worker."""
+    if not email:
+        return
+    cache.delete(_clave_cache(email))
+    if has_request_context() and g.get('current_user') is not None and g.current_user.email == email:
+        g.pop('current_user', None)
+
+
+def invalidar_usuarios(emails) -> None:
+    """Como ``invalidar_usuario`` para varios correos, con un solo ``delete_many``."""
+    emails = {email for email in emails if email}
+    if not emails:
+        return
+    cache.delete_many(*(_clave_cache(email) for email in emails))
+    if has_request_context() and g.get('current_user') is not None and g.current_user.email in emails:
+        g.pop('current_user', None)
+
+
+# Proxy perezoso para rutas y decoradores: ``current_user.tipo``
+current_user = LocalProxy(get_current_user)
@@ -0,0 +1,214 @@
+"""
+Datos del panel de administración servidos bajo demanda.
+
+El render inicial de /admin solo necesita los contadores agregados, que se
+cachean (``contadores_dashboard``). Las tablas de artículos, fuentes, casos
+y usuarios se piden por JSON, paginadas, ordenables y filtrables
+(``listar_seccion``), cuando el panel las muestra.
+
+Los contadores comparten la generación de ``invalidar_totales()``: cualquier
+alta o baja desde el panel los invalida (en todos los workers solo con una
+caché compartida; con la caché por proceso, en el worker que la atendió);
+el resto (usuarios nuevos, visitas) se refresca por TTL.
+"""
+
+import logging
+from typing import Callable, NamedTuple
+
+from flask import current_app, url_for
+
+from app.extensions import cache
+from app.enums import LogEventType
+from app.models.articulo import Articulo
+from app.models.caso import CasoClinico
+from app.models.fuente import FuenteAcademica
+from app.models.usuario import Usuario
+from app.utils.category_registry import category_registry
+from app.utils.pagination import version_totales
+from app.utils.stats_rollup import total_eventos
+
+logger = logging.getLogger(__name__)
+
+ORDEN_DEFECTO = 'date-desc'
+
+
+# =============================================================================
+# CONTADORES
+# =============================================================================
+
+def contadores_dashboard() -> dict:
+    """Totales del panel (artículos, usuarios, visitas, fuentes, casos) desde caché."""
+    clave = f'admin:contadores:{version_totales()}'
+    contadores = cache.get(clave)
+    if contadores is not None:
+        return contadores
+
+    contadores = {
+        'articulos': Articulo.get_active().order_by(None).count(),
+        'fuentes': FuenteAcademica.get_active().order_by(None).count(),
+        'casos': CasoClinico.get_active().order_by(None).count(),
+        'usuarios': Usuario.query.count(),
+        'visitas': total_eventos(LogEventType.LECTURA),  # Rollup diario + eventos aún no acumulados
+    }
+    cache.set(clave, contadores, timeout=current_app.config.get('ADMIN_COUNTERS_CACHE_SECONDS', 120))
+    return contadores
+
+
+# =============================================================================
+# SECCIONES
+# =============================================================================
+
+def _fecha(valor) -> str:
+    return valor.strftime('%d/%m/%Y') if valor else ''
+
+
+def _serializar_articulo(art: Articulo) -> dict:
+    return {
+        'id': art.id,
+        'titulo': art.titulo,
+        'slug': art.slug,
+        'fecha': _fecha(art.fecha),
+        'url': url_for('main.ver_articulo', cat_slug=category_registry.actual().slug(art.categoria), slug=art.slug),
+        'url_editar': url_for('admin.admin_editar', id=art.id),
+        'url_eliminar': url_for('admin.admin_eliminar', id=art.id),
+    }
+
+
+def _serializar_fuente(fuente: FuenteAcademica) -> dict:
+    return {
+        'id': fuente.id,
+        'titulo': fuente.titulo,
+        'autor': fuente.autor,
+        'anio': fuente.anio,
+        'fuente_origen': fuente.fuente_origen,
+        'url_eliminar': url_for('admin.admin_eliminar_fuente', id=fuente.id),
+    }
+
+
+def _serializar_caso(caso: CasoClinico) -> dict:
+    return {
+        'id': caso.id,
+        'numero': caso.numero,
+        'titulo': caso.titulo,
+        'nivel': caso.nivel,
+        'nivel_color': caso.nivel_color,
+        'edad_paciente': caso.edad_paciente,
+        'url_eliminar': url_for('admin.admin_eliminar_caso', id=caso.id),
+    }
+
+
+def _serializar_usuario(usuario: Usuario) -> dict:
+    return {
+        'id': usuario.id,
+        'nombre': usuario.nombre,
+        'email': usuario.email,
+        'acceso_edu': bool(usuario.acceso_edu),
+        'url_aprobar': url_for('admin.admin_aprobar_edu', user_id=usuario.id),
+        'url_revocar': url_for('admin.admin_revocar_edu', user_id=usuario.id),
+    }
+
+
+class SeccionDashboard(NamedTuple):
+    """Cómo consultar, filtrar, ordenar y serializar una tabla del panel"""
+    query: Callable
+    busqueda: tuple  # Columnas para el filtro ?q=
+    ordenes: dict  # Valor de ?sort= -> cláusulas ORDER BY
+    serializar: Callable
+    contador: str  # Clave en contadores_dashboard()
+
+
+SECCIONES = {
+    'articulos': SeccionDashboard(
+        query=Articulo.get_active,
+        busqueda=(Articulo.titulo, Articulo.slug),
+        ordenes={
+            'date-desc': (Articulo.fecha.desc(), Articulo.id.desc()),
+            'date-asc': (Articulo.fecha.asc(), Articulo.id.asc()),
+            'alpha-asc': (Articulo.titulo.asc(), Articulo.id.asc()),
+            'alpha-desc': (Articulo.titulo.desc(), Articulo.id.desc()),
+        },
+        serializar=_serializar_articulo,
+        contador='articulos',
+    ),
+    'fuentes': SeccionDashboard(
+        query=FuenteAcademica.get_active,
+        busqueda=(FuenteAcademica.titulo, FuenteAcademica.autor),
+        ordenes={
+            'date-desc': (FuenteAcademica.fecha.desc(), FuenteAcademica.id.desc()),
+            'date-asc': (FuenteAcademica.fecha.asc(), FuenteAcademica.id.asc()),
+            'alpha-asc': (FuenteAcademica.titulo.asc(), FuenteAcademica.id.asc()),
+            'alpha-desc': (FuenteAcademica.titulo.desc(), FuenteAcademica.id.desc()),
+        },
+        serializar=_serializar_fuente,
+        contador='fuentes',
+    ),
+    'casos': SeccionDashboard(
+        query=CasoClinico.get_active,
+        busqueda=(CasoClinico.titulo, CasoClinico.numero),
+        ordenes={
+            'date-desc': (CasoClinico.fecha.desc(), CasoClinico.id.desc()),
+            'date-asc': (CasoClinico.fecha.asc(), CasoClinico.id.asc()),
+            'alpha-asc': (CasoClinico.titulo.asc(), CasoClinico.id.asc()),
+            'alpha-desc': (CasoClinico.titulo.desc(), CasoClinico.id.desc()),
+        },
+        serializar=_serializar_caso,
+        contador='casos',
+    ),
+    'usuarios': SeccionDashboard(
+        query=lambda: Usuario.query,
+        busqueda=(Usuario.email, Usuario.nombre),
+        ordenes={
+            'date-desc': (Usuario.fecha_registro.desc(), Usuario.id.desc()),
+            'date-asc': (Usuario.fecha_registro.asc(), Usuario.id.asc()),
+            'alpha-asc': (Usuario.email.asc(),),
+            'alpha-desc': (Usuario.email.desc(),),
+        },
+        serializar=_serializar_usuario,
+        contador='usuarios',
+    ),
+}
+
+
+def listar_seccion(nombre: str, busqueda: str = '', orden: str = ORDEN_DEFECTO,
+                   page: int = 1, per_page: int = 25) -> dict:
+    """
+    Página de una sección del panel lista para jsonify.
+
+    Sin filtro el total sale de los contadores cacheados (sin COUNT por página);
+    con filtro se cuenta sobre el subconjunto filtrado.
+
+    Raises:
+        KeyError: Si la sección no existe
+    """
+    seccion = SECCIONES[nombre]
+    max_per_page = current_app.config.get('ADMIN_PAGE_MAX', 100)
+    per_page = max(1, min(per_page, max_per_page))
+    page = max(1, page)
+
+    query = seccion.query()
+    busqueda = (busqueda or '').strip()[:100]
+    if busqueda:
+        condicion = seccion.busqueda[0].icontains(busqueda, autoescape=True)
+        for columna in seccion.busqueda[1:]:
+            condicion = condicion | columna.icontains(busqueda, autoescape=True)
+        query = query.filter(condicion)
+
+    if orden not in seccion.ordenes:
+        orden = ORDEN_DEFECTO
+    query = query.order_by(*seccion.ordenes[orden])
+
+    paginacion = query.paginate(page=page, per_page=per_page, error_out=False, count=bool(busqueda))
+    total = paginacion.total if busqueda else contadores_dashboard()[seccion.contador]
+    paginas = max(1, -(-total // per_page))
+
+    return {
+        'items': [seccion.serializar(item) for item in paginacion.items],
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': paginas,
+        'has_prev': page > 1,
+        'has_next': page < paginas,
+        'sort': orden,
+        'q': busqueda,
+    }
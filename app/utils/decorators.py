@@ -132,19 +132,13 @@ def edu_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         from flask import render_template
-        from app.models.usuario import Usuario
+        from app.utils.current_user import get_current_user
         
         if 'user_email' not in session:
             return redirect(url_for('auth.login'))
         
-        usuario = Usuario.query.filter_by(email=session['user_email']).first()
-        
-        # Admin siempre tiene acceso
-        admin_email = current_app.config.get('ADMIN_EMAIL', '')
-        if admin_email and session.get('user_email', '').strip().lower() == admin_email.strip().lower():
-            return f(*args, **kwargs)
-        
-        if not usuario or not usuario.acceso_edu:
+        # OPTIMIZACIÓN: Usuario de la petición (cacheado), admin incluido en acceso_edu
+        if not get_current_user().acceso_edu:
             return render_template('acceso_edu_requerido.html'), 403
         
         return f(*args, **kwargs)
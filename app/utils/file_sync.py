@@ -0,0 +1,197 @@
+"""
+Reconciliación entre la BD y los archivos HTML de contenido.
+
+En lugar de un ``os.path.exists`` por fila, se lista cada carpeta de
+``templates/`` una sola vez con ``os.scandir`` y se compara como conjuntos
+contra una consulta de solo columnas:
+
+- huérfanos: filas activas cuyo archivo ya no existe (se archivan con un
+  único ``UPDATE ... SET deleted_at`` y una sola entrada de auditoría)
+- sin registro: archivos ``.html`` que ninguna fila referencia
+
+Lo usan la sincronización del panel (/admin/sincronizar) y el diagnóstico
+de integridad de artículos. El diagnóstico usa el modo incremental: por
+carpeta se guarda la firma del directorio (mtime, que cambia al crear,
+borrar o renombrar archivos) y de la tabla (filas, id máximo y
+``updated_at`` máximo); si ninguna cambió se reutiliza el resultado
+anterior, y si solo cambió la tabla se reutiliza el listado de archivos.
+"""
+
+import os
+import logging
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func, update
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.models.articulo import Articulo
+from app.models.caso import CasoClinico
+from app.models.log import LogActividad
+from app.utils.content_cache import CARPETA_ARTICULOS, CARPETA_CASOS
+
+logger = logging.getLogger(__name__)
+
+# Modelos con archivo HTML en templates/<carpeta>/
+MODELOS_CON_ARCHIVO = (
+    (CARPETA_ARTICULOS, Articulo),
+    (CARPETA_CASOS, CasoClinico),
+)
+
+# Ids por sentencia UPDATE (límite de parámetros de SQLite)
+TAMANIO_LOTE_UPDATE = 500
+
+
+class Huerfano(NamedTuple):
+    """Fila activa sin archivo HTML (solo las columnas que muestra el panel)"""
+    id: int
+    titulo: str
+    slug: str
+    nombre_archivo: str
+    fecha: datetime
+
+
+class ResultadoCarpeta(NamedTuple):
+    """Diferencia entre una carpeta de templates/ y su tabla"""
+    carpeta: str
+    modelo: type
+    activos: int
+    archivos: int
+    huerfanos: list  # [Huerfano]
+    sin_registro: list  # Nombres de archivo ordenados
+    verificacion: str = 'completa'  # 'completa' | 'solo BD' | 'sin cambios' (modo incremental)
+
+
+class _EstadoIncremental(NamedTuple):
+    firma_carpeta: Optional[int]
+    firma_tabla: tuple
+    archivos: set
+    resultado: ResultadoCarpeta
+
+
+# Último resultado por (base_dir, carpeta) para el modo incremental (por worker)
+_estado_incremental = {}
+
+
+def listar_archivos_html(ruta_carpeta: str) -> set:
+    """Nombres de los .html de la carpeta con un único scandir (vacío si no existe)."""
+    try:
+        with os.scandir(ruta_carpeta) as entradas:
+            return {e.name for e in entradas if e.name.endswith('.html') and e.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
+def _firma_carpeta(ruta_carpeta: str) -> Optional[int]:
+    try:
+        return os.stat(ruta_carpeta).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _firma_tabla(modelo) -> tuple:
+    return tuple(db.session.query(
+        func.count(modelo.id), func.max(modelo.id), func.max(modelo.updated_at)
+    ).one())
+
+
+def reconciliar_carpeta(carpeta: str, modelo, base_dir: str, incremental: bool = False) -> ResultadoCarpeta:
+    """Compara templates/<carpeta> con las filas de ``modelo``."""
+    ruta_carpeta = os.path.join(base_dir, 'templates', carpeta)
+
+    if incremental:
+        # Firmas antes de leer: un cambio concurrente se detecta en la siguiente pasada
+        firma_carpeta = _firma_carpeta(ruta_carpeta)
+        firma_tabla = _firma_tabla(modelo)
+        previo = _estado_incremental.get((base_dir, carpeta))
+        if previo is not None and previo.firma_carpeta == firma_carpeta:
+            if previo.firma_tabla == firma_tabla:
+                return previo.resultado._replace(verificacion='sin cambios')
+            archivos = previo.archivos
+        else:
+            archivos = listar_archivos_html(ruta_carpeta)
+    else:
+        archivos = listar_archivos_html(ruta_carpeta)
+
+    filas = db.session.query(
+        modelo.id, modelo.titulo, modelo.slug, modelo.nombre_archivo, modelo.fecha, modelo.deleted_at
+    ).order_by(modelo.id).all()
+
+    referenciados = set()
+    huerfanos = []
+    activos = 0
+    for id_, titulo, slug, nombre_archivo, fecha, deleted_at in filas:
+        referenciados.add(nombre_archivo)
+        if deleted_at is None:
+            activos += 1
+            if nombre_archivo not in archivos:
+                huerfanos.append(Huerfano(id_, titulo, slug, nombre_archivo, fecha))
+
+    resultado = ResultadoCarpeta(
+        carpeta=carpeta,
+        modelo=modelo,
+        activos=activos,
+        archivos=len(archivos),
+        huerfanos=huerfanos,
+        sin_registro=sorted(archivos - referenciados),
+    )
+    if incremental:
+        if previo is not None and previo.firma_carpeta == firma_carpeta:
+            resultado = resultado._replace(verificacion='solo BD')
+        _estado_incremental[(base_dir, carpeta)] = _EstadoIncremental(firma_carpeta, firma_tabla, archivos, resultado)
+    return resultado
+
+
+def reconciliar(base_dir: str, incremental: bool = False) -> dict:
+    """
+    Reconcilia todas las carpetas de contenido. Retorna {carpeta: ResultadoCarpeta}.
+
+    Con ``incremental`` solo se vuelve a listar/consultar lo que cambió
+    desde la última llamada incremental de este worker.
+    """
+    return {
+        carpeta: reconciliar_carpeta(carpeta, modelo, base_dir, incremental)
+        for carpeta, modelo in MODELOS_CON_ARCHIVO
+    }
+
+
+def archivar_huerfanos(resultados: dict) -> dict:
+    """
+    Soft delete en bloque de los huérfanos detectados por ``reconciliar``.
+
+    Un UPDATE por tabla (en lotes de ids) y una sola entrada de auditoría con
+    el resumen. Solo afecta a filas que siguen activas.
+
+    NOTA LOG-001: No hace commit; la capa de rutas es responsable.
+
+    Returns:
+        {carpeta: filas archivadas}
+    """
+    ahora = datetime.now(timezone.utc)
+    archivados = {}
+
+    for carpeta, resultado in resultados.items():
+        ids = [h.id for h in resultado.huerfanos]
+        total = 0
+        for i in range(0, len(ids), TAMANIO_LOTE_UPDATE):
+            sentencia = (
+                update(resultado.modelo)
+                .where(resultado.modelo.id.in_(ids[i:i + TAMANIO_LOTE_UPDATE]),
+                       resultado.modelo.deleted_at.is_(None))
+                .values(deleted_at=ahora)
+                .execution_options(synchronize_session=False)
+            )
+            total += db.session.execute(sentencia).rowcount
+        archivados[carpeta] = total
+
+    total = sum(archivados.values())
+    if total:
+        desglose = ', '.join(f'{carpeta}: {n}' for carpeta, n in archivados.items() if n)
+        db.session.add(LogActividad(
+            tipo_evento=LogEventType.ADMIN,
+            detalle=f"Sincronización: {total} archivados ({desglose})"
+        ))
+        logger.info(f"Sincronización: {total} archivados ({desglose})")
+
+    return archivados
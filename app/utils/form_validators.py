@@ -13,8 +13,7 @@ from werkzeug.datastructures import FileStorage
 from app.constants import (
     MAX_FIELD_LENGTHS,
     ALLOWED_MIME_TYPES,
-    ALLOWED_EXTENSIONS,
-    LISTA_CATEGORIAS
+    ALLOWED_EXTENSIONS
 )
 from app.utils.validators import validar_url_segura, validar_longitud, validar_slug
 
@@ -148,10 +147,9 @@ def validar_formulario_articulo(form_data: Dict[str, str]) -> List[str]:
     # Validar categoría usando método centralizado (REMEDIACIÓN: elimina duplicación)
     categoria = form_data.get('categoria', '').strip()
     if categoria:
-        from app.models.categoria import Categoria
-        categorias_validas = Categoria.get_nombres_con_fallback()
+        from app.utils.category_registry import category_registry
         
-        if categoria not in categorias_validas:
+        if not category_registry.actual().es_valida(categoria):
             errores.append("Error: La categoría seleccionada no es válida.")
     
     return errores
@@ -165,5 +163,5 @@ def obtener_categorias_validas() -> List[str]:
     Returns:
         Lista de nombres de categorías válidas
     """
-    from app.models.categoria import Categoria
-    return Categoria.get_nombres_con_fallback()
+    from app.utils.category_registry import category_registry
+    return list(category_registry.actual().nombres)
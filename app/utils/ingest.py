@@ -0,0 +1,97 @@
+"""
+Etapa de ingesta de contenido HTML.
+
+Se ejecuta una sola vez, justo después de ``limpiar_html_google``, y calcula
+las métricas que antes se recalculaban en cada lectura: número de palabras,
+tiempo de lectura, índice de encabezados (TOC) y extracto en texto plano.
+Los resultados se persisten en columnas de Articulo/CasoClinico.
+"""
+
+import json
+import logging
+
+from bs4 import BeautifulSoup
+
+from app.constants import READING_SPEED_WPM, DEFAULT_READING_TIME_MINUTES
+
+logger = logging.getLogger(__name__)
+
+# Encabezados que forman parte del índice
+NIVELES_INDICE = ('h1', 'h2', 'h3', 'h4')
+
+# Longitud máxima del extracto en texto plano
+MAX_EXTRACTO_LENGTH = 300
+
+
+def _recortar_extracto(texto: str, max_length: int = MAX_EXTRACTO_LENGTH) -> str:
+    """Recorta el texto en el último límite de palabra antes de max_length."""
+    if len(texto) <= max_length:
+        return texto
+    recorte = texto[:max_length - 1].rsplit(' ', 1)[0]
+    return recorte.rstrip(' ,.;:') + '…'
+
+
+def analizar_html(contenido_html: str) -> dict:
+    """
+    Calcula métricas de lectura de un HTML ya sanitizado.
+
+    Args:
+        contenido_html: HTML limpio (salida de limpiar_html_google)
+
+    Returns:
+        dict con 'num_palabras', 'tiempo_lectura', 'indice' (lista de
+        {'nivel', 'texto'}), 'extracto' y 'texto' (texto plano completo,
+        usado por el índice de búsqueda)
+    """
+    if not contenido_html:
+        return {
+            'num_palabras': 0,
+            'tiempo_lectura': DEFAULT_READING_TIME_MINUTES,
+            'indice': [],
+            'extracto': '',
+            'texto': '',
+        }
+
+    soup = BeautifulSoup(contenido_html, 'html.parser')
+
+    indice = []
+    for encabezado in soup.find_all(NIVELES_INDICE):
+        texto = ' '.join(encabezado.get_text(separator=' ').split())
+        if texto:
+            indice.append({'nivel': int(encabezado.name[1]), 'texto': texto})
+
+    palabras = soup.get_text(separator=' ').split()
+    num_palabras = len(palabras)
+    texto_plano = ' '.join(palabras)
+
+    return {
+        'num_palabras': num_palabras,
+        'tiempo_lectura': max(1, round(num_palabras / READING_SPEED_WPM)),
+        'indice': indice,
+        'extracto': _recortar_extracto(texto_plano),
+        'texto': texto_plano,
+    }
+
+
+def aplicar_metricas(modelo, metricas: dict) -> None:
+    """
+    Copia las métricas calculadas a un Articulo o CasoClinico (sin commit).
+
+    Args:
+        modelo: Instancia con columnas num_palabras/tiempo_lectura/indice_json/extracto
+        metricas: Resultado de analizar_html()
+    """
+    modelo.num_palabras = metricas['num_palabras']
+    modelo.tiempo_lectura = metricas['tiempo_lectura']
+    modelo.indice_json = json.dumps(metricas['indice'], ensure_ascii=False)
+    modelo.extracto = metricas['extracto']
+
+
+def valores_metricas(metricas: dict) -> dict:
+    """Métricas en formato de columnas para UPDATE masivos."""
+    return {
+        'num_palabras': metricas['num_palabras'],
+        'tiempo_lectura': metricas['tiempo_lectura'],
+        'indice_json': json.dumps(metricas['indice'], ensure_ascii=False),
+        'extracto': metricas['extracto'],
+    }
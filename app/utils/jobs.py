@@ -0,0 +1,417 @@
+"""
+Trabajos en segundo plano para operaciones pesadas de administración.
+
+Sincronización, importación masiva, reindexado de búsqueda, regeneración del
+sitemap y verificación de integridad no deben ocupar un worker de gunicorn
+(timeout de 120s). El panel las encola (``encolar``) en la tabla ``trabajo``
+y responde con el id; ``flask jobs worker`` las ejecuta en hilos propios y
+el panel consulta el progreso en /admin/jobs/<id>.
+
+Garantías:
+    - Bloqueo: un trabajo se reclama con un UPDATE condicional
+      (``reclamar``); si dos workers compiten, solo a uno le afecta la fila.
+      El bloqueo es un plazo (JOBS_LEASE_SECONDS) que se renueva en cada
+      ``progreso``/``log``; si el worker muere, otro lo retoma al vencer.
+    - Idempotencia: ``clave`` deduplica trabajos pendientes o en curso, y
+      las tareas registradas pueden repetirse sin efectos dobles (la
+      importación reanuda desde su checkpoint, el resto recalcula).
+
+Uso:
+    trabajo = encolar('sincronizar')
+    # ...en otro proceso: flask jobs worker
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import traceback
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import update, or_, and_
+
+from app.extensions import db
+from app.enums import JobStatus
+from app.models.trabajo import Trabajo
+
+logger = logging.getLogger(__name__)
+
+# Tipo de trabajo -> función(contexto) -> resultado serializable a JSON
+TAREAS: dict = {}
+
+
+class TrabajoPerdido(Exception):
+    """El bloqueo del trabajo venció y otro worker lo reclamó."""
+    pass
+
+
+def tarea(tipo: str) -> Callable:
+    """Decorador que registra una función como tipo de trabajo."""
+    def registrar(funcion):
+        TAREAS[tipo] = funcion
+        return funcion
+    return registrar
+
+
+def _ahora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _plazo() -> datetime:
+    return _ahora() + timedelta(seconds=current_app.config.get('JOBS_LEASE_SECONDS', 300))
+
+
+# =============================================================================
+# COLA
+# =============================================================================
+
+# Tareas cuyo único efecto es llenar la caché: desde el proceso del worker
+# solo sirven si la caché es compartida con Gunicorn (Redis, Memcached...)
+TAREAS_CACHE_COMPARTIDA = {'regenerar_sitemap'}
+CACHES_POR_PROCESO = {'simple', 'simplecache', 'null', 'nullcache'}
+
+
+def cache_compartida() -> bool:
+    """True si CACHE_TYPE es visible desde otros procesos."""
+    tipo = str(current_app.config.get('CACHE_TYPE') or 'null').rsplit('.', 1)[-1].lower()
+    return tipo not in CACHES_POR_PROCESO
+
+
+def encolar(tipo: str, parametros: Optional[dict] = None, clave: Optional[str] = None) -> Trabajo:
+    """
+    Encola un trabajo (con commit) y lo retorna.
+
+    Si ``clave`` coincide con un trabajo pendiente o en curso, retorna ese
+    en lugar de crear otro.
+
+    Raises:
+        ValueError: Si el tipo no está registrado o necesita una caché compartida que no hay
+    """
+    if tipo not in TAREAS:
+        raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+    if tipo in TAREAS_CACHE_COMPARTIDA and not cache_compartida():
+        raise ValueError(f"{tipo} requiere una caché compartida (CACHE_TYPE={current_app.config.get('CACHE_TYPE')})")
+
+    if clave:
+        existente = Trabajo.query.filter(
+            Trabajo.clave == clave,
+            Trabajo.estado.in_((JobStatus.PENDING.value, JobStatus.RUNNING.value))
+        ).order_by(Trabajo.id).first()
+        if existente is not None:
+            return existente
+
+    trabajo = Trabajo(
+        tipo=tipo,
+        clave=clave,
+        estado=JobStatus.PENDING.value,
+        parametros_json=json.dumps(parametros or {}),
+    )
+    db.session.add(trabajo)
+    db.session.commit()
+    logger.info(f"Trabajo encolado: #{trabajo.id} {tipo}")
+    return trabajo
+
+
+def reclamar(worker: str) -> Optional[int]:
+    """
+    Toma el siguiente trabajo disponible para ``worker``.
+
+    Disponibles: pendientes, o en curso con el plazo vencido (worker caído)
+    y menos de JOBS_MAX_INTENTOS intentos. Los vencidos que agotaron los
+    intentos se marcan como fallidos.
+
+    Returns:
+        Id del trabajo reclamado o None
+    """
+    ahora = _ahora()
+    max_intentos = current_app.config.get('JOBS_MAX_INTENTOS', 3)
+    vencido = and_(Trabajo.estado == JobStatus.RUNNING.value, Trabajo.bloqueado_hasta < ahora)
+
+    db.session.execute(
+        update(Trabajo)
+        .where(vencido, Trabajo.intentos >= max_intentos)
+        .values(estado=JobStatus.FAILED.value, error='Plazo de bloqueo vencido tras agotar los intentos',
+                finalizado_en=ahora, worker=None, bloqueado_hasta=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    disponible = or_(Trabajo.estado == JobStatus.PENDING.value, and_(vencido, Trabajo.intentos < max_intentos))
+    candidatos = db.session.query(Trabajo.id).filter(disponible).order_by(Trabajo.id).limit(10).all()
+
+    for (trabajo_id,) in candidatos:
+        # UPDATE condicional: solo un worker ve rowcount == 1
+        resultado = db.session.execute(
+            update(Trabajo)
+            .where(Trabajo.id == trabajo_id, disponible)
+            .values(estado=JobStatus.RUNNING.value, worker=worker, bloqueado_hasta=_plazo(),
+                    iniciado_en=ahora, intentos=Trabajo.intentos + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if resultado.rowcount == 1:
+            return trabajo_id
+    return None
+
+
+class ContextoTrabajo:
+    """
+    Lo que recibe cada tarea: parámetros y canal de progreso/log.
+
+    ``progreso`` y ``log`` hacen commit de la sesión (igual que los
+    checkpoints por lote de las tareas largas) y renuevan el bloqueo.
+    """
+
+    def __init__(self, trabajo_id: int, worker: str, parametros: dict):
+        self.trabajo_id = trabajo_id
+        self.worker = worker
+        self.parametros = parametros
+        self._lineas = []
+        self._max_lineas = current_app.config.get('JOBS_LOG_LINEAS', 200)
+
+    def _guardar(self, **valores) -> None:
+        resultado = db.session.execute(
+            update(Trabajo)
+            .where(Trabajo.id == self.trabajo_id, Trabajo.worker == self.worker,
+                   Trabajo.estado == JobStatus.RUNNING.value)
+            .values(bloqueado_hasta=_plazo(), **valores)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if resultado.rowcount != 1:
+            raise TrabajoPerdido(f"Trabajo #{self.trabajo_id} ya no pertenece a {self.worker}")
+
+    def progreso(self, porcentaje: float, mensaje: Optional[str] = None) -> None:
+        """Actualiza el progreso (0-100) y el mensaje visible en el panel."""
+        valores = {'progreso': max(0, min(100, int(porcentaje)))}
+        if mensaje is not None:
+            valores['mensaje'] = mensaje[:255]
+        self._guardar(**valores)
+
+    def log(self, linea: str) -> None:
+        """Añade una línea al log del trabajo (se conservan las últimas JOBS_LOG_LINEAS)."""
+        self._lineas.append(f"{_ahora():%H:%M:%S} {linea}")
+        del self._lineas[:-self._max_lineas]
+        self._guardar(log='\n'.join(self._lineas))
+
+
+def ejecutar_trabajo(trabajo_id: int, worker: str) -> Optional[str]:
+    """
+    Ejecuta un trabajo ya reclamado por ``worker`` y registra el resultado.
+
+    Returns:
+        Estado final, o None si se perdió el bloqueo
+    """
+    trabajo = db.session.get(Trabajo, trabajo_id)
+    funcion = TAREAS.get(trabajo.tipo)
+    contexto = ContextoTrabajo(trabajo_id, worker, trabajo.get_parametros())
+    valores = {'worker': None, 'bloqueado_hasta': None}
+
+    inicio = time.perf_counter()
+    try:
+        if funcion is None:
+            raise ValueError(f"Tipo de trabajo desconocido: {trabajo.tipo}")
+        resultado = funcion(contexto)
+        valores.update(estado=JobStatus.DONE.value, progreso=100,
+                       resultado_json=json.dumps(resultado, default=str))
+        logger.info(f"Trabajo #{trabajo_id} {trabajo.tipo} completado en {time.perf_counter() - inicio:.1f}s")
+    except TrabajoPerdido as e:
+        db.session.rollback()
+        logger.warning(str(e))
+        return None
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Trabajo #{trabajo_id} {trabajo.tipo} falló: {e}", exc_info=True)
+        valores.update(estado=JobStatus.FAILED.value,
+                       error=''.join(traceback.format_exception_only(type(e), e)).strip()[:2000])
+
+    valores['finalizado_en'] = _ahora()
+    db.session.execute(
+        update(Trabajo)
+        .where(Trabajo.id == trabajo_id, Trabajo.worker == worker)
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return valores['estado']
+
+
+def procesar_pendientes(worker: str, limite: Optional[int] = None) -> int:
+    """Reclama y ejecuta trabajos hasta vaciar la cola (o ``limite``). Retorna cuántos ejecutó."""
+    ejecutados = 0
+    while limite is None or ejecutados < limite:
+        trabajo_id = reclamar(worker)
+        if trabajo_id is None:
+            break
+        ejecutar_trabajo(trabajo_id, worker)
+        db.session.expire_all()
+        ejecutados += 1
+    return ejecutados
+
+
+def nombre_worker(indice: int = 0) -> str:
+    """Identificador único por host/proceso/hilo (se guarda en Trabajo.worker)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{indice}"[:100]
+
+
+def ejecutar_worker(app, hilos: int = 2, intervalo: float = 2.0,
+                    detener: Optional[threading.Event] = None) -> None:
+    """
+    Bucle del worker: ``hilos`` hilos sondean la cola cada ``intervalo`` segundos.
+
+    Bloquea hasta que ``detener`` se activa (Ctrl+C en ``flask jobs worker``).
+    """
+    detener = detener or threading.Event()
+
+    def bucle(indice):
+        worker = nombre_worker(indice)
+        while not detener.is_set():
+            with app.app_context():
+                try:
+                    ejecutados = procesar_pendientes(worker)
+                except Exception as e:
+                    logger.error(f"Worker {worker}: error consultando la cola: {e}", exc_info=True)
+                    db.session.rollback()
+                    ejecutados = 0
+                finally:
+                    db.session.remove()
+            if not ejecutados:
+                detener.wait(intervalo)
+
+    threads = [threading.Thread(target=bucle, args=(i,), name=f'jobs-worker-{i}', daemon=True)
+               for i in range(max(1, hilos))]
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=0.5)
+    except KeyboardInterrupt:
+        detener.set()
+        for t in threads:
+            t.join()
+
+
+# =============================================================================
+# TAREAS
+# =============================================================================
+
+@tarea('sincronizar')
+def _tarea_sincronizar(ctx: ContextoTrabajo) -> dict:
+    """Archiva artículos/casos sin archivo HTML (app/utils/file_sync.py)."""
+    from app.config import BASE_DIR
+    from app.utils.file_sync import reconciliar, archivar_huerfanos
+    from app.utils.pagination import invalidar_totales
+    from app.utils.search import invalidar_busqueda
+    from app.utils.tags import invalidar_conteos_tags
+
+    ctx.progreso(10, 'Listando archivos')
+    resultados = reconciliar(BASE_DIR)
+    archivados = archivar_huerfanos(resultados)
+    db.session.commit()
+    if any(archivados.values()):
+        invalidar_conteos_tags()
+        invalidar_totales()
+        invalidar_busqueda()
+    ctx.log(f"Archivados: {archivados}")
+    return {
+        'archivados': archivados,
+        'sin_registro': {carpeta: r.sin_registro for carpeta, r in resultados.items()},
+    }
+
+
+@tarea('diagnostico_integridad')
+def _tarea_diagnostico_integridad(ctx: ContextoTrabajo) -> dict:
+    """Verificación de integridad de artículos y casos."""
+    from app.routes.diagnostics import check_articles_integrity
+
+    return check_articles_integrity()
+
+
+@tarea('reindexar_busqueda')
+def _tarea_reindexar_busqueda(ctx: ContextoTrabajo) -> dict:
+    """Reconstruye el índice de búsqueda (app/utils/search.py)."""
+    from app.config import BASE_DIR
+    from app.utils.search import reindexar_articulos
+
+    def reportar(indexados, total, ultimo_id):
+        ctx.progreso(100 * indexados / max(total, 1), f'{indexados}/{total} artículos indexados')
+
+    indexados, faltantes = reindexar_articulos(BASE_DIR, ctx.parametros.get('batch_size', 500), reportar)
+    return {'indexados': indexados, 'sin_archivo': faltantes}
+
+
+@tarea('archivar_logs')
+def _tarea_archivar_logs(ctx: ContextoTrabajo) -> dict:
+    """Archiva log_actividad anterior a la retención (app/utils/log_archive.py)."""
+    from app.utils.log_archive import archivar_logs
+
+    def reportar(archivadas):
+        ctx.log(f'{archivadas} eventos archivados')
+
+    return archivar_logs(dias=ctx.parametros.get('dias'), reportar=reportar)
+
+
+@tarea('acumular_estadisticas')
+def _tarea_acumular_estadisticas(ctx: ContextoTrabajo) -> dict:
+    """Rollup incremental de log_actividad (app/utils/stats_rollup.py)."""
+    from app.utils.stats_rollup import acumular_estadisticas
+
+    def reportar(eventos, marca):
+        ctx.log(f'{eventos} eventos acumulados (marca {marca})')
+
+    return acumular_estadisticas(reportar=reportar)
+
+
+@tarea('regenerar_sitemap')
+def _tarea_regenerar_sitemap(ctx: ContextoTrabajo) -> dict:
+    """
+    Genera y cachea todas las partes del sitemap (app/utils/sitemap.py).
+
+    Solo se encola con una caché compartida (CACHE_TYPE redis): con la caché
+    por proceso el resultado quedaría en el worker de trabajos, donde ninguna
+    petición lo lee.
+    """
+    from app.utils.sitemap import estado_sitemap, numero_de_partes, sitemap_gz
+
+    estado = estado_sitemap()
+    partes = numero_de_partes(estado)
+    sitemap_gz(estado)
+    if partes > 1:
+        for numero in range(1, partes + 1):
+            sitemap_gz(estado, numero)
+            ctx.progreso(100 * numero / partes, f'Parte {numero}/{partes}')
+    return {'partes': partes, 'articulos': estado.total_articulos, 'huella': estado.huella}
+
+
+@tarea('importar')
+def _tarea_importar(ctx: ContextoTrabajo) -> dict:
+    """
+    Importación masiva (app/utils/bulk_import.py).
+
+    Reanuda desde el checkpoint si el trabajo se reintenta.
+    """
+    from app.config import BASE_DIR
+    from app.utils.bulk_import import importar_articulos
+
+    parametros = ctx.parametros
+
+    def reportar(lote):
+        ctx.progreso(100 * lote.procesadas / max(lote.total, 1),
+                     f'Lote {lote.numero}: {lote.procesadas}/{lote.total} filas')
+        ctx.log(f'Lote {lote.numero}: {lote.importados} importados, {lote.omitidos} omitidos, '
+                f'{lote.errores} errores ({lote.por_segundo:.0f} filas/s)')
+
+    resultado = importar_articulos(
+        parametros['fuente'], BASE_DIR,
+        manifiesto=parametros.get('manifiesto'),
+        batch_size=parametros.get('batch_size', 1000),
+        workers=parametros.get('workers'),
+        reportar=reportar,
+    )
+    resultado['errores'] = resultado['errores'][:100]
+    return resultado
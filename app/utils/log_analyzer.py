@@ -0,0 +1,297 @@
+"""
+Análisis en streaming de los logs de peticiones (logs/app.log y rotados).
+
+``after_request_logging`` escribe una línea por petición::
+
+    2026-10-16 12:00:01,234 [INFO] request: [a1b2c3d4] GET /categoria/fisica/x - Status: 200 - Tiempo: 12.3ms
+
+o su equivalente JSON en producción (``crear_formateador_json``), con la
+fecha en ``timestamp`` detrás del mensaje y los campos ``extra``::
+
+    {"name": "request", "message": "[a1b2c3d4] GET ...", "status": 200, ..., "timestamp": "2026-10-16 12:00:01,234"}
+
+Este módulo recorre el log actual y los rotados (``app.log.N`` y
+``app.log.N.gz``) del más antiguo al más reciente sin cargarlos en memoria:
+los archivos planos se leen por mmap y los comprimidos por bloques.
+
+Las latencias se acumulan en histogramas logarítmicos por ruta (error
+relativo acotado por ``RESOLUCION``), así que p50/p95/p99 cuestan memoria
+O(rutas × cubetas) y no O(peticiones). Las rutas se agrupan por regla
+(``/categoria/<cat_slug>/<slug>``) para que los slugs no disparen la cardinalidad.
+"""
+
+import os
+import re
+import gzip
+import json
+import math
+import mmap
+import glob
+from collections import Counter
+from typing import Callable, Iterator, Optional
+
+# Ancho relativo de cada cubeta del histograma (p. ej. 1.02 → ±2%)
+RESOLUCION = 1.02
+LATENCIA_MINIMA_MS = 0.01
+TAMANIO_BLOQUE = 1024 * 1024
+PERCENTILES = (50, 95, 99)
+SIN_RUTA = '<sin ruta>'
+
+# Marcador barato para descartar sin regex las líneas que no son de peticiones
+_MARCADOR = b' - Status: '
+_FECHA = rb'(?P<fecha>\d{4}-\d\d-\d\d[ T]\d\d:\d\d)'
+_PETICION = rb'\[[^\]\s]*\] (?P<metodo>[A-Z]+) (?P<ruta>\S+) - Status: (?P<estado>\d{3}) - Tiempo: (?P<ms>[\d.]+)ms'
+_RE_PETICION = re.compile(_FECHA + rb'.*?' + _PETICION)  # Línea de texto: timestamp al principio
+_RE_FECHA = re.compile(_FECHA)
+_RE_MENSAJE = re.compile(_PETICION)
+
+
+class HistogramaLatencia:
+    """Histograma logarítmico de latencias con percentiles aproximados."""
+
+    __slots__ = ('cubetas', 'total', 'suma', 'maximo')
+
+    def __init__(self):
+        self.cubetas = Counter()
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def agregar(self, ms: float) -> None:
+        indice = int(math.log(max(ms, LATENCIA_MINIMA_MS) / LATENCIA_MINIMA_MS, RESOLUCION))
+        self.cubetas[indice] += 1
+        self.total += 1
+        self.suma += ms
+        if ms > self.maximo:
+            self.maximo = ms
+
+    def percentil(self, p: float) -> float:
+        """Latencia (ms) por debajo de la cual queda el p% de las peticiones."""
+        if not self.total:
+            return 0.0
+        objetivo = math.ceil(self.total * p / 100)
+        acumulado = 0
+        for indice in sorted(self.cubetas):
+            acumulado += self.cubetas[indice]
+            if acumulado >= objetivo:
+                # Punto medio geométrico de la cubeta, sin superar el máximo observado
+                return min(LATENCIA_MINIMA_MS * RESOLUCION ** (indice + 0.5), self.maximo)
+        return self.maximo
+
+
+class EstadisticasRuta:
+    __slots__ = ('latencias', 'estados')
+
+    def __init__(self):
+        self.latencias = HistogramaLatencia()
+        self.estados = Counter()
+
+    def a_dict(self) -> dict:
+        datos = {'peticiones': self.latencias.total}
+        for p in PERCENTILES:
+            datos[f'p{p}_ms'] = round(self.latencias.percentil(p), 2)
+        datos['media_ms'] = round(self.latencias.suma / max(self.latencias.total, 1), 2)
+        datos['max_ms'] = round(self.latencias.maximo, 2)
+        datos['estados'] = {str(estado): n for estado, n in sorted(self.estados.items())}
+        return datos
+
+
+# =============================================================================
+# LECTURA
+# =============================================================================
+
+def archivos_de_log(log_dir: str, nombre: str = 'app.log', incluir_rotados: bool = True) -> list:
+    """Log actual y rotados, del más antiguo (app.log.N) al más reciente (app.log)."""
+    rotados = []
+    if incluir_rotados:
+        for ruta in glob.glob(os.path.join(log_dir, glob.escape(nombre) + '.*')):
+            sufijo = os.path.basename(ruta)[len(nombre) + 1:]
+            numero = sufijo[:-3] if sufijo.endswith('.gz') else sufijo
+            if numero.isdigit():
+                rotados.append((int(numero), ruta))
+    rutas = [ruta for _, ruta in sorted(rotados, reverse=True)]
+    actual = os.path.join(log_dir, nombre)
+    if os.path.exists(actual):
+        rutas.append(actual)
+    return rutas
+
+
+def _lineas_mmap(ruta: str) -> Iterator[bytes]:
+    with open(ruta, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            inicio = 0
+            fin_archivo = len(datos)
+            while inicio < fin_archivo:
+                fin = datos.find(b'\n', inicio)
+                if fin == -1:
+                    fin = fin_archivo
+                yield datos[inicio:fin]
+                inicio = fin + 1
+
+
+def _lineas_bloques(archivo) -> Iterator[bytes]:
+    resto = b''
+    while True:
+        bloque = archivo.read(TAMANIO_BLOQUE)
+        if not bloque:
+            break
+        lineas = (resto + bloque).split(b'\n')
+        resto = lineas.pop()
+        yield from lineas
+    if resto:
+        yield resto
+
+
+def iterar_lineas(ruta: str) -> Iterator[bytes]:
+    """Líneas (bytes) de un log plano (mmap) o comprimido con gzip (por bloques)."""
+    if ruta.endswith('.gz'):
+        with gzip.open(ruta, 'rb') as f:
+            yield from _lineas_bloques(f)
+    else:
+        yield from _lineas_mmap(ruta)
+
+
+def _decodificar_ruta(ruta: bytes) -> str:
+    texto = ruta.decode('utf-8', errors='replace')
+    if '\\' in texto:  # Escapes JSON (\u00e9, \/)
+        try:
+            texto = json.loads(f'"{texto}"')
+        except ValueError:
+            pass
+    return texto
+
+
+def _peticion(linea: bytes):
+    """(minuto, coincidencia con método/ruta/estado/ms) de una línea de petición, o None."""
+    if not linea.lstrip().startswith(b'{'):
+        coincidencia = _RE_PETICION.search(linea)
+        return (coincidencia.group('fecha'), coincidencia) if coincidencia else None
+
+    # JSON: el orden de las claves no está garantizado (timestamp va detrás del mensaje)
+    try:
+        registro = json.loads(linea)
+    except ValueError:
+        return None
+    mensaje, fecha = registro.get('message'), registro.get('timestamp')
+    if not isinstance(mensaje, str) or not isinstance(fecha, str):
+        return None
+    coincidencia = _RE_MENSAJE.search(mensaje.encode('utf-8'))
+    minuto = _RE_FECHA.match(fecha.encode('ascii', errors='replace'))
+    if coincidencia is None or minuto is None:
+        return None
+    return minuto.group('fecha'), coincidencia
+
+
+def normalizador_por_defecto(metodo: str, ruta: str) -> str:
+    """Agrupa segmentos numéricos (/admin/jobs/12 → /admin/jobs/<n>)."""
+    return re.sub(r'/\d+(?=/|$)', '/<n>', ruta)
+
+
+# =============================================================================
+# ANÁLISIS
+# =============================================================================
+
+def analizar_logs(rutas: list, normalizar: Optional[Callable[[str, str], str]] = None,
+                  desde: Optional[str] = None, hasta: Optional[str] = None) -> dict:
+    """
+    Agrega las peticiones de los logs indicados.
+
+    Args:
+        rutas: Archivos en orden cronológico (ver ``archivos_de_log``)
+        normalizar: (método, ruta) -> clave de agrupación (default: segmentos numéricos)
+        desde, hasta: Límites 'YYYY-MM-DD[ HH:MM]' inclusivos por minuto
+
+    Returns:
+        dict serializable a JSON con totales, rutas, estados y peticiones por minuto
+    """
+    normalizar = normalizar or normalizador_por_defecto
+    claves = {}  # (método, ruta) -> clave normalizada
+    rutas_stats = {}
+    global_stats = EstadisticasRuta()
+    por_minuto = Counter()
+    lineas = ignoradas = 0
+    desde_b = desde.replace('T', ' ').encode() if desde else None
+    hasta_b = hasta.replace('T', ' ').encode() if hasta else None
+
+    for ruta_archivo in rutas:
+        for linea in iterar_lineas(ruta_archivo):
+            lineas += 1
+            if _MARCADOR not in linea:
+                continue
+            peticion = _peticion(linea)
+            if peticion is None:
+                ignoradas += 1
+                continue
+
+            minuto, coincidencia = peticion
+            minuto = minuto.replace(b'T', b' ')
+            if (desde_b and minuto[:len(desde_b)] < desde_b) or (hasta_b and minuto[:len(hasta_b)] > hasta_b):
+                continue
+
+            metodo = coincidencia.group('metodo').decode('ascii')
+            ruta_cruda = coincidencia.group('ruta')
+            clave = claves.get((metodo, ruta_cruda))
+            if clave is None:
+                if len(claves) > 100_000:  # Acota la memoria con rutas muy variadas
+                    claves.clear()
+                clave = f'{metodo} {normalizar(metodo, _decodificar_ruta(ruta_cruda))}'
+                claves[(metodo, ruta_cruda)] = clave
+
+            ms = float(coincidencia.group('ms'))
+            estado = int(coincidencia.group('estado'))
+            stats = rutas_stats.get(clave)
+            if stats is None:
+                stats = rutas_stats[clave] = EstadisticasRuta()
+            for destino in (stats, global_stats):
+                destino.latencias.agregar(ms)
+                destino.estados[estado] += 1
+            por_minuto[minuto.decode('ascii')] += 1
+
+    minutos = sorted(por_minuto)
+    return {
+        'archivos': [os.path.basename(r) for r in rutas],
+        'lineas': lineas,
+        'peticiones': global_stats.latencias.total,
+        'lineas_no_reconocidas': ignoradas,
+        'desde': minutos[0] if minutos else None,
+        'hasta': minutos[-1] if minutos else None,
+        'global': global_stats.a_dict(),
+        'estados_por_clase': _por_clase(global_stats.estados),
+        'rutas': {
+            clave: stats.a_dict()
+            for clave, stats in sorted(rutas_stats.items(), key=lambda par: -par[1].latencias.total)
+        },
+        'throughput': {
+            'minutos_con_trafico': len(minutos),
+            'pico_por_minuto': max(por_minuto.values(), default=0),
+            'media_por_minuto': round(global_stats.latencias.total / max(len(minutos), 1), 2),
+            'por_minuto': {minuto: por_minuto[minuto] for minuto in minutos},
+        },
+    }
+
+
+def _por_clase(estados: Counter) -> dict:
+    clases = Counter()
+    for estado, n in estados.items():
+        clases[f'{estado // 100}xx'] += n
+    return dict(sorted(clases.items()))
+
+
+def normalizador_flask(app) -> Callable[[str, str], str]:
+    """Agrupa por la regla de la url_map de Flask (/categoria/<cat_slug>/<slug>); sin regla → '<sin ruta>'."""
+    from werkzeug.exceptions import HTTPException
+
+    adaptador = app.url_map.bind('localhost')
+
+    def normalizar(metodo: str, ruta: str) -> str:
+        try:
+            regla, _ = adaptador.match(ruta, method=metodo, return_rule=True)
+        except HTTPException:
+            return SIN_RUTA
+        except Exception:
+            return normalizador_por_defecto(metodo, ruta)
+        return regla.rule
+
+    return normalizar
@@ -0,0 +1,307 @@
+"""
+Retención y archivo comprimido de ``log_actividad``.
+
+``flask logs archive`` mueve las filas anteriores a ``LOGS_RETENTION_DAYS``
+a archivos NDJSON comprimidos (uno por día de evento, en
+``LOGS_ARCHIVE_DIR``) y las borra de la tabla en lotes acotados: cada lote
+es un SELECT por índice de fecha, una escritura gzip y un DELETE por ids con
+su propio commit, de modo que ningún bloqueo dura más que un lote.
+
+Garantía "al menos una vez": el lote se escribe y sincroniza a disco antes
+del DELETE; si el proceso muere entre ambos, la siguiente ejecución vuelve a
+archivar esas filas (cada línea lleva su ``id`` para deduplicar).
+
+Antes de archivar se ejecuta el rollup de estadísticas
+(app/utils/stats_rollup.py) y solo se archivan eventos ya acumulados, para
+que las estadísticas no pierdan nada.
+
+``manifest.json`` resume lo archivado por archivo y las últimas ejecuciones;
+lo muestra el visor /admin/logs.
+
+En MySQL la tabla puede además particionarse por mes
+(``flask logs partition``): el archivo vacía las particiones antiguas y
+estas se eliminan sin recorrer filas, así que tamaño e índices no crecen.
+"""
+
+import os
+import json
+import gzip
+import time
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import delete, text
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.models.log import LogActividad
+from app.utils.stats_rollup import acumular_estadisticas
+
+logger = logging.getLogger(__name__)
+
+MANIFIESTO = 'manifest.json'
+PREFIJO_ARCHIVO = 'log_actividad-'
+EJECUCIONES_EN_MANIFIESTO = 20
+
+# Ids por DELETE (límite de parámetros de SQLite)
+TAMANIO_LOTE_DELETE = 500
+
+
+# =============================================================================
+# MANIFIESTO
+# =============================================================================
+
+def _ruta_manifiesto(destino: str) -> str:
+    return os.path.join(destino, MANIFIESTO)
+
+
+def leer_manifiesto(destino: Optional[str] = None) -> dict:
+    """Manifiesto del directorio de archivo (vacío si aún no existe)."""
+    destino = destino or current_app.config['LOGS_ARCHIVE_DIR']
+    try:
+        with open(_ruta_manifiesto(destino), encoding='utf-8') as f:
+            manifiesto = json.load(f)
+    except (OSError, ValueError):
+        manifiesto = {}
+    manifiesto.setdefault('archivos', {})
+    manifiesto.setdefault('ejecuciones', [])
+    return manifiesto
+
+
+def _guardar_manifiesto(destino: str, manifiesto: dict) -> None:
+    """Escritura atómica (tmp + replace) para no dejar un manifiesto a medias."""
+    ruta = _ruta_manifiesto(destino)
+    with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(ruta + '.tmp', ruta)
+
+
+def resumen_archivo(destino: Optional[str] = None) -> dict:
+    """
+    Resumen para el panel: archivos (más recientes primero), totales y última ejecución.
+    """
+    destino = destino or current_app.config['LOGS_ARCHIVE_DIR']
+    manifiesto = leer_manifiesto(destino)
+    archivos = []
+    for nombre, datos in manifiesto['archivos'].items():
+        ruta = os.path.join(destino, nombre)
+        archivos.append({
+            'nombre': nombre,
+            'dia': datos.get('dia'),
+            'filas': datos.get('filas', 0),
+            'bytes': os.path.getsize(ruta) if os.path.exists(ruta) else 0,
+        })
+    archivos.sort(key=lambda a: a['nombre'], reverse=True)
+    ejecuciones = manifiesto['ejecuciones']
+    return {
+        'archivos': archivos,
+        'total_filas': sum(a['filas'] for a in archivos),
+        'total_bytes': sum(a['bytes'] for a in archivos),
+        'ultima_ejecucion': ejecuciones[-1] if ejecuciones else None,
+    }
+
+
+# =============================================================================
+# ARCHIVO POR LOTES
+# =============================================================================
+
+def _linea(fila) -> str:
+    return json.dumps({
+        'id': fila.id,
+        'tipo_evento': fila.tipo_evento,
+        'detalle': fila.detalle,
+        'fecha': fila.fecha.isoformat(),
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def _escribir_lote(destino: str, filas: list, manifiesto: dict) -> None:
+    """Añade el lote a los .ndjson.gz de cada día (miembros gzip concatenados) y lo sincroniza."""
+    por_dia = {}
+    for fila in filas:
+        por_dia.setdefault(fila.fecha.date(), []).append(fila)
+
+    for dia, filas_dia in por_dia.items():
+        nombre = f'{PREFIJO_ARCHIVO}{dia.isoformat()}.ndjson.gz'
+        with open(os.path.join(destino, nombre), 'ab') as crudo:
+            with gzip.GzipFile(fileobj=crudo, mode='ab') as gz:
+                gz.write(('\n'.join(_linea(f) for f in filas_dia) + '\n').encode('utf-8'))
+            crudo.flush()
+            os.fsync(crudo.fileno())
+        datos = manifiesto['archivos'].setdefault(nombre, {'dia': dia.isoformat(), 'filas': 0})
+        datos['filas'] += len(filas_dia)
+
+
+def fecha_corte(dias: int, ahora: Optional[datetime] = None) -> datetime:
+    """Inicio del día (UTC, naive como la columna) a partir del cual se conservan filas."""
+    ahora = ahora or datetime.now(timezone.utc)
+    return datetime.combine((ahora - timedelta(days=dias)).date(), datetime.min.time())
+
+
+def archivar_logs(dias: Optional[int] = None, batch_size: Optional[int] = None,
+                  destino: Optional[str] = None, pausa: Optional[float] = None,
+                  reportar: Optional[Callable[[int], None]] = None) -> dict:
+    """
+    Archiva y borra las filas de ``log_actividad`` anteriores a la retención.
+
+    Args:
+        dias: Días conservados en la tabla (default LOGS_RETENTION_DAYS)
+        batch_size: Filas por lote/transacción (default LOGS_ARCHIVE_BATCH)
+        destino: Directorio de archivo (default LOGS_ARCHIVE_DIR)
+        pausa: Segundos entre lotes para ceder la tabla (default LOGS_ARCHIVE_PAUSE_SECONDS)
+        reportar: Callback con el total archivado tras cada lote
+
+    Returns:
+        dict con 'corte', 'archivadas', 'lotes' y 'archivos'
+    """
+    config = current_app.config
+    dias = config.get('LOGS_RETENTION_DAYS', 90) if dias is None else dias
+    batch_size = batch_size or config.get('LOGS_ARCHIVE_BATCH', 1000)
+    destino = destino or config['LOGS_ARCHIVE_DIR']
+    pausa = config.get('LOGS_ARCHIVE_PAUSE_SECONDS', 0.05) if pausa is None else pausa
+    corte = fecha_corte(dias)
+    marca = acumular_estadisticas()['marca']
+
+    os.makedirs(destino, exist_ok=True)
+    manifiesto = leer_manifiesto(destino)
+    archivos_antes = set(manifiesto['archivos'])
+    archivadas = lotes = 0
+
+    while True:
+        # El índice de fecha acota el SELECT; lo ya borrado no reaparece
+        filas = db.session.query(
+            LogActividad.id, LogActividad.tipo_evento, LogActividad.detalle, LogActividad.fecha
+        ).filter(LogActividad.fecha < corte, LogActividad.id <= marca).order_by(
+            LogActividad.fecha, LogActividad.id
+        ).limit(batch_size).all()
+        if not filas:
+            break
+
+        _escribir_lote(destino, filas, manifiesto)
+        ids = [fila.id for fila in filas]
+        for i in range(0, len(ids), TAMANIO_LOTE_DELETE):
+            db.session.execute(
+                delete(LogActividad).where(LogActividad.id.in_(ids[i:i + TAMANIO_LOTE_DELETE]))
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+        _guardar_manifiesto(destino, manifiesto)
+
+        archivadas += len(filas)
+        lotes += 1
+        if reportar:
+            reportar(archivadas)
+        if len(filas) < batch_size:
+            break
+        if pausa:
+            time.sleep(pausa)
+
+    archivos = sorted(set(manifiesto['archivos']) - archivos_antes)
+    manifiesto['ejecuciones'].append({
+        'fecha': datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec='seconds'),
+        'corte': corte.date().isoformat(),
+        'filas': archivadas,
+    })
+    manifiesto['ejecuciones'] = manifiesto['ejecuciones'][-EJECUCIONES_EN_MANIFIESTO:]
+    _guardar_manifiesto(destino, manifiesto)
+
+    if archivadas:
+        db.session.add(LogActividad(
+            tipo_evento=LogEventType.SISTEMA,
+            detalle=f"Archivo de logs: {archivadas} eventos anteriores a {corte.date().isoformat()}"
+        ))
+        db.session.commit()
+        logger.info(f"Archivados {archivadas} eventos de log_actividad en {lotes} lotes")
+
+    return {'corte': corte.date().isoformat(), 'archivadas': archivadas, 'lotes': lotes, 'archivos': archivos}
+
+
+# =============================================================================
+# PARTICIONADO POR MES (MySQL)
+# =============================================================================
+
+def _mes_siguiente(mes: date) -> date:
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _particion(mes: date) -> str:
+    limite = _mes_siguiente(mes).isoformat()
+    return f"PARTITION p{mes:%Y%m} VALUES LESS THAN (TO_DAYS('{limite}'))"
+
+
+def sql_particiones_mysql(existentes: list, desde: date, hasta: date, eliminar: tuple = ()) -> list:
+    """
+    Sentencias para particionar ``log_actividad`` por mes (RANGE sobre TO_DAYS(fecha)).
+
+    MySQL exige que la clave de partición forme parte de cada clave única,
+    por eso la primera vez la clave primaria pasa a ser ``(id, fecha)``.
+
+    Args:
+        existentes: Nombres de partición actuales ([] si la tabla no está particionada)
+        desde: Primer mes a cubrir (el de la fila más antigua)
+        hasta: Último mes a crear por adelantado
+        eliminar: Particiones antiguas ya vaciadas por ``flask logs archive``
+    """
+    tabla = LogActividad.__tablename__
+    meses = []
+    mes = date(desde.year, desde.month, 1)
+    while mes <= hasta:
+        meses.append(mes)
+        mes = _mes_siguiente(mes)
+
+    if not existentes:
+        particiones = ',\n  '.join([_particion(m) for m in meses] + ['PARTITION pmax VALUES LESS THAN MAXVALUE'])
+        return [
+            f"ALTER TABLE {tabla} MODIFY fecha DATETIME NOT NULL, DROP PRIMARY KEY, ADD PRIMARY KEY (id, fecha)",
+            f"ALTER TABLE {tabla} PARTITION BY RANGE (TO_DAYS(fecha)) (\n  {particiones}\n)",
+        ]
+
+    sentencias = []
+    nuevos = [m for m in meses if f'p{m:%Y%m}' not in existentes and m >= _ultimo_mes(existentes)]
+    if nuevos:
+        particiones = ',\n  '.join([_particion(m) for m in nuevos] + ['PARTITION pmax VALUES LESS THAN MAXVALUE'])
+        sentencias.append(f"ALTER TABLE {tabla} REORGANIZE PARTITION pmax INTO (\n  {particiones}\n)")
+    if eliminar:
+        sentencias.append(f"ALTER TABLE {tabla} DROP PARTITION {', '.join(eliminar)}")
+    return sentencias
+
+
+def _mes_de(particion: str) -> date:
+    return date(int(particion[1:5]), int(particion[5:7]), 1)
+
+
+def _ultimo_mes(existentes: list) -> date:
+    meses = [_mes_de(p) for p in existentes if p != 'pmax']
+    return _mes_siguiente(max(meses)) if meses else date.min
+
+
+def plan_particiones(meses_adelante: int = 3) -> list:
+    """
+    Sentencias pendientes para la tabla actual (lee information_schema en MySQL).
+
+    Solo propone eliminar particiones anteriores a la retención que estén
+    realmente vacías, es decir, ya archivadas.
+    """
+    tabla = LogActividad.__tablename__
+    existentes, eliminar = [], []
+    corte = fecha_corte(current_app.config.get('LOGS_RETENTION_DAYS', 90)).date()
+    if db.engine.dialect.name == 'mysql':
+        existentes = [nombre for (nombre,) in db.session.execute(text(
+            "SELECT partition_name FROM information_schema.partitions "
+            "WHERE table_schema = DATABASE() AND table_name = :tabla AND partition_name IS NOT NULL "
+            "ORDER BY partition_ordinal_position"
+        ), {'tabla': tabla})]
+        for particion in existentes:
+            if particion == 'pmax' or _mes_siguiente(_mes_de(particion)) > corte:
+                continue
+            if db.session.execute(text(f"SELECT 1 FROM {tabla} PARTITION ({particion}) LIMIT 1")).first() is None:
+                eliminar.append(particion)
+
+    hoy = datetime.now(timezone.utc).date()
+    primera = db.session.query(db.func.min(LogActividad.fecha)).scalar()
+    desde = primera.date() if primera else hoy
+    hasta = date(hoy.year, hoy.month, 1)
+    for _ in range(meses_adelante):
+        hasta = _mes_siguiente(hasta)
+    return sql_particiones_mysql(existentes, desde, hasta, tuple(eliminar))
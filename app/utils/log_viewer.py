@@ -0,0 +1,173 @@
+"""
+Visor del log de actividad (/admin/logs).
+
+``log_actividad`` es la tabla que más crece (cada lectura añade una fila),
+así que el visor evita las dos operaciones que escalan con su tamaño:
+
+- OFFSET: navega por keyset sobre ``(fecha, id)`` reutilizando
+  ``paginar_por_fecha``; los filtros por tipo y rango de fechas se apoyan en
+  el índice compuesto ``ix_log_actividad_tipo_evento_fecha``.
+- COUNT(*): el total es una estimación (estadística de la tabla sin filtros
+  en MySQL/PostgreSQL, o un conteo acotado a ``LOGS_COUNT_LIMIT`` filas) cacheada unos
+  segundos; la página siguiente se detecta leyendo una fila de más, no
+  comparando con el total.
+"""
+
+from functools import partial
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+
+from flask import current_app
+from sqlalchemy import func, text
+
+from app.extensions import db, cache
+from app.enums import LogEventType
+from app.models.log import LogActividad
+from app.utils.pagination import PaginacionKeyset, paginar_por_fecha
+
+TIPOS_EVENTO = tuple(tipo.value for tipo in LogEventType)
+
+
+class FiltrosLog(NamedTuple):
+    """Filtros válidos del visor (None = sin filtrar)"""
+    tipo: Optional[str] = None
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+
+    @property
+    def activos(self) -> bool:
+        return any(self)
+
+    def como_args(self) -> dict:
+        """Parámetros de URL para conservar los filtros al paginar."""
+        args = {'tipo': self.tipo, 'desde': self.desde, 'hasta': self.hasta}
+        return {clave: str(valor) for clave, valor in args.items() if valor}
+
+
+def _parsear_fecha(valor: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def parsear_filtros(args) -> FiltrosLog:
+    """Lee tipo, desde y hasta (YYYY-MM-DD) de la query string; ignora valores inválidos."""
+    tipo = args.get('tipo') or None
+    return FiltrosLog(
+        tipo=tipo if tipo in TIPOS_EVENTO else None,
+        desde=_parsear_fecha(args.get('desde')),
+        hasta=_parsear_fecha(args.get('hasta')),
+    )
+
+
+def filtrar_logs(filtros: FiltrosLog):
+    """Query de LogActividad con los filtros aplicados (sin order_by)."""
+    query = LogActividad.query
+    if filtros.tipo:
+        query = query.filter(LogActividad.tipo_evento == filtros.tipo)
+    if filtros.desde:
+        query = query.filter(LogActividad.fecha >= datetime.combine(filtros.desde, time.min))
+    if filtros.hasta:
+        # Rango semiabierto: incluye todo el día "hasta"
+        query = query.filter(LogActividad.fecha < datetime.combine(filtros.hasta + timedelta(days=1), time.min))
+    return query
+
+
+class TotalEstimado(NamedTuple):
+    valor: int
+    modo: str  # 'exacto', 'estimado' (estadística del motor) o 'minimo' (conteo acotado)
+
+    def __str__(self) -> str:
+        prefijo = {'estimado': '≈ ', 'minimo': 'más de '}.get(self.modo, '')
+        return f'{prefijo}{self.valor:,}'
+
+
+# Filas estimadas por el motor sin recorrer la tabla
+_SQL_ESTIMACION = {
+    'mysql': "SELECT table_rows FROM information_schema.tables "
+             "WHERE table_schema = DATABASE() AND table_name = :tabla",
+    'postgresql': "SELECT reltuples::bigint FROM pg_class WHERE relname = :tabla",
+}
+
+
+def _estimacion_motor() -> Optional[int]:
+    """Filas estimadas por las estadísticas de MySQL/PostgreSQL; None si no hay."""
+    sql = _SQL_ESTIMACION.get(db.engine.dialect.name)
+    if sql is None:
+        return None
+    filas = db.session.execute(text(sql), {'tabla': LogActividad.__tablename__}).scalar()
+    return int(filas) if filas is not None and filas >= 0 else None
+
+
+def estimar_total(query, filtros: FiltrosLog) -> TotalEstimado:
+    """
+    Total aproximado de filas del listado, cacheado LOGS_TOTAL_CACHE_SECONDS.
+
+    Sin filtros en MySQL/PostgreSQL usa la estadística de la tabla; en otro caso
+    cuenta como máximo LOGS_COUNT_LIMIT filas (el coste no crece con la tabla).
+    """
+    clave_cache = 'logs:total:' + ':'.join(f'{k}={v}' for k, v in sorted(filtros.como_args().items()))
+    total = cache.get(clave_cache)
+    if total is not None:
+        return TotalEstimado(*total)
+
+    total = None
+    if not filtros.activos:
+        estimado = _estimacion_motor()
+        if estimado is not None:
+            total = TotalEstimado(estimado, 'estimado')
+
+    if total is None:
+        limite = current_app.config.get('LOGS_COUNT_LIMIT', 10000)
+        acotada = query.order_by(None).with_entities(LogActividad.id).limit(limite + 1).subquery()
+        contadas = db.session.query(func.count()).select_from(acotada).scalar()
+        total = TotalEstimado(min(contadas, limite), 'exacto' if contadas <= limite else 'minimo')
+
+    cache.set(clave_cache, tuple(total), timeout=current_app.config.get('LOGS_TOTAL_CACHE_SECONDS', 60))
+    return total
+
+
+class PaginacionLogs(PaginacionKeyset):
+    """
+    PaginacionKeyset con total estimado.
+
+    ``has_next`` sale de la fila extra leída, no del total, para que una
+    estimación baja no corte la navegación.
+    """
+
+    filas_extra = 1
+
+    def __init__(self, *args, filtros: FiltrosLog = FiltrosLog(), **kwargs):
+        self.filtros = filtros
+        self.total_estimado = None
+        self._hay_siguiente = False
+        super().__init__(*args, **kwargs)
+
+    def _query_items(self) -> list:
+        items = super()._query_items()
+        sobrante = len(items) > self.per_page
+        if self._cursor is not None and self._cursor['direccion'] == 'p':
+            # Hacia atrás la fila extra es la más reciente; siguiente siempre existe
+            self._hay_siguiente = True
+            return items[1:] if sobrante else items
+        self._hay_siguiente = sobrante
+        return items[:self.per_page]
+
+    def _query_count(self) -> int:
+        self.total_estimado = estimar_total(self._query, self.filtros)
+        return self.total_estimado.valor
+
+    @property
+    def has_next(self) -> bool:
+        return self._hay_siguiente
+
+    @property
+    def pages(self) -> int:
+        return max(super().pages, self.page + (1 if self._hay_siguiente else 0))
+
+
+def paginar_logs(filtros: FiltrosLog, page: int, cursor: Optional[str], per_page: int) -> PaginacionLogs:
+    """Página del visor: keyset sobre (fecha, id) con los filtros aplicados."""
+    return paginar_por_fecha(filtrar_logs(filtros), LogActividad, page=page, cursor=cursor, per_page=per_page,
+                             clave_total='logs', clase=partial(PaginacionLogs, filtros=filtros))
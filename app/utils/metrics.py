@@ -0,0 +1,275 @@
+"""
+Métricas en proceso con exposición en formato de texto de Prometheus.
+
+Por petición (``after_request``) se suman, bajo un lock sin contención:
+
+- ``nexus_http_requests_total{endpoint, method, status}``: clase de estado (2xx...).
+- ``nexus_http_request_duration_seconds{endpoint}``: histograma de cubetas fijas.
+
+Además se cuentan las consultas SQL (las mide app/utils/query_stats.py con
+los eventos del Engine) y los aciertos/fallos de Flask-Caching (``cache.get``) y de la caché
+de contenido. Las etiquetas de endpoint son ``blueprint.vista`` (no la URL),
+así que la cardinalidad está acotada por las rutas registradas.
+
+Modo multiproceso: con ``METRICS_DIR`` cada worker de Gunicorn vuelca sus
+contadores a ``metricas-<pid>-<token>.json`` como mucho cada
+``METRICS_FLUSH_SECONDS`` (escritura atómica). ``/metrics`` suma los archivos
+de todos los workers (incluidos los que ya terminaron, para que los
+contadores no retrocedan); ``flask metrics reset`` vacía la carpeta al
+desplegar.
+"""
+
+import os
+import glob
+import json
+import time
+import uuid
+import atexit
+import bisect
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Cubetas de latencia en segundos (las de prometheus_client por defecto)
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+SIN_ENDPOINT = '<sin ruta>'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(**etiquetas) -> str:
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in etiquetas.items()) + '}'
+
+
+def _num(valor) -> str:
+    return repr(round(valor, 6)) if isinstance(valor, float) else str(valor)
+
+
+class RegistroMetricas:
+    """
+    Contadores e histogramas del worker, agregables entre procesos.
+
+    Uso:
+        metricas.observar_peticion('main.index', 'GET', 200, 0.012)
+        texto = metricas.exposicion()
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.directorio = None
+        self.intervalo = 5.0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._archivo = None
+        self._ultimo_volcado = 0.0
+        self._atexit_registrado = False
+        self.reiniciar()
+
+    def init_app(self, app):
+        """Configura el registro e instala el contador de la caché."""
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.directorio = app.config.get('METRICS_DIR') or None
+        self.intervalo = app.config.get('METRICS_FLUSH_SECONDS', self.intervalo)
+        if not self.enabled:
+            return
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+        from app.extensions import cache
+        _instrumentar_cache(self, cache)
+        if not self._atexit_registrado:
+            atexit.register(self.volcar, True)
+            self._atexit_registrado = True
+
+    def reiniciar(self) -> None:
+        """Pone a cero los contadores de este proceso."""
+        with self._lock:
+            self._peticiones = {}  # (endpoint, método, clase) -> n
+            self._latencias = {}  # endpoint -> [cubetas..., +Inf, suma]
+            self._db = [0, 0.0]  # consultas, segundos
+            self._cache = [0, 0]  # aciertos, fallos
+
+    # ------------------------------------------------------------------
+    # Registro (ruta caliente)
+    # ------------------------------------------------------------------
+
+    def observar_peticion(self, endpoint: Optional[str], metodo: str, estado: int, segundos: float) -> None:
+        if not self.enabled:
+            return
+        endpoint = endpoint or SIN_ENDPOINT
+        clave = (endpoint, metodo, f'{estado // 100}xx')
+        indice = bisect.bisect_left(BUCKETS_LATENCIA, segundos)
+        with self._lock:
+            self._peticiones[clave] = self._peticiones.get(clave, 0) + 1
+            fila = self._latencias.get(endpoint)
+            if fila is None:
+                fila = self._latencias[endpoint] = [0] * (len(BUCKETS_LATENCIA) + 1) + [0.0]
+            fila[indice] += 1
+            fila[-1] += segundos
+        if self.directorio and time.monotonic() - self._ultimo_volcado >= self.intervalo:
+            self.volcar()
+
+    def contar_consulta(self, segundos: float) -> None:
+        with self._lock:
+            self._db[0] += 1
+            self._db[1] += segundos
+
+    def contar_cache(self, acierto: bool) -> None:
+        with self._lock:
+            self._cache[0 if acierto else 1] += 1
+
+    # ------------------------------------------------------------------
+    # Agregación entre workers
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Contadores de este proceso en forma serializable a JSON."""
+        from app.utils.content_cache import content_cache
+
+        with self._lock:
+            datos = {
+                'peticiones': [[*clave, n] for clave, n in self._peticiones.items()],
+                'latencias': {endpoint: list(fila) for endpoint, fila in self._latencias.items()},
+                'db': list(self._db),
+                'cache': {'flask': list(self._cache)},
+            }
+        datos['cache']['contenido'] = [content_cache.hits, content_cache.misses]
+        return datos
+
+    def volcar(self, forzar: bool = False) -> None:
+        """Escribe el snapshot del worker en METRICS_DIR (como mucho cada ``intervalo``)."""
+        if not self.directorio or not self.enabled:
+            return
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_volcado < self.intervalo:
+            return
+        self._ultimo_volcado = ahora
+        ruta = self._archivo_propio()
+        temporal = f'{ruta}.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            logger.warning(f"No se pudieron volcar las métricas: {e}")
+
+    def agregado(self) -> dict:
+        """Suma de este proceso (en vivo) y de los archivos de los demás workers."""
+        snapshots = [self.snapshot()]
+        if self.directorio:
+            propio = self._archivo_propio()
+            for ruta in glob.glob(os.path.join(self.directorio, 'metricas-*.json')):
+                if ruta == propio:
+                    continue
+                try:
+                    with open(ruta, encoding='utf-8') as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # Archivo a medio borrar o de otra versión
+
+        total = {'peticiones': {}, 'latencias': {}, 'db': [0, 0.0], 'cache': {}, 'procesos': len(snapshots)}
+        for datos in snapshots:
+            for *clave, n in datos.get('peticiones', []):
+                clave = tuple(clave)
+                total['peticiones'][clave] = total['peticiones'].get(clave, 0) + n
+            for endpoint, fila in datos.get('latencias', {}).items():
+                acumulada = total['latencias'].get(endpoint)
+                if acumulada is None or len(acumulada) != len(fila):
+                    total['latencias'][endpoint] = list(fila)
+                else:
+                    total['latencias'][endpoint] = [a + b for a, b in zip(acumulada, fila)]
+            total['db'] = [a + b for a, b in zip(total['db'], datos.get('db', [0, 0.0]))]
+            for nombre, (aciertos, fallos) in datos.get('cache', {}).items():
+                previo = total['cache'].get(nombre, (0, 0))
+                total['cache'][nombre] = (previo[0] + aciertos, previo[1] + fallos)
+        return total
+
+    def exposicion(self) -> str:
+        """Métricas agregadas en formato de texto de Prometheus 0.0.4."""
+        total = self.agregado()
+        lineas = [
+            '# HELP nexus_http_requests_total Peticiones HTTP por endpoint, método y clase de estado.',
+            '# TYPE nexus_http_requests_total counter',
+        ]
+        for (endpoint, metodo, clase), n in sorted(total['peticiones'].items()):
+            lineas.append(f'nexus_http_requests_total{_etiquetas(endpoint=endpoint, method=metodo, status=clase)} {n}')
+
+        lineas += [
+            '# HELP nexus_http_request_duration_seconds Latencia de las peticiones por endpoint.',
+            '# TYPE nexus_http_request_duration_seconds histogram',
+        ]
+        for endpoint, fila in sorted(total['latencias'].items()):
+            acumulado = 0
+            for limite, n in zip(BUCKETS_LATENCIA + ('+Inf',), fila[:-1]):
+                acumulado += n
+                lineas.append(
+                    f'nexus_http_request_duration_seconds_bucket{_etiquetas(endpoint=endpoint, le=limite)} {acumulado}'
+                )
+            lineas.append(f'nexus_http_request_duration_seconds_sum{_etiquetas(endpoint=endpoint)} {_num(fila[-1])}')
+            lineas.append(f'nexus_http_request_duration_seconds_count{_etiquetas(endpoint=endpoint)} {acumulado}')
+
+        lineas += [
+            '# HELP nexus_db_queries_total Consultas SQL ejecutadas.',
+            '# TYPE nexus_db_queries_total counter',
+            f'nexus_db_queries_total {total["db"][0]}',
+            '# HELP nexus_db_query_duration_seconds_total Tiempo acumulado en consultas SQL.',
+            '# TYPE nexus_db_query_duration_seconds_total counter',
+            f'nexus_db_query_duration_seconds_total {_num(float(total["db"][1]))}',
+            '# HELP nexus_cache_requests_total Lecturas de caché por resultado.',
+            '# TYPE nexus_cache_requests_total counter',
+        ]
+        for nombre, (aciertos, fallos) in sorted(total['cache'].items()):
+            lineas.append(f'nexus_cache_requests_total{_etiquetas(cache=nombre, result="hit")} {aciertos}')
+            lineas.append(f'nexus_cache_requests_total{_etiquetas(cache=nombre, result="miss")} {fallos}')
+
+        lineas += [
+            '# HELP nexus_metrics_processes Procesos (workers) agregados en esta respuesta.',
+            '# TYPE nexus_metrics_processes gauge',
+            f'nexus_metrics_processes {total["procesos"]}',
+        ]
+        return '\n'.join(lineas) + '\n'
+
+    def limpiar_directorio(self) -> int:
+        """Borra los volcados de METRICS_DIR (al desplegar, con los workers parados)."""
+        if not self.directorio:
+            return 0
+        borrados = 0
+        for ruta in glob.glob(os.path.join(self.directorio, 'metricas-*.json*')):
+            try:
+                os.remove(ruta)
+                borrados += 1
+            except OSError:
+                pass
+        return borrados
+
+    def _archivo_propio(self) -> str:
+        """Archivo del worker actual; tras un fork se empieza de cero con uno nuevo."""
+        pid = os.getpid()
+        if self._pid != pid:
+            if self._pid is not None:
+                self.reiniciar()  # Los contadores heredados ya son del archivo del padre
+            self._pid = pid
+            self._archivo = os.path.join(self.directorio, f'metricas-{pid}-{uuid.uuid4().hex[:8]}.json')
+        return self._archivo
+
+
+def _instrumentar_cache(registro: RegistroMetricas, cache) -> None:
+    """Envuelve ``cache.get`` para contar aciertos (valor distinto de None) y fallos."""
+    original = cache.get
+    if getattr(original, 'con_metricas', False):
+        return
+
+    def get(*args, **kwargs):
+        valor = original(*args, **kwargs)
+        registro.contar_cache(valor is not None)
+        return valor
+
+    get.con_metricas = True
+    cache.get = get
+
+
+metricas = RegistroMetricas()
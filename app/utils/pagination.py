@@ -0,0 +1,210 @@
+"""
+Paginación keyset (seek) para listados públicos ordenados por fecha.
+
+Los listados se ordenan por ``(fecha DESC, id DESC)``. La página 1 y las
+primeras ``PAGINATION_MAX_OFFSET_PAGE`` páginas aceptan ``?page=N`` (OFFSET
+barato); a partir de ahí la navegación usa ``?cursor=<token>``, un token
+opaco con la posición ``(fecha, id)`` del borde de la página, de modo que la
+base de datos salta directamente por índice en lugar de descartar filas.
+
+El total ya no cuesta un COUNT(*) por visita: se cachea por listado y se
+invalida desde el panel de administración (``invalidar_totales``).
+
+La invalidación es inmediata solo con una caché compartida (CACHE_TYPE
+redis). Con la caché por proceso (``simple``, el valor por defecto) el
+contador de generación vive en cada worker de Gunicorn: el que atendió la
+escritura se invalida al momento y los demás convergen al expirar
+``PAGINATION_TOTAL_CACHE_SECONDS``.
+"""
+
+import json
+import base64
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from flask import abort, current_app
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import and_, or_
+
+from app.extensions import cache
+
+logger = logging.getLogger(__name__)
+
+TOTALES_VERSION_KEY = 'paginacion:totales:version'
+
+
+# =============================================================================
+# TOKENS DE CURSOR
+# =============================================================================
+
+def codificar_cursor(fecha: datetime, ident: int, page: int, direccion: str) -> str:
+    """
+    Codifica la posición de seek en un token opaco apto para URLs.
+
+    Args:
+        fecha, ident: Clave (fecha, id) del elemento borde
+        page: Número de página destino (solo para mostrar "Página N de M")
+        direccion: 'n' (siguiente) o 'p' (anterior)
+    """
+    # Las columnas DateTime se guardan sin zona (UTC): normalizar a naive
+    datos = {'f': fecha.replace(tzinfo=None).isoformat(), 'i': ident, 'p': page, 'd': direccion}
+    crudo = json.dumps(datos, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token: Optional[str]) -> Optional[dict]:
+    """Decodifica un token de cursor; retorna None si falta o es inválido."""
+    if not token:
+        return None
+    try:
+        crudo = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        datos = json.loads(crudo)
+        cursor = {
+            'fecha': datetime.fromisoformat(datos['f']),
+            'id': int(datos['i']),
+            'page': max(1, int(datos['p'])),
+            'direccion': datos['d'] if datos['d'] in ('n', 'p') else 'n',
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        logger.debug("Cursor de paginación inválido, usando página por número")
+        return None
+    return cursor
+
+
+# =============================================================================
+# TOTALES CACHEADOS
+# =============================================================================
+
+def version_totales() -> int:
+    """Generación vigente de los totales (también la usan los contadores del panel)."""
+    return cache.get(TOTALES_VERSION_KEY) or 0
+
+
+def invalidar_totales() -> None:
+    """
+    Invalida todos los totales cacheados (altas, bajas y cambios de categoría).
+
+    Usa un contador de generación porque el backend de caché no soporta
+    borrado por prefijo. Con la caché por proceso solo afecta al worker
+    actual (ver el docstring del módulo).
+    """
+    cache.set(TOTALES_VERSION_KEY, version_totales() + 1, timeout=0)
+
+
+def total_cacheado(query, clave: str) -> int:
+    """COUNT(*) del listado, cacheado por clave y generación."""
+    clave_cache = f'paginacion:total:{version_totales()}:{clave}'
+    total = cache.get(clave_cache)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(clave_cache, total, timeout=current_app.config.get('PAGINATION_TOTAL_CACHE_SECONDS', 300))
+    return total
+
+
+# =============================================================================
+# PAGINACIÓN
+# =============================================================================
+
+class PaginacionKeyset(Pagination):
+    """
+    Pagination compatible con ``query.paginate()`` con modo cursor.
+
+    Además de la interfaz estándar expone ``next_cursor`` / ``prev_cursor``
+    para que los templates construyan los enlaces de navegación.
+    """
+
+    # Filas leídas de más por página (las subclases que no confían en el total
+    # leen una fila extra para saber si hay página siguiente)
+    filas_extra = 0
+
+    def __init__(self, query, modelo, page: int, per_page: int, cursor: Optional[dict],
+                 clave_total: str, max_offset_page: int):
+        self._query = query
+        self._modelo = modelo
+        self._cursor = cursor
+        self._clave_total = clave_total
+        self.max_offset_page = max_offset_page
+        super().__init__(page=page, per_page=per_page, max_per_page=None, error_out=False)
+
+    def _query_items(self) -> list:
+        fecha, ident = self._modelo.fecha, self._modelo.id
+
+        limite = self.per_page + self.filas_extra
+
+        if self._cursor is None:
+            return self._query.order_by(fecha.desc(), ident.desc()).limit(
+                limite
+            ).offset(self._query_offset).all()
+
+        f, i = self._cursor['fecha'], self._cursor['id']
+        if self._cursor['direccion'] == 'n':
+            return self._query.filter(
+                or_(fecha < f, and_(fecha == f, ident < i))
+            ).order_by(fecha.desc(), ident.desc()).limit(limite).all()
+
+        # Página anterior: recorrer en orden inverso y voltear
+        items = self._query.filter(
+            or_(fecha > f, and_(fecha == f, ident > i))
+        ).order_by(fecha.asc(), ident.asc()).limit(limite).all()
+        return list(reversed(items))
+
+    def _query_count(self) -> int:
+        return total_cacheado(self._query, self._clave_total)
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """Token de la página siguiente (None si es la última)."""
+        if not self.has_next or not self.items:
+            return None
+        ultimo = self.items[-1]
+        return codificar_cursor(ultimo.fecha, ultimo.id, self.page + 1, 'n')
+
+    @property
+    def prev_cursor(self) -> Optional[str]:
+        """Token de la página anterior (None si es la 1: se enlaza con ?page=1)."""
+        if self.page <= 2 or not self.items:
+            return None
+        primero = self.items[0]
+        return codificar_cursor(primero.fecha, primero.id, self.page - 1, 'p')
+
+    def iter_pages(self, *args, **kwargs):
+        """Números de página enlazables: solo los accesibles por OFFSET (y la actual)."""
+        anterior_vacio = False
+        for num in super().iter_pages(*args, **kwargs):
+            if num is not None and (num <= self.max_offset_page or num == self.page):
+                anterior_vacio = False
+                yield num
+            elif not anterior_vacio:
+                anterior_vacio = True
+                yield None
+
+
+def paginar_por_fecha(query, modelo, page: int, cursor: Optional[str], per_page: int,
+                      clave_total: str, clase: Callable[..., PaginacionKeyset] = PaginacionKeyset) -> PaginacionKeyset:
+    """
+    Pagina un listado por (fecha DESC, id DESC).
+
+    Args:
+        query: Query filtrada (sin order_by)
+        modelo: Modelo con columnas ``fecha`` e ``id``
+        page: Valor de ?page= (ignorado si hay cursor válido)
+        cursor: Valor de ?cursor=
+        per_page: Elementos por página
+        clave_total: Clave estable del listado para el total cacheado
+        clase: PaginacionKeyset o subclase (o fábrica) a instanciar
+
+    Raises:
+        404 si se pide ?page= por encima de PAGINATION_MAX_OFFSET_PAGE
+    """
+    max_offset_page = current_app.config.get('PAGINATION_MAX_OFFSET_PAGE', 20)
+    datos_cursor = decodificar_cursor(cursor)
+
+    if datos_cursor is not None:
+        page = datos_cursor['page']
+    elif page > max_offset_page:
+        # Páginas profundas por OFFSET: solo accesibles navegando con cursor
+        abort(404)
+
+    return clase(query, modelo, page=max(1, page), per_page=per_page, cursor=datos_cursor,
+                 clave_total=clave_total, max_offset_page=max_offset_page)
@@ -0,0 +1,343 @@
+"""
+Perfilado por muestreo bajo demanda de peticiones concretas.
+
+Un administrador arma una sesión desde el panel de diagnóstico
+(``POST /api/diagnostics/profiler``) para un endpoint y N peticiones. Las
+siguientes N peticiones a ese endpoint (o solo las que traigan la cabecera
+``X-Profile-Token`` con el token de la sesión, si se pide) se perfilan: un
+hilo muestreador lee la pila del hilo de la petición con
+``sys._current_frames()`` cada ``PROFILER_INTERVAL_MS`` y acumula pilas
+colapsadas (``a;b;c 12``), el formato de flamegraph.pl y speedscope.
+
+Entre workers de Gunicorn la sesión se comparte con ``sesion.json`` en
+``PROFILER_DIR``: cada worker mira su mtime como mucho cada
+``PROFILER_CHECK_SECONDS`` y reserva huecos ``<token>-<n>.collapsed`` con
+``O_EXCL``, así que nunca se capturan más de N peticiones en total.
+
+Sin sesión armada el coste por petición es una lectura del reloj monotónico:
+no hay hilo muestreador ni trazado (``sys.setprofile``) activo.
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import logging
+import secrets
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CABECERA_TOKEN = 'X-Profile-Token'
+ARCHIVO_SESION = 'sesion.json'
+EXTENSION = '.collapsed'
+PROFUNDIDAD_MAXIMA = 200  # Marcos por muestra (recursiones profundas se truncan)
+PATRON_TOKEN = re.compile(r'^[0-9a-f]{16}$')
+
+
+class Muestreador:
+    """
+    Hilo que muestrea la pila de los hilos registrados a intervalo fijo.
+
+    Solo existe mientras haya algún hilo registrado.
+
+    Uso:
+        muestreador.iniciar()
+        ...  # trabajo del hilo actual
+        pilas = muestreador.detener()  # Counter {'mod:func;mod:func': muestras}
+    """
+
+    def __init__(self, intervalo: float = 0.005, base: Optional[str] = None):
+        self.intervalo = intervalo
+        self.base = base
+        self._objetivos = {}  # ident del hilo -> Counter de pilas
+        self._nombres = {}  # co_filename -> nombre corto
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def iniciar(self, ident: Optional[int] = None) -> None:
+        ident = ident or threading.get_ident()
+        with self._lock:
+            self._objetivos[ident] = Counter()
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name='perfilador', daemon=True)
+                self._hilo.start()
+
+    def detener(self, ident: Optional[int] = None) -> Counter:
+        with self._lock:
+            return self._objetivos.pop(ident or threading.get_ident(), Counter())
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None
+
+    def _bucle(self) -> None:
+        while True:
+            with self._lock:
+                if not self._objetivos:
+                    self._hilo = None
+                    return
+                objetivos = list(self._objetivos.items())
+            marcos = sys._current_frames()
+            for ident, pilas in objetivos:
+                marco = marcos.get(ident)
+                if marco is not None:
+                    pilas[self._pila(marco)] += 1
+            del marcos, marco  # No retener los marcos de otros hilos hasta la siguiente vuelta
+            time.sleep(self.intervalo)
+
+    def _pila(self, marco) -> str:
+        """Pila colapsada de la raíz a la hoja: ``archivo:funcion;...``."""
+        partes = []
+        while marco is not None and len(partes) < PROFUNDIDAD_MAXIMA:
+            codigo = marco.f_code
+            partes.append(f'{self._nombre(codigo.co_filename)}:{codigo.co_name}')
+            marco = marco.f_back
+        partes.reverse()
+        return ';'.join(partes).replace(' ', '_')
+
+    def _nombre(self, archivo: str) -> str:
+        nombre = self._nombres.get(archivo)
+        if nombre is None:
+            if self.base and archivo.startswith(self.base + os.sep):
+                nombre = os.path.relpath(archivo, self.base)
+            elif 'site-packages' + os.sep in archivo:
+                nombre = archivo.split('site-packages' + os.sep, 1)[1]
+            else:
+                nombre = os.path.basename(archivo)
+            nombre = self._nombres[archivo] = nombre.replace(';', '_')
+        return nombre
+
+
+def formatear_pilas(pilas: Counter) -> str:
+    """Pilas colapsadas (una por línea, ``pila muestras``), de más a menos muestras."""
+    return ''.join(f'{pila} {n}\n' for pila, n in pilas.most_common())
+
+
+def leer_pilas(rutas) -> Counter:
+    """Suma varias capturas colapsadas (p. ej. todas las de una sesión)."""
+    total = Counter()
+    for ruta in rutas:
+        with open(ruta, encoding='utf-8') as f:
+            for linea in f:
+                pila, _, n = linea.rstrip('\n').rpartition(' ')
+                if pila and n.isdigit():
+                    total[pila] += int(n)
+    return total
+
+
+class Perfilador:
+    """
+    Sesiones de perfilado compartidas por los workers y sus capturas.
+
+    Uso (hooks de petición en app/__init__.py):
+        perfilador.antes_de_peticion(request.endpoint, request.headers)
+        perfilador.despues_de_peticion(request_id, path)
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.directorio = None
+        self.max_peticiones = 50
+        self.ttl = 900
+        self.revision = 1.0
+        self.muestreador = Muestreador()
+        self._sesion = None
+        self._mtime = None
+        self._proxima_revision = 0.0
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILER_ENABLED', True)
+        self.directorio = app.config.get('PROFILER_DIR')
+        self.max_peticiones = app.config.get('PROFILER_MAX_REQUESTS', self.max_peticiones)
+        self.ttl = app.config.get('PROFILER_TTL_SECONDS', self.ttl)
+        self.revision = app.config.get('PROFILER_CHECK_SECONDS', self.revision)
+        self.muestreador.intervalo = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000
+        self.muestreador.base = os.path.dirname(app.root_path)
+        self._sesion, self._mtime, self._proxima_revision = None, None, 0.0
+
+    # ------------------------------------------------------------------
+    # Sesiones (panel de diagnóstico)
+    # ------------------------------------------------------------------
+
+    def armar(self, endpoint: Optional[str], peticiones: int, requiere_token: bool = False) -> dict:
+        """Arma una sesión nueva (sustituye a la anterior) y devuelve sus datos con el token."""
+        if not self.enabled or not self.directorio:
+            raise ValueError('El perfilador está desactivado')
+        if not endpoint and not requiere_token:
+            raise ValueError('Indica un endpoint o exige la cabecera con el token')
+        if not 1 <= peticiones <= self.max_peticiones:
+            raise ValueError(f'peticiones debe estar entre 1 y {self.max_peticiones}')
+
+        os.makedirs(self.directorio, exist_ok=True)
+        sesion = {
+            'token': secrets.token_hex(8),
+            'endpoint': endpoint or None,
+            'peticiones': peticiones,
+            'requiere_token': requiere_token,
+            'creada': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'expira': time.time() + self.ttl,
+        }
+        ruta = self._ruta(ARCHIVO_SESION)
+        with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(sesion, f)
+        os.replace(ruta + '.tmp', ruta)
+        self._proxima_revision = 0.0  # Este worker la ve en la siguiente petición
+        logger.info(f"Perfilado armado ({sesion['token']}): {endpoint or '*'} × {peticiones}")
+        return sesion
+
+    def desarmar(self) -> bool:
+        """Cancela la sesión armada (las capturas hechas se conservan)."""
+        self._proxima_revision = 0.0
+        try:
+            os.remove(self._ruta(ARCHIVO_SESION))
+            return True
+        except (OSError, TypeError):
+            return False
+
+    def sesion_activa(self) -> Optional[dict]:
+        """Sesión armada y vigente (releída del disco como mucho cada ``revision`` segundos)."""
+        ahora = time.monotonic()
+        if ahora >= self._proxima_revision:
+            self._proxima_revision = ahora + self.revision
+            self._recargar()
+        sesion = self._sesion
+        if sesion is not None and time.time() >= sesion['expira']:
+            return None
+        return sesion
+
+    def capturas(self) -> list:
+        """Sesiones con capturas en disco (más recientes primero) para el panel."""
+        if not self.directorio or not os.path.isdir(self.directorio):
+            return []
+        sesiones = {}
+        for ruta in glob.glob(self._ruta('*' + EXTENSION)):
+            token = os.path.basename(ruta).split('-', 1)[0]
+            if not PATRON_TOKEN.match(token):
+                continue
+            datos = sesiones.setdefault(token, {'token': token, 'capturas': 0, 'bytes': 0, 'fecha': 0.0})
+            estado = os.stat(ruta)
+            datos['capturas'] += 1
+            datos['bytes'] += estado.st_size
+            datos['fecha'] = max(datos['fecha'], estado.st_mtime)
+        for datos in sesiones.values():
+            datos['peticiones'] = self._leer_indice(datos['token'])
+            datos['fecha'] = datetime.fromtimestamp(datos['fecha'], timezone.utc).isoformat(timespec='seconds')
+        return sorted(sesiones.values(), key=lambda d: d['fecha'], reverse=True)
+
+    def rutas_sesion(self, token: str) -> list:
+        """Archivos de captura de una sesión (vacío si el token no es válido)."""
+        if not self.directorio or not PATRON_TOKEN.match(token or ''):
+            return []
+        return sorted(glob.glob(self._ruta(f'{token}-*{EXTENSION}')))
+
+    # ------------------------------------------------------------------
+    # Hooks de petición (ruta caliente)
+    # ------------------------------------------------------------------
+
+    def antes_de_peticion(self, endpoint: Optional[str], cabeceras) -> None:
+        if not self.enabled:
+            return
+        sesion = self.sesion_activa()
+        if sesion is None:
+            return
+        if sesion['endpoint'] and endpoint != sesion['endpoint']:
+            return
+        if sesion['requiere_token'] and not secrets.compare_digest(
+            cabeceras.get(CABECERA_TOKEN, ''), sesion['token']
+        ):
+            return
+
+        hueco = self._reservar_hueco(sesion)
+        if hueco is None:
+            return
+        self._local.captura = (hueco, sesion['token'], endpoint, time.perf_counter())
+        self.muestreador.iniciar()
+
+    def despues_de_peticion(self, request_id: Optional[str] = None, path: Optional[str] = None) -> None:
+        captura = getattr(self._local, 'captura', None)
+        if captura is None:
+            return
+        self._local.captura = None
+        pilas = self.muestreador.detener()
+        hueco, token, endpoint, inicio = captura
+        milisegundos = round((time.perf_counter() - inicio) * 1000, 2)
+        try:
+            with open(hueco, 'w', encoding='utf-8') as f:
+                f.write(formatear_pilas(pilas))
+            with open(self._ruta(f'{token}.ndjson'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'captura': os.path.basename(hueco), 'request_id': request_id, 'endpoint': endpoint,
+                    'path': path, 'ms': milisegundos, 'muestras': sum(pilas.values()),
+                }) + '\n')
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el perfil {hueco}: {e}")
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def _recargar(self) -> None:
+        """Relee ``sesion.json`` si cambió su mtime (una llamada a stat)."""
+        if not self.directorio:
+            return
+        ruta = self._ruta(ARCHIVO_SESION)
+        try:
+            mtime = os.stat(ruta).st_mtime_ns
+        except OSError:
+            self._sesion = self._mtime = None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                self._sesion = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError):
+            self._sesion = None  # A medio escribir: se reintenta en la siguiente revisión
+
+    def _reservar_hueco(self, sesion: dict) -> Optional[str]:
+        """Crea el primer ``<token>-<n>.collapsed`` libre; al agotarse, desarma la sesión."""
+        for n in range(sesion['peticiones']):
+            ruta = self._ruta(f"{sesion['token']}-{n}{EXTENSION}")
+            try:
+                os.close(os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return ruta
+            except FileExistsError:
+                continue
+            except OSError as e:
+                logger.warning(f"No se pudo reservar captura de perfilado: {e}")
+                return None
+        self._agotada(sesion['token'])
+        return None
+
+    def _agotada(self, token: str) -> None:
+        """Borra ``sesion.json`` si sigue siendo la de ``token`` (otra recién armada se respeta)."""
+        self._sesion = None
+        try:
+            with open(self._ruta(ARCHIVO_SESION), encoding='utf-8') as f:
+                if json.load(f).get('token') != token:
+                    return
+        except (OSError, ValueError):
+            return
+        self.desarmar()
+        logger.info(f"Perfilado {token} completado")
+
+    def _leer_indice(self, token: str) -> list:
+        try:
+            with open(self._ruta(f'{token}.ndjson'), encoding='utf-8') as f:
+                return [json.loads(linea) for linea in f if linea.strip()]
+        except (OSError, ValueError):
+            return []
+
+
+perfilador = Perfilador()
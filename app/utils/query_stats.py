@@ -0,0 +1,190 @@
+"""
+Instrumentación SQL por petición: conteo, tiempo, N+1 y consultas lentas.
+
+Un único par de eventos ``before/after_cursor_execute`` del Engine mide cada
+consulta y la suma a:
+
+- El ``ContadorConsultas`` de la petición actual (en ``g``): el log de acceso
+  añade ``SQL: n (ms)`` a la línea con el X-Request-ID y, al cerrar la
+  petición, se avisa si una misma sentencia se repitió
+  ``SQL_N1_THRESHOLD`` veces (posible N+1) o si se superó
+  ``SQL_QUERY_BUDGET``.
+- Los contadores activos de ``contar_consultas()`` en el hilo (tests y shell).
+- Las métricas globales (app/utils/metrics.py).
+
+Las consultas de más de ``SQL_SLOW_QUERY_MS`` y las sospechas de N+1 se
+guardan en buffers circulares por worker, visibles en el panel de
+diagnóstico.
+"""
+
+import time
+import logging
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+LONGITUD_SENTENCIA = 500  # Caracteres guardados por sentencia en los buffers
+
+
+class ContadorConsultas:
+    """Consultas, tiempo y repeticiones por sentencia de un bloque o petición."""
+
+    __slots__ = ('total', 'segundos', 'sentencias')
+
+    def __init__(self):
+        self.total = 0
+        self.segundos = 0.0
+        self.sentencias = Counter()
+
+    def registrar(self, sentencia: str, segundos: float) -> None:
+        self.total += 1
+        self.segundos += segundos
+        self.sentencias[sentencia] += 1
+
+    @property
+    def milisegundos(self) -> float:
+        return round(self.segundos * 1000, 2)
+
+    def repetidas(self, minimo: int) -> list:
+        """(sentencia, veces) ejecutadas al menos ``minimo`` veces, de más a menos."""
+        return [(s, n) for s, n in self.sentencias.most_common() if n >= minimo]
+
+    def resumen(self, limite: int = 10) -> str:
+        """Sentencias más repetidas, para mensajes de error de los tests."""
+        return '\n'.join(f'  {n}× {s[:200]}' for s, n in self.sentencias.most_common(limite))
+
+
+class InstrumentacionSQL:
+    """
+    Eventos del Engine y buffers de consultas lentas / N+1 del worker.
+
+    Uso:
+        with contar_consultas() as contador:
+            ...
+        contador.total, contador.repetidas(5)
+    """
+
+    def __init__(self):
+        self.umbral_lenta = 0.2
+        self.umbral_n1 = 5
+        self.presupuesto = 50
+        self.lentas = deque(maxlen=50)
+        self.sospechas_n1 = deque(maxlen=50)
+        self._local = threading.local()
+        self._instalado = False
+
+    def init_app(self, app):
+        """Lee umbrales de la configuración e instala los eventos (una vez por proceso)."""
+        self.umbral_lenta = app.config.get('SQL_SLOW_QUERY_MS', 200) / 1000
+        self.umbral_n1 = app.config.get('SQL_N1_THRESHOLD', self.umbral_n1)
+        self.presupuesto = app.config.get('SQL_QUERY_BUDGET', self.presupuesto)
+        tamanio = app.config.get('SQL_SLOW_BUFFER', 50)
+        if self.lentas.maxlen != tamanio:
+            self.lentas = deque(self.lentas, maxlen=tamanio)
+            self.sospechas_n1 = deque(self.sospechas_n1, maxlen=tamanio)
+        if not self._instalado:
+            from sqlalchemy import event
+            from sqlalchemy.engine import Engine
+
+            event.listen(Engine, 'before_cursor_execute', self._antes)
+            event.listen(Engine, 'after_cursor_execute', self._despues)
+            self._instalado = True
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def contar(self):
+        """Cuenta las consultas del hilo actual dentro del bloque."""
+        contador = ContadorConsultas()
+        activos = self._activos()
+        activos.append(contador)
+        try:
+            yield contador
+        finally:
+            activos.remove(contador)
+
+    def de_peticion(self) -> Optional[ContadorConsultas]:
+        """Contador de la petición actual (None si aún no hubo consultas)."""
+        return g.get('consultas_sql') if has_request_context() else None
+
+    def revisar_peticion(self, contador: ContadorConsultas, req_id: str, endpoint: Optional[str]) -> None:
+        """Avisa (log con X-Request-ID + buffer) de posibles N+1 y de presupuesto superado."""
+        repetidas = contador.repetidas(self.umbral_n1)
+        for sentencia, veces in repetidas:
+            logger.warning(f"[{req_id}] Posible N+1 en {endpoint}: {veces}× {sentencia[:200]}")
+        if repetidas:
+            self.sospechas_n1.append({
+                'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'request_id': req_id,
+                'endpoint': endpoint,
+                'consultas': contador.total,
+                'repeticiones': [{'veces': n, 'sentencia': s[:LONGITUD_SENTENCIA]} for s, n in repetidas[:3]],
+            })
+        if contador.total > self.presupuesto:
+            logger.warning(
+                f"[{req_id}] {endpoint} ejecutó {contador.total} consultas SQL "
+                f"({contador.milisegundos}ms; presupuesto {self.presupuesto})"
+            )
+
+    def estado(self) -> dict:
+        """Buffers del worker (más recientes primero) para el panel de diagnóstico."""
+        return {
+            'umbral_lenta_ms': round(self.umbral_lenta * 1000),
+            'umbral_n1': self.umbral_n1,
+            'lentas': list(reversed(self.lentas)),
+            'sospechas_n1': list(reversed(self.sospechas_n1)),
+        }
+
+    # ------------------------------------------------------------------
+    # Eventos del Engine
+    # ------------------------------------------------------------------
+
+    def _activos(self) -> list:
+        activos = getattr(self._local, 'activos', None)
+        if activos is None:
+            activos = self._local.activos = []
+        return activos
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['sql_inicio'] = time.perf_counter()
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info.pop('sql_inicio', None)
+        if inicio is None:
+            return
+        segundos = time.perf_counter() - inicio
+
+        from app.utils.metrics import metricas
+        metricas.contar_consulta(segundos)
+
+        for contador in self._activos():
+            contador.registrar(statement, segundos)
+
+        endpoint = req_id = None
+        if has_request_context():
+            contador = g.get('consultas_sql')
+            if contador is None:
+                contador = g.consultas_sql = ContadorConsultas()
+            contador.registrar(statement, segundos)
+            endpoint, req_id = request.endpoint, g.get('request_id')
+
+        if segundos >= self.umbral_lenta:
+            self.lentas.append({
+                'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'ms': round(segundos * 1000, 2),
+                'sentencia': statement[:LONGITUD_SENTENCIA],
+                'endpoint': endpoint,
+                'request_id': req_id,
+            })
+
+
+instrumentacion_sql = InstrumentacionSQL()
+contar_consultas = instrumentacion_sql.contar
@@ -0,0 +1,282 @@
+"""
+Servicio de búsqueda de texto completo para artículos.
+
+Un único punto de entrada (``buscar_articulos``) para la ruta /categorias?q=,
+con backend según el motor de la base de datos:
+
+    - MySQL:  MATCH ... AGAINST en modo booleano sobre índices FULLTEXT
+    - SQLite: FTS5 con ranking bm25
+    - Otros:  LIKE sobre el texto normalizado (fallback sin índice)
+
+Documento y consulta se normalizan igual (minúsculas, sin acentos), por lo que
+"estres" encuentra "Estrés". El número de candidatos está acotado por
+SEARCH_MAX_RESULTS para mantener el tiempo de consulta acotado.
+"""
+
+import os
+import re
+import logging
+import unicodedata
+from typing import Callable, Optional
+
+from flask import current_app
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db, cache
+from app.models.articulo import Articulo
+from app.models.busqueda import ArticuloBusqueda
+
+logger = logging.getLogger(__name__)
+
+# Límites de la consulta
+MIN_TERM_LENGTH = 2
+MAX_TERMS = 8
+MYSQL_MIN_TOKEN_SIZE = 3  # innodb_ft_min_token_size por defecto
+
+# Tiempo de vida de resultados en caché (consultas repetidas al teclear)
+SEARCH_CACHE_TIMEOUT = 60
+SEARCH_VERSION_KEY = 'busqueda:version'
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """
+    Normaliza texto para indexación y búsqueda.
+
+    Examples:
+        >>> normalizar_texto('Estrés  y ANSIEDAD')
+        'estres y ansiedad'
+    """
+    if not texto:
+        return ''
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def extraer_terminos(consulta: str) -> list:
+    """Extrae términos alfanuméricos únicos de la consulta del usuario."""
+    terminos = []
+    for termino in re.findall(r'[a-z0-9]+', normalizar_texto(consulta)):
+        if len(termino) >= MIN_TERM_LENGTH and termino not in terminos:
+            terminos.append(termino)
+    return terminos[:MAX_TERMS]
+
+
+class ResultadosBusqueda(Pagination):
+    """
+    Paginación sobre una lista de ids ya ordenada por relevancia.
+
+    Expone la misma interfaz que ``query.paginate()`` para que los templates
+    (components/pagination.html) no distingan entre búsqueda y listado.
+    """
+
+    def __init__(self, ids: list, page: int, per_page: int):
+        self._ids = ids
+        super().__init__(page=page, per_page=per_page, max_per_page=None, error_out=False)
+
+    def _query_items(self) -> list:
+        ids_pagina = self._ids[self._query_offset:self._query_offset + self.per_page]
+        if not ids_pagina:
+            return []
+        # Los ids vienen de caché: un artículo enviado a la papelera después no se muestra
+        articulos = {
+            a.id: a
+            for a in Articulo.query.filter(Articulo.id.in_(ids_pagina), Articulo.deleted_at.is_(None)).all()
+        }
+        return [articulos[i] for i in ids_pagina if i in articulos]
+
+    def _query_count(self) -> int:
+        return len(self._ids)
+
+
+# =============================================================================
+# INDEXACIÓN
+# =============================================================================
+
+def valores_busqueda(titulo: str, tags: Optional[str], categoria: Optional[str],
+                     descripcion: Optional[str]) -> dict:
+    """Columnas normalizadas del documento (sin cuerpo), también para INSERT masivos."""
+    from app.constants import get_category_display_name
+
+    etiquetas = f"{tags or ''} {get_category_display_name(categoria or '')}"
+    return {
+        'titulo': normalizar_texto(titulo)[:200],
+        'tags': normalizar_texto(etiquetas)[:400],
+        'descripcion': normalizar_texto(descripcion)[:300],
+    }
+
+
+def indexar_articulo(articulo: Articulo, texto_cuerpo: Optional[str] = None) -> None:
+    """
+    Crea o actualiza el documento de búsqueda de un artículo (sin commit).
+
+    Args:
+        articulo: Artículo con id asignado (usar db.session.flush() si es nuevo)
+        texto_cuerpo: Texto plano del HTML; None conserva el cuerpo indexado
+    """
+    doc = db.session.get(ArticuloBusqueda, articulo.id)
+    if doc is None:
+        doc = ArticuloBusqueda(articulo_id=articulo.id, cuerpo='')
+        db.session.add(doc)
+
+    valores = valores_busqueda(articulo.titulo, articulo.tags, articulo.categoria, articulo.descripcion)
+    doc.titulo = valores['titulo']
+    doc.tags = valores['tags']
+    doc.descripcion = valores['descripcion']
+    if texto_cuerpo is not None:
+        doc.cuerpo = normalizar_texto(texto_cuerpo)
+
+
+def reindexar_articulos(base_dir: str, batch_size: int = 500,
+                        reportar: Optional[Callable[[int, int, int], None]] = None) -> tuple:
+    """
+    Reconstruye el índice de todos los artículos, un commit por lote.
+
+    Usado por ``flask content reindex-search`` y por el trabajo
+    'reindexar_busqueda' (app/utils/jobs.py).
+
+    Args:
+        base_dir: Raíz del proyecto (templates/articulos)
+        batch_size: Artículos por lote/transacción
+        reportar: Callback (indexados, total, ultimo_id) tras cada lote
+
+    Returns:
+        Tupla (indexados, sin_archivo)
+    """
+    from app.utils.ingest import analizar_html
+
+    total = Articulo.query.count()
+    indexados = 0
+    faltantes = 0
+    ultimo_id = 0
+
+    while True:
+        articulos = Articulo.query.filter(Articulo.id > ultimo_id).order_by(Articulo.id).limit(batch_size).all()
+        if not articulos:
+            break
+
+        for art in articulos:
+            ruta = os.path.join(base_dir, 'templates', 'articulos', art.nombre_archivo)
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    texto = analizar_html(f.read())['texto']
+            except OSError:
+                faltantes += 1
+                texto = ''  # Indexar al menos título, tags y descripción
+            indexar_articulo(art, texto)
+
+        db.session.commit()
+        indexados += len(articulos)
+        ultimo_id = articulos[-1].id
+        if reportar:
+            reportar(indexados, total, ultimo_id)
+
+    return indexados, faltantes
+
+
+# =============================================================================
+# BACKENDS DE CONSULTA
+# =============================================================================
+
+def _ids_sqlite(terminos: list, limite: int) -> list:
+    """FTS5: términos con prefijo en AND implícito, ranking bm25 ponderado."""
+    consulta_fts = ' '.join(f'"{t}"*' for t in terminos)
+    filas = db.session.execute(text(
+        "SELECT articulo_busqueda_fts.rowid FROM articulo_busqueda_fts "
+        "JOIN articulo ON articulo.id = articulo_busqueda_fts.rowid "
+        "WHERE articulo_busqueda_fts MATCH :q AND articulo.deleted_at IS NULL "
+        "ORDER BY bm25(articulo_busqueda_fts, 10.0, 5.0, 2.0, 1.0) "
+        "LIMIT :limite"
+    ), {'q': consulta_fts, 'limite': limite})
+    return [fila[0] for fila in filas]
+
+
+def _ids_mysql(terminos: list, limite: int) -> list:
+    """FULLTEXT en modo booleano; título/tags pesan el triple."""
+    terminos = [t for t in terminos if len(t) >= MYSQL_MIN_TOKEN_SIZE]
+    if not terminos:
+        return []
+    consulta_ft = ' '.join(f'+{t}*' for t in terminos)
+    filas = db.session.execute(text(
+        "SELECT b.articulo_id FROM articulo_busqueda b "
+        "JOIN articulo a ON a.id = b.articulo_id "
+        "WHERE MATCH(b.titulo, b.tags, b.descripcion, b.cuerpo) AGAINST (:q IN BOOLEAN MODE) "
+        "AND a.deleted_at IS NULL "
+        "ORDER BY (3 * MATCH(b.titulo, b.tags) AGAINST (:q IN BOOLEAN MODE) "
+        "+ MATCH(b.titulo, b.tags, b.descripcion, b.cuerpo) AGAINST (:q IN BOOLEAN MODE)) DESC "
+        "LIMIT :limite"
+    ), {'q': consulta_ft, 'limite': limite})
+    return [fila[0] for fila in filas]
+
+
+def _ids_fallback(terminos: list, limite: int) -> list:
+    """LIKE sobre el documento normalizado (motores sin índice de texto completo)."""
+    query = db.session.query(ArticuloBusqueda.articulo_id).join(
+        Articulo, Articulo.id == ArticuloBusqueda.articulo_id
+    ).filter(Articulo.deleted_at.is_(None))
+    for termino in terminos:
+        patron = f'%{termino}%'
+        query = query.filter(
+            ArticuloBusqueda.titulo.like(patron) |
+            ArticuloBusqueda.tags.like(patron) |
+            ArticuloBusqueda.descripcion.like(patron) |
+            ArticuloBusqueda.cuerpo.like(patron)
+        )
+    return [fila[0] for fila in query.order_by(Articulo.fecha.desc()).limit(limite)]
+
+
+_BACKENDS = {
+    'sqlite': _ids_sqlite,
+    'mysql': _ids_mysql,
+    'mariadb': _ids_mysql,
+}
+
+
+def buscar_ids(consulta: str, limite: Optional[int] = None) -> list:
+    """
+    Retorna ids de artículos activos ordenados por relevancia.
+
+    Args:
+        consulta: Texto libre del usuario
+        limite: Máximo de candidatos (default: SEARCH_MAX_RESULTS)
+    """
+    terminos = extraer_terminos(consulta)
+    if not terminos:
+        return []
+
+    limite = limite or current_app.config.get('SEARCH_MAX_RESULTS', 500)
+    clave_cache = f"busqueda:{cache.get(SEARCH_VERSION_KEY) or 0}:{limite}:{' '.join(terminos)}"
+    ids = cache.get(clave_cache)
+    if ids is not None:
+        return ids
+
+    backend = _BACKENDS.get(db.engine.dialect.name, _ids_fallback)
+    try:
+        ids = backend(terminos, limite)
+    except SQLAlchemyError as e:
+        # Índice no disponible (p.ej. migración pendiente): degradar sin romper la página
+        logger.error(f"Error en búsqueda de texto completo: {e.__class__.__name__}")
+        db.session.rollback()
+        ids = _ids_fallback(terminos, limite)
+
+    cache.set(clave_cache, ids, timeout=SEARCH_CACHE_TIMEOUT)
+    return ids
+
+
+def invalidar_busqueda() -> None:
+    """
+    Descarta los candidatos cacheados (papelera, restauración, sincronización, importación).
+
+    Contador de generación como ``invalidar_totales()``: con la caché por
+    worker solo afecta al worker actual; en los demás los borrados ya se
+    filtran al cargar la página y las restauraciones tardan como mucho
+    SEARCH_CACHE_TIMEOUT en aparecer.
+    """
+    cache.set(SEARCH_VERSION_KEY, (cache.get(SEARCH_VERSION_KEY) or 0) + 1, timeout=0)
+
+
+def buscar_articulos(consulta: str, page: int, per_page: int) -> ResultadosBusqueda:
+    """Búsqueda paginada compatible con components/pagination.html."""
+    return ResultadosBusqueda(buscar_ids(consulta), page=page, per_page=per_page)
@@ -0,0 +1,219 @@
+"""
+Generación de sitemaps XML en streaming, particionada y cacheada.
+
+El sitemap se construye con un generador que recorre solo las columnas
+necesarias de ``articulo`` (``yield_per``) y escribe el XML por fragmentos
+directamente en un buffer gzip, sin cargar objetos ORM completos ni
+concatenar cadenas.
+
+Cuando el total de URLs supera ``SITEMAP_MAX_URLS`` (50.000 según el
+protocolo), ``/sitemap.xml`` pasa a ser un índice que enlaza a los hijos
+``/sitemap-<n>.xml``.
+
+Cada variante se cachea ya comprimida en una única clave por parte, junto
+a la huella del contenido (número de artículos activos, max(updated_at) y
+versión del registro de categorías): cualquier alta, edición o baja cambia
+la huella y la parte se regenera y sobrescribe en la siguiente petición, de
+modo que la caché nunca guarda más de una versión. La misma huella sirve de
+``ETag``.
+"""
+
+import gzip
+import hashlib
+import logging
+from io import BytesIO
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.extensions import db, cache
+from app.models.articulo import Articulo
+from app.utils.category_registry import category_registry
+
+logger = logging.getLogger(__name__)
+
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Páginas estáticas principales: (ruta, changefreq, priority)
+PAGINAS_ESTATICAS = (
+    ('/', 'daily', '1.0'),
+    ('/categorias', 'daily', '0.9'),
+    ('/info/nosotros', 'monthly', '0.5'),
+    ('/info/filosofia', 'monthly', '0.4'),
+    ('/info/editorial', 'monthly', '0.5'),  # E-E-A-T
+    ('/info/politica', 'yearly', '0.3'),
+    ('/info/contacto', 'monthly', '0.5'),
+    ('/info/legal', 'yearly', '0.3'),
+    ('/info/solicitar', 'monthly', '0.6'),
+)
+
+
+class EstadoSitemap(NamedTuple):
+    """Huella del contenido publicado (una consulta agregada)"""
+    total_articulos: int
+    ultima_modificacion: Optional[datetime]
+    huella: str
+
+
+def _base_url() -> str:
+    return current_app.config.get('SITE_URL', 'https://www.nexusciencia.com').rstrip('/')
+
+
+def estado_sitemap() -> EstadoSitemap:
+    """Calcula la huella del sitemap sin recorrer los artículos."""
+    total, ultima = db.session.query(
+        func.count(Articulo.id),
+        func.max(func.coalesce(Articulo.updated_at, Articulo.fecha))
+    ).filter(Articulo.deleted_at.is_(None)).one()
+
+    if isinstance(ultima, str):  # SQLite devuelve texto en expresiones agregadas
+        ultima = datetime.fromisoformat(ultima)
+    if ultima is not None and ultima.tzinfo is None:
+        ultima = ultima.replace(tzinfo=timezone.utc)
+
+    partes = (
+        total,
+        ultima.isoformat() if ultima else '',
+        category_registry.actual().version,
+        _base_url(),
+        current_app.config.get('SITEMAP_MAX_URLS', 50000),
+    )
+    huella = hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()[:20]
+    return EstadoSitemap(total, ultima, huella)
+
+
+# =============================================================================
+# URLS
+# =============================================================================
+
+def _fecha_iso(fecha: Optional[datetime]) -> str:
+    return fecha.strftime('%Y-%m-%d') if fecha else ''
+
+
+def _urls_fijas(lastmod: str) -> list:
+    """Páginas estáticas y de categoría: (loc, lastmod, changefreq, priority)."""
+    base = _base_url()
+    urls = [(base + ruta, lastmod, changefreq, priority) for ruta, changefreq, priority in PAGINAS_ESTATICAS]
+
+    registro = category_registry.actual()
+    for nombre in registro.nombres:
+        urls.append((f"{base}/categoria/{registro.slug(nombre)}", lastmod, 'weekly', '0.8'))
+    return urls
+
+
+def _urls_articulos(offset: int, limite: int) -> Iterator[tuple]:
+    """Artículos activos por id, en lotes de ``SITEMAP_YIELD_PER`` filas (solo columnas)."""
+    if limite <= 0:
+        return
+
+    base = _base_url()
+    registro = category_registry.actual()
+    query = db.session.query(
+        Articulo.slug, Articulo.categoria, Articulo.updated_at, Articulo.fecha
+    ).filter(
+        Articulo.deleted_at.is_(None)
+    ).order_by(Articulo.id).offset(offset).limit(limite).yield_per(
+        current_app.config.get('SITEMAP_YIELD_PER', 1000)
+    )
+
+    for slug, categoria, updated_at, fecha in query:
+        yield (f"{base}/categoria/{registro.slug(categoria)}/{slug}",
+               _fecha_iso(updated_at or fecha), 'monthly', '0.7')
+
+
+# =============================================================================
+# ESCRITURA XML
+# =============================================================================
+
+def _xml_urlset(urls) -> Iterator[str]:
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+    for loc, lastmod, changefreq, priority in urls:
+        fragmento = f'  <url>\n    <loc>{escape(loc)}</loc>\n'
+        if lastmod:
+            fragmento += f'    <lastmod>{lastmod}</lastmod>\n'
+        yield fragmento + f'    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n'
+    yield '</urlset>'
+
+
+def _xml_indice(locs, lastmod: str) -> Iterator[str]:
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n'
+    for loc in locs:
+        fragmento = f'  <sitemap>\n    <loc>{escape(loc)}</loc>\n'
+        if lastmod:
+            fragmento += f'    <lastmod>{lastmod}</lastmod>\n'
+        yield fragmento + '  </sitemap>\n'
+    yield '</sitemapindex>'
+
+
+def _comprimir(fragmentos: Iterator[str]) -> bytes:
+    """Escribe los fragmentos en un buffer gzip a medida que se generan."""
+    buffer = BytesIO()
+    # mtime=0: salida determinista para la misma huella
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6, mtime=0) as gz:
+        for fragmento in fragmentos:
+            gz.write(fragmento.encode('utf-8'))
+    return buffer.getvalue()
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def numero_de_partes(estado: EstadoSitemap) -> int:
+    """Sitemaps hijos necesarios para todas las URLs (1 = sin índice)."""
+    maximo = current_app.config.get('SITEMAP_MAX_URLS', 50000)
+    total_urls = len(PAGINAS_ESTATICAS) + len(category_registry.actual()) + estado.total_articulos
+    return max(1, -(-total_urls // maximo))
+
+
+def _generar_parte(estado: EstadoSitemap, numero: int) -> Iterator[str]:
+    maximo = current_app.config.get('SITEMAP_MAX_URLS', 50000)
+    inicio, fin = (numero - 1) * maximo, numero * maximo
+
+    fijas = _urls_fijas(_fecha_iso(estado.ultima_modificacion))
+    urls_fijas = fijas[inicio:fin]
+    offset = max(0, inicio - len(fijas))
+    limite = (fin - inicio) - len(urls_fijas)
+
+    def urls():
+        yield from urls_fijas
+        yield from _urls_articulos(offset, limite)
+
+    return _xml_urlset(urls())
+
+
+def sitemap_gz(estado: EstadoSitemap, numero: Optional[int] = None) -> Optional[bytes]:
+    """
+    Sitemap comprimido desde caché (se genera si cambió la huella).
+
+    Args:
+        estado: Resultado de ``estado_sitemap()``
+        numero: None para /sitemap.xml (índice o único urlset), n para el hijo n
+
+    Returns:
+        Bytes gzip, o None si la parte no existe
+    """
+    partes = numero_de_partes(estado)
+    if numero is not None and not 1 <= numero <= partes:
+        return None
+
+    nombre = 'raiz' if numero is None else str(numero)
+    clave = f'sitemap:{nombre}'
+    guardado = cache.get(clave)  # (huella, gzip): una sola versión por parte
+    if guardado is not None and guardado[0] == estado.huella:
+        return guardado[1]
+
+    if numero is None and partes > 1:
+        base = _base_url()
+        fragmentos = _xml_indice((f"{base}/sitemap-{n}.xml" for n in range(1, partes + 1)),
+                                 _fecha_iso(estado.ultima_modificacion))
+    else:
+        fragmentos = _generar_parte(estado, numero or 1)
+
+    contenido = _comprimir(fragmentos)
+    cache.set(clave, (estado.huella, contenido), timeout=current_app.config.get('SITEMAP_CACHE_SECONDS', 86400))
+    logger.info(f"Sitemap {nombre} regenerado ({len(contenido)} bytes gzip, {partes} partes)")
+    return contenido
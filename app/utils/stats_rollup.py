@@ -0,0 +1,200 @@
+"""
+Rollups diarios de log_actividad (estadísticas materializadas).
+
+``flask stats rollup`` recorre por id los eventos posteriores a la marca
+(high-water mark) de ``rollup_marca`` y suma, por lote y en la misma
+transacción que avanza la marca:
+
+- ``daily_stats``: eventos por (día, tipo_evento).
+- ``article_daily_stats``: lecturas por (artículo, día), a partir de los
+  detalles "Leído: <slug>".
+
+Así cada evento se cuenta exactamente una vez y las consultas del panel
+(total de visitas, más leídos, serie diaria) leen O(días) filas en lugar de
+contar O(eventos).
+
+Los eventos más recientes que ``STATS_ROLLUP_LAG_SECONDS`` se dejan para la
+siguiente pasada: da margen a que terminen de confirmarse las transacciones
+con ids menores (el buffer write-behind inserta con cierto retraso) antes
+de que la marca los deje atrás.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.models.articulo import Articulo
+from app.models.estadistica import EstadisticaArticuloDia, EstadisticaDia, MarcaRollup
+from app.models.log import LogActividad
+
+logger = logging.getLogger(__name__)
+
+MARCA_LOG = 'log_actividad'
+PREFIJO_LECTURA_ARTICULO = 'Leído: '  # Ver app/utils/analytics_buffer.py
+
+
+class RollupConcurrente(Exception):
+    """Otro proceso avanzó la marca durante el lote (se descarta el lote)."""
+    pass
+
+
+def marca_actual() -> int:
+    """Último id de log_actividad ya acumulado (0 si nunca se ejecutó)."""
+    marca = db.session.get(MarcaRollup, MARCA_LOG)
+    return marca.ultimo_id if marca else 0
+
+
+def _asegurar_marca() -> int:
+    marca = db.session.get(MarcaRollup, MARCA_LOG)
+    if marca is not None:
+        return marca.ultimo_id
+    try:
+        db.session.add(MarcaRollup(nombre=MARCA_LOG, ultimo_id=0))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # La creó otro proceso a la vez
+    return marca_actual()
+
+
+def _sumar(modelo, claves: dict, columna: str, incremento: int) -> None:
+    """UPDATE columna = columna + n; INSERT si la fila aún no existe."""
+    filtro = [getattr(modelo, nombre) == valor for nombre, valor in claves.items()]
+    actualizadas = db.session.execute(
+        update(modelo).where(*filtro).values({columna: getattr(modelo, columna) + incremento})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not actualizadas:
+        db.session.add(modelo(**claves, **{columna: incremento}))
+
+
+def _acumular_lote(filas: list, anterior: int) -> None:
+    """Suma un lote de eventos y avanza la marca (un commit)."""
+    por_tipo = {}
+    por_slug = {}
+    for fila in filas:
+        dia = fila.fecha.date()
+        por_tipo[(dia, fila.tipo_evento)] = por_tipo.get((dia, fila.tipo_evento), 0) + 1
+        if fila.tipo_evento == LogEventType.LECTURA.value and fila.detalle \
+                and fila.detalle.startswith(PREFIJO_LECTURA_ARTICULO):
+            slug = fila.detalle[len(PREFIJO_LECTURA_ARTICULO):]
+            por_slug[(slug, dia)] = por_slug.get((slug, dia), 0) + 1
+
+    # La marca va primero: el UPDATE condicional serializa ejecuciones concurrentes
+    avanzada = db.session.execute(
+        update(MarcaRollup)
+        .where(MarcaRollup.nombre == MARCA_LOG, MarcaRollup.ultimo_id == anterior)
+        .values(ultimo_id=filas[-1].id, actualizado_en=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not avanzada:
+        db.session.rollback()
+        raise RollupConcurrente()
+
+    for (dia, tipo), total in por_tipo.items():
+        _sumar(EstadisticaDia, {'dia': dia, 'tipo_evento': tipo}, 'total', total)
+
+    slugs = {slug for slug, _ in por_slug}
+    ids = dict(db.session.query(Articulo.slug, Articulo.id).filter(Articulo.slug.in_(slugs))) if slugs else {}
+    por_articulo = {}
+    for (slug, dia), total in por_slug.items():
+        if slug in ids:  # Slugs de artículos ya borrados definitivamente se ignoran
+            por_articulo[(ids[slug], dia)] = por_articulo.get((ids[slug], dia), 0) + total
+    for (articulo_id, dia), total in por_articulo.items():
+        _sumar(EstadisticaArticuloDia, {'articulo_id': articulo_id, 'dia': dia}, 'lecturas', total)
+
+    db.session.commit()
+
+
+def acumular_estadisticas(batch_size: Optional[int] = None,
+                          reportar: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    Acumula los eventos nuevos en las tablas de estadísticas.
+
+    Args:
+        batch_size: Eventos por lote/transacción (default STATS_ROLLUP_BATCH)
+        reportar: Callback (eventos acumulados, marca) tras cada lote
+
+    Returns:
+        dict con 'eventos', 'lotes' y 'marca'
+    """
+    batch_size = batch_size or current_app.config.get('STATS_ROLLUP_BATCH', 5000)
+    retraso = current_app.config.get('STATS_ROLLUP_LAG_SECONDS', 60)
+    limite = (datetime.now(timezone.utc) - timedelta(seconds=retraso)).replace(tzinfo=None)
+
+    marca = _asegurar_marca()
+    eventos = lotes = 0
+    while True:
+        filas = db.session.query(
+            LogActividad.id, LogActividad.tipo_evento, LogActividad.detalle, LogActividad.fecha
+        ).filter(LogActividad.id > marca).order_by(LogActividad.id).limit(batch_size).all()
+
+        # Cortar en el primer evento demasiado reciente (la marca solo avanza en orden de id)
+        recientes = next((i for i, f in enumerate(filas) if f.fecha is None or f.fecha >= limite), None)
+        completo = len(filas) == batch_size and recientes is None
+        if recientes is not None:
+            filas = filas[:recientes]
+        if not filas:
+            break
+
+        _acumular_lote(filas, marca)
+        marca = filas[-1].id
+        eventos += len(filas)
+        lotes += 1
+        if reportar:
+            reportar(eventos, marca)
+        if not completo:
+            break
+
+    if eventos:
+        logger.info(f"Rollup de estadísticas: {eventos} eventos en {lotes} lotes (marca {marca})")
+    return {'eventos': eventos, 'lotes': lotes, 'marca': marca}
+
+
+# =============================================================================
+# CONSULTAS (O(días))
+# =============================================================================
+
+def total_eventos(tipo: LogEventType) -> int:
+    """Total histórico de un tipo: rollup + eventos aún no acumulados (posteriores a la marca)."""
+    acumulado = db.session.query(func.coalesce(func.sum(EstadisticaDia.total), 0)).filter(
+        EstadisticaDia.tipo_evento == tipo.value
+    ).scalar()
+    pendientes = LogActividad.query.filter(
+        LogActividad.id > marca_actual(), LogActividad.tipo_evento == tipo.value
+    ).order_by(None).count()
+    return int(acumulado) + pendientes
+
+
+def serie_diaria(dias: int = 30, tipo: LogEventType = LogEventType.LECTURA, hoy: Optional[date] = None) -> list:
+    """Eventos por día de los últimos ``dias`` días (ceros incluidos), hasta el último rollup."""
+    hoy = hoy or datetime.now(timezone.utc).date()
+    desde = hoy - timedelta(days=dias - 1)
+    totales = dict(db.session.query(EstadisticaDia.dia, EstadisticaDia.total).filter(
+        EstadisticaDia.tipo_evento == tipo.value, EstadisticaDia.dia >= desde
+    ))
+    return [
+        {'dia': (desde + timedelta(days=i)).isoformat(), 'total': totales.get(desde + timedelta(days=i), 0)}
+        for i in range(dias)
+    ]
+
+
+def mas_leidos(dias: int = 30, limite: int = 10, hoy: Optional[date] = None) -> list:
+    """Artículos activos con más lecturas en los últimos ``dias`` días."""
+    hoy = hoy or datetime.now(timezone.utc).date()
+    lecturas = func.sum(EstadisticaArticuloDia.lecturas).label('lecturas')
+    filas = db.session.query(Articulo.id, Articulo.titulo, Articulo.slug, lecturas).join(
+        EstadisticaArticuloDia, EstadisticaArticuloDia.articulo_id == Articulo.id
+    ).filter(
+        EstadisticaArticuloDia.dia >= hoy - timedelta(days=dias - 1),
+        Articulo.deleted_at.is_(None),
+    ).group_by(Articulo.id, Articulo.titulo, Articulo.slug).order_by(lecturas.desc(), Articulo.id).limit(limite)
+    return [
+        {'id': f.id, 'titulo': f.titulo, 'slug': f.slug, 'lecturas': int(f.lecturas)}
+        for f in filas
+    ]
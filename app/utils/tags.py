@@ -0,0 +1,123 @@
+"""
+Parseo y sincronización de etiquetas de artículos.
+
+Fuente única de la normalización de tags: la usan el panel de administración,
+scripts/inyectar_datos.py, la migración inicial (copia congelada) y los
+templates para construir enlaces a /tag/<slug>.
+
+``Articulo.tags`` se conserva como texto visible ("tag1, tag2"); la tabla
+``tag`` + ``articulo_tag`` es la que se consulta.
+"""
+
+import re
+import logging
+import unicodedata
+
+from sqlalchemy import func
+
+from app.extensions import db, cache
+
+logger = logging.getLogger(__name__)
+
+MAX_TAG_LENGTH = 60
+MAX_TAGS_POR_ARTICULO = 20
+
+# Índice de conteos cacheado (nube de tags / autocompletado del admin)
+TAG_COUNTS_CACHE_KEY = 'tags:conteos'
+TAG_COUNTS_CACHE_TIMEOUT = 600
+
+
+def slugify_tag(nombre: str) -> str:
+    """
+    Normaliza un tag a su slug: sin acentos, minúsculas, guiones.
+
+    Examples:
+        >>> slugify_tag('  Memoria de Trabajo ')
+        'memoria-de-trabajo'
+        >>> slugify_tag('Inspiración')
+        'inspiracion'
+    """
+    valor = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode('ascii')
+    valor = re.sub(r'[^\w\s-]', '', valor).strip().lower()
+    return re.sub(r'[-\s_]+', '-', valor).strip('-')
+
+
+def parsear_tags(texto: str) -> list:
+    """
+    Divide el texto de tags separado por comas en pares (nombre, slug).
+
+    Descarta vacíos y duplicados (por slug) preservando el orden.
+    """
+    resultado = []
+    vistos = set()
+    for parte in (texto or '').split(','):
+        nombre = ' '.join(parte.split())[:MAX_TAG_LENGTH]
+        slug = slugify_tag(nombre)
+        if not slug or slug in vistos:
+            continue
+        vistos.add(slug)
+        resultado.append((nombre, slug))
+    return resultado[:MAX_TAGS_POR_ARTICULO]
+
+
+def sincronizar_tags(articulo, texto: str) -> None:
+    """
+    Asigna los tags del texto a un artículo (sin commit).
+
+    Actualiza el texto visible ``articulo.tags`` y la relación normalizada,
+    creando las filas de ``tag`` que falten con una sola consulta IN.
+    """
+    from app.models.tag import Tag
+
+    pares = parsear_tags(texto)
+    articulo.tags = ', '.join(nombre for nombre, _ in pares)
+
+    slugs = [slug for _, slug in pares]
+    existentes = {}
+    if slugs:
+        existentes = {t.slug: t for t in Tag.query.filter(Tag.slug.in_(slugs)).all()}
+
+    etiquetas = []
+    for nombre, slug in pares:
+        tag = existentes.get(slug)
+        if tag is None:
+            tag = Tag(nombre=nombre, slug=slug)
+            db.session.add(tag)
+            existentes[slug] = tag
+        etiquetas.append(tag)
+
+    articulo.etiquetas = etiquetas
+    invalidar_conteos_tags()
+
+
+def contar_tags() -> list:
+    """
+    Índice de tags con número de artículos activos, cacheado.
+
+    Returns:
+        Lista de dicts {'nombre', 'slug', 'total'} ordenada por total desc
+    """
+    conteos = cache.get(TAG_COUNTS_CACHE_KEY)
+    if conteos is not None:
+        return conteos
+
+    from app.models.articulo import Articulo
+    from app.models.tag import Tag, articulo_tag
+
+    total = func.count(articulo_tag.c.articulo_id)
+    filas = db.session.query(Tag.nombre, Tag.slug, total).join(
+        articulo_tag, articulo_tag.c.tag_id == Tag.id
+    ).join(
+        Articulo, Articulo.id == articulo_tag.c.articulo_id
+    ).filter(
+        Articulo.deleted_at.is_(None)
+    ).group_by(Tag.id, Tag.nombre, Tag.slug).order_by(total.desc(), Tag.slug).all()
+
+    conteos = [{'nombre': nombre, 'slug': slug, 'total': n} for nombre, slug, n in filas]
+    cache.set(TAG_COUNTS_CACHE_KEY, conteos, timeout=TAG_COUNTS_CACHE_TIMEOUT)
+    return conteos
+
+
+def invalidar_conteos_tags() -> None:
+    """Descarta el índice de conteos (altas, ediciones y borrados de artículos)."""
+    cache.delete(TAG_COUNTS_CACHE_KEY)
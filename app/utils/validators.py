@@ -81,7 +81,7 @@ def validar_url_segura(url: Optional[str]) -> bool:
 
 def validar_categoria_nombre(nombre: Optional[str]) -> bool:
     """
-    Valida que un nombre de categoría exista en la base de datos.
+    Valida que un nombre sea una categoría activa (registro: BD o fallback).
     
     Args:
         nombre: Nombre de la categoría a validar
@@ -90,12 +90,12 @@ def validar_categoria_nombre(nombre: Optional[str]) -> bool:
         bool: True si la categoría existe, False en caso contrario
     """
     # Importación tardía para evitar circular imports
-    from app.models.categoria import Categoria
+    from app.utils.category_registry import category_registry
     
     if not nombre or nombre.strip() == '':
         return True  # Categoría vacía es válida (opcional)
     
-    return Categoria.query.filter_by(nombre=nombre.strip(), activa=True).first() is not None
+    return category_registry.actual().es_valida(nombre.strip())
 
 
 def validar_longitud(texto: Optional[str], max_length: int) -> bool:
@@ -0,0 +1,188 @@
+"""
+Vigilante de peticiones lentas: pilas de los workers atascados.
+
+Gunicorn mata con ``--timeout 120`` a un worker colgado (MySQL lento,
+saneado de una subida enorme...) sin dejar rastro. Cada petición se anota
+al empezar (hilo, X-Request-ID, endpoint, ruta) y se borra al terminar; un
+hilo de fondo por worker revisa las peticiones en curso cada
+``WATCHDOG_CHECK_SECONDS`` y, cuando una supera ``WATCHDOG_THRESHOLD_SECONDS``,
+toma la pila de su hilo con ``sys._current_frames()``, la escribe en el log
+con el X-Request-ID y la guarda en un buffer circular de
+``WATCHDOG_BUFFER`` capturas, visible en el panel de diagnóstico.
+
+Una petición que sigue atascada se vuelve a capturar cada umbral (30s,
+60s, 90s...): comparar pilas sucesivas muestra si avanza o está bloqueada
+siempre en el mismo punto antes de que Gunicorn la mate.
+"""
+
+import os
+import sys
+import time
+import atexit
+import logging
+import threading
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MARCOS_POR_PILA = 60  # Los más internos, que son los que señalan el bloqueo
+
+
+class VigilantePeticiones:
+    """
+    Peticiones en curso del worker y capturas de las que superan el umbral.
+
+    Uso (hooks de petición en app/__init__.py):
+        vigilante.iniciar_peticion(request_id, endpoint, method, path)
+        vigilante.terminar_peticion()
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.umbral = 30.0
+        self.intervalo = 1.0
+        self.capturas = deque(maxlen=20)
+        self.total_capturas = 0
+        self._en_curso = {}  # ident del hilo -> datos de la petición
+        self._stop = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._atexit_registrado = False
+
+    def init_app(self, app):
+        """Lee umbral, periodo y tamaño del buffer de la configuración."""
+        self.enabled = app.config.get('WATCHDOG_ENABLED', True)
+        self.umbral = float(app.config.get('WATCHDOG_THRESHOLD_SECONDS', self.umbral))
+        self.intervalo = float(app.config.get('WATCHDOG_CHECK_SECONDS', self.intervalo))
+        tamanio = app.config.get('WATCHDOG_BUFFER', 20)
+        if self.capturas.maxlen != tamanio:
+            self.capturas = deque(self.capturas, maxlen=tamanio)
+        if not self._atexit_registrado:
+            atexit.register(self.detener)
+            self._atexit_registrado = True
+
+    # ------------------------------------------------------------------
+    # Hooks de petición (ruta caliente)
+    # ------------------------------------------------------------------
+
+    def iniciar_peticion(self, request_id: str, endpoint: Optional[str], metodo: str, path: str) -> None:
+        if not self.enabled:
+            return
+        self._asegurar_hilo()
+        inicio = time.monotonic()
+        self._en_curso[threading.get_ident()] = {
+            'request_id': request_id,
+            'endpoint': endpoint,
+            'metodo': metodo,
+            'path': path,
+            'inicio': inicio,
+            'siguiente': inicio + self.umbral,
+            'capturas': 0,
+        }
+
+    def terminar_peticion(self) -> None:
+        self._en_curso.pop(threading.get_ident(), None)
+
+    # ------------------------------------------------------------------
+    # Revisión (hilo de fondo)
+    # ------------------------------------------------------------------
+
+    def revisar(self) -> int:
+        """Captura las peticiones que pasaron su siguiente umbral. Retorna capturas nuevas."""
+        ahora = time.monotonic()
+        vencidas = [(ident, datos) for ident, datos in list(self._en_curso.items()) if ahora >= datos['siguiente']]
+        if not vencidas:
+            return 0
+
+        marcos = sys._current_frames()
+        nuevas = 0
+        for ident, datos in vencidas:
+            marco = marcos.get(ident)
+            if marco is None or self._en_curso.get(ident) is not datos:
+                continue  # Terminó mientras se revisaba
+            pila = ''.join(traceback.format_stack(marco, limit=MARCOS_POR_PILA))
+            datos['capturas'] += 1
+            datos['siguiente'] = ahora + self.umbral
+            self._registrar_captura(datos, round(ahora - datos['inicio'], 1), pila)
+            nuevas += 1
+        del marcos
+        return nuevas
+
+    def estado(self) -> dict:
+        """Peticiones en curso y capturas recientes (más recientes primero) para el panel."""
+        ahora = time.monotonic()
+        en_curso = sorted(
+            (
+                {
+                    'request_id': d['request_id'], 'endpoint': d['endpoint'], 'metodo': d['metodo'],
+                    'path': d['path'], 'segundos': round(ahora - d['inicio'], 1),
+                }
+                for d in list(self._en_curso.values())
+            ),
+            key=lambda d: d['segundos'], reverse=True,
+        )
+        return {
+            'enabled': self.enabled,
+            'umbral_segundos': self.umbral,
+            'en_curso': en_curso,
+            'total_capturas': self.total_capturas,
+            'capturas': list(reversed(self.capturas)),
+        }
+
+    def detener(self) -> None:
+        """Detiene el hilo de revisión (al salir del proceso)."""
+        self._stop.set()
+        hilo = self._hilo
+        if hilo is not None and hilo.is_alive():
+            hilo.join(timeout=self.intervalo + 1)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _registrar_captura(self, datos: dict, segundos: float, pila: str) -> None:
+        req_id = datos['request_id']
+        logger.warning(
+            f"[{req_id}] Petición lenta: {datos['metodo']} {datos['path']} ({datos['endpoint']}) "
+            f"lleva {segundos}s en curso\n{pila.rstrip()}"
+        )
+        self.total_capturas += 1
+        self.capturas.append({
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'request_id': req_id,
+            'endpoint': datos['endpoint'],
+            'metodo': datos['metodo'],
+            'path': datos['path'],
+            'segundos': segundos,
+            'captura': datos['capturas'],
+            'pid': os.getpid(),
+            'pila': pila,
+        })
+
+    def _asegurar_hilo(self) -> None:
+        """Arranca el hilo de revisión (de nuevo tras un fork de Gunicorn)."""
+        if self._hilo is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._en_curso = {}  # Las peticiones heredadas eran del padre
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._bucle, name='watchdog', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self) -> None:
+        while not self._stop.wait(self.intervalo):
+            try:
+                self.revisar()
+            except Exception as e:  # El vigilante nunca debe morir por una captura fallida
+                logger.error(f"Error en el vigilante de peticiones: {e}", exc_info=True)
+
+
+vigilante = VigilantePeticiones()
@@ -0,0 +1,49 @@
+"""Add daily stats rollup tables (article_daily_stats, daily_stats, rollup_marca)
+
+Revision ID: a7c3e9f1b258
+Revises: f2b6d8e4a913
+Create Date: 2026-10-16 17:41:09.530816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f1b258'
+down_revision = 'f2b6d8e4a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('article_daily_stats',
+    sa.Column('articulo_id', sa.Integer(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('lecturas', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['articulo_id'], ['articulo.id'], ),
+    sa.PrimaryKeyConstraint('articulo_id', 'dia')
+    )
+    with op.batch_alter_table('article_daily_stats', schema=None) as batch_op:
+        batch_op.create_index('ix_article_daily_stats_dia', ['dia'], unique=False)
+
+    op.create_table('daily_stats',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('tipo_evento', sa.String(length=50), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dia', 'tipo_evento')
+    )
+    op.create_table('rollup_marca',
+    sa.Column('nombre', sa.String(length=50), nullable=False),
+    sa.Column('ultimo_id', sa.Integer(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('nombre')
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_marca')
+    op.drop_table('daily_stats')
+    with op.batch_alter_table('article_daily_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_article_daily_stats_dia')
+    op.drop_table('article_daily_stats')
@@ -0,0 +1,35 @@
+"""Add ingest metrics (palabras, tiempo_lectura, indice, extracto) to Articulo and CasoClinico
+
+Revision ID: b71d4e9a3c25
+Revises: fac21c9d99b2
+Create Date: 2026-10-16 09:12:41.532810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d4e9a3c25'
+down_revision = 'fac21c9d99b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Valores NULL hasta ejecutar: flask content backfill-metrics
+    for tabla in ('articulo', 'caso_clinico'):
+        with op.batch_alter_table(tabla, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('num_palabras', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('tiempo_lectura', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('indice_json', sa.Text(), nullable=True))
+            batch_op.add_column(sa.Column('extracto', sa.String(length=300), nullable=True))
+
+
+def downgrade():
+    for tabla in ('caso_clinico', 'articulo'):
+        with op.batch_alter_table(tabla, schema=None) as batch_op:
+            batch_op.drop_column('extracto')
+            batch_op.drop_column('indice_json')
+            batch_op.drop_column('tiempo_lectura')
+            batch_op.drop_column('num_palabras')
@@ -0,0 +1,69 @@
+"""Add articulo_busqueda table with FULLTEXT (MySQL) / FTS5 (SQLite) index
+
+Revision ID: c4e8f2a61d07
+Revises: b71d4e9a3c25
+Create Date: 2026-10-16 11:03:18.204517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8f2a61d07'
+down_revision = 'b71d4e9a3c25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tabla vacía hasta ejecutar: flask content reindex-search
+    op.create_table('articulo_busqueda',
+    sa.Column('articulo_id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('tags', sa.String(length=400), nullable=False),
+    sa.Column('descripcion', sa.String(length=300), nullable=False),
+    sa.Column('cuerpo', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['articulo_id'], ['articulo.id'], ),
+    sa.PrimaryKeyConstraint('articulo_id')
+    )
+
+    dialecto = op.get_bind().dialect.name
+    if dialecto in ('mysql', 'mariadb'):
+        op.execute(
+            "ALTER TABLE articulo_busqueda "
+            "ADD FULLTEXT INDEX ft_articulo_busqueda_titulo (titulo, tags), "
+            "ADD FULLTEXT INDEX ft_articulo_busqueda_todo (titulo, tags, descripcion, cuerpo)"
+        )
+    elif dialecto == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articulo_busqueda_fts USING fts5("
+            "titulo, tags, descripcion, cuerpo, "
+            "content='articulo_busqueda', content_rowid='articulo_id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS articulo_busqueda_ai AFTER INSERT ON articulo_busqueda BEGIN "
+            "INSERT INTO articulo_busqueda_fts(rowid, titulo, tags, descripcion, cuerpo) "
+            "VALUES (new.articulo_id, new.titulo, new.tags, new.descripcion, new.cuerpo); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS articulo_busqueda_ad AFTER DELETE ON articulo_busqueda BEGIN "
+            "INSERT INTO articulo_busqueda_fts(articulo_busqueda_fts, rowid, titulo, tags, descripcion, cuerpo) "
+            "VALUES ('delete', old.articulo_id, old.titulo, old.tags, old.descripcion, old.cuerpo); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS articulo_busqueda_au AFTER UPDATE ON articulo_busqueda BEGIN "
+            "INSERT INTO articulo_busqueda_fts(articulo_busqueda_fts, rowid, titulo, tags, descripcion, cuerpo) "
+            "VALUES ('delete', old.articulo_id, old.titulo, old.tags, old.descripcion, old.cuerpo); "
+            "INSERT INTO articulo_busqueda_fts(rowid, titulo, tags, descripcion, cuerpo) "
+            "VALUES (new.articulo_id, new.titulo, new.tags, new.descripcion, new.cuerpo); END"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('articulo_busqueda_ai', 'articulo_busqueda_ad', 'articulo_busqueda_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS articulo_busqueda_fts")
+    op.drop_table('articulo_busqueda')
@@ -0,0 +1,98 @@
+"""Add normalized tag and articulo_tag tables, split existing Articulo.tags
+
+Revision ID: d93a5b7e0f14
+Revises: c4e8f2a61d07
+Create Date: 2026-10-16 12:27:45.918362
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93a5b7e0f14'
+down_revision = 'c4e8f2a61d07'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _slugify_tag(nombre):
+    # Copia congelada de app.utils.tags.slugify_tag (las migraciones no importan la app)
+    valor = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode('ascii')
+    valor = re.sub(r'[^\w\s-]', '', valor).strip().lower()
+    return re.sub(r'[-\s_]+', '-', valor).strip('-')
+
+
+def upgrade():
+    op.create_table('tag',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=60), nullable=False),
+    sa.Column('slug', sa.String(length=80), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tag', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tag_slug'), ['slug'], unique=True)
+
+    op.create_table('articulo_tag',
+    sa.Column('articulo_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['articulo_id'], ['articulo.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ),
+    sa.PrimaryKeyConstraint('articulo_id', 'tag_id')
+    )
+    with op.batch_alter_table('articulo_tag', schema=None) as batch_op:
+        batch_op.create_index('ix_articulo_tag_tag_articulo', ['tag_id', 'articulo_id'], unique=False)
+
+    # Datos: dividir "tag1, tag2" existentes en filas normalizadas
+    conn = op.get_bind()
+    articulo = sa.table('articulo', sa.column('id', sa.Integer), sa.column('tags', sa.String))
+    tag = sa.Table('tag', sa.MetaData(),
+                   sa.Column('id', sa.Integer, primary_key=True),
+                   sa.Column('nombre', sa.String),
+                   sa.Column('slug', sa.String))
+    articulo_tag = sa.table('articulo_tag', sa.column('articulo_id', sa.Integer), sa.column('tag_id', sa.Integer))
+
+    ids_por_slug = {}
+    ultimo_id = 0
+    while True:
+        filas = conn.execute(
+            sa.select(articulo.c.id, articulo.c.tags)
+            .where(articulo.c.id > ultimo_id)
+            .order_by(articulo.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not filas:
+            break
+
+        asociaciones = []
+        for articulo_id, tags in filas:
+            vistos = set()
+            for parte in (tags or '').split(','):
+                nombre = ' '.join(parte.split())[:60]
+                slug = _slugify_tag(nombre)
+                if not slug or slug in vistos:
+                    continue
+                vistos.add(slug)
+                if slug not in ids_por_slug:
+                    resultado = conn.execute(tag.insert().values(nombre=nombre, slug=slug))
+                    ids_por_slug[slug] = resultado.inserted_primary_key[0]
+                asociaciones.append({'articulo_id': articulo_id, 'tag_id': ids_por_slug[slug]})
+
+        if asociaciones:
+            conn.execute(articulo_tag.insert(), asociaciones)
+        ultimo_id = filas[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('articulo_tag', schema=None) as batch_op:
+        batch_op.drop_index('ix_articulo_tag_tag_articulo')
+    op.drop_table('articulo_tag')
+
+    with op.batch_alter_table('tag', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tag_slug'))
+    op.drop_table('tag')
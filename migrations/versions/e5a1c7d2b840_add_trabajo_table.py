@@ -0,0 +1,48 @@
+"""Add trabajo table for background admin jobs
+
+Revision ID: e5a1c7d2b840
+Revises: d93a5b7e0f14
+Create Date: 2026-10-16 15:02:11.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c7d2b840'
+down_revision = 'd93a5b7e0f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('trabajo',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('clave', sa.String(length=255), nullable=True),
+    sa.Column('parametros_json', sa.Text(), nullable=True),
+    sa.Column('progreso', sa.Integer(), nullable=False),
+    sa.Column('mensaje', sa.String(length=255), nullable=True),
+    sa.Column('log', sa.Text(), nullable=True),
+    sa.Column('resultado_json', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('worker', sa.String(length=100), nullable=True),
+    sa.Column('bloqueado_hasta', sa.DateTime(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=True),
+    sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+    sa.Column('finalizado_en', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('trabajo', schema=None) as batch_op:
+        batch_op.create_index('ix_trabajo_estado_id', ['estado', 'id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_trabajo_clave'), ['clave'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('trabajo', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_trabajo_clave'))
+        batch_op.drop_index('ix_trabajo_estado_id')
+    op.drop_table('trabajo')
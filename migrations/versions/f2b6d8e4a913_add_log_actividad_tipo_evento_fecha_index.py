@@ -0,0 +1,26 @@
+"""Add composite (tipo_evento, fecha) index to log_actividad
+
+Revision ID: f2b6d8e4a913
+Revises: e5a1c7d2b840
+Create Date: 2026-10-16 16:20:37.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d8e4a913'
+down_revision = 'e5a1c7d2b840'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('log_actividad', schema=None) as batch_op:
+        batch_op.create_index('ix_log_actividad_tipo_evento_fecha', ['tipo_evento', 'fecha'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('log_actividad', schema=None) as batch_op:
+        batch_op.drop_index('ix_log_actividad_tipo_evento_fecha')
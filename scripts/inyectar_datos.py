@@ -4,8 +4,12 @@ import unicodedata
 import re
 from datetime import datetime, timedelta
 
-# Importamos la app, la base de datos y el modelo desde tu archivo principal
-from app import app, db, Articulo, LISTA_CATEGORIAS
+# Datos de prueba. Para cargar contenido real en volumen usar: flask content import
+from app import create_app
+from app.extensions import db
+from app.models.articulo import Articulo
+from app.constants import LISTA_CATEGORIAS
+from app.utils.tags import sincronizar_tags  # Mismo parseo de tags que el panel admin
 
 # --- CONFIGURACIÓN MASIVA ---
 ARTICULOS_POR_CATEGORIA = 100  # 100 artículos para CADA una de las 50 categorías
@@ -89,12 +93,12 @@ def generar_datos_masivos():
                 titulo=titulo,
                 slug=slug,
                 categoria=categoria,
-                tags=tags_generados,
                 nombre_archivo=nombre_archivo,
                 url_pdf=URL_PDF,
                 url_audio=URL_AUDIO,
                 fecha=fecha_art
             )
+            sincronizar_tags(nuevo_articulo, tags_generados)
             db.session.add(nuevo_articulo)
 
         # Hacemos commit por cada categoría (cada 100 items) para no saturar la RAM
@@ -110,6 +114,7 @@ def generar_datos_masivos():
     print(f"📂 Archivos en: {CARPETA_TEMPLATES}")
 
 if __name__ == "__main__":
+    app = create_app()
     with app.app_context():
         # Opcional: Limpiar DB previa para evitar duplicados masivos
         # print("🧹 Limpiando base de datos anterior...")
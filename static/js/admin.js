@@ -3,8 +3,9 @@
    ==========================================================================
    Descripción: Maneja la interactividad del dashboard administrativo.
    Funciones:
-   - Filtrado en tiempo real de la tabla de artículos.
-   - Ordenamiento dinámico (Fecha / Alfabético).
+   - Tablas de artículos, fuentes, casos y usuarios cargadas bajo demanda
+     desde /admin/api/listado/<seccion> (paginadas, filtrables y ordenables).
+   - Gráfico de lecturas y más leídos desde /admin/api/estadisticas.
    - Auto-cierre de alertas del sistema.
    - Confirmación de eliminación con modal.
    ========================================================================== */
@@ -22,111 +23,313 @@ document.addEventListener('DOMContentLoaded', function () {
         }, 5000);
     }
 
-    // --- 2. LÓGICA DE TABLA (FILTRADO Y ORDEN) ---
-    const searchInput = document.getElementById('searchInput');
-    const sortSelect = document.getElementById('sortSelect');
-    const tableBody = document.getElementById('articlesTableBody');
-
-    // Si no existen estos elementos (ej. si la tabla está vacía), salimos.
-    if (!tableBody) return;
-
-    // Convertimos NodeList a Array para poder ordenar
-    const rows = Array.from(document.querySelectorAll('.article-row'));
-
-    // A. FILTRADO (BÚSQUEDA EN TIEMPO REAL)
-    if (searchInput) {
-        searchInput.addEventListener('keyup', function (e) {
-            const term = e.target.value.toLowerCase();
-
-            rows.forEach(row => {
-                // Buscamos dentro del título del artículo
-                // Nota: Usamos .article-title o buscamos strong dentro de la celda
-                const titleElement = row.querySelector('.article-title-cell strong');
-                if (titleElement) {
-                    const titleText = titleElement.textContent.toLowerCase();
-                    // Mostrar u ocultar fila según coincidencia
-                    row.style.display = titleText.includes(term) ? '' : 'none';
-                }
-            });
+    // --- 2. TABLAS BAJO DEMANDA (FILTRADO, ORDEN Y PAGINACIÓN EN SERVIDOR) ---
+    initLazyTables();
+
+    // --- 3. CONFIRMACIÓN DE ELIMINACIÓN (POST FORMS) ---
+    // Delegado en document: las filas de las tablas se crean después de la carga
+    document.addEventListener('submit', function (e) {
+        const form = e.target.closest('.delete-form');
+        if (!form) return;
+        e.preventDefault();
+
+        // Usar el modal global de main.js si existe
+        if (typeof window.showNexusToast !== 'undefined') {
+            const modalEl = document.getElementById('confirmation-modal');
+            const modalTitle = document.getElementById('modal-title');
+            const modalText = document.getElementById('modal-text');
+            const btnConfirm = document.getElementById('btn-confirm-modal');
+
+            if (modalEl && modalTitle && modalText) {
+                modalTitle.textContent = '¿Eliminar artículo?';
+                modalText.textContent = 'El artículo será movido a la papelera. Podrás restaurarlo posteriormente.';
+                modalEl.classList.add('active');
+
+                // Remove previous listeners and add new ones
+                const newBtnConfirm = btnConfirm.cloneNode(true);
+                btnConfirm.parentNode.replaceChild(newBtnConfirm, btnConfirm);
+
+                newBtnConfirm.addEventListener('click', () => {
+                    modalEl.classList.remove('active');
+                    form.submit();
+                });
+
+                return;
+            }
+        }
+
+        // Fallback: confirm nativo
+        if (confirm('¿Estás seguro de eliminar este artículo?')) {
+            form.submit();
+        }
+    });
+
+    // --- 4. PANEL DE DIAGNÓSTICOS ---
+    initDiagnosticsPanel();
+
+    // --- 5. TRABAJOS EN SEGUNDO PLANO (ENCOLAR Y CONSULTAR PROGRESO) ---
+    initJobPanel();
+
+    // --- 6. ESTADÍSTICAS DE LECTURA (ROLLUPS DIARIOS) ---
+    initStatsPanel();
+
+    // --- 7. PERFILADO BAJO DEMANDA ---
+    initProfilerPanel();
+
+    // --- 8. AUTOCOMPLETADO DE TAGS EN FORMULARIOS DE ARTÍCULO ---
+    initTagAutocomplete();
+});
+
+/**
+ * Tablas del panel cargadas por JSON al hacerse visibles.
+ *
+ * Cada contenedor .lazy-table declara data-endpoint y data-section; la
+ * búsqueda, el orden y la página se resuelven en el servidor.
+ */
+function initLazyTables() {
+    const tables = document.querySelectorAll('.lazy-table');
+    if (!tables.length) return;
+
+    const csrfMeta = document.querySelector('meta[name="csrf-token"]');
+    const csrfToken = csrfMeta ? csrfMeta.getAttribute('content') : '';
+
+    // Helpers de construcción segura (textContent, nunca innerHTML con datos)
+    function el(tag, attrs, children) {
+        const node = document.createElement(tag);
+        Object.entries(attrs || {}).forEach(([key, value]) => {
+            if (key === 'text') node.textContent = value;
+            else node.setAttribute(key, value);
         });
+        (children || []).forEach(child => node.appendChild(child));
+        return node;
     }
 
-    // B. ORDENAMIENTO (FECHA / ALFABÉTICO)
-    if (sortSelect) {
-        sortSelect.addEventListener('change', function (e) {
-            const criteria = e.target.value;
-
-            const sortedRows = rows.sort((a, b) => {
-                // Obtener valores de texto para comparar
-                const titleA = a.querySelector('.article-title-cell strong').textContent.toLowerCase();
-                const titleB = b.querySelector('.article-title-cell strong').textContent.toLowerCase();
-
-                // Obtener fechas (Formato esperado en HTML: DD/MM/YYYY)
-                const dateTextA = a.querySelector('.article-date-cell').textContent.trim();
-                const dateTextB = b.querySelector('.article-date-cell').textContent.trim();
-
-                // Conversión simple para sort: invertir cadena (01/12/2025 -> 20251201)
-                // Esto permite comparar como números o strings ISO básicos
-                const dateA = dateTextA.split('/').reverse().join('');
-                const dateB = dateTextB.split('/').reverse().join('');
-
-                switch (criteria) {
-                    case 'alpha-asc': return titleA.localeCompare(titleB);
-                    case 'alpha-desc': return titleB.localeCompare(titleA);
-                    case 'date-asc': return dateA.localeCompare(dateB); // Antiguos primero
-                    case 'date-desc': return dateB.localeCompare(dateA); // Recientes primero
-                    default: return 0;
-                }
-            });
+    function truncate(text, max) {
+        text = text || '';
+        return text.length > max ? text.slice(0, max) + '...' : text;
+    }
 
-            // Re-inyectar filas ordenadas en el DOM
-            tableBody.innerHTML = '';
-            sortedRows.forEach(row => tableBody.appendChild(row));
-        });
+    function postForm(action, label, className, title, isDelete) {
+        return el('form', {
+            action: action, method: 'POST', style: 'display: inline;',
+            class: isDelete ? 'delete-form' : ''
+        }, [
+            el('input', { type: 'hidden', name: 'csrf_token', value: csrfToken }),
+            el('button', { type: 'submit', class: 'btn-action-sm ' + className, title: title, text: label })
+        ]);
     }
 
-    // --- 3. CONFIRMACIÓN DE ELIMINACIÓN (POST FORMS) ---
-    document.querySelectorAll('.delete-form').forEach(form => {
-        form.addEventListener('submit', function (e) {
-            e.preventDefault();
-
-            // Usar el modal global de main.js si existe
-            if (typeof window.showNexusToast !== 'undefined') {
-                // Check if modal exists
-                const modalEl = document.getElementById('confirmation-modal');
-                const modalTitle = document.getElementById('modal-title');
-                const modalText = document.getElementById('modal-text');
-                const btnConfirm = document.getElementById('btn-confirm-modal');
-                const btnCancel = document.getElementById('btn-cancel-modal');
-
-                if (modalEl && modalTitle && modalText) {
-                    modalTitle.textContent = '¿Eliminar artículo?';
-                    modalText.textContent = 'El artículo será movido a la papelera. Podrás restaurarlo posteriormente.';
-                    modalEl.classList.add('active');
-
-                    // Remove previous listeners and add new ones
-                    const newBtnConfirm = btnConfirm.cloneNode(true);
-                    btnConfirm.parentNode.replaceChild(newBtnConfirm, btnConfirm);
-
-                    newBtnConfirm.addEventListener('click', () => {
-                        modalEl.classList.remove('active');
-                        form.submit();
-                    });
-
-                    return;
-                }
+    const rowBuilders = {
+        articulos: item => el('tr', { class: 'article-row' }, [
+            el('td', { class: 'article-title-cell' }, [
+                el('a', { href: item.url, style: 'text-decoration:none; color:inherit;' }, [
+                    el('strong', { class: 'article-title', text: item.titulo })
+                ]),
+                el('div', { class: 'article-slug', text: '/' + item.slug })
+            ]),
+            el('td', { class: 'article-date-cell', text: item.fecha }),
+            el('td', { class: 'text-right' }, [
+                el('div', { class: 'd-inline-flex gap-1' }, [
+                    el('a', { href: item.url_editar, class: 'btn-action-sm btn-edit', title: 'Editar', text: '✎' }),
+                    postForm(item.url_eliminar, '🗑', 'btn-delete', 'Eliminar', true)
+                ])
+            ])
+        ]),
+        fuentes: item => el('tr', {}, [
+            el('td', { text: truncate(item.titulo, 50) }),
+            el('td', { text: truncate(item.autor, 30) }),
+            el('td', { text: String(item.anio) }),
+            el('td', { text: item.fuente_origen }),
+            el('td', {}, [postForm(item.url_eliminar, '🗑', 'btn-delete', 'Eliminar', true)])
+        ]),
+        casos: item => el('tr', {}, [
+            el('td', { text: item.numero }),
+            el('td', { text: truncate(item.titulo, 50) }),
+            el('td', {}, [el('span', { class: 'badge badge-' + item.nivel_color, text: item.nivel })]),
+            el('td', { text: item.edad_paciente || 'N/A' }),
+            el('td', {}, [postForm(item.url_eliminar, '🗑', 'btn-delete', 'Eliminar', true)])
+        ]),
+        usuarios: item => el('tr', {}, [
+            el('td', { text: item.nombre || 'Sin nombre' }),
+            el('td', { text: item.email }),
+            el('td', {}, [item.acceso_edu
+                ? el('span', { class: 'badge badge-emerald', text: '✓ Verificado' })
+                : el('span', { class: 'badge badge-rose', text: '✗ Sin acceso' })]),
+            el('td', {}, [item.acceso_edu
+                ? postForm(item.url_revocar, 'Revocar', 'btn-delete', 'Revocar acceso', false)
+                : postForm(item.url_aprobar, 'Aprobar', 'btn-edit', 'Aprobar acceso', false)])
+        ])
+    };
+
+    tables.forEach(container => {
+        const section = container.dataset.section;
+        const endpoint = container.dataset.endpoint;
+        const body = container.querySelector('.lazy-table-body');
+        const searchInput = container.querySelector('.lazy-table-search');
+        const sortSelect = container.querySelector('.lazy-table-sort');
+        const pagination = container.querySelector('.lazy-table-pagination');
+        const info = container.querySelector('.lazy-table-info');
+        const prevBtn = container.querySelector('.lazy-table-prev');
+        const nextBtn = container.querySelector('.lazy-table-next');
+        const totalEl = container.querySelector('.lazy-table-total');
+        const columns = container.querySelectorAll('thead th').length || 1;
+        const selectAll = container.querySelector('.lazy-table-select-all');
+        const bulkBar = container.querySelector('.lazy-table-bulk');
+
+        const state = { page: 1, q: '', sort: 'date-desc' };
+        let requestId = 0;
+
+        function message(text) {
+            body.replaceChildren(el('tr', {}, [el('td', { colspan: columns, class: 'empty-table-msg', text: text })]));
+        }
+
+        // Fila con casilla de selección si la tabla admite acciones en lote
+        function buildRow(item) {
+            const row = rowBuilders[section](item);
+            if (selectAll) {
+                row.prepend(el('td', { class: 'bulk-col' }, [
+                    el('input', { type: 'checkbox', class: 'lazy-table-select', value: item.id, 'aria-label': 'Seleccionar' })
+                ]));
             }
+            return row;
+        }
+
+        function selectedIds() {
+            return Array.from(body.querySelectorAll('.lazy-table-select:checked'), box => Number(box.value));
+        }
 
-            // Fallback: confirm nativo
-            if (confirm('¿Estás seguro de eliminar este artículo?')) {
-                form.submit();
+        function updateSelection() {
+            if (!bulkBar) return;
+            const count = selectedIds().length;
+            const boxes = body.querySelectorAll('.lazy-table-select').length;
+            bulkBar.querySelector('.lazy-table-selected').textContent = count;
+            bulkBar.hidden = count === 0 && !bulkBar.querySelector('.lazy-table-bulk-status').textContent;
+            selectAll.checked = boxes > 0 && count === boxes;
+        }
+
+        async function load() {
+            const current = ++requestId;
+            const params = new URLSearchParams({ page: state.page, sort: state.sort });
+            if (state.q) params.set('q', state.q);
+
+            try {
+                const response = await fetch(`${endpoint}?${params}`, {
+                    headers: { 'Accept': 'application/json' },
+                    credentials: 'same-origin'
+                });
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                const data = await response.json();
+                if (current !== requestId) return; // Respuesta obsoleta
+
+                if (!data.items.length) {
+                    message(state.q ? 'Sin resultados para la búsqueda.' : 'No hay registros aún.');
+                } else {
+                    body.replaceChildren(...data.items.map(buildRow));
+                }
+
+                updateSelection();
+                if (totalEl && !state.q) totalEl.textContent = data.total;
+                if (pagination) {
+                    pagination.hidden = data.pages <= 1;
+                    info.textContent = `Página ${data.page} de ${data.pages} · ${data.total} registros`;
+                    prevBtn.disabled = !data.has_prev;
+                    nextBtn.disabled = !data.has_next;
+                }
+            } catch (error) {
+                console.error(`Error cargando ${section}:`, error);
+                if (current === requestId) message('No se pudo cargar la tabla. Intenta recargar la página.');
             }
-        });
-    });
+        }
 
-    // --- 4. PANEL DE DIAGNÓSTICOS ---
-    initDiagnosticsPanel();
-});
+        if (searchInput) {
+            let debounce = null;
+            searchInput.addEventListener('input', function (e) {
+                clearTimeout(debounce);
+                debounce = setTimeout(() => {
+                    state.q = e.target.value.trim();
+                    state.page = 1;
+                    load();
+                }, 300);
+            });
+        }
+
+        if (sortSelect) {
+            sortSelect.addEventListener('change', function (e) {
+                state.sort = e.target.value;
+                state.page = 1;
+                load();
+            });
+        }
+
+        if (selectAll) {
+            selectAll.addEventListener('change', function () {
+                body.querySelectorAll('.lazy-table-select').forEach(box => { box.checked = selectAll.checked; });
+                updateSelection();
+            });
+            body.addEventListener('change', function (e) {
+                if (e.target.classList.contains('lazy-table-select')) updateSelection();
+            });
+        }
+
+        // Acciones en lote: un POST con todos los ids seleccionados (un solo UPDATE en el servidor)
+        if (bulkBar) {
+            const status = bulkBar.querySelector('.lazy-table-bulk-status');
+            const valueSelect = bulkBar.querySelector('.lazy-table-bulk-value');
+
+            bulkBar.querySelectorAll('.lazy-table-bulk-action').forEach(button => {
+                button.addEventListener('click', async function () {
+                    const ids = selectedIds();
+                    if (!ids.length) return;
+                    const payload = { ids: ids };
+                    if ('requiresValue' in button.dataset) {
+                        if (!valueSelect || !valueSelect.value) {
+                            status.textContent = 'Selecciona una categoría.';
+                            return;
+                        }
+                        payload.valor = valueSelect.value;
+                    }
+                    if (button.dataset.confirm && !confirm(button.dataset.confirm)) return;
+
+                    button.disabled = true;
+                    try {
+                        const response = await fetch(button.dataset.endpoint, {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken },
+                            credentials: 'same-origin',
+                            body: JSON.stringify(payload)
+                        });
+                        const data = await response.json();
+                        if (!response.ok) throw new Error(data.error || `HTTP ${response.status}`);
+                        status.textContent = `${data.afectados} de ${data.solicitados} actualizados.`;
+                        selectAll.checked = false;
+                        load();
+                    } catch (error) {
+                        console.error(`Error en acción en lote (${section}):`, error);
+                        status.textContent = 'Error: ' + error.message;
+                    } finally {
+                        button.disabled = false;
+                    }
+                });
+            });
+        }
+
+        if (prevBtn) prevBtn.addEventListener('click', () => { state.page -= 1; load(); });
+        if (nextBtn) nextBtn.addEventListener('click', () => { state.page += 1; load(); });
+
+        // Cargar solo cuando la sección se acerca al viewport
+        if ('IntersectionObserver' in window) {
+            const observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    observer.disconnect();
+                    load();
+                }
+            }, { rootMargin: '200px' });
+            observer.observe(container);
+        } else {
+            load();
+        }
+    });
+}
 
 /**
  * Inicializa el panel de diagnósticos del sistema
@@ -152,7 +355,9 @@ function initDiagnosticsPanel() {
         'static': 'Archivos Estáticos',
         'articles': 'Integridad Artículos',
         'disk': 'Espacio en Disco',
-        'logs': 'Archivo de Log'
+        'logs': 'Archivo de Log',
+        'queries': 'Consultas SQL',
+        'watchdog': 'Peticiones Lentas'
     };
 
     // Ejecutar un check individual
@@ -170,7 +375,8 @@ function initDiagnosticsPanel() {
         if (btn) btn.disabled = true;
 
         try {
-            const response = await fetch(endpoint, {
+            // Clic explícito en un check: ignorar el resultado cacheado
+            const response = await fetch(`${endpoint}?refresh=1`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -199,7 +405,7 @@ function initDiagnosticsPanel() {
                 ${Object.keys(data.details || {}).length > 0 ?
                     `<div class="result-details">${JSON.stringify(data.details, null, 2)}</div>` : ''
                 }
-                <div class="result-duration">⏱️ ${data.duration_ms}ms</div>
+                <div class="result-duration">⏱️ ${data.duration_ms}ms${data.cached ? ' · en caché' : ''}</div>
             `;
 
             return data;
@@ -279,7 +485,7 @@ function initDiagnosticsPanel() {
                     ${Object.keys(check.details || {}).length > 0 ?
                         `<div class="result-details">${JSON.stringify(check.details, null, 2)}</div>` : ''
                     }
-                    <div class="result-duration">⏱️ ${check.duration_ms}ms</div>
+                    <div class="result-duration">⏱️ ${check.duration_ms}ms${check.cached ? ' · en caché' : ''}</div>
                 `;
             });
 
@@ -316,4 +522,288 @@ function initDiagnosticsPanel() {
             }
         });
     });
-}
\ No newline at end of file
+}
+
+/**
+ * Tareas en segundo plano: encola con POST /admin/jobs/<tipo> y consulta
+ * /admin/jobs/<id> hasta que el trabajo termina. Los textos del servidor se
+ * insertan con textContent.
+ */
+function initJobPanel() {
+    const buttons = document.querySelectorAll('.btn-run-job');
+    if (!buttons.length) return;
+
+    const csrfMeta = document.querySelector('meta[name="csrf-token"]');
+    const csrfToken = csrfMeta ? csrfMeta.getAttribute('content') : '';
+    const POLL_MS = 2000;
+    const ESTADOS = {
+        pending: ['status-running', '⏳ En cola'],
+        running: ['status-running', '⚙️ En curso'],
+        done: ['status-pass-text', '✅ Completado'],
+        failed: ['status-fail-text', '❌ Falló']
+    };
+
+    function renderJob(card, job) {
+        const [clase, texto] = ESTADOS[job.estado] || ['status-error-text', job.estado];
+        const status = card.querySelector('.job-status');
+        const result = card.querySelector('.job-result');
+
+        const badge = document.createElement('span');
+        badge.className = clase;
+        badge.textContent = texto;
+        status.replaceChildren(badge);
+
+        const bar = document.createElement('div');
+        bar.className = 'job-progress';
+        const fill = document.createElement('div');
+        fill.className = 'job-progress-bar';
+        fill.style.width = `${job.progreso || 0}%`;
+        bar.appendChild(fill);
+
+        const message = document.createElement('div');
+        message.className = 'result-message';
+        message.textContent = `#${job.id} · ${job.error || job.mensaje || ''}`;
+
+        const nodes = [bar, message];
+        const detalle = job.resultado !== null ? JSON.stringify(job.resultado, null, 2) : (job.log || []).join('\n');
+        if (detalle) {
+            const details = document.createElement('div');
+            details.className = 'result-details';
+            details.textContent = detalle;
+            nodes.push(details);
+        }
+        result.replaceChildren(...nodes);
+        result.classList.add('visible');
+    }
+
+    async function poll(card, url, btn) {
+        try {
+            const response = await fetch(url, { headers: { 'Accept': 'application/json' } });
+            const job = await response.json();
+            renderJob(card, job);
+            if (!job.terminado) {
+                setTimeout(() => poll(card, url, btn), POLL_MS);
+                return;
+            }
+        } catch (error) {
+            console.error('Error consultando trabajo:', error);
+        }
+        btn.disabled = false;
+    }
+
+    buttons.forEach(btn => {
+        btn.addEventListener('click', async function () {
+            const card = this.closest('.job-card');
+            this.disabled = true;
+            try {
+                const response = await fetch(this.dataset.endpoint, {
+                    method: 'POST',
+                    headers: { 'X-CSRFToken': csrfToken }
+                });
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.error || response.statusText);
+                poll(card, data.url, this);
+            } catch (error) {
+                this.disabled = false;
+                if (typeof window.showNexusToast === 'function') {
+                    window.showNexusToast(`No se pudo encolar: ${error.message}`, 'error');
+                }
+            }
+        });
+    });
+}
+
+/**
+ * Lecturas por día y artículos más leídos (rollups diarios, O(días)).
+ * Se cargan al acercarse el panel al viewport.
+ */
+function initStatsPanel() {
+    const panel = document.querySelector('.stats-panel');
+    if (!panel) return;
+
+    const chart = panel.querySelector('.stats-chart');
+    const top = panel.querySelector('.stats-top');
+    const note = panel.querySelector('.stats-note');
+
+    async function load() {
+        try {
+            const response = await fetch(panel.dataset.endpoint, {
+                headers: { 'Accept': 'application/json' },
+                credentials: 'same-origin'
+            });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const data = await response.json();
+
+            const max = Math.max(1, ...data.serie.map(punto => punto.total));
+            chart.replaceChildren(...data.serie.map(punto => {
+                const bar = document.createElement('div');
+                bar.className = 'stats-bar';
+                bar.style.height = `${Math.round(100 * punto.total / max)}%`;
+                bar.title = `${punto.dia}: ${punto.total} lecturas`;
+                return bar;
+            }));
+
+            top.replaceChildren(...data.mas_leidos.map(item => {
+                const li = document.createElement('li');
+                const title = document.createElement('span');
+                title.textContent = item.titulo;
+                const count = document.createElement('strong');
+                count.textContent = item.lecturas;
+                li.append(title, count);
+                return li;
+            }));
+
+            const total = data.serie.reduce((suma, punto) => suma + punto.total, 0);
+            note.textContent = total
+                ? `${total} lecturas acumuladas hasta el último rollup.`
+                : 'Sin lecturas acumuladas. Ejecuta `flask stats rollup` (cron) para actualizar.';
+        } catch (error) {
+            console.error('Error cargando estadísticas:', error);
+            note.textContent = 'No se pudieron cargar las estadísticas.';
+        }
+    }
+
+    if ('IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                observer.disconnect();
+                load();
+            }
+        }, { rootMargin: '200px' });
+        observer.observe(panel);
+    } else {
+        load();
+    }
+}
+
+/**
+ * Perfilado bajo demanda: arma una sesión para las próximas N peticiones a
+ * un endpoint y lista las capturas (pilas colapsadas) para descargar.
+ */
+function initProfilerPanel() {
+    const panel = document.querySelector('.profiler-panel');
+    if (!panel) return;
+
+    const form = panel.querySelector('.profiler-form');
+    const status = panel.querySelector('.profiler-status');
+    const list = panel.querySelector('.profiler-list');
+    const csrfMeta = document.querySelector('meta[name="csrf-token"]');
+    const csrfToken = csrfMeta ? csrfMeta.getAttribute('content') : '';
+    const url = panel.dataset.endpoint;
+
+    function render(data) {
+        const sesion = data.sesion;
+        if (!data.enabled) {
+            status.textContent = 'Perfilador desactivado (PROFILER_ENABLED).';
+        } else if (sesion) {
+            const destino = sesion.endpoint || 'cualquier endpoint';
+            const cabecera = sesion.requiere_token ? ` con X-Profile-Token: ${sesion.token}` : '';
+            status.textContent = `Armado: ${destino} × ${sesion.peticiones}${cabecera}`;
+        } else {
+            status.textContent = 'Sin sesión armada.';
+        }
+
+        list.replaceChildren(...data.sesiones.map(item => {
+            const li = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = `${url}/${item.token}.collapsed`;
+            link.textContent = `${item.token} · ${item.fecha}`;
+            const count = document.createElement('strong');
+            count.textContent = `${item.capturas} peticiones`;
+            li.append(link, count);
+            return li;
+        }));
+    }
+
+    async function request(method, body) {
+        const response = await fetch(url, {
+            method,
+            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken },
+            credentials: 'same-origin',
+            body: body ? JSON.stringify(body) : undefined
+        });
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || response.statusText);
+        return data;
+    }
+
+    async function load() {
+        try {
+            render(await request('GET'));
+        } catch (error) {
+            status.textContent = 'No se pudo consultar el perfilador.';
+        }
+    }
+
+    form.addEventListener('submit', async function (e) {
+        e.preventDefault();
+        try {
+            await request('POST', {
+                endpoint: form.elements.endpoint.value,
+                peticiones: Number(form.elements.peticiones.value),
+                requiere_token: form.elements.requiere_token.checked
+            });
+        } catch (error) {
+            if (typeof window.showNexusToast === 'function') {
+                window.showNexusToast(`No se pudo armar: ${error.message}`, 'error');
+            }
+        }
+        load();
+    });
+
+    panel.querySelector('.profiler-cancel').addEventListener('click', async function () {
+        await request('DELETE').catch(() => null);
+        load();
+    });
+
+    load();
+}
+
+/**
+ * Autocompletado de tags (/admin/api/tags, servido del índice de conteos en
+ * caché). Completa el último tag de la lista separada por comas mediante un
+ * <datalist> cuyas opciones conservan los tags ya escritos.
+ */
+function initTagAutocomplete() {
+    const inputs = document.querySelectorAll('input[data-tags-endpoint]');
+    if (!inputs.length) return;
+
+    const DEBOUNCE_MS = 200;
+
+    inputs.forEach(input => {
+        const datalist = document.getElementById(input.getAttribute('list'));
+        if (!datalist) return;
+        let timer = null;
+        let ultimo = null;
+
+        async function sugerir() {
+            const partes = input.value.split(',');
+            const prefijo = partes.pop().trim();
+            if (prefijo.length < 2 || prefijo === ultimo) return;
+            ultimo = prefijo;
+
+            try {
+                const url = `${input.dataset.tagsEndpoint}?q=${encodeURIComponent(prefijo)}`;
+                const response = await fetch(url, { headers: { 'Accept': 'application/json' }, credentials: 'same-origin' });
+                if (!response.ok) return;
+                const tags = await response.json();
+                const previos = partes.map(p => p.trim()).filter(Boolean);
+                datalist.replaceChildren(...tags
+                    .filter(tag => !previos.includes(tag.nombre))
+                    .map(tag => {
+                        const option = document.createElement('option');
+                        option.value = [...previos, tag.nombre].join(', ');
+                        option.label = `${tag.nombre} (${tag.total})`;
+                        return option;
+                    }));
+            } catch (error) {
+                console.error('Error cargando tags:', error);
+            }
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(sugerir, DEBOUNCE_MS);
+        });
+    });
+}
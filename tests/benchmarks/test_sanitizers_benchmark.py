@@ -0,0 +1,81 @@
+"""
+Benchmarks de app/utils/sanitizers.py con entradas de 10KB a 5MB.
+
+No se ejecutan en la suite normal. Para lanzarlos:
+
+    RUN_BENCHMARKS=1 pytest tests/benchmarks --benchmark-only
+
+Con --benchmark-compare se comparan contra una ejecución guardada
+(--benchmark-autosave).
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from app.utils.sanitizers import (
+    limpiar_html_google, sanitizar_texto_plano, validar_css_seguro,
+    MOTOR_CLASICO, MOTOR_UNA_PASADA
+)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason='Benchmarks desactivados (definir RUN_BENCHMARKS=1)'
+)
+
+TAMANIOS = {
+    '10KB': 10 * 1024,
+    '100KB': 100 * 1024,
+    '1MB': 1024 * 1024,
+    '5MB': 5 * 1024 * 1024,
+}
+
+_BLOQUE_HTML = (
+    '<h2 class="c3"><span class="c1">Sección</span></h2>'
+    '<p class="c4"><span>Texto con&nbsp;entidades &amp; </span>'
+    '<a href="https://pubmed.ncbi.nlm.nih.gov/1">enlace externo</a> y '
+    '<a href="/categoria/neurociencia/art">interno</a>.</p>\n'
+    '<p style="color:red"><img src="images/i.png" alt="" title=""></p>'
+    '<ul><li>uno</li><li><strong>dos</strong></li></ul>'
+    '<script>alert(1)</script><!-- comentario -->\n'
+)
+
+_BLOQUE_CSS = (
+    '.articulo h2 { color: #1155cc; margin: 0 0 1rem; }\n'
+    '.articulo img { max-width: 100%; border-radius: 4px; }\n'
+)
+
+_BLOQUE_TEXTO = 'Texto <b>plano</b> con &lt;marcas&gt; y acentos: neurociencia. '
+
+
+def _repetir(bloque: str, tamanio: int) -> str:
+    return (bloque * (tamanio // len(bloque) + 1))[:tamanio]
+
+
+@pytest.fixture(scope='module', params=list(TAMANIOS), ids=list(TAMANIOS))
+def tamanio(request):
+    return TAMANIOS[request.param]
+
+
+@pytest.mark.parametrize('motor', [MOTOR_UNA_PASADA, MOTOR_CLASICO])
+def test_limpiar_html_google(benchmark, tamanio, motor):
+    benchmark.group = f'limpiar_html_google-{tamanio}'
+    html = _repetir(_BLOQUE_HTML, tamanio)
+    resultado = benchmark(limpiar_html_google, html, motor=motor)
+    assert '<script' not in resultado
+
+
+def test_sanitizar_texto_plano(benchmark, tamanio):
+    benchmark.group = f'sanitizar_texto_plano-{tamanio}'
+    texto = _repetir(_BLOQUE_TEXTO, tamanio)
+    resultado = benchmark(sanitizar_texto_plano, texto, max_length=tamanio)
+    assert '<b>' not in resultado
+
+
+def test_validar_css_seguro(benchmark, tamanio):
+    benchmark.group = f'validar_css_seguro-{tamanio}'
+    css = _repetir(_BLOQUE_CSS, tamanio)
+    es_valido, _ = benchmark(validar_css_seguro, css)
+    assert es_valido
@@ -34,12 +34,13 @@ def get_test_app():
 @pytest.fixture
 def app():
     """Fixture que proporciona la aplicación Flask configurada para testing."""
-    from app.extensions import db
+    from app.extensions import db, cache
     
     test_app = get_test_app()
     
     with test_app.app_context():
         db.create_all()
+        cache.clear()  # La app es compartida entre tests: evitar resultados cacheados previos
         yield test_app
         db.session.remove()
         db.drop_all()
@@ -64,3 +65,75 @@ def admin_session(client, app):
         sess['user_email'] = app.config.get('ADMIN_EMAIL', 'admin@test.com')
         sess['user_name'] = 'Admin Test'
     return client
+
+
+@pytest.fixture
+def max_consultas(app):
+    """
+    Presupuesto de consultas SQL para un bloque (regresiones N+1).
+    
+    Uso:
+        with max_consultas(6):
+            client.get('/perfil')
+    """
+    from contextlib import contextmanager
+    from app.utils.query_stats import contar_consultas
+    
+    @contextmanager
+    def limite(maximo):
+        with contar_consultas() as contador:
+            yield contador
+        assert contador.total <= maximo, (
+            f'{contador.total} consultas SQL (máximo {maximo}):\n{contador.resumen()}'
+        )
+    
+    return limite
+
+
+@pytest.fixture
+def crear_articulos(app):
+    """
+    Fábrica de artículos activos (con commit) compartida por los tests.
+    
+    Los valores str se formatean con el índice ``i`` y los callables lo
+    reciben. Por defecto: 'Art {i}', slug 'art-{i}', categoría 'Test' y una
+    fecha distinta por artículo (orden estable).
+    
+    Uso:
+        ids = [a.id for a in crear_articulos(3)]
+        crear_articulos(2, titulo='Artículo {i:02d}', slug='articulo-{i:02d}')
+        crear_articulos(1, slug='estres', titulo='Estrés', cuerpo='...')  # indexado para búsqueda
+        crear_articulos(1, slug='uno', tags='Ansiedad, Sueño')  # vía sincronizar_tags
+    """
+    from datetime import datetime, timedelta, timezone
+    from app.extensions import db
+    from app.models.articulo import Articulo
+    from app.utils.search import indexar_articulo
+    from app.utils.tags import sincronizar_tags
+    
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    
+    def crear(n=1, cuerpo=None, tags=None, **campos):
+        campos = {'titulo': 'Art {i}', 'slug': 'art-{i}', 'categoria': 'Test', **campos}
+        campos.setdefault('nombre_archivo', campos['slug'] + '.html')
+        campos.setdefault('fecha', lambda i: base + timedelta(days=i))
+        
+        articulos = []
+        for i in range(n):
+            valores = {
+                campo: valor(i) if callable(valor) else valor.format(i=i) if isinstance(valor, str) else valor
+                for campo, valor in campos.items()
+            }
+            articulo = Articulo(**valores)
+            if tags is not None:
+                sincronizar_tags(articulo, tags)
+            db.session.add(articulo)
+            articulos.append(articulo)
+        if cuerpo is not None:
+            db.session.flush()
+            for articulo in articulos:
+                indexar_articulo(articulo, cuerpo)
+        db.session.commit()
+        return articulos
+    
+    return crear
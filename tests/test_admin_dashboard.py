@@ -0,0 +1,70 @@
+"""
+Tests para el panel de administración con tablas bajo demanda.
+"""
+
+from app.extensions import db
+from app.models.articulo import Articulo
+from app.models.usuario import Usuario
+from app.utils.pagination import invalidar_totales
+
+NUMERADOS = {'titulo': 'Artículo {i:02d}', 'slug': 'articulo-{i:02d}'}
+
+
+class TestDashboard:
+    """Tests del render inicial."""
+
+    def test_render_sin_filas_y_con_contadores(self, admin_session, crear_articulos):
+        crear_articulos(3, **NUMERADOS)
+        response = admin_session.get('/admin/')
+        assert response.status_code == 200
+        assert b'/admin/api/listado/articulos' in response.data
+        assert 'Artículo 00'.encode('utf-8') not in response.data
+
+    def test_contadores_cacheados_hasta_invalidar(self, admin_session, crear_articulos):
+        from app.utils.dashboard import contadores_dashboard
+
+        crear_articulos(2, **NUMERADOS)
+        assert contadores_dashboard()['articulos'] == 2
+
+        db.session.add(Articulo(titulo='Nuevo', slug='nuevo', nombre_archivo='nuevo.html'))
+        db.session.commit()
+        assert contadores_dashboard()['articulos'] == 2
+
+        invalidar_totales()
+        assert contadores_dashboard()['articulos'] == 3
+
+
+class TestApiListado:
+    """Tests de /admin/api/listado/<seccion>."""
+
+    def test_paginacion_y_orden(self, admin_session, crear_articulos):
+        crear_articulos(5, **NUMERADOS)
+        datos = admin_session.get('/admin/api/listado/articulos?per_page=2').get_json()
+        assert datos['total'] == 5
+        assert datos['pages'] == 3
+        assert [a['slug'] for a in datos['items']] == ['articulo-04', 'articulo-03']
+        assert datos['items'][0]['url_editar'].startswith('/admin/editar/')
+
+        datos = admin_session.get('/admin/api/listado/articulos?per_page=2&page=3&sort=date-asc').get_json()
+        assert [a['slug'] for a in datos['items']] == ['articulo-04']
+        assert not datos['has_next']
+
+    def test_busqueda(self, admin_session, crear_articulos):
+        crear_articulos(12, **NUMERADOS)
+        datos = admin_session.get('/admin/api/listado/articulos?q=culo 1').get_json()
+        assert datos['total'] == 2  # Artículo 10 y 11
+        assert all('culo 1' in a['titulo'] for a in datos['items'])
+
+    def test_usuarios(self, admin_session):
+        db.session.add(Usuario(email='ana@uni.edu', nombre='Ana', acceso_edu=True))
+        db.session.commit()
+        datos = admin_session.get('/admin/api/listado/usuarios?q=ANA').get_json()
+        assert datos['items'][0]['email'] == 'ana@uni.edu'
+        assert datos['items'][0]['acceso_edu'] is True
+
+    def test_seccion_desconocida(self, admin_session):
+        assert admin_session.get('/admin/api/listado/logs').status_code == 404
+
+    def test_requiere_admin(self, client):
+        response = client.get('/admin/api/listado/articulos')
+        assert response.status_code in (302, 403)
@@ -0,0 +1,53 @@
+"""
+Tests para el buffer write-behind de eventos de lectura.
+"""
+
+import pytest
+from app.enums import LogEventType
+from app.models.log import LogActividad
+from app.utils.analytics_buffer import ReadEventBuffer
+
+
+@pytest.fixture
+def buffer(app):
+    """Buffer habilitado ligado a la app de test."""
+    buf = ReadEventBuffer()
+    buf.init_app(app)
+    buf.enabled = True
+    yield buf
+    buf.detener()
+
+
+class TestReadEventBuffer:
+    """Tests del buffer de analytics."""
+
+    def test_detener_escribe_eventos_pendientes(self, app, buffer):
+        """El flush de apagado persiste todos los eventos encolados."""
+        for i in range(5):
+            buffer.registrar(LogEventType.LECTURA, f"Leído: articulo-{i}")
+        buffer.detener()
+
+        assert LogActividad.query.filter_by(tipo_evento='lectura').count() == 5
+        assert buffer.stats()['escritos'] == 5
+
+    def test_cola_llena_descarta_sin_bloquear(self, app, buffer, monkeypatch):
+        """Con la cola llena, los eventos se descartan y se contabilizan."""
+        import queue
+        monkeypatch.setattr(buffer, '_asegurar_hilo', lambda: None)
+        buffer._cola = queue.Queue(maxsize=2)
+
+        for i in range(5):
+            buffer.registrar(LogEventType.LECTURA, f"Leído: {i}")
+
+        stats = buffer.stats()
+        assert stats['encolados'] == 2
+        assert stats['descartados'] == 3
+
+    def test_modo_sincrono_escribe_inmediato(self, app):
+        """Sin write-behind, el evento se escribe en la misma petición."""
+        buf = ReadEventBuffer()
+        buf.init_app(app)
+        buf.enabled = False
+        buf.registrar(LogEventType.LECTURA, "Leído: directo")
+
+        assert LogActividad.query.filter_by(detalle="Leído: directo").count() == 1
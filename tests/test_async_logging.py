@@ -0,0 +1,118 @@
+"""
+Tests para el logging no bloqueante y el muestreo de accesos (app/utils/async_logging.py).
+"""
+
+import logging
+import threading
+import time
+
+from app.utils.async_logging import ColaLogs, MuestreoPeticiones, estado_logging, instalar_muestreo
+
+
+class _HandlerLento(logging.Handler):
+    """Simula un disco lento: cada escritura espera a que se libere el evento."""
+
+    def __init__(self, liberar):
+        super().__init__()
+        self.liberar = liberar
+        self.mensajes = []
+        self.hilos = set()
+
+    def emit(self, record):
+        self.liberar.wait(5)
+        self.hilos.add(threading.current_thread().name)
+        self.mensajes.append(self.format(record))
+
+
+def _logger(nombre, handler):
+    logger = logging.getLogger(nombre)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class TestColaLogs:
+    """Encolado sin bloqueo, descartes y vaciado al detener."""
+
+    def test_no_bloquea_y_vacia_al_detener(self):
+        liberar = threading.Event()
+        destino = _HandlerLento(liberar)
+        destino.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        cola = ColaLogs([destino], max_registros=100)
+        logger = _logger('test.async.vaciado', cola)
+
+        inicio = time.perf_counter()
+        for i in range(20):
+            logger.info('evento %d', i)
+        assert time.perf_counter() - inicio < 1  # El disco "lento" no frena al emisor
+
+        liberar.set()
+        cola.detener()
+        assert destino.mensajes == [f'INFO evento {i}' for i in range(20)]
+        assert threading.current_thread().name not in destino.hilos
+
+    def test_cola_llena_descarta_y_cuenta(self):
+        liberar = threading.Event()
+        destino = _HandlerLento(liberar)
+        cola = ColaLogs([destino], max_registros=5)
+        logger = _logger('test.async.llena', cola)
+
+        for i in range(50):
+            logger.info('evento %d', i)
+        stats = cola.stats()
+        assert stats['descartados'] > 0
+        assert stats['encolados'] + stats['descartados'] == 50
+
+        liberar.set()
+        cola.detener()
+        assert len(destino.mensajes) == stats['encolados']
+
+    def test_excepciones_se_formatean_en_el_listener(self):
+        destino = _HandlerLento(threading.Event())
+        destino.liberar.set()
+        destino.setFormatter(logging.Formatter('%(message)s'))
+        cola = ColaLogs([destino])
+        logger = _logger('test.async.exc', cola)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception('fallo')
+        cola.detener()
+        assert 'ValueError: boom' in destino.mensajes[0]
+
+
+class TestMuestreo:
+    """1 de cada N accesos correctos; errores y lentos siempre."""
+
+    def test_filtro(self):
+        filtro = MuestreoPeticiones(cada=10, lento_ms=500)
+
+        def registro(status, ms):
+            record = logging.LogRecord('request', logging.INFO, __file__, 1, 'x', None, None)
+            record.status, record.elapsed_ms = status, ms
+            return record
+
+        conservados = sum(filtro.filter(registro(200, 5)) for _ in range(100))
+        assert conservados == 10
+        assert filtro.omitidos == 90
+        assert all(filtro.filter(registro(500, 5)) for _ in range(5))
+        assert all(filtro.filter(registro(200, 800)) for _ in range(5))
+        assert filtro.filter(logging.LogRecord('request', logging.INFO, __file__, 1, 'x', None, None))
+
+    def test_instalar_reemplaza_y_estado(self):
+        try:
+            instalar_muestreo(4, 1000)
+            instalar_muestreo(8, 1000)
+            filtros = [f for f in logging.getLogger('request').filters if isinstance(f, MuestreoPeticiones)]
+            assert [f.cada for f in filtros] == [8]
+            assert estado_logging()['muestreo'] == {'cada': 8, 'omitidos': 0}
+        finally:
+            instalar_muestreo(1, 1000)
+        assert estado_logging()['muestreo'] is None
+
+
+def test_diagnostico_incluye_estado_logging(admin_session):
+    response = admin_session.post('/api/diagnostics/logs')
+    datos = response.get_json()
+    assert datos['details']['logging']['modo'] in ('sync', 'async')
@@ -0,0 +1,127 @@
+"""
+Tests para las acciones en lote del panel (app/utils/batch_actions.py).
+"""
+
+import pytest
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.constants import LISTA_CATEGORIAS
+from app.models.articulo import Articulo
+from app.models.fuente import FuenteAcademica
+from app.models.log import LogActividad
+from app.models.usuario import Usuario
+from app.utils.batch_actions import AccionLoteError, parsear_ids, ejecutar_accion_lote
+
+
+def _logs_lote():
+    return LogActividad.query.filter(
+        LogActividad.tipo_evento == LogEventType.ADMIN,
+        LogActividad.detalle.like('Lote %'),
+    ).all()
+
+
+class TestParsearIds:
+    """Normalización de la lista de ids."""
+
+    def test_lista_y_cadena(self, app):
+        assert parsear_ids(['3', 1, '3,2']) == [3, 1, 2]
+        assert parsear_ids('5, 6,,5') == [5, 6]
+
+    @pytest.mark.parametrize('valores', [None, [], '', ['abc'], ['-1'], ['0']])
+    def test_invalidos(self, app, valores):
+        with pytest.raises(AccionLoteError):
+            parsear_ids(valores)
+
+    def test_limite(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'ADMIN_BATCH_MAX', 2)
+        with pytest.raises(AccionLoteError):
+            parsear_ids([1, 2, 3])
+
+
+class TestEjecutar:
+    """UPDATE por conjunto, conteo real y un solo log."""
+
+    def test_papelera_y_restaurar(self, app, crear_articulos):
+        ids = [a.id for a in crear_articulos(3)]
+        resultado = ejecutar_accion_lote('articulos', 'eliminar', ids[:2] + [9999])
+
+        assert resultado['solicitados'] == 3
+        assert resultado['afectados'] == 2
+        assert Articulo.get_active().count() == 1
+        assert len(_logs_lote()) == 1
+
+        # Repetir no cambia nada ni deja otro log
+        assert ejecutar_accion_lote('articulos', 'eliminar', ids[:2])['afectados'] == 0
+        assert len(_logs_lote()) == 1
+
+        assert ejecutar_accion_lote('articulos', 'restaurar', ids)['afectados'] == 2
+        assert Articulo.get_active().count() == 3
+
+    def test_categoria(self, app, crear_articulos):
+        ids = [a.id for a in crear_articulos(2)]
+        with pytest.raises(AccionLoteError):
+            ejecutar_accion_lote('articulos', 'categoria', ids, 'No existe')
+
+        resultado = ejecutar_accion_lote('articulos', 'categoria', ids, LISTA_CATEGORIAS[0])
+        assert resultado['afectados'] == 2
+        assert {a.categoria for a in Articulo.query} == {LISTA_CATEGORIAS[0]}
+
+    def test_categoria_actualiza_indice_de_busqueda(self, app, crear_articulos):
+        from app.utils.search import buscar_ids
+
+        origen, destino = '🧠 Psi. del Estrés y la Ansiedad', '🧩 Psi. y Neurociencia del Comportamiento'
+        articulo, = crear_articulos(titulo='Rumiación', slug='rumiacion', categoria=origen, tags='sueño', cuerpo='')
+
+        ejecutar_accion_lote('articulos', 'categoria', [articulo.id], destino)
+        assert buscar_ids('neurociencia comportamiento') == [articulo.id]
+        assert buscar_ids('ansiedad') == []
+        assert buscar_ids('sueno') == [articulo.id]  # Los tags propios se conservan
+
+    def test_fuentes(self, app):
+        fuente = FuenteAcademica(titulo='F', autor='A', anio=2020, fuente_origen='PubMed')
+        db.session.add(fuente)
+        db.session.commit()
+        assert ejecutar_accion_lote('fuentes', 'eliminar', [fuente.id])['afectados'] == 1
+        assert FuenteAcademica.get_active().count() == 0
+
+    def test_acceso_edu_invalida_cache_de_usuarios(self, app, monkeypatch):
+        usuarios = [Usuario(email=f'u{i}@gmail.com', nombre=f'U{i}') for i in range(3)]
+        db.session.add_all(usuarios)
+        db.session.commit()
+        invalidados = []
+        monkeypatch.setattr('app.utils.current_user.invalidar_usuarios', lambda emails: invalidados.extend(emails))
+
+        resultado = ejecutar_accion_lote('usuarios', 'aprobar_edu', [u.id for u in usuarios[:2]])
+        assert resultado['afectados'] == 2
+        assert Usuario.query.filter_by(acceso_edu=True).count() == 2
+        assert sorted(invalidados) == ['u0@gmail.com', 'u1@gmail.com']
+
+        assert ejecutar_accion_lote('usuarios', 'revocar_edu', [u.id for u in usuarios])['afectados'] == 2
+
+    def test_accion_desconocida(self, app):
+        with pytest.raises(AccionLoteError):
+            ejecutar_accion_lote('usuarios', 'eliminar', [1])
+
+
+class TestRuta:
+    """/admin/lote/<seccion>/<accion>."""
+
+    def test_json_y_formulario(self, admin_session, crear_articulos):
+        ids = [a.id for a in crear_articulos(3)]
+        response = admin_session.post('/admin/lote/articulos/eliminar', json={'ids': ids[:2]})
+        assert response.status_code == 200
+        assert response.get_json() == {
+            'seccion': 'articulos', 'accion': 'eliminar', 'solicitados': 2, 'afectados': 2
+        }
+
+        response = admin_session.post('/admin/lote/articulos/restaurar', data={'ids': f'{ids[0]},{ids[1]}'})
+        assert response.get_json()['afectados'] == 2
+
+    def test_errores(self, admin_session):
+        assert admin_session.post('/admin/lote/articulos/borrar', json={'ids': [1]}).status_code == 404
+        assert admin_session.post('/admin/lote/articulos/eliminar', json={'ids': []}).status_code == 400
+        assert admin_session.post('/admin/lote/articulos/categoria', json={'ids': [1]}).status_code == 400
+
+    def test_requiere_admin(self, client):
+        assert client.post('/admin/lote/articulos/eliminar', json={'ids': [1]}).status_code in (302, 403)
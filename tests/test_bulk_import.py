@@ -0,0 +1,125 @@
+"""
+Tests para la importación masiva de artículos (flask content import).
+"""
+
+import json
+import zipfile
+
+import pytest
+
+from app.extensions import db
+from app.models.articulo import Articulo
+from app.models.busqueda import ArticuloBusqueda
+from app.models.tag import Tag
+from app.utils.bulk_import import importar_articulos, ImportacionError, FuenteImportacion
+from app.utils.search import buscar_ids
+
+
+def _fuente(tmp_path, n=3, formato='csv'):
+    origen = tmp_path / 'origen'
+    origen.mkdir()
+    filas = []
+    for i in range(n):
+        slug = f'importado-{i}'
+        (origen / f'{slug}.html').write_text(
+            f'<h2>Sección {i}</h2><p>Texto sobre neuroplasticidad {i}</p><script>alert(1)</script>',
+            encoding='utf-8'
+        )
+        filas.append({'slug': slug, 'titulo': f'Importado {i}', 'tags': 'Memoria, Sueño'})
+    (origen / 'importado-0.css').write_text('.x { color: red; }', encoding='utf-8')
+
+    if formato == 'json':
+        (origen / 'manifest.json').write_text(json.dumps(filas), encoding='utf-8')
+    else:
+        lineas = ['slug,titulo,tags'] + [f'{f["slug"]},{f["titulo"]},"{f["tags"]}"' for f in filas]
+        (origen / 'manifest.csv').write_text('\n'.join(lineas), encoding='utf-8')
+    return origen
+
+
+class TestImportacion:
+    """Tests del pipeline por lotes."""
+
+    def test_importa_sanitiza_e_indexa(self, app, tmp_path):
+        origen = _fuente(tmp_path)
+        destino = tmp_path / 'destino'
+        lotes = []
+
+        resultado = importar_articulos(str(origen), str(destino), batch_size=2, workers=1,
+                                       reportar=lotes.append)
+
+        assert resultado['importados'] == 3
+        assert [lote.importados for lote in lotes] == [2, 1]
+        html = (destino / 'templates' / 'articulos' / 'importado-0.html').read_text(encoding='utf-8')
+        assert '<script>' not in html
+        assert (destino / 'static' / 'articulos_css' / 'importado-0.css').exists()
+
+        art = Articulo.query.filter_by(slug='importado-1').one()
+        assert art.num_palabras and art.extracto
+        assert sorted(t.slug for t in art.etiquetas) == ['memoria', 'sueno']
+        assert Tag.query.count() == 2
+        assert db.session.get(ArticuloBusqueda, art.id) is not None
+        assert len(buscar_ids('neuroplasticidad')) == 3
+
+    def test_reimportar_omite_existentes(self, app, tmp_path):
+        origen = _fuente(tmp_path, formato='json')
+        importar_articulos(str(origen), str(tmp_path / 'destino'), workers=1)
+        resultado = importar_articulos(str(origen), str(tmp_path / 'destino'), workers=1)
+        assert resultado['importados'] == 0
+        assert resultado['omitidos'] == 3
+        assert Articulo.query.count() == 3
+
+    def test_errores_por_fila(self, app, tmp_path):
+        origen = _fuente(tmp_path, n=1)
+        with open(origen / 'manifest.csv', 'a', encoding='utf-8') as f:
+            f.write('\nSlug Malo,Titulo,\nsin-archivo,Titulo,\nimportado-0,Duplicado,')
+
+        resultado = importar_articulos(str(origen), str(tmp_path / 'destino'), workers=1)
+        assert resultado['importados'] == 1
+        assert {slug for slug, _ in resultado['errores']} == {'Slug Malo', 'sin-archivo', 'importado-0'}
+
+    def test_reanuda_desde_checkpoint(self, app, tmp_path):
+        origen = _fuente(tmp_path, n=4)
+        checkpoint = tmp_path / 'progreso.json'
+
+        class Interrumpir(Exception):
+            pass
+
+        def cortar(lote):
+            raise Interrumpir()
+
+        with pytest.raises(Interrumpir):
+            importar_articulos(str(origen), str(tmp_path / 'destino'), checkpoint=str(checkpoint),
+                               batch_size=2, workers=1, reportar=cortar)
+        assert json.loads(checkpoint.read_text())['siguiente'] == 2
+
+        lotes = []
+        resultado = importar_articulos(str(origen), str(tmp_path / 'destino'), checkpoint=str(checkpoint),
+                                       batch_size=2, workers=1, reportar=lotes.append)
+        assert [lote.numero for lote in lotes] == [2]
+        assert resultado['importados'] == 4
+        assert Articulo.query.count() == 4
+        assert not checkpoint.exists()
+
+    def test_zip_y_pool_de_procesos(self, app, tmp_path):
+        origen = _fuente(tmp_path, n=2)
+        archivo = tmp_path / 'lote.zip'
+        with zipfile.ZipFile(archivo, 'w') as zf:
+            for ruta in origen.iterdir():
+                zf.write(ruta, ruta.name)
+
+        resultado = importar_articulos(str(archivo), str(tmp_path / 'destino'), workers=2)
+        assert resultado['importados'] == 2
+
+    def test_fuente_invalida(self, app, tmp_path):
+        archivo = tmp_path / 'no-zip.txt'
+        archivo.write_text('x')
+        with pytest.raises(ImportacionError):
+            FuenteImportacion(str(archivo))
+
+
+def test_cli_import(app, runner, tmp_path, monkeypatch):
+    monkeypatch.setattr('app.config.BASE_DIR', str(tmp_path / 'destino'))
+    origen = _fuente(tmp_path, n=2)
+    resultado = runner.invoke(args=['content', 'import', str(origen), '--workers', '1'])
+    assert resultado.exit_code == 0, resultado.output
+    assert 'Lote 1: 2 importados' in resultado.output
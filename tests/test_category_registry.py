@@ -0,0 +1,77 @@
+"""
+Tests para el registro de categorías en memoria.
+"""
+
+from sqlalchemy import event
+from app.extensions import db
+from app.models.categoria import Categoria
+from app.constants import LISTA_CATEGORIAS, get_category_slug
+from app.utils.category_registry import category_registry
+
+
+def _contar_consultas_categoria(app):
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM categoria' in statement:
+            sentencias.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    return sentencias, registrar
+
+
+class TestRegistroCategorias:
+    """Tests de construcción e invalidación del registro."""
+
+    def test_fallback_a_constantes(self, app):
+        """Sin categorías en BD se usa LISTA_CATEGORIAS."""
+        registro = category_registry.actual()
+        assert registro.origen == 'constantes'
+        assert registro.nombres == tuple(LISTA_CATEGORIAS)
+        assert len(registro) == len(LISTA_CATEGORIAS)
+
+    def test_slug_y_busqueda_por_slug(self, app):
+        registro = category_registry.actual()
+        cat = LISTA_CATEGORIAS[0]
+        slug = get_category_slug(cat)
+        assert registro.slug(cat) == slug
+        assert registro.por_slug(slug).nombre == cat
+        assert registro.por_slug('no-existe') is None
+
+    def test_slug_de_nombre_desconocido(self, app):
+        """Nombres fuera del registro conservan el slug calculado."""
+        registro = category_registry.actual()
+        assert registro.slug('🧪 Categoría Antigua') == 'categoria-antigua'
+        assert not registro.es_valida('🧪 Categoría Antigua')
+
+    def test_construye_desde_bd_e_invalida_al_commit(self, app):
+        assert category_registry.actual().origen == 'constantes'
+
+        db.session.add(Categoria(nombre='🧪 Psi. Experimental', orden=1))
+        db.session.add(Categoria(nombre='🔒 Inactiva', orden=2, activa=False))
+        db.session.commit()
+
+        registro = category_registry.actual()
+        assert registro.origen == 'bd'
+        assert registro.nombres == ('🧪 Psi. Experimental',)
+        assert registro.es_valida('🧪 Psi. Experimental')
+        assert not registro.es_valida('🔒 Inactiva')
+        assert registro.por_slug('psi-experimental').emoji == '🧪'
+
+    def test_lecturas_sin_consultas(self, app):
+        """Tras construirse, leer el registro no consulta la tabla categoria."""
+        category_registry.actual()
+        sentencias, registrar = _contar_consultas_categoria(app)
+        try:
+            for _ in range(5):
+                category_registry.actual().nombres
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        assert sentencias == []
+
+    def test_context_processor_usa_registro(self, app, client):
+        response = client.get('/categorias')
+        assert response.status_code == 200
+        slug = get_category_slug(LISTA_CATEGORIAS[0])
+        assert client.get(f'/categoria/{slug}').status_code == 200
+        assert client.get('/categoria/no-existe').status_code == 404
@@ -0,0 +1,84 @@
+"""
+Tests para la caché de contenido HTML por worker.
+"""
+
+import os
+import pytest
+from app.utils.content_cache import ContentCache, CARPETA_ARTICULOS
+
+
+@pytest.fixture
+def archivos(tmp_path):
+    """Crea un HTML y un CSS de prueba."""
+    ruta_html = tmp_path / 'articulo.html'
+    ruta_css = tmp_path / 'articulo.css'
+    ruta_html.write_text('<p>' + 'palabra ' * 400 + '</p>', encoding='utf-8')
+    ruta_css.write_text('p { color: red; }', encoding='utf-8')
+    return str(ruta_html), str(ruta_css)
+
+
+class TestContentCache:
+    """Tests del LRU de contenido preparado."""
+
+    def test_carga_payload_completo(self, archivos):
+        """El payload incluye HTML y versión CSS."""
+        ruta_html, ruta_css = archivos
+        cache = ContentCache()
+        payload = cache.obtener(CARPETA_ARTICULOS, 'articulo', ruta_html, ruta_css)
+
+        assert payload['html'].startswith('<p>')
+        assert payload['tiene_css'] is True
+        assert payload['css_version'] == int(os.path.getmtime(ruta_css))
+
+    def test_segunda_lectura_es_hit(self, archivos):
+        """La segunda lectura se sirve desde memoria."""
+        ruta_html, ruta_css = archivos
+        cache = ContentCache()
+        cache.obtener(CARPETA_ARTICULOS, 'articulo', ruta_html, ruta_css)
+        cache.obtener(CARPETA_ARTICULOS, 'articulo', ruta_html, ruta_css)
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_archivo_inexistente_retorna_none(self, tmp_path):
+        """Un HTML inexistente no se cachea y retorna None."""
+        cache = ContentCache()
+        assert cache.obtener(CARPETA_ARTICULOS, 'x', str(tmp_path / 'no.html')) is None
+        assert cache.stats()['entradas'] == 0
+
+    def test_revalida_por_mtime(self, archivos):
+        """Con revalidación inmediata, un archivo modificado se recarga."""
+        ruta_html, ruta_css = archivos
+        cache = ContentCache(revalidate_seconds=0)
+        cache.obtener(CARPETA_ARTICULOS, 'articulo', ruta_html, ruta_css)
+
+        with open(ruta_html, 'w', encoding='utf-8') as f:
+            f.write('<p>nuevo contenido</p>')
+        stat = os.stat(ruta_html)
+        os.utime(ruta_html, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        payload = cache.obtener(CARPETA_ARTICULOS, 'articulo', ruta_html, ruta_css)
+        assert payload['html'] == '<p>nuevo contenido</p>'
+
+    def test_invalidar_elimina_entrada(self, archivos):
+        """invalidar() fuerza la recarga desde disco."""
+        ruta_html, ruta_css = archivos
+        cache = ContentCache()
+        cache.obtener(CARPETA_ARTICULOS, 'articulo', ruta_html, ruta_css)
+        cache.invalidar(CARPETA_ARTICULOS, 'articulo')
+
+        assert cache.stats()['entradas'] == 0
+        assert cache.stats()['bytes'] == 0
+
+    def test_expulsa_por_bytes_totales(self, tmp_path):
+        """Las entradas menos usadas se expulsan al superar max_bytes."""
+        cache = ContentCache(max_bytes=250)
+        for i in range(3):
+            ruta = tmp_path / f'a{i}.html'
+            ruta.write_text('x' * 100, encoding='utf-8')
+            cache.obtener(CARPETA_ARTICULOS, f'a{i}', str(ruta))
+
+        stats = cache.stats()
+        assert stats['entradas'] == 2
+        assert stats['bytes'] <= 250
@@ -0,0 +1,104 @@
+"""
+Tests para el usuario actual por petición (g.current_user).
+"""
+
+import pytest
+from flask import g
+from sqlalchemy import event
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.utils.current_user import UsuarioActual
+
+
+@pytest.fixture
+def consultas_usuario(app):
+    """Cuenta las sentencias SQL que leen la tabla usuario."""
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM usuario' in statement:
+            sentencias.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    yield sentencias
+    event.remove(db.engine, 'before_cursor_execute', registrar)
+
+
+def _login(client, email):
+    with client.session_transaction() as sess:
+        sess['user_email'] = email
+        sess['user_name'] = 'Test'
+
+
+class TestTipoUsuario:
+    """Tests del cálculo de nivel de acceso."""
+
+    def test_visitante(self):
+        assert UsuarioActual().tipo == 1
+
+    def test_personal(self):
+        assert UsuarioActual('ana@gmail.com', {'id': 1}).tipo == 2
+
+    def test_educativo_por_dominio_o_aprobacion(self):
+        assert UsuarioActual('ana@uni.edu', {'id': 1}).tipo == 3
+        assert UsuarioActual('ana@gmail.com', {'id': 1, 'acceso_edu': True}).tipo == 3
+
+    def test_institucional_y_admin(self):
+        assert UsuarioActual('ana@ieproes.edu.sv', {'id': 1}).tipo == 4
+        admin = UsuarioActual('Admin@Test.com', {'id': None}, admin_email='admin@test.com')
+        assert admin.tipo == 4
+        assert admin.es_admin and admin.acceso_edu
+
+
+class TestCargaPorPeticion:
+    """Tests de consultas por petición."""
+
+    def test_una_consulta_y_cero_con_cache(self, app, client, consultas_usuario):
+        """Primera petición: una consulta; la siguiente se sirve de caché."""
+        db.session.add(Usuario(email='ana@gmail.com', nombre='Ana'))
+        db.session.commit()
+        _login(client, 'ana@gmail.com')
+
+        assert client.get('/fuentes').status_code == 200
+        assert len(consultas_usuario) == 1
+
+        assert client.get('/fuentes').status_code == 200
+        assert len(consultas_usuario) == 1
+
+    def test_aprobar_edu_invalida_cache(self, app, client):
+        """Aprobar acceso .edu se refleja sin esperar al TTL de la caché."""
+        usuario = Usuario(email='ana@gmail.com', nombre='Ana')
+        db.session.add(usuario)
+        db.session.commit()
+        usuario_id = usuario.id
+
+        _login(client, 'ana@gmail.com')
+        with client:
+            client.get('/fuentes')  # calienta la caché
+            assert g.current_user.tipo == 2
+
+        _login(client, app.config['ADMIN_EMAIL'])
+        client.post(f'/admin/aprobar-edu/{usuario_id}')
+
+        _login(client, 'ana@gmail.com')
+        with client:
+            client.get('/fuentes')
+            assert g.current_user.tipo == 3
+
+    def test_acceso_edu_con_ttl_corto(self, app, monkeypatch):
+        """Una revocación en otro worker caduca con CURRENT_USER_EDU_CACHE_SECONDS."""
+        from app.extensions import cache
+        from app.utils.current_user import _cargar_datos
+
+        db.session.add_all([
+            Usuario(email='ana@gmail.com', nombre='Ana', acceso_edu=True),
+            Usuario(email='luis@gmail.com', nombre='Luis'),
+        ])
+        db.session.commit()
+        timeouts = {}
+        monkeypatch.setattr(cache, 'set', lambda clave, valor, timeout=None: timeouts.__setitem__(clave, timeout))
+
+        _cargar_datos('ana@gmail.com')
+        _cargar_datos('luis@gmail.com')
+        assert timeouts['usuario_actual:ana@gmail.com'] == app.config['CURRENT_USER_EDU_CACHE_SECONDS']
+        assert timeouts['usuario_actual:luis@gmail.com'] == app.config['CURRENT_USER_CACHE_SECONDS']
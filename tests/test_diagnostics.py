@@ -75,3 +75,74 @@ class TestDiagnosticsWithAdmin:
             # Verificar cálculo: (passed / total) * 100
             expected_score = round((summary['passed'] / summary['total']) * 100, 1)
             assert summary['health_score'] == expected_score
+
+
+class TestEjecucionConcurrente:
+    """Checks en paralelo, timeout parcial y caché TTL."""
+    
+    def test_run_all_cachea_y_refresh_fuerza(self, admin_session, app):
+        primera = admin_session.post('/api/diagnostics/run-all').get_json()
+        segunda = admin_session.post('/api/diagnostics/run-all').get_json()
+        
+        assert primera['summary']['cached'] == 0
+        nombres = [c['name'] for c in segunda['checks']]
+        assert nombres == [c['name'] for c in primera['checks']]
+        cacheados = {c['name'] for c in segunda['checks'] if c['cached']}
+        assert 'Base de Datos' in cacheados and 'Integridad Artículos' in cacheados
+        assert 'Configuración' not in cacheados  # Baratos: siempre en vivo
+        
+        forzada = admin_session.post('/api/diagnostics/run-all?refresh=1').get_json()
+        assert forzada['summary']['cached'] == 0
+    
+    def test_timeout_devuelve_resultado_parcial(self, admin_session, app, monkeypatch):
+        import threading
+        from app.routes import diagnostics
+        
+        liberar = threading.Event()
+        
+        def lento():
+            liberar.wait(5)
+            return {'success': True, 'message': 'ok tarde'}
+        
+        monkeypatch.setitem(app.config, 'DIAGNOSTICS_CHECK_TIMEOUT_SECONDS', 0.2)
+        with app.test_request_context('/api/diagnostics/run-all'):
+            resultados = diagnostics.ejecutar_checks(
+                [('Lento', lento), ('Configuración', diagnostics.check_config)]
+            )
+        liberar.set()
+        
+        assert resultados[0]['status'] == 'error' and resultados[0]['details']['timeout']
+        assert resultados[1]['name'] == 'Configuración' and resultados[1]['status'] in ('pass', 'fail')
+    
+    def test_check_colgado_no_se_reenvia(self, admin_session, app, monkeypatch):
+        import threading
+        from app.extensions import cache
+        from app.routes import diagnostics
+        
+        liberar = threading.Event()
+        llamadas = []
+        
+        def colgado():
+            llamadas.append(1)
+            liberar.wait(5)
+            return {'success': True, 'message': 'ok tarde'}
+        
+        monkeypatch.setitem(app.config, 'DIAGNOSTICS_CHECK_TIMEOUT_SECONDS', 0.1)
+        try:
+            with app.test_request_context('/api/diagnostics/run-all'):
+                for _ in range(2):
+                    resultado = diagnostics.ejecutar_checks([('Colgado', colgado)], forzar=True)[0]
+                    assert resultado['details']['timeout']
+            assert len(llamadas) == 1  # La segunda consulta esperó al mismo future
+        finally:
+            liberar.set()
+        
+        monkeypatch.setitem(app.config, 'DIAGNOSTICS_CHECK_TIMEOUT_SECONDS', 5)
+        with app.test_request_context('/api/diagnostics/run-all'):
+            assert diagnostics.ejecutar_checks([('Colgado', colgado)])[0]['status'] == 'pass'
+        cache.delete(diagnostics.CACHE_PREFIX + 'Colgado')
+    
+    def test_integridad_incremental(self, admin_session):
+        admin_session.post('/api/diagnostics/articles?refresh=1')
+        datos = admin_session.post('/api/diagnostics/articles?refresh=1').get_json()
+        assert datos['details']['verificacion']['articulos'] == 'sin cambios'
@@ -0,0 +1,122 @@
+"""
+Tests para la reconciliación BD/archivos (app/utils/file_sync.py).
+"""
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.models.articulo import Articulo
+from app.models.caso import CasoClinico
+from app.models.log import LogActividad
+from app.utils import file_sync
+from app.utils.file_sync import reconciliar, archivar_huerfanos, listar_archivos_html
+
+
+def _preparar(tmp_path):
+    """Dos artículos con archivo, uno sin archivo, un caso sin archivo y un HTML sin registro."""
+    articulos = tmp_path / 'templates' / 'articulos'
+    articulos.mkdir(parents=True)
+    for slug in ('con-archivo', 'otro'):
+        (articulos / f'{slug}.html').write_text('<p>x</p>', encoding='utf-8')
+    (articulos / 'suelto.html').write_text('<p>x</p>', encoding='utf-8')
+    (articulos / 'notas.txt').write_text('x', encoding='utf-8')
+    (articulos / 'subcarpeta.html').mkdir()
+
+    for slug in ('con-archivo', 'otro', 'perdido'):
+        db.session.add(Articulo(titulo=slug.title(), slug=slug, categoria='Test', nombre_archivo=f'{slug}.html'))
+    db.session.add(CasoClinico(titulo='Caso', slug='caso', numero='01', nombre_archivo='caso.html'))
+    db.session.commit()
+
+
+class TestReconciliar:
+    """Tests del diff archivos/filas."""
+
+    def test_carpeta_inexistente(self, tmp_path):
+        assert listar_archivos_html(str(tmp_path / 'no-existe')) == set()
+
+    def test_huerfanos_y_sin_registro(self, app, tmp_path):
+        _preparar(tmp_path)
+        resultados = reconciliar(str(tmp_path))
+
+        articulos = resultados['articulos']
+        assert [h.slug for h in articulos.huerfanos] == ['perdido']
+        assert articulos.sin_registro == ['suelto.html']
+        assert articulos.activos == 3
+        assert articulos.archivos == 3
+        assert [h.slug for h in resultados['casos_clinicos'].huerfanos] == ['caso']
+
+    def test_archivar_en_bloque_con_un_solo_log(self, app, tmp_path):
+        _preparar(tmp_path)
+        logs_antes = LogActividad.query.count()
+
+        archivados = archivar_huerfanos(reconciliar(str(tmp_path)))
+        db.session.commit()
+
+        assert archivados == {'articulos': 1, 'casos_clinicos': 1}
+        assert Articulo.get_active().count() == 2
+        assert Articulo.query.filter_by(slug='perdido').one().deleted_at is not None
+        assert CasoClinico.get_active().count() == 0
+        assert LogActividad.query.count() == logs_antes + 1
+        log = LogActividad.query.filter_by(tipo_evento=LogEventType.ADMIN).one()
+        assert 'Sincronización: 2 archivados' in log.detalle
+
+        # Idempotente: los archivados ya no son huérfanos
+        assert not reconciliar(str(tmp_path))['articulos'].huerfanos
+
+
+class TestAdminSincronizar:
+    """Tests de /admin/sincronizar sobre el motor de reconciliación."""
+
+    def test_preview_y_confirmacion(self, admin_session, tmp_path, monkeypatch):
+        monkeypatch.setattr('app.routes.admin.carpeta_base', str(tmp_path))
+        _preparar(tmp_path)
+
+        preview = admin_session.get('/admin/sincronizar')
+        assert preview.status_code == 200
+        assert b'perdido.html' in preview.data
+        assert b'suelto.html' in preview.data
+
+        response = admin_session.post('/admin/sincronizar')
+        assert response.status_code == 302
+        assert Articulo.get_active().count() == 2
+
+
+def test_diagnostico_integridad(admin_session, monkeypatch, tmp_path):
+    monkeypatch.setattr('app.config.BASE_DIR', str(tmp_path))
+    _preparar(tmp_path)
+    datos = admin_session.post('/api/diagnostics/articles').get_json()
+    assert datos['status'] == 'fail'
+    assert {o['archivo'] for o in datos['details']['orphaned']} == {'perdido.html', 'caso.html'}
+    assert datos['details']['sin_registro'] == {'articulos': 1, 'casos_clinicos': 0}
+
+
+class TestIncremental:
+    """Reutiliza resultados/listados mientras carpeta y tabla no cambien."""
+
+    def test_solo_reverifica_lo_que_cambia(self, app, tmp_path, monkeypatch):
+        _preparar(tmp_path)
+        base = str(tmp_path)
+        assert reconciliar(base, incremental=True)['articulos'].verificacion == 'completa'
+
+        listados = []
+        original = file_sync.listar_archivos_html
+        monkeypatch.setattr(file_sync, 'listar_archivos_html', lambda ruta: listados.append(ruta) or original(ruta))
+
+        sin_cambios = reconciliar(base, incremental=True)['articulos']
+        assert sin_cambios.verificacion == 'sin cambios'
+        assert [h.slug for h in sin_cambios.huerfanos] == ['perdido']
+        assert listados == []
+
+        # Cambio solo en la BD: se reutiliza el listado de archivos
+        db.session.add(Articulo(titulo='Nuevo', slug='suelto', categoria='Test', nombre_archivo='suelto.html'))
+        db.session.commit()
+        solo_bd = reconciliar(base, incremental=True)['articulos']
+        assert solo_bd.verificacion == 'solo BD'
+        assert solo_bd.sin_registro == []
+        assert listados == []
+
+        # Archivo borrado: cambia el mtime de la carpeta y se vuelve a listar
+        (tmp_path / 'templates' / 'articulos' / 'otro.html').unlink()
+        completo = reconciliar(base, incremental=True)['articulos']
+        assert completo.verificacion == 'completa'
+        assert sorted(h.slug for h in completo.huerfanos) == ['otro', 'perdido']
+        assert len(listados) == 1
@@ -0,0 +1,68 @@
+"""
+Tests para la etapa de ingesta (métricas precalculadas de contenido).
+"""
+
+import json
+from app.extensions import db
+from app.models.caso import CasoClinico
+from app.utils.ingest import analizar_html, aplicar_metricas
+
+
+class TestAnalizarHtml:
+    """Tests del cálculo de métricas."""
+
+    def test_cuenta_palabras_y_tiempo(self):
+        """400 palabras a 200 wpm son 2 minutos."""
+        metricas = analizar_html('<p>' + 'palabra ' * 400 + '</p>')
+        assert metricas['num_palabras'] == 400
+        assert metricas['tiempo_lectura'] == 2
+
+    def test_tiempo_minimo_un_minuto(self):
+        """Textos cortos tienen al menos 1 minuto de lectura."""
+        assert analizar_html('<p>Hola</p>')['tiempo_lectura'] == 1
+
+    def test_indice_de_encabezados(self):
+        """El índice recoge h1-h4 con su nivel."""
+        html = '<h2><span>Introducción</span></h2><p>x</p><h3>Métodos</h3><h5>No</h5>'
+        assert analizar_html(html)['indice'] == [
+            {'nivel': 2, 'texto': 'Introducción'},
+            {'nivel': 3, 'texto': 'Métodos'},
+        ]
+
+    def test_extracto_recortado(self):
+        """El extracto se recorta en límite de palabra."""
+        extracto = analizar_html('<p>' + 'palabra ' * 200 + '</p>')['extracto']
+        assert len(extracto) <= 300
+        assert extracto.endswith('…')
+
+    def test_html_vacio(self):
+        """HTML vacío produce métricas neutras."""
+        metricas = analizar_html('')
+        assert metricas['num_palabras'] == 0
+        assert metricas['indice'] == []
+
+    def test_aplicar_metricas_serializa_indice(self):
+        """aplicar_metricas guarda el índice como JSON."""
+        caso = CasoClinico()
+        aplicar_metricas(caso, analizar_html('<h2>Uno</h2>'))
+        assert json.loads(caso.indice_json) == [{'nivel': 2, 'texto': 'Uno'}]
+        assert caso.get_indice() == [{'nivel': 2, 'texto': 'Uno'}]
+
+
+def test_backfill_metrics_cli(app, runner):
+    """El comando de backfill rellena métricas desde el archivo HTML."""
+    caso = CasoClinico(
+        titulo='TEPT',
+        slug='trastorno-de-estres-postraumatico',
+        numero='01',
+        nombre_archivo='trastorno-de-estres-postraumatico.html'
+    )
+    db.session.add(caso)
+    db.session.commit()
+
+    result = runner.invoke(args=['content', 'backfill-metrics', '--batch-size', '10'])
+    assert result.exit_code == 0
+
+    db.session.refresh(caso)
+    assert caso.num_palabras > 0
+    assert caso.tiempo_lectura >= 1
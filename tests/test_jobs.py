@@ -0,0 +1,154 @@
+"""
+Tests para los trabajos en segundo plano (app/utils/jobs.py).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.extensions import db
+from app.enums import JobStatus
+from app.models.articulo import Articulo
+from app.models.trabajo import Trabajo
+from app.utils.jobs import (
+    TAREAS, encolar, reclamar, ejecutar_trabajo, procesar_pendientes, ContextoTrabajo, TrabajoPerdido
+)
+
+
+@pytest.fixture
+def tarea_prueba(monkeypatch):
+    """Registra una tarea que reporta progreso y retorna sus parámetros."""
+    def funcion(ctx):
+        ctx.progreso(50, 'mitad')
+        ctx.log('hola')
+        if ctx.parametros.get('fallar'):
+            raise RuntimeError('fallo provocado')
+        return {'recibido': ctx.parametros}
+
+    monkeypatch.setitem(TAREAS, 'prueba', funcion)
+    return funcion
+
+
+class TestCola:
+    """Encolado idempotente y bloqueo."""
+
+    def test_tipo_desconocido(self, app):
+        with pytest.raises(ValueError):
+            encolar('no-existe')
+
+    def test_clave_deduplica_mientras_esta_activo(self, app, tarea_prueba):
+        primero = encolar('prueba', clave='unico')
+        assert encolar('prueba', clave='unico').id == primero.id
+
+        procesar_pendientes('w1')
+        assert encolar('prueba', clave='unico').id != primero.id
+
+    def test_un_solo_worker_reclama(self, app, tarea_prueba):
+        trabajo = encolar('prueba')
+        assert reclamar('w1') == trabajo.id
+        assert reclamar('w2') is None
+
+    def test_plazo_vencido_se_retoma(self, app, tarea_prueba):
+        trabajo = encolar('prueba')
+        reclamar('w1')
+        trabajo = db.session.get(Trabajo, trabajo.id)
+        trabajo.bloqueado_hasta = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.session.commit()
+
+        assert reclamar('w2') == trabajo.id
+        db.session.refresh(trabajo)
+        assert trabajo.worker == 'w2'
+        assert trabajo.intentos == 2
+
+        # El worker original perdió el bloqueo
+        with pytest.raises(TrabajoPerdido):
+            ContextoTrabajo(trabajo.id, 'w1', {}).progreso(10)
+
+    def test_intentos_agotados_marca_fallido(self, app, tarea_prueba, monkeypatch):
+        monkeypatch.setitem(app.config, 'JOBS_MAX_INTENTOS', 1)
+        trabajo = encolar('prueba')
+        reclamar('w1')
+        trabajo = db.session.get(Trabajo, trabajo.id)
+        trabajo.bloqueado_hasta = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.session.commit()
+
+        assert reclamar('w2') is None
+        db.session.refresh(trabajo)
+        assert trabajo.estado == JobStatus.FAILED.value
+
+
+class TestEjecucion:
+    """Resultado, progreso y errores."""
+
+    def test_completa_con_resultado_y_log(self, app, tarea_prueba):
+        trabajo = encolar('prueba', {'n': 1})
+        assert procesar_pendientes('w1') == 1
+
+        datos = db.session.get(Trabajo, trabajo.id).to_dict()
+        assert datos['estado'] == 'done'
+        assert datos['progreso'] == 100
+        assert datos['mensaje'] == 'mitad'
+        assert datos['resultado'] == {'recibido': {'n': 1}}
+        assert datos['log'][0].endswith('hola')
+        assert datos['terminado']
+
+    def test_fallo_registra_error(self, app, tarea_prueba):
+        trabajo = encolar('prueba', {'fallar': True})
+        reclamar('w1')
+        assert ejecutar_trabajo(trabajo.id, 'w1') == JobStatus.FAILED.value
+        trabajo = db.session.get(Trabajo, trabajo.id)
+        assert 'fallo provocado' in trabajo.error
+        assert trabajo.worker is None
+
+    def test_tarea_sincronizar(self, app, tmp_path, monkeypatch):
+        monkeypatch.setattr('app.config.BASE_DIR', str(tmp_path))
+        db.session.add(Articulo(titulo='Perdido', slug='perdido', nombre_archivo='perdido.html'))
+        db.session.commit()
+
+        trabajo = encolar('sincronizar')
+        procesar_pendientes('w1')
+
+        trabajo = db.session.get(Trabajo, trabajo.id)
+        assert trabajo.get_resultado()['archivados']['articulos'] == 1
+        assert Articulo.get_active().count() == 0
+
+
+class TestRutasAdmin:
+    """/admin/jobs/<tipo> y /admin/jobs/<id>."""
+
+    def test_encolar_y_consultar(self, admin_session):
+        response = admin_session.post('/admin/jobs/diagnostico_integridad')
+        assert response.status_code == 202
+        datos = response.get_json()
+        assert admin_session.post('/admin/jobs/diagnostico_integridad').get_json()['id'] == datos['id']
+
+        estado = admin_session.get(datos['url']).get_json()
+        assert estado['estado'] == 'pending'
+        assert estado['tipo'] == 'diagnostico_integridad'
+
+    def test_sitemap_requiere_cache_compartida(self, admin_session, app, monkeypatch):
+        assert admin_session.post('/admin/jobs/regenerar_sitemap').status_code == 409
+        with pytest.raises(ValueError):
+            encolar('regenerar_sitemap')
+        assert 'data-job="regenerar_sitemap"' not in admin_session.get('/admin/').get_data(as_text=True)
+
+        monkeypatch.setitem(app.config, 'CACHE_TYPE', 'RedisCache')
+        assert admin_session.post('/admin/jobs/regenerar_sitemap').status_code == 202
+        assert 'data-job="regenerar_sitemap"' in admin_session.get('/admin/').get_data(as_text=True)
+
+    def test_tipos_no_permitidos_y_fuente_invalida(self, admin_session):
+        assert admin_session.post('/admin/jobs/prueba').status_code == 404
+        assert admin_session.post('/admin/jobs/importar', data={'fuente': '../../etc'}).status_code == 400
+        assert admin_session.get('/admin/jobs/999').status_code == 404
+
+    def test_requiere_admin(self, client):
+        assert client.post('/admin/jobs/sincronizar').status_code in (302, 403)
+
+
+def test_cli_worker_una_vez(app, runner, monkeypatch):
+    monkeypatch.setitem(app.config, 'CACHE_TYPE', 'RedisCache')
+    encolar('regenerar_sitemap')
+    resultado = runner.invoke(args=['jobs', 'worker', '--una-vez'])
+    assert resultado.exit_code == 0, resultado.output
+    assert '1 trabajos ejecutados' in resultado.output
+    assert Trabajo.query.one().estado == JobStatus.DONE.value
@@ -0,0 +1,148 @@
+"""
+Tests para el análisis de logs de peticiones (app/utils/log_analyzer.py).
+"""
+
+import gzip
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from app import crear_formateador_json
+from app.utils.log_analyzer import (
+    HistogramaLatencia, analizar_logs, archivos_de_log, iterar_lineas, normalizador_flask
+)
+
+
+def _texto(minuto, metodo, ruta, estado, ms):
+    return (f'2026-10-16 {minuto}:01,234 [INFO] request: [a1b2c3d4] '
+            f'{metodo} {ruta} - Status: {estado} - Tiempo: {ms}ms\n')
+
+
+def _json(minuto, metodo, ruta, estado, ms):
+    """Línea como la escribe after_request_logging con el formateador JSON de producción."""
+    registro = logging.LogRecord(
+        'request', logging.INFO, __file__, 0,
+        f'[a1b2c3d4] {metodo} {ruta} - Status: {estado} - Tiempo: {ms}ms - SQL: 3 (1.2ms)', None, None
+    )
+    registro.__dict__.update({'status': estado, 'elapsed_ms': ms, 'sql_consultas': 3})
+    registro.created = datetime.strptime(f'2026-10-16 {minuto}:05', '%Y-%m-%d %H:%M:%S').timestamp()
+    return crear_formateador_json().format(registro) + '\n'
+
+
+@pytest.fixture
+def carpeta(tmp_path):
+    # app.log.2.gz (más antiguo, JSON) → app.log.1 → app.log (actual, texto)
+    with gzip.open(tmp_path / 'app.log.2.gz', 'wt', encoding='utf-8') as f:
+        f.write(_json('10:00', 'GET', '/categoria/biologia/fotosintesis', 200, 10))
+        f.write(_json('10:00', 'GET', '/categoria/biologia/mitocondria', 200, 30))
+    (tmp_path / 'app.log.1').write_text(
+        _texto('10:01', 'GET', '/categoria/quimica/ad%C3%B1', 404, 5)
+        + '2026-10-16 10:01:02,000 [WARNING] app: algo sin petición\n'
+        + _texto('10:01', 'POST', '/admin/lote/articulos/eliminar', 500, 250),
+        encoding='utf-8'
+    )
+    (tmp_path / 'app.log').write_text(
+        ''.join(_texto('10:02', 'GET', '/', 200, ms) for ms in range(1, 101)),
+        encoding='utf-8'
+    )
+    (tmp_path / 'app.log.bak').write_text('ignorado', encoding='utf-8')
+    return tmp_path
+
+
+class TestLectura:
+    """Orden de archivos y lectura por mmap/gzip."""
+
+    def test_orden_cronologico(self, carpeta):
+        nombres = [p.rsplit('/', 1)[-1] for p in archivos_de_log(str(carpeta))]
+        assert nombres == ['app.log.2.gz', 'app.log.1', 'app.log']
+        assert len(archivos_de_log(str(carpeta), incluir_rotados=False)) == 1
+
+    def test_lineas_sin_salto_final_y_vacio(self, tmp_path):
+        (tmp_path / 'a.log').write_bytes(b'uno\ndos')
+        (tmp_path / 'vacio.log').write_bytes(b'')
+        assert list(iterar_lineas(str(tmp_path / 'a.log'))) == [b'uno', b'dos']
+        assert list(iterar_lineas(str(tmp_path / 'vacio.log'))) == []
+
+
+class TestAnalisis:
+    """Percentiles, estados y throughput."""
+
+    def test_agregados(self, carpeta, app):
+        resultado = analizar_logs(archivos_de_log(str(carpeta)), normalizar=normalizador_flask(app))
+
+        assert resultado['peticiones'] == 104
+        assert resultado['desde'] == '2026-10-16 10:00'
+        assert resultado['hasta'] == '2026-10-16 10:02'
+        assert resultado['estados_por_clase'] == {'2xx': 102, '4xx': 1, '5xx': 1}
+        assert resultado['throughput']['por_minuto'] == {
+            '2026-10-16 10:00': 2, '2026-10-16 10:01': 2, '2026-10-16 10:02': 100
+        }
+        assert resultado['throughput']['pico_por_minuto'] == 100
+
+        # Slugs agrupados por la regla de Flask
+        articulos = resultado['rutas']['GET /categoria/<cat_slug>/<slug>']
+        assert articulos['peticiones'] == 3
+        assert articulos['estados'] == {'200': 2, '404': 1}
+
+        raiz = resultado['rutas']['GET /']
+        assert raiz['p50_ms'] == pytest.approx(50, rel=0.03)
+        assert raiz['p95_ms'] == pytest.approx(95, rel=0.03)
+        assert raiz['p99_ms'] == pytest.approx(99, rel=0.03)
+        assert raiz['max_ms'] == 100
+        assert list(resultado['rutas'])[0] == 'GET /'
+        json.dumps(resultado)
+
+    def test_json_de_produccion(self, carpeta):
+        """El timestamp va detrás del mensaje: la fecha sale del campo, no del orden."""
+        with gzip.open(carpeta / 'app.log.2.gz', 'rb') as f:
+            linea = f.readline()
+        assert linea.index(b'"message"') < linea.index(b'"timestamp"')
+        resultado = analizar_logs([str(carpeta / 'app.log.2.gz')])
+        assert resultado['peticiones'] == 2
+        assert resultado['lineas_no_reconocidas'] == 0
+        assert resultado['desde'] == '2026-10-16 10:00'
+
+    def test_filtro_por_rango(self, carpeta):
+        resultado = analizar_logs(archivos_de_log(str(carpeta)), desde='2026-10-16 10:01', hasta='2026-10-16T10:01')
+        assert resultado['peticiones'] == 2
+
+    def test_histograma_acota_el_error(self):
+        histograma = HistogramaLatencia()
+        for ms in range(1, 10001):
+            histograma.agregar(ms / 10)
+        assert histograma.percentil(50) == pytest.approx(500, rel=0.02)
+        assert histograma.percentil(99) == pytest.approx(990, rel=0.02)
+        assert histograma.percentil(100) <= 1000
+        assert len(histograma.cubetas) < 600
+
+
+class TestCli:
+    """flask logs analyze / stats sobre LOGS_DIR."""
+
+    def test_analyze_json(self, runner, app, carpeta, monkeypatch):
+        monkeypatch.setitem(app.config, 'LOGS_DIR', str(carpeta))
+        resultado = runner.invoke(args=['logs', 'analyze', '--json'])
+        assert resultado.exit_code == 0, resultado.output
+        assert json.loads(resultado.output)['peticiones'] == 104
+
+    def test_analyze_texto_y_salida(self, runner, app, carpeta, tmp_path):
+        salida = tmp_path / 'informe.json'
+        resultado = runner.invoke(args=['logs', 'analyze', '--dir', str(carpeta), '--sin-rotados'])
+        assert resultado.exit_code == 0, resultado.output
+        assert '100 peticiones' in resultado.output
+        assert 'GET /' in resultado.output
+
+        runner.invoke(args=['logs', 'analyze', '--dir', str(carpeta), '--salida', str(salida)])
+        assert json.loads(salida.read_text(encoding='utf-8'))['peticiones'] == 104
+
+    def test_stats_y_rotate_usan_logs_dir(self, runner, app, carpeta, monkeypatch):
+        monkeypatch.setitem(app.config, 'LOGS_DIR', str(carpeta))
+        resultado = runner.invoke(args=['logs', 'stats'])
+        assert 'Líneas: 100' in resultado.output
+        assert 'Backups: 2' in resultado.output
+
+        resultado = runner.invoke(args=['logs', 'rotate'])
+        assert '2 archivos de backup eliminados' in resultado.output
+        assert archivos_de_log(str(carpeta)) == [str(carpeta / 'app.log')]
@@ -0,0 +1,116 @@
+"""
+Tests para la retención y archivo de log_actividad (app/utils/log_archive.py).
+"""
+
+import gzip
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.extensions import db
+from app.models.log import LogActividad
+from app.utils.log_archive import archivar_logs, resumen_archivo, sql_particiones_mysql
+
+
+@pytest.fixture
+def destino(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOGS_ARCHIVE_DIR', str(tmp_path))
+    monkeypatch.setitem(app.config, 'LOGS_ARCHIVE_PAUSE_SECONDS', 0)
+    return tmp_path
+
+
+def _logs(dias_atras, n):
+    fecha = datetime.now(timezone.utc).replace(tzinfo=None, hour=10, minute=0) - timedelta(days=dias_atras)
+    for i in range(n):
+        log = LogActividad(tipo_evento='lectura', detalle=f'Leído: art-{dias_atras}-{i}')
+        log.fecha = fecha + timedelta(seconds=i)
+        db.session.add(log)
+    db.session.commit()
+    return fecha.date()
+
+
+def _leer(ruta):
+    with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f]
+
+
+class TestArchivar:
+    """Lotes, archivos por día y manifiesto."""
+
+    def test_mueve_solo_lo_anterior_a_la_retencion(self, destino):
+        viejo = _logs(100, 5)
+        _logs(120, 2)
+        _logs(1, 3)
+
+        resultado = archivar_logs(dias=90, batch_size=2)
+
+        assert resultado['archivadas'] == 7
+        assert resultado['lotes'] == 4
+        assert len(resultado['archivos']) == 2
+        # Quedan los recientes más la entrada de auditoría del archivo
+        assert LogActividad.query.filter_by(tipo_evento='lectura').count() == 3
+        assert LogActividad.query.filter(LogActividad.detalle.like('Archivo de logs%')).count() == 1
+
+        lineas = _leer(destino / f'log_actividad-{viejo.isoformat()}.ndjson.gz')
+        assert [l['detalle'] for l in lineas] == [f'Leído: art-100-{i}' for i in range(5)]
+        assert set(lineas[0]) == {'id', 'tipo_evento', 'detalle', 'fecha'}
+
+    def test_ejecuciones_sucesivas_anexan_y_resumen(self, destino):
+        dia = _logs(100, 2)
+        archivar_logs(dias=90)
+        _logs(100, 1)
+        assert archivar_logs(dias=90)['archivos'] == []
+
+        assert len(_leer(destino / f'log_actividad-{dia.isoformat()}.ndjson.gz')) == 3
+        resumen = resumen_archivo()
+        assert resumen['total_filas'] == 3
+        assert resumen['archivos'][0]['dia'] == dia.isoformat()
+        assert resumen['ultima_ejecucion']['filas'] == 1
+
+    def test_sin_filas_no_escribe_auditoria(self, destino):
+        _logs(1, 2)
+        assert archivar_logs(dias=90)['archivadas'] == 0
+        assert LogActividad.query.count() == 2
+
+
+class TestParticiones:
+    """SQL de particionado mensual para MySQL."""
+
+    def test_particionado_inicial(self, app):
+        sentencias = sql_particiones_mysql([], date(2026, 11, 15), date(2027, 1, 1))
+        assert 'ADD PRIMARY KEY (id, fecha)' in sentencias[0]
+        assert "PARTITION p202611 VALUES LESS THAN (TO_DAYS('2026-12-01'))" in sentencias[1]
+        assert "PARTITION p202701 VALUES LESS THAN (TO_DAYS('2027-02-01'))" in sentencias[1]
+        assert sentencias[1].rstrip(')\n').endswith('PARTITION pmax VALUES LESS THAN MAXVALUE')
+
+    def test_agrega_meses_y_elimina_vacias(self, app):
+        existentes = ['p202610', 'p202611', 'pmax']
+        sentencias = sql_particiones_mysql(existentes, date(2026, 10, 1), date(2027, 1, 1), eliminar=('p202610',))
+        assert sentencias[0].startswith('ALTER TABLE log_actividad REORGANIZE PARTITION pmax INTO')
+        assert 'p202611 ' not in sentencias[0]
+        assert 'p202612' in sentencias[0] and 'p202701' in sentencias[0]
+        assert sentencias[1] == 'ALTER TABLE log_actividad DROP PARTITION p202610'
+
+        assert sql_particiones_mysql(['p202701', 'pmax'], date(2026, 10, 1), date(2027, 1, 1)) == []
+
+
+def test_cli_archive(runner, destino):
+    _logs(200, 3)
+    resultado = runner.invoke(args=['logs', 'archive', '--dias', '30'])
+    assert resultado.exit_code == 0, resultado.output
+    assert '3 eventos anteriores a' in resultado.output
+
+
+def test_cli_partition_fuera_de_mysql(runner, app):
+    resultado = runner.invoke(args=['logs', 'partition', '--aplicar'])
+    assert resultado.exit_code != 0
+    assert 'PARTITION BY RANGE' in resultado.output
+
+
+def test_visor_muestra_resumen(admin_session, destino):
+    _logs(100, 2)
+    archivar_logs(dias=90)
+    response = admin_session.get('/admin/logs')
+    assert b'Eventos Archivados' in response.data
+    assert b'.ndjson.gz' in response.data
@@ -0,0 +1,90 @@
+"""
+Tests para el visor del log de actividad (app/utils/log_viewer.py).
+"""
+
+from datetime import datetime, timedelta
+
+from werkzeug.datastructures import MultiDict
+
+from app.extensions import db
+from app.models.log import LogActividad
+from app.utils.log_viewer import FiltrosLog, parsear_filtros, paginar_logs, estimar_total, filtrar_logs
+
+
+def _logs(n, tipo='lectura', inicio=datetime(2026, 1, 1, 12, 0)):
+    for i in range(n):
+        log = LogActividad(tipo_evento=tipo, detalle=f'{tipo} {i}')
+        log.fecha = inicio + timedelta(minutes=i)
+        db.session.add(log)
+    db.session.commit()
+
+
+def test_parsear_filtros_ignora_invalidos(app):
+    filtros = parsear_filtros(MultiDict({'tipo': 'admin', 'desde': '2026-01-02', 'hasta': 'ayer'}))
+    assert filtros == FiltrosLog(tipo='admin', desde=datetime(2026, 1, 2).date(), hasta=None)
+    assert parsear_filtros(MultiDict({'tipo': 'otro'})).tipo is None
+    assert filtros.como_args() == {'tipo': 'admin', 'desde': '2026-01-02'}
+
+
+class TestPaginacion:
+    """Keyset sobre (fecha, id) con fila extra."""
+
+    def test_recorre_todo_por_cursor_sin_repetir(self, app):
+        _logs(7)
+        _logs(3, tipo='admin')
+        filtros = FiltrosLog(tipo='lectura')
+
+        vistos = []
+        pagina = paginar_logs(filtros, page=1, cursor=None, per_page=3)
+        while True:
+            vistos.extend(log.detalle for log in pagina.items)
+            if not pagina.has_next:
+                break
+            pagina = paginar_logs(filtros, page=1, cursor=pagina.next_cursor, per_page=3)
+
+        assert vistos == [f'lectura {i}' for i in range(6, -1, -1)]
+        assert pagina.page == 3
+
+        # Volver atrás desde la última página
+        anterior = paginar_logs(filtros, page=1, cursor=pagina.prev_cursor, per_page=3)
+        assert [log.detalle for log in anterior.items] == ['lectura 3', 'lectura 2', 'lectura 1']
+        assert anterior.has_next
+
+    def test_rango_de_fechas_incluye_el_dia_final(self, app):
+        _logs(3, inicio=datetime(2026, 1, 1, 23, 59))
+        filtros = FiltrosLog(desde=datetime(2026, 1, 1).date(), hasta=datetime(2026, 1, 1).date())
+        assert filtrar_logs(filtros).count() == 1
+
+    def test_total_acotado(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, 'LOGS_COUNT_LIMIT', 5)
+        _logs(8)
+        filtros = FiltrosLog(tipo='lectura')
+        total = estimar_total(filtrar_logs(filtros), filtros)
+        assert (total.valor, total.modo) == (5, 'minimo')
+        assert str(total) == 'más de 5'
+
+        # La navegación no depende del total
+        pagina = paginar_logs(filtros, page=2, cursor=None, per_page=3)
+        assert pagina.has_next
+
+
+class TestRuta:
+    """/admin/logs."""
+
+    def test_filtro_y_enlaces_conservan_filtros(self, admin_session):
+        _logs(60)
+        _logs(2, tipo='admin')
+
+        response = admin_session.get('/admin/logs?tipo=lectura')
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        assert 'lectura 59' in html
+        assert 'admin 1' not in html
+        assert 'cursor=' in html and 'tipo=lectura' in html
+
+    def test_requiere_admin(self, client):
+        assert client.get('/admin/logs').status_code in (302, 403)
+
+    def test_dashboard_enlaza_al_visor(self, admin_session):
+        response = admin_session.get('/admin/')
+        assert b'/admin/logs' in response.data
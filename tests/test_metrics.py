@@ -0,0 +1,81 @@
+"""
+Tests para las métricas Prometheus (app/utils/metrics.py, /metrics).
+"""
+
+import pytest
+
+from app.utils.metrics import RegistroMetricas, metricas
+
+
+def _valor(texto, prefijo):
+    linea = next(l for l in texto.splitlines() if l.startswith(prefijo))
+    return float(linea.rsplit(' ', 1)[1])
+
+
+class TestRegistro:
+    """Contadores, histograma y agregación entre procesos."""
+
+    def test_histograma_y_exposicion(self):
+        registro = RegistroMetricas()
+        registro.observar_peticion('main.index', 'GET', 200, 0.003)
+        registro.observar_peticion('main.index', 'GET', 200, 0.2)
+        registro.observar_peticion('main.index', 'GET', 503, 12)
+        registro.observar_peticion(None, 'GET', 404, 0.001)
+        texto = registro.exposicion()
+
+        assert 'nexus_http_requests_total{endpoint="main.index",method="GET",status="2xx"} 2' in texto
+        assert 'nexus_http_requests_total{endpoint="main.index",method="GET",status="5xx"} 1' in texto
+        assert 'nexus_http_requests_total{endpoint="<sin ruta>",method="GET",status="4xx"} 1' in texto
+        assert 'nexus_http_request_duration_seconds_bucket{endpoint="main.index",le="0.005"} 1' in texto
+        assert 'nexus_http_request_duration_seconds_bucket{endpoint="main.index",le="0.25"} 2' in texto
+        assert 'nexus_http_request_duration_seconds_bucket{endpoint="main.index",le="10.0"} 2' in texto
+        assert 'nexus_http_request_duration_seconds_bucket{endpoint="main.index",le="+Inf"} 3' in texto
+        assert 'nexus_http_request_duration_seconds_count{endpoint="main.index"} 3' in texto
+        assert _valor(texto, 'nexus_http_request_duration_seconds_sum{endpoint="main.index"}') == pytest.approx(12.203)
+        assert '# TYPE nexus_http_request_duration_seconds histogram' in texto
+
+    def test_agrega_los_volcados_de_otros_workers(self, tmp_path):
+        otro, este = RegistroMetricas(), RegistroMetricas()
+        for registro in (otro, este):
+            registro.directorio = str(tmp_path)
+        otro.observar_peticion('main.index', 'GET', 200, 0.01)
+        otro.contar_consulta(0.5)
+        otro.volcar(forzar=True)
+        este.observar_peticion('main.index', 'GET', 200, 0.02)
+        este.contar_cache(True)
+        este.contar_cache(False)
+
+        texto = este.exposicion()
+        assert 'nexus_http_requests_total{endpoint="main.index",method="GET",status="2xx"} 2' in texto
+        assert 'nexus_db_queries_total 1' in texto
+        assert 'nexus_cache_requests_total{cache="flask",result="hit"} 1' in texto
+        assert 'nexus_metrics_processes 2' in texto
+
+        # Cada worker vuelca su propio archivo; reset los borra todos
+        assert este.limpiar_directorio() == 2
+        assert 'nexus_metrics_processes 1' in este.exposicion()
+
+
+class TestRuta:
+    """Acceso restringido y contadores reales de la app."""
+
+    def test_anonimo_denegado(self, client, monkeypatch, app):
+        monkeypatch.setitem(app.config, 'METRICS_ALLOWED_IPS', [])
+        assert client.get('/metrics').status_code == 403
+
+    def test_ip_permitida(self, client, monkeypatch, app):
+        monkeypatch.setitem(app.config, 'METRICS_ALLOWED_IPS', ['127.0.0.1'])
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+
+    def test_admin_ve_peticiones_y_consultas(self, admin_session):
+        metricas.reiniciar()
+        admin_session.get('/')
+        admin_session.get('/no-existe-esta-ruta')
+        texto = admin_session.get('/metrics').get_data(as_text=True)
+
+        assert 'nexus_http_requests_total{endpoint="main.inicio",method="GET",status="2xx"} 1' in texto
+        assert 'nexus_http_requests_total{endpoint="<sin ruta>",method="GET",status="4xx"} 1' in texto
+        assert _valor(texto, 'nexus_db_queries_total') > 0
+        assert 'nexus_cache_requests_total{cache="flask",result="miss"}' in texto
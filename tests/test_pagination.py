@@ -0,0 +1,85 @@
+"""
+Tests para la paginación keyset con totales cacheados.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from werkzeug.exceptions import NotFound
+from app.extensions import db
+from app.models.articulo import Articulo
+from app.utils.pagination import (
+    codificar_cursor, decodificar_cursor, paginar_por_fecha, invalidar_totales
+)
+
+
+@pytest.fixture
+def articulos(app):
+    """7 artículos, dos de ellos con la misma fecha (desempate por id)."""
+    base = datetime(2025, 1, 1)
+    for i in range(7):
+        fecha = base if i in (3, 4) else base + timedelta(days=i)
+        db.session.add(Articulo(titulo=f'A{i}', slug=f'a{i}', categoria='T', nombre_archivo=f'a{i}.html', fecha=fecha))
+    db.session.commit()
+    return Articulo.get_active().order_by(Articulo.fecha.desc(), Articulo.id.desc()).all()
+
+
+def _paginar(page=1, cursor=None):
+    return paginar_por_fecha(Articulo.get_active(), Articulo, page=page, cursor=cursor,
+                             per_page=3, clave_total='test')
+
+
+class TestCursor:
+    """Tests del token opaco."""
+
+    def test_ida_y_vuelta(self):
+        token = codificar_cursor(datetime(2025, 5, 1, 10, 30), 42, 3, 'n')
+        assert decodificar_cursor(token) == {
+            'fecha': datetime(2025, 5, 1, 10, 30), 'id': 42, 'page': 3, 'direccion': 'n'
+        }
+
+    def test_token_invalido(self):
+        assert decodificar_cursor('no-es-un-token') is None
+
+
+class TestPaginacionKeyset:
+    """Tests del recorrido por cursor."""
+
+    def test_recorrido_con_cursor_igual_a_offset(self, articulos):
+        """Siguiente/anterior por cursor recorren el mismo orden que OFFSET."""
+        pagina1 = _paginar()
+        pagina2 = _paginar(cursor=pagina1.next_cursor)
+        pagina3 = _paginar(cursor=pagina2.next_cursor)
+
+        recorrido = pagina1.items + pagina2.items + pagina3.items
+        assert [a.id for a in recorrido] == [a.id for a in articulos]
+        assert pagina3.page == 3 and pagina3.next_cursor is None
+
+        volver = _paginar(cursor=pagina3.prev_cursor)
+        assert [a.id for a in volver.items] == [a.id for a in pagina2.items]
+
+    def test_pagina_profunda_por_offset_404(self, app, articulos):
+        """?page= por encima del límite configurado da 404."""
+        app.config['PAGINATION_MAX_OFFSET_PAGE'] = 2
+        try:
+            with pytest.raises(NotFound):
+                _paginar(page=3)
+        finally:
+            app.config['PAGINATION_MAX_OFFSET_PAGE'] = 20
+
+    def test_total_cacheado_hasta_invalidar(self, articulos):
+        """El total no se recalcula por visita; se invalida explícitamente."""
+        assert _paginar().total == 7
+        db.session.add(Articulo(titulo='N', slug='n', categoria='T', nombre_archivo='n.html'))
+        db.session.commit()
+        assert _paginar().total == 7
+        invalidar_totales()
+        assert _paginar().total == 8
+
+    def test_ruta_categorias_con_cursor(self, client, articulos):
+        """Las rutas aceptan ?cursor= y renderizan enlaces con cursor."""
+        token = codificar_cursor(articulos[0].fecha, articulos[0].id, 2, 'n')
+        response = client.get(f'/categorias?cursor={token}')
+        html = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert f'/{articulos[0].slug}"' not in html
+        assert f'/{articulos[1].slug}"' in html
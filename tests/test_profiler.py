@@ -0,0 +1,140 @@
+"""
+Tests para el perfilado por muestreo bajo demanda (app/utils/profiler.py).
+"""
+
+import os
+import time
+import threading
+
+import pytest
+
+from app.utils.profiler import CABECERA_TOKEN, Muestreador, leer_pilas, perfilador
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    """Sesión y capturas en una carpeta temporal, sin sesión armada al empezar."""
+    monkeypatch.setattr(perfilador, 'directorio', str(tmp_path))
+    monkeypatch.setattr(perfilador, '_sesion', None)
+    monkeypatch.setattr(perfilador, '_mtime', None)
+    monkeypatch.setattr(perfilador, '_proxima_revision', 0.0)
+    return tmp_path
+
+
+def _ocupado(segundos):
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        pass
+
+
+class TestMuestreador:
+    """Pilas colapsadas del hilo registrado; el hilo muestreador solo vive mientras hay objetivos."""
+
+    def test_pilas_colapsadas(self):
+        muestreador = Muestreador(intervalo=0.001)
+        muestreador.iniciar()
+        _ocupado(0.05)
+        pilas = muestreador.detener()
+
+        assert sum(pilas.values()) > 5
+        pila = pilas.most_common(1)[0][0]
+        assert pila.split(';')[-1].endswith(':_ocupado')
+        assert ' ' not in pila
+
+        for _ in range(100):
+            if not muestreador.activo:
+                break
+            time.sleep(0.01)
+        assert not muestreador.activo
+
+    def test_solo_muestrea_hilos_registrados(self):
+        muestreador = Muestreador(intervalo=0.001)
+        otro = threading.Thread(target=_ocupado, args=(0.05,))
+        otro.start()
+        muestreador.iniciar()
+        time.sleep(0.05)
+        pilas = muestreador.detener()
+        otro.join()
+        assert pilas and not any(p.endswith(':_ocupado') for p in pilas)
+
+
+class TestSesiones:
+    """Arme, N peticiones como máximo, cabecera con token y coste nulo en reposo."""
+
+    def test_sin_sesion_no_arranca_el_muestreador(self, client, carpeta):
+        client.get('/')
+        assert not perfilador.muestreador.activo
+        assert not list(carpeta.iterdir())
+
+    def test_perfila_n_peticiones_y_desarma(self, client, carpeta):
+        sesion = perfilador.armar('main.inicio', 2)
+        for _ in range(4):
+            client.get('/')
+        client.get('/no-existe-esta-ruta')
+
+        assert len(perfilador.rutas_sesion(sesion['token'])) == 2
+        assert perfilador.sesion_activa() is None
+        assert not (carpeta / 'sesion.json').exists()
+
+        resumen = perfilador.capturas()[0]
+        assert resumen['capturas'] == 2
+        assert {p['endpoint'] for p in resumen['peticiones']} == {'main.inicio'}
+        assert all(p['request_id'] for p in resumen['peticiones'])
+
+    def test_requiere_cabecera_con_token(self, client, carpeta):
+        sesion = perfilador.armar(None, 5, requiere_token=True)
+        client.get('/')
+        client.get('/', headers={CABECERA_TOKEN: 'otro'})
+        assert perfilador.rutas_sesion(sesion['token']) == []
+
+        client.get('/', headers={CABECERA_TOKEN: sesion['token']})
+        assert len(perfilador.rutas_sesion(sesion['token'])) == 1
+
+    def test_sesion_caducada(self, client, carpeta, monkeypatch):
+        monkeypatch.setattr(perfilador, 'ttl', -1)
+        sesion = perfilador.armar('main.inicio', 3)
+        client.get('/')
+        assert perfilador.rutas_sesion(sesion['token']) == []
+
+    def test_validacion(self, carpeta):
+        with pytest.raises(ValueError):
+            perfilador.armar(None, 3)
+        with pytest.raises(ValueError):
+            perfilador.armar('main.inicio', perfilador.max_peticiones + 1)
+
+
+class TestRutas:
+    """Endpoints del blueprint de diagnóstico (solo administrador)."""
+
+    def test_requiere_admin(self, client, carpeta):
+        respuesta = client.post('/api/diagnostics/profiler', json={'endpoint': 'main.inicio'})
+        assert respuesta.status_code in (302, 403)
+
+    def test_armar_y_descargar(self, admin_session, carpeta):
+        respuesta = admin_session.post('/api/diagnostics/profiler', json={'endpoint': 'main.inicio', 'peticiones': 2})
+        assert respuesta.status_code == 201
+        sesion = respuesta.get_json()
+        assert admin_session.get('/api/diagnostics/profiler').get_json()['sesion']['token'] == sesion['token']
+
+        admin_session.get('/')
+        admin_session.get('/')
+        # Las capturas pueden no tener muestras si la petición dura menos que el intervalo
+        with open(os.path.join(carpeta, f"{sesion['token']}-0.collapsed"), 'a', encoding='utf-8') as f:
+            f.write('app/routes/main.py:inicio 3\n')
+
+        descarga = admin_session.get(sesion['descarga'])
+        assert descarga.status_code == 200
+        assert 'attachment' in descarga.headers['Content-Disposition']
+        assert leer_pilas([os.path.join(carpeta, f"{sesion['token']}-0.collapsed")])['app/routes/main.py:inicio'] == 3
+        assert 'app/routes/main.py:inicio 3' in descarga.get_data(as_text=True)
+
+    def test_endpoint_desconocido_y_token_invalido(self, admin_session, carpeta):
+        respuesta = admin_session.post('/api/diagnostics/profiler', json={'endpoint': 'no.existe'})
+        assert respuesta.status_code == 400
+        assert admin_session.get('/api/diagnostics/profiler/../etc.collapsed').status_code == 404
+        assert admin_session.get('/api/diagnostics/profiler/0123456789abcdef.collapsed').status_code == 404
+
+    def test_desarmar(self, admin_session, carpeta):
+        admin_session.post('/api/diagnostics/profiler', json={'endpoint': 'main.inicio'})
+        assert admin_session.delete('/api/diagnostics/profiler').get_json()['desarmado'] is True
+        assert admin_session.get('/api/diagnostics/profiler').get_json()['sesion'] is None
@@ -0,0 +1,86 @@
+"""
+Tests para la instrumentación SQL por petición (app/utils/query_stats.py).
+"""
+
+import logging
+
+from flask import g
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.utils.query_stats import contar_consultas, instrumentacion_sql
+
+
+class TestContador:
+    """Conteo por bloque, por petición y detección de N+1."""
+
+    def test_contar_consultas_y_repetidas(self, app):
+        with contar_consultas() as contador:
+            for _ in range(6):
+                db.session.execute(text('SELECT 1'))
+            db.session.execute(text('SELECT 2'))
+        assert contador.total == 7
+        assert contador.repetidas(5) == [('SELECT 1', 6)]
+        assert '6× SELECT 1' in contador.resumen()
+
+    def test_peticion_n1_y_log_correlacionado(self, app, caplog, crear_articulos):
+        with app.test_request_context('/'):
+            g.request_id = 'abc12345'
+            for articulo in crear_articulos(6):
+                db.session.expire(articulo)
+                articulo.titulo  # Un SELECT por artículo: N+1 clásico
+            contador = instrumentacion_sql.de_peticion()
+            with caplog.at_level(logging.WARNING, logger='app.utils.query_stats'):
+                instrumentacion_sql.revisar_peticion(contador, g.request_id, 'main.prueba')
+
+        assert contador.repetidas(instrumentacion_sql.umbral_n1)
+        assert any('[abc12345] Posible N+1 en main.prueba: 6×' in r.getMessage() for r in caplog.records)
+        sospecha = instrumentacion_sql.estado()['sospechas_n1'][0]
+        assert sospecha['request_id'] == 'abc12345'
+        assert sospecha['repeticiones'][0]['veces'] == 6
+
+    def test_consultas_lentas(self, app, monkeypatch):
+        monkeypatch.setattr(instrumentacion_sql, 'umbral_lenta', 0)
+        db.session.execute(text('SELECT 42'))
+        assert instrumentacion_sql.estado()['lentas'][0]['sentencia'] == 'SELECT 42'
+
+    def test_linea_de_acceso_incluye_sql(self, client, caplog):
+        with caplog.at_level(logging.INFO, logger='request'):
+            response = client.get('/')
+        request_id = response.headers['X-Request-ID']
+        linea = next(r.getMessage() for r in caplog.records if r.name == 'request')
+        assert linea.startswith(f'[{request_id}] GET / - Status: 200')
+        assert ' - SQL: ' in linea
+
+
+class TestPresupuestoRutas:
+    """Presupuestos de consultas por ruta: detectan regresiones N+1."""
+
+    def test_inicio(self, client, max_consultas, crear_articulos):
+        crear_articulos(12)
+        with max_consultas(4):
+            client.get('/')
+
+    def test_perfil_con_guardados(self, client, app, max_consultas, crear_articulos):
+        usuario = Usuario(email='ana@gmail.com', nombre='Ana')
+        usuario.articulos_guardados.extend(crear_articulos(10))
+        db.session.add(usuario)
+        db.session.commit()
+        with client.session_transaction() as sess:
+            sess['user_email'] = 'ana@gmail.com'
+
+        # selectinload: usuario + guardados + notificaciones + total (no 1 por artículo)
+        with max_consultas(5):
+            assert client.get('/perfil').status_code == 200
+
+    def test_dashboard_admin(self, admin_session, max_consultas, crear_articulos):
+        crear_articulos(12)
+        with max_consultas(10):
+            assert admin_session.get('/admin/').status_code == 200
+
+
+def test_diagnostico_consultas(admin_session):
+    datos = admin_session.post('/api/diagnostics/queries').get_json()
+    assert datos['status'] == 'pass'
+    assert 'lentas' in datos['details'] and 'sospechas_n1' in datos['details']
@@ -2,8 +2,19 @@
 Tests para funciones de sanitización HTML
 """
 
+import glob
+import os
+
 import pytest
-from app.utils.sanitizers import limpiar_html_google
+from app.config import BASE_DIR
+from app.utils.sanitizers import limpiar_html_google, MOTOR_CLASICO
+
+# Corpus de equivalencia: fixtures estilo Google Docs + contenido publicado
+CORPUS = sorted(
+    glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'sanitizer', '*.html'))
+    + glob.glob(os.path.join(BASE_DIR, 'templates', 'articulos', '*.html'))
+    + glob.glob(os.path.join(BASE_DIR, 'templates', 'casos_clinicos', '*.html'))
+)
 
 
 def test_elimina_scripts():
@@ -74,3 +85,30 @@ def test_limpia_solo_texto():
     html = 'Just plain text without tags'
     result = limpiar_html_google(html)
     assert 'Just plain text without tags' in result
+
+
+def test_imagen_serializada_de_forma_estable():
+    """Clases en orden fijo (no depende del hash de set()) y atributos ordenados"""
+    result = limpiar_html_google('<img src="a.png">')
+    assert result == '<img alt="Imagen del artículo" class="img-fluid rounded my-3" loading="lazy" src="a.png"/>'
+
+
+@pytest.mark.parametrize('ruta', CORPUS, ids=os.path.basename)
+def test_motores_equivalentes_en_corpus(ruta):
+    """El motor de una pasada produce la misma salida que el clásico"""
+    with open(ruta, encoding='utf-8') as f:
+        contenido = f.read()
+    assert limpiar_html_google(contenido) == limpiar_html_google(contenido, motor=MOTOR_CLASICO)
+
+
+@pytest.mark.parametrize('html', [
+    '<p>a&nbsp;b <a href="https://x.com/?a=1&amp;b=2" title=\'di "hola" > ya\'>l</a></p>',
+    '<html><head><title>T</title><style>p{}</style></head>'
+    '<body><p class="c1  c2">x<script>1</script></p><!-- c --></body></html>',
+    '<a href="/local">x</a><a href="https://e.com" rel="x">y</a><img src="a.png" alt="ok" title="t">',
+    '<div>\n    <p>x</p>\n  <svg><path d="M0"/></svg>\n</div><pre>\n  a\n\n  b</pre>',
+    '<table><tr><td colspan="2">x</td></tr></table><hr/><br>',
+])
+def test_motores_equivalentes_en_casos_limite(html):
+    """Entidades, comillas en atributos, espacios entre etiquetas y <pre>"""
+    assert limpiar_html_google(html) == limpiar_html_google(html, motor=MOTOR_CLASICO)
@@ -0,0 +1,77 @@
+"""
+Tests para la búsqueda de texto completo de artículos.
+"""
+
+from datetime import datetime, timezone
+from app.extensions import db
+from app.utils.search import normalizar_texto, extraer_terminos, buscar_articulos
+
+CATEGORIA = 'Psicología Clínica'
+
+
+class TestNormalizacion:
+    """Tests de normalización de consultas."""
+
+    def test_elimina_acentos_y_mayusculas(self):
+        assert normalizar_texto('Estrés  POSTRAUMÁTICO') == 'estres postraumatico'
+
+    def test_terminos_filtrados(self):
+        """Se descartan términos de 1 carácter, duplicados y símbolos."""
+        assert extraer_terminos('a Estrés, estres; "TEPT"*') == ['estres', 'tept']
+
+
+class TestBuscarArticulos:
+    """Tests del servicio de búsqueda (SQLite FTS5)."""
+
+    def test_insensible_a_acentos(self, app, crear_articulos):
+        """'estres' encuentra un título con 'Estrés'."""
+        crear_articulos(slug='estres', titulo='Estrés crónico', categoria=CATEGORIA, cuerpo='')
+        resultados = buscar_articulos('estres', page=1, per_page=20)
+        assert [a.slug for a in resultados.items] == ['estres']
+        assert resultados.total == 1
+
+    def test_busca_en_cuerpo_y_prioriza_titulo(self, app, crear_articulos):
+        """Una coincidencia en el título supera a una en el cuerpo."""
+        crear_articulos(slug='cuerpo', titulo='Otro tema', categoria=CATEGORIA,
+                        cuerpo='Texto sobre la memoria de trabajo')
+        crear_articulos(slug='titulo', titulo='Memoria de trabajo', categoria=CATEGORIA, cuerpo='')
+        resultados = buscar_articulos('memoria', page=1, per_page=20)
+        assert [a.slug for a in resultados.items] == ['titulo', 'cuerpo']
+
+    def test_excluye_eliminados(self, app, crear_articulos):
+        """Los artículos con soft delete no aparecen."""
+        art = crear_articulos(slug='borrado', titulo='Ansiedad social', categoria=CATEGORIA, cuerpo='')[0]
+        art.deleted_at = datetime.now(timezone.utc)
+        db.session.commit()
+        assert buscar_articulos('ansiedad', page=1, per_page=20).total == 0
+
+    def test_candidatos_cacheados_excluyen_papelera(self, app, crear_articulos):
+        """Un borrado posterior a la consulta cacheada no aparece; la restauración sí tras invalidar."""
+        from app.utils.search import invalidar_busqueda
+
+        art = crear_articulos(slug='fobia', titulo='Fobia social', categoria=CATEGORIA, cuerpo='')[0]
+        assert buscar_articulos('fobia', page=1, per_page=20).total == 1
+
+        art.deleted_at = datetime.now(timezone.utc)
+        db.session.commit()
+        assert buscar_articulos('fobia', page=1, per_page=20).items == []
+
+        art.deleted_at = None
+        db.session.commit()
+        invalidar_busqueda()
+        assert [a.slug for a in buscar_articulos('fobia', page=1, per_page=20).items] == ['fobia']
+
+    def test_paginacion(self, app, crear_articulos):
+        """Los resultados se paginan con la interfaz de Pagination."""
+        crear_articulos(3, slug='sueno-{i}', titulo='Sueño {i}', categoria=CATEGORIA, cuerpo='')
+        pagina = buscar_articulos('sueno', page=2, per_page=2)
+        assert pagina.total == 3
+        assert len(pagina.items) == 1
+        assert pagina.has_prev and not pagina.has_next
+
+    def test_ruta_categorias_con_busqueda(self, app, client, crear_articulos):
+        """/categorias?q= renderiza los resultados."""
+        crear_articulos(slug='neuro', titulo='Neuroplasticidad', categoria=CATEGORIA, cuerpo='')
+        response = client.get('/categorias?q=neuroplasticidad')
+        assert response.status_code == 200
+        assert 'Neuroplasticidad' in response.get_data(as_text=True)
@@ -0,0 +1,110 @@
+"""
+Tests para la generación de sitemaps (app/utils/sitemap.py).
+"""
+
+import gzip
+from datetime import datetime, timezone, timedelta
+
+from app.extensions import db
+from app.models.articulo import Articulo
+from app.constants import LISTA_CATEGORIAS, get_category_slug
+from app.utils.sitemap import PAGINAS_ESTATICAS
+
+CATEGORIA = LISTA_CATEGORIAS[0]
+CAT_SLUG = get_category_slug(CATEGORIA)
+
+
+def _xml(response):
+    if response.headers.get('Content-Encoding') == 'gzip' or response.mimetype == 'application/gzip':
+        return gzip.decompress(response.data).decode('utf-8')
+    return response.get_data(as_text=True)
+
+
+class TestSitemap:
+    """Tests del sitemap único."""
+
+    def test_contenido(self, app, client, crear_articulos):
+        crear_articulos(2, categoria=CATEGORIA)
+        Articulo.query.filter_by(slug='art-1').first().soft_delete()
+        db.session.commit()
+
+        response = client.get('/sitemap.xml')
+        assert response.status_code == 200
+        xml = _xml(response)
+        assert '<urlset' in xml
+        assert f'/categoria/{CAT_SLUG}/art-0</loc>' in xml
+        assert 'art-1' not in xml
+        assert f'/categoria/{CAT_SLUG}</loc>' in xml
+
+    def test_gzip_negociado_y_variante_gz(self, app, client, crear_articulos):
+        crear_articulos(1, categoria=CATEGORIA)
+        plano = client.get('/sitemap.xml')
+        comprimido = client.get('/sitemap.xml', headers={'Accept-Encoding': 'gzip'})
+        archivo = client.get('/sitemap.xml.gz')
+
+        assert 'Content-Encoding' not in plano.headers
+        assert comprimido.headers['Content-Encoding'] == 'gzip'
+        assert archivo.mimetype == 'application/gzip'
+        assert _xml(plano) == _xml(comprimido) == _xml(archivo)
+        assert 'Accept-Encoding' in comprimido.headers['Vary']
+
+    def test_etag_304_y_cambio_al_editar(self, app, client, crear_articulos):
+        crear_articulos(1, categoria=CATEGORIA)
+        response = client.get('/sitemap.xml')
+        etag = response.headers['ETag']
+        assert response.headers.get('Last-Modified')
+
+        repetida = client.get('/sitemap.xml', headers={'If-None-Match': etag})
+        assert repetida.status_code == 304
+
+        articulo = Articulo.query.first()
+        articulo.titulo = 'Editado'
+        articulo.updated_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+        db.session.commit()
+
+        nueva = client.get('/sitemap.xml', headers={'If-None-Match': etag})
+        assert nueva.status_code == 200
+        assert nueva.headers['ETag'] != etag
+
+    def test_una_entrada_de_cache_por_parte(self, app, client, crear_articulos):
+        from app.extensions import cache
+
+        crear_articulos(1, categoria=CATEGORIA)
+        client.get('/sitemap.xml')
+        huella, _ = cache.get('sitemap:raiz')
+
+        articulo = Articulo.query.first()
+        articulo.updated_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+        db.session.commit()
+        client.get('/sitemap.xml')
+
+        assert cache.get('sitemap:raiz')[0] != huella
+        assert not any(huella in clave for clave in cache.cache._cache)  # La versión anterior se sobrescribió
+
+
+class TestSitemapIndice:
+    """Tests de partición en índice + hijos."""
+
+    def test_indice_y_partes(self, app, client, monkeypatch, crear_articulos):
+        monkeypatch.setitem(app.config, 'SITEMAP_MAX_URLS', 10)
+        total_fijas = len(PAGINAS_ESTATICAS) + len(LISTA_CATEGORIAS)
+        crear_articulos(15, categoria=CATEGORIA)
+        partes = -(-(total_fijas + 15) // 10)
+
+        indice = _xml(client.get('/sitemap.xml'))
+        assert '<sitemapindex' in indice
+        assert indice.count('<sitemap>') == partes
+
+        vistos = []
+        for n in range(1, partes + 1):
+            xml = _xml(client.get(f'/sitemap-{n}.xml'))
+            assert xml.count('<url>') <= 10
+            vistos += [linea for linea in xml.splitlines() if '<loc>' in linea]
+
+        assert len(vistos) == len(set(vistos)) == total_fijas + 15
+        assert client.get(f'/sitemap-{partes + 1}.xml').status_code == 404
+
+        # La ETag es común a todas las partes: una parte inexistente no da 304
+        etag = client.get('/sitemap-1.xml').headers['ETag']
+        respuesta = client.get(f'/sitemap-{partes + 1}.xml', headers={'If-None-Match': etag})
+        assert respuesta.status_code == 404
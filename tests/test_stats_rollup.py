@@ -0,0 +1,124 @@
+"""
+Tests para los rollups diarios de log_actividad (app/utils/stats_rollup.py).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.enums import LogEventType
+from app.models.articulo import Articulo
+from app.models.estadistica import EstadisticaArticuloDia, EstadisticaDia
+from app.models.log import LogActividad
+from app.utils.stats_rollup import (
+    acumular_estadisticas, marca_actual, total_eventos, serie_diaria, mas_leidos
+)
+
+AHORA = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _evento(tipo, detalle, hace=timedelta(hours=2)):
+    log = LogActividad(tipo_evento=tipo, detalle=detalle)
+    log.fecha = AHORA - hace
+    db.session.add(log)
+
+
+def _preparar():
+    for slug in ('alfa', 'beta'):
+        db.session.add(Articulo(titulo=slug.title(), slug=slug, categoria='Test', nombre_archivo=f'{slug}.html'))
+    for _ in range(3):
+        _evento('lectura', 'Leído: alfa')
+    _evento('lectura', 'Leído: alfa', hace=timedelta(days=1, hours=2))
+    _evento('lectura', 'Leído: beta')
+    _evento('lectura', 'Leído: no-existe')
+    _evento('lectura', 'Caso leído: caso-1')
+    _evento('login', 'Usuario x')
+    db.session.commit()
+
+
+class TestAcumular:
+    """Marca, conteos y exactamente una vez."""
+
+    def test_acumula_por_dia_y_articulo(self, app):
+        _preparar()
+        resultado = acumular_estadisticas(batch_size=3)
+
+        assert resultado['eventos'] == 8
+        assert resultado['lotes'] == 3
+        assert marca_actual() == LogActividad.query.order_by(LogActividad.id.desc()).first().id
+
+        alfa = Articulo.query.filter_by(slug='alfa').one()
+        por_dia = {e.dia: e.lecturas for e in EstadisticaArticuloDia.query.filter_by(articulo_id=alfa.id)}
+        assert sorted(por_dia.values()) == [1, 3]
+        hoy = (AHORA - timedelta(hours=2)).date()
+        assert db.session.get(EstadisticaDia, (hoy, 'lectura')).total == 6
+        assert db.session.get(EstadisticaDia, (hoy, 'login')).total == 1
+
+    def test_incremental_no_cuenta_dos_veces(self, app):
+        _preparar()
+        acumular_estadisticas()
+        assert acumular_estadisticas()['eventos'] == 0
+
+        _evento('lectura', 'Leído: beta')
+        db.session.commit()
+        assert acumular_estadisticas()['eventos'] == 1
+        beta = Articulo.query.filter_by(slug='beta').one()
+        assert sum(e.lecturas for e in EstadisticaArticuloDia.query.filter_by(articulo_id=beta.id)) == 2
+
+    def test_eventos_recientes_esperan(self, app):
+        _evento('lectura', 'Leído: alfa')
+        _evento('lectura', 'Leído: alfa', hace=timedelta(seconds=1))
+        _evento('lectura', 'Leído: alfa')
+        db.session.commit()
+
+        assert acumular_estadisticas()['eventos'] == 1
+        # El total sigue siendo exacto: rollup + eventos posteriores a la marca
+        assert total_eventos(LogEventType.LECTURA) == 3
+
+
+class TestConsultas:
+    """Lecturas O(días) para el panel."""
+
+    def test_serie_y_mas_leidos(self, app):
+        _preparar()
+        acumular_estadisticas()
+        hoy = (AHORA - timedelta(hours=2)).date()
+
+        serie = serie_diaria(3, hoy=hoy)
+        assert [p['dia'] for p in serie] == [(hoy - timedelta(days=i)).isoformat() for i in (2, 1, 0)]
+        assert serie[-1]['total'] == 6
+
+        ranking = mas_leidos(30, hoy=hoy)
+        assert [(r['slug'], r['lecturas']) for r in ranking] == [('alfa', 4), ('beta', 1)]
+        assert [r['slug'] for r in mas_leidos(1, hoy=hoy)] == ['alfa', 'beta']
+
+    def test_api_admin_y_contador(self, admin_session):
+        _preparar()
+        acumular_estadisticas()
+        datos = admin_session.get('/admin/api/estadisticas?dias=7').get_json()
+        assert len(datos['serie']) == 7
+        assert datos['mas_leidos'][0]['slug'] == 'alfa'
+
+        response = admin_session.get('/admin/')
+        assert b'stats-panel' in response.data
+
+
+def test_archivar_conserva_estadisticas(app, tmp_path, monkeypatch):
+    from app.utils.log_archive import archivar_logs
+
+    monkeypatch.setitem(app.config, 'LOGS_ARCHIVE_DIR', str(tmp_path))
+    for _ in range(4):
+        _evento('lectura', 'Leído: alfa', hace=timedelta(days=200))
+    _evento('lectura', 'Leído: alfa')
+    db.session.commit()
+
+    # El archivo ejecuta antes el rollup: lo archivado ya está contado
+    assert archivar_logs(dias=90, pausa=0)['archivadas'] == 4
+    assert LogActividad.query.filter_by(tipo_evento='lectura').count() == 1
+    assert total_eventos(LogEventType.LECTURA) == 5
+
+
+def test_cli_rollup(runner, app):
+    _preparar()
+    resultado = runner.invoke(args=['stats', 'rollup'])
+    assert resultado.exit_code == 0, resultado.output
+    assert '8 eventos acumulados' in resultado.output
@@ -0,0 +1,75 @@
+"""
+Tests para tags normalizados (tabla tag + articulo_tag).
+"""
+
+from datetime import datetime, timezone
+from app.extensions import db
+from app.models.tag import Tag
+from app.utils.tags import slugify_tag, parsear_tags, contar_tags
+
+
+class TestParseoTags:
+    """Tests del parseo compartido por admin y scripts."""
+
+    def test_slugify(self):
+        assert slugify_tag(' Memoria de  Trabajo ') == 'memoria-de-trabajo'
+        assert slugify_tag('Inspiración') == 'inspiracion'
+
+    def test_parsear_descarta_vacios_y_duplicados(self):
+        assert parsear_tags('Ira, , ira,  Estrés  agudo') == [('Ira', 'ira'), ('Estrés agudo', 'estres-agudo')]
+
+
+class TestSincronizarTags:
+    """Tests de la relación normalizada."""
+
+    def test_reutiliza_tags_existentes(self, app, crear_articulos):
+        """Dos artículos con el mismo tag comparten la fila."""
+        crear_articulos(slug='uno', titulo='Uno', tags='Ansiedad, Sueño')
+        art = crear_articulos(slug='dos', titulo='Dos', tags='ansiedad')[0]
+        assert Tag.query.count() == 2
+        assert [t.slug for t in art.etiquetas] == ['ansiedad']
+        assert art.tags == 'ansiedad'
+
+    def test_contar_tags_excluye_eliminados(self, app, crear_articulos):
+        """El índice de conteos solo cuenta artículos activos."""
+        crear_articulos(slug='uno', titulo='Uno', tags='ansiedad')
+        borrado = crear_articulos(slug='dos', titulo='Dos', tags='ansiedad, sueño')[0]
+        borrado.deleted_at = datetime.now(timezone.utc)
+        db.session.commit()
+        assert contar_tags() == [{'nombre': 'ansiedad', 'slug': 'ansiedad', 'total': 1}]
+
+
+class TestVerTag:
+    """Tests de /tag/<slug>."""
+
+    def test_coincidencia_exacta(self, app, client, crear_articulos):
+        """'ira' no coincide con 'inspiracion'."""
+        crear_articulos(slug='enojo', titulo='Enojo', tags='ira')
+        crear_articulos(slug='musa', titulo='Musa', tags='inspiracion')
+        html = client.get('/tag/ira').get_data(as_text=True)
+        assert 'Enojo' in html
+        assert 'Musa' not in html
+
+    def test_slug_no_normalizado_redirige(self, app, client, crear_articulos):
+        """Slugs con mayúsculas/acentos redirigen al canónico."""
+        crear_articulos(slug='musa', titulo='Musa', tags='Inspiración')
+        response = client.get('/tag/Inspiración')
+        assert response.status_code == 301
+        assert response.location.endswith('/tag/inspiracion')
+
+    def test_tag_inexistente_404(self, app, client):
+        assert client.get('/tag/no-existe').status_code == 404
+
+    def test_autocompletado_admin(self, app, admin_session, crear_articulos):
+        """El admin obtiene sugerencias por prefijo."""
+        crear_articulos(slug='uno', titulo='Uno', tags='Neurociencia, Nutrición')
+        response = admin_session.get('/admin/api/tags?q=neu')
+        assert [t['slug'] for t in response.get_json()] == ['neurociencia']
+
+    def test_formularios_usan_autocompletado(self, app, admin_session, crear_articulos):
+        """Alta y edición de artículos enlazan el campo tags con /admin/api/tags."""
+        articulo = crear_articulos(slug='uno', titulo='Uno', tags='Neurociencia')[0]
+        for url in ('/admin/', f'/admin/editar/{articulo.id}'):
+            html = admin_session.get(url).get_data(as_text=True)
+            assert 'data-tags-endpoint="/admin/api/tags"' in html
+            assert 'js/admin.js' in html
@@ -0,0 +1,92 @@
+"""
+Tests para el vigilante de peticiones lentas (app/utils/watchdog.py).
+"""
+
+import logging
+import threading
+
+from app.utils.watchdog import VigilantePeticiones, vigilante
+
+
+def _consulta_bloqueada(liberar):
+    liberar.wait(5)
+
+
+def _peticion_atascada(registro, liberar):
+    """Simula un worker: anota la petición y se queda bloqueado hasta ``liberar``."""
+    registro.iniciar_peticion('abc12345', 'admin.subir', 'POST', '/admin/subir')
+    try:
+        _consulta_bloqueada(liberar)
+    finally:
+        registro.terminar_peticion()
+
+
+class TestVigilante:
+    """Capturas de pila con X-Request-ID, repetición por umbral y buffer acotado."""
+
+    def test_captura_pila_de_peticion_atascada(self, caplog):
+        registro = VigilantePeticiones()
+        registro.umbral = 0
+        registro.intervalo = 60  # La revisión la hace el test
+        liberar = threading.Event()
+        hilo = threading.Thread(target=_peticion_atascada, args=(registro, liberar))
+        hilo.start()
+        try:
+            while not registro.estado()['en_curso']:
+                pass
+            with caplog.at_level(logging.WARNING, logger='app.utils.watchdog'):
+                assert registro.revisar() == 1
+        finally:
+            liberar.set()
+            hilo.join()
+
+        captura = registro.estado()['capturas'][0]
+        assert captura['request_id'] == 'abc12345'
+        assert captura['endpoint'] == 'admin.subir'
+        assert 'in _consulta_bloqueada' in captura['pila']
+        mensaje = caplog.records[0].getMessage()
+        assert mensaje.startswith('[abc12345] Petición lenta: POST /admin/subir (admin.subir)')
+        assert '_consulta_bloqueada' in mensaje
+        assert registro.estado()['en_curso'] == []
+
+    def test_no_captura_antes_del_umbral_ni_dos_veces(self):
+        registro = VigilantePeticiones()
+        registro.umbral = 30
+        registro.intervalo = 60
+        registro.iniciar_peticion('r1', 'main.inicio', 'GET', '/')
+        assert registro.revisar() == 0
+
+        registro.umbral = 0
+        registro._en_curso[threading.get_ident()]['siguiente'] = 0
+        assert registro.revisar() == 1
+        registro.umbral = 30
+        registro._en_curso[threading.get_ident()]['siguiente'] += 30
+        assert registro.revisar() == 0
+        registro.terminar_peticion()
+        assert registro.total_capturas == 1
+
+    def test_buffer_acotado(self, app, monkeypatch):
+        registro = VigilantePeticiones()
+        monkeypatch.setitem(app.config, 'WATCHDOG_BUFFER', 2)
+        registro.init_app(app)
+        for i in range(3):
+            registro._registrar_captura(
+                {'request_id': f'r{i}', 'endpoint': None, 'metodo': 'GET', 'path': '/', 'capturas': 1}, 31.0, ''
+            )
+        assert [c['request_id'] for c in registro.estado()['capturas']] == ['r2', 'r1']
+        assert registro.total_capturas == 3
+
+
+class TestIntegracion:
+    """Hooks de petición y check del panel de diagnóstico."""
+
+    def test_peticiones_se_anotan_y_se_retiran(self, client):
+        client.get('/')
+        assert vigilante.estado()['en_curso'] == []
+        assert vigilante._hilo is not None
+
+    def test_diagnostico(self, admin_session):
+        datos = admin_session.post('/api/diagnostics/watchdog').get_json()
+        assert datos['name'] == 'Peticiones Lentas'
+        assert datos['status'] == 'pass'
+        assert {'umbral_segundos', 'en_curso', 'capturas'} <= set(datos['details'])